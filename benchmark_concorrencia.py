@@ -0,0 +1,110 @@
+"""
+Benchmark da vazão de gravações com o controle de concorrência (AIMD) e o
+limite de taxa (token bucket)
+
+Simula a gravação paralela (ex: atitudes da modal): cada job tem um pool com
+limite_max threads, e cada requisição passa por ControladorAIMD.requisicao()
+e pelo LimitadorTaxa do host, como em _fazer_requisicao_ajax. O SGN é
+simulado por uma espera com as latências dos POST do diário gravados nos HAR
+de requisicoes/ (sorteadas com semente fixa).
+
+Compara o limite de taxa antigo (2 req/s, rajada 4) com o padrão atual
+(TAXA_PADRAO, RAJADA_PADRAO) para 1 e 2 jobs simultâneos. O tempo é
+comprimido por ESCALA; a vazão é informada em requisições por segundo reais.
+
+Uso:
+    python benchmark_concorrencia.py [requisicoes_por_job]
+"""
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from queue import Empty, Queue
+
+from src.concurrency import RAJADA_PADRAO, TAXA_PADRAO, ControladorAIMD, LimitadorTaxa
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+# Compressão do tempo: latências x ESCALA, taxas / ESCALA
+ESCALA = 0.1
+
+
+def latencias_har():
+    """Latências (s) dos POST do diário gravados nos HAR de requisicoes/"""
+    latencias = []
+    for caminho in sorted(glob.glob(os.path.join(PASTA, "requisicoes", "*.har"))):
+        with open(caminho, encoding="utf-8") as f:
+            har = json.load(f)
+        latencias.extend(
+            e["time"] / 1000 for e in har["log"]["entries"]
+            if e["request"]["method"] == "POST" and "diario-classe" in e["request"]["url"]
+        )
+    return latencias
+
+
+def executar_jobs(jobs, requisicoes_por_job, taxa, rajada, latencias):
+    """
+    Executa os jobs com um limitador compartilhado (por host)
+
+    Returns:
+        tuple: (requisições por segundo reais, limite AIMD final de cada job)
+    """
+    limitador = LimitadorTaxa(taxa=taxa / ESCALA, rajada=rajada)
+    controladores = [ControladorAIMD() for _ in range(jobs)]
+    sorteio = random.Random(42)
+    amostras = [latencias[sorteio.randrange(len(latencias))] * ESCALA
+                for _ in range(jobs * requisicoes_por_job)]
+
+    def trabalhador(controlador, fila):
+        while True:
+            try:
+                latencia = fila.get_nowait()
+            except Empty:
+                return
+            with controlador.requisicao() as req:
+                limitador.adquirir()
+                time.sleep(latencia)
+                req.latencia = latencia / ESCALA
+
+    threads = []
+    for j, controlador in enumerate(controladores):
+        fila = Queue()
+        for latencia in amostras[j * requisicoes_por_job:(j + 1) * requisicoes_por_job]:
+            fila.put(latencia)
+        for _ in range(controlador.limite_max):
+            threads.append(threading.Thread(target=trabalhador, args=(controlador, fila)))
+
+    inicio = time.perf_counter()
+    # Sem as mensagens de mudança de limite do ControladorAIMD
+    with open(os.devnull, "w") as nulo, redirect_stdout(nulo):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    decorrido = (time.perf_counter() - inicio) / ESCALA
+    return jobs * requisicoes_por_job / decorrido, [c.limite for c in controladores]
+
+
+def main():
+    requisicoes_por_job = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latencias = latencias_har()
+    media = sum(latencias) / len(latencias)
+    print(f"📊 Vazão de gravações: {requisicoes_por_job} requisições por job, "
+          f"latência média dos HAR {media:.2f}s ({len(latencias)} POST)")
+
+    cenarios = [
+        ("antes: 2 req/s, rajada 4", 2.0, 4),
+        (f"depois: {TAXA_PADRAO:g} req/s, rajada {RAJADA_PADRAO}", TAXA_PADRAO, RAJADA_PADRAO),
+    ]
+    for jobs in (1, 2):
+        print(f"\n   {jobs} job(s) no mesmo host:")
+        for nome, taxa, rajada in cenarios:
+            vazao, limites = executar_jobs(jobs, requisicoes_por_job, taxa, rajada, latencias)
+            print(f"      {nome:<28} {vazao:6.2f} req/s  (limite AIMD final: {limites})")
+
+
+if __name__ == "__main__":
+    main()
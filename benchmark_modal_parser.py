@@ -0,0 +1,126 @@
+"""
+Micro-benchmark da leitura dos selects da modal de conceitos
+
+Compara:
+- a busca antiga: um re.search DOTALL por índice de atitude/habilidade
+  (custo proporcional a campos x tamanho do texto)
+- src.modal_parser.ler_modal_conceitos: recorta o trecho da modal e lê só os
+  selects de atitude/habilidade em uma varredura
+
+Os cenários reais são o formulário da modal (formAtitudes de
+paginas/9lancar_conceito_aluno.html), a página inteira e as respostas
+partial/ajax com a modal gravadas nos HAR de requisicoes/. O formulário com
+o select de atitude replicado até 119 atitudes é sintético.
+
+Uso:
+    python benchmark_modal_parser.py [repeticoes]
+"""
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+from src.modal_parser import ler_modal_conceitos
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+PAGINA = os.path.join(PASTA, "paginas", "9lancar_conceito_aluno.html")
+ATITUDES_SINTETICAS = 119
+
+
+def metodo_antigo(texto):
+    """Reprodução da leitura por índice usada antes do parser de uma passada"""
+    atitudes = {}
+    habilidades = {}
+    indices = re.findall(r'dataTableAtitudes:(\d+):observacaoAtitude', texto)
+    for i in range(max(int(m) for m in indices) + 1 if indices else 0):
+        match = re.search(rf'dataTableAtitudes:{i}:observacaoAtitude_input.*?<option value="([^"]*)" selected="selected"',
+                          texto, re.DOTALL)
+        atitudes[i] = match.group(1) if match else ""
+    indices = re.findall(r'dataTableHabilidades:(\d+):notaConceito', texto)
+    for i in range(max(int(m) for m in indices) + 1 if indices else 0):
+        match = re.search(rf'dataTableHabilidades:{i}:notaConceito_input.*?<option value="([^"]*)" selected="selected"',
+                          texto, re.DOTALL)
+        habilidades[i] = match.group(1) if match else ""
+    return atitudes, habilidades
+
+
+def pagina_com_atitudes(texto, quantidade):
+    """Replica o select da atitude 0 até ter `quantidade` atitudes"""
+    select = re.search(r'<select id="[^"]*dataTableAtitudes:0:observacaoAtitude_input".*?</select>', texto, re.S).group(0)
+    existentes = len(set(re.findall(r'dataTableAtitudes:(\d+):observacaoAtitude_input', texto)))
+    copias = "".join(
+        select.replace("dataTableAtitudes:0:", f"dataTableAtitudes:{i}:")
+        for i in range(existentes, quantidade)
+    )
+    # Depois da última atitude existente, como na modal real
+    fim = texto.index("</select>", texto.index(f"dataTableAtitudes:{existentes - 1}:observacaoAtitude_input")) + len("</select>")
+    return texto[:fim] + copias + texto[fim:]
+
+
+def respostas_com_modal():
+    """Maior resposta partial/ajax com a modal de cada HAR de requisicoes/"""
+    respostas = []
+    for caminho in sorted(glob.glob(os.path.join(PASTA, "requisicoes", "*.har"))):
+        with open(caminho, encoding="utf-8") as f:
+            har = json.load(f)
+        textos = [
+            e["response"]["content"].get("text") or ""
+            for e in har["log"]["entries"]
+        ]
+        textos = [t for t in textos if "observacaoAtitude_input" in t]
+        if textos:
+            respostas.append((f"resposta de {os.path.basename(caminho)}", max(textos, key=len)))
+    return respostas
+
+
+def medir(funcao, texto, repeticoes):
+    """Tempo médio (ms) por chamada"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(texto)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with open(PAGINA, encoding="utf-8") as f:
+        original = f.read()
+
+    inicio = original.index('<form id="formAtitudes"')
+    modal = original[inicio:original.index("</form>", inicio) + len("</form>")]
+    cenarios = [
+        ("modal", modal),
+        ("página inteira", original),
+        *respostas_com_modal(),
+        (f"modal com {ATITUDES_SINTETICAS} atitudes (sintética)", pagina_com_atitudes(modal, ATITUDES_SINTETICAS)),
+    ]
+
+    print(f"📊 Leitura da modal de conceitos ({repeticoes} repetições)")
+    for nome, texto in cenarios:
+        atitudes, habilidades = metodo_antigo(texto)
+        novo = ler_modal_conceitos(texto)
+        habilidades_novo = {h["indice"]: h["valor"] for h in novo["habilidades"]}
+        diferencas = [
+            f"{campo} {i}: {antigo!r} x {atual.get(i)!r}"
+            for campo, valores, atual in (("atitude", atitudes, novo["atitudes"]),
+                                          ("habilidade", habilidades, habilidades_novo))
+            for i, antigo in valores.items() if atual.get(i) != antigo
+        ]
+
+        antigo_ms = medir(metodo_antigo, texto, repeticoes)
+        novo_ms = medir(ler_modal_conceitos, texto, repeticoes)
+        print(f"\n   {nome}: {len(texto) // 1024} KB, {len(atitudes)} atitudes, {len(habilidades)} habilidades")
+        print(f"      busca por índice: {antigo_ms:8.2f} ms")
+        print(f"      modal_parser:     {novo_ms:8.2f} ms (busca por índice / modal_parser: {antigo_ms / novo_ms:.1f}x)")
+        if not diferencas:
+            print("      mesmos valores:   ✅")
+        else:
+            # Campo sem opção selecionada: o DOTALL da busca antiga avança até o
+            # select seguinte e devolve o valor dele
+            print(f"      valores diferentes (busca por índice x modal_parser): {'; '.join(diferencas)}")
+
+
+if __name__ == "__main__":
+    main()
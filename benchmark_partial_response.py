@@ -0,0 +1,129 @@
+"""
+Micro-benchmark da leitura das respostas partial/ajax
+
+Roda sobre as respostas <partial-response> gravadas nos HAR de requisicoes/
+as verificações que cada requisição do lançamento HTTP faz
+(_fazer_requisicao_ajax): ViewState para o rastreador e para o chamador,
+erro do servidor para o disjuntor e para o controle de concorrência e sessão
+expirada duas vezes, além do conteúdo dos updates.
+
+Compara:
+- as expressões ad hoc usadas antes (três padrões de ViewState, busca do
+  /errors/500.html, texto inteiro em minúsculas contra 8 indicadores de
+  sessão e regex DOTALL no CDATA de cada update)
+- src.partial_response.analisar_resposta: um parse lxml por resposta, com
+  as mesmas perguntas respondidas pela estrutura em cache
+
+Uso:
+    python benchmark_partial_response.py [repeticoes]
+"""
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+from src.partial_response import RespostaParcial, analisar_resposta
+
+PASTA_HAR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "requisicoes")
+
+_PADROES_VIEWSTATE = [
+    re.compile(r'<update id="j_id1:javax\.faces\.ViewState:0"><!\[CDATA\[(.*?)\]\]></update>'),
+    re.compile(r'<update id="javax\.faces\.ViewState"><!\[CDATA\[(.*?)\]\]></update>'),
+    re.compile(r'ViewState:0">\s*<!\[CDATA\[(.*?)\]\]>'),
+]
+_INDICADORES_ANTIGOS = [
+    'Oops! Ocorreu um erro ao carregar essa página',
+    'logic:notAuthenticated',
+    'login.html',
+    'autenticacao',
+    'session expired',
+    'sessão expirou',
+    'redirect url="/login.html"',
+    'redirect url="/errors/403.html"'
+]
+
+
+def _viewstate_antigo(texto):
+    for padrao in _PADROES_VIEWSTATE:
+        match = padrao.search(texto)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _sessao_expirada_antiga(texto):
+    texto_lower = texto.lower()
+    return any(indicador.lower() in texto_lower for indicador in _INDICADORES_ANTIGOS)
+
+
+def metodo_antigo(texto):
+    """Verificações de uma requisição com as expressões ad hoc"""
+    viewstate = _viewstate_antigo(texto)                          # rastreador do JsfClient
+    erro = '/errors/500.html' in texto                            # disjuntor
+    sessao = erro or _sessao_expirada_antiga(texto)               # controle de concorrência
+    _viewstate_antigo(texto)                                      # _fazer_requisicao_ajax
+    sessao = _sessao_expirada_antiga(texto)
+    updates = dict(re.findall(r'<update id="([^"]+)"><!\[CDATA\[(.*?)\]\]></update>', texto, re.S))
+    updates.pop("j_id1:javax.faces.ViewState:0", None)
+    return viewstate, erro, sessao, updates
+
+
+def metodo_novo(texto):
+    """Mesmas verificações com a resposta interpretada uma vez"""
+    analisar_resposta.cache_clear()
+    viewstate = analisar_resposta(texto).viewstate
+    erro = analisar_resposta(texto).erro_servidor
+    sessao = erro or analisar_resposta(texto).sessao_expirada
+    analisar_resposta(texto).viewstate
+    sessao = analisar_resposta(texto).sessao_expirada
+    return viewstate, erro, sessao, analisar_resposta(texto).updates
+
+
+def carregar_respostas():
+    """Respostas <partial-response> de cada HAR"""
+    respostas = {}
+    for caminho in sorted(glob.glob(os.path.join(PASTA_HAR, "*.har"))):
+        with open(caminho, encoding="utf-8") as f:
+            har = json.load(f)
+        textos = [
+            e["response"]["content"].get("text") or ""
+            for e in har["log"]["entries"]
+        ]
+        respostas[os.path.basename(caminho)] = [t for t in textos if "<partial-response" in t]
+    return respostas
+
+
+def medir(funcao, textos, repeticoes):
+    """Tempo médio (ms) por resposta"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for texto in textos:
+            funcao(texto)
+    return (time.perf_counter() - inicio) / (repeticoes * len(textos)) * 1000
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    respostas = carregar_respostas()
+
+    print(f"📊 Leitura das respostas partial/ajax ({repeticoes} repetições)")
+    for nome, textos in respostas.items():
+        if not textos:
+            continue
+        iguais = all(metodo_antigo(t) == metodo_novo(t) for t in textos)
+        tamanho = sum(len(t) for t in textos) // 1024
+
+        antigo_ms = medir(metodo_antigo, textos, repeticoes)
+        novo_ms = medir(metodo_novo, textos, repeticoes)
+        parse_ms = medir(RespostaParcial, textos, repeticoes)
+        print(f"\n   {nome}: {len(textos)} respostas, {tamanho} KB")
+        print(f"      expressões ad hoc: {antigo_ms:8.2f} ms por resposta")
+        print(f"      partial_response:  {novo_ms:8.2f} ms por resposta (ad hoc / partial_response: {antigo_ms / novo_ms:.1f}x)")
+        print(f"      só o parse lxml:   {parse_ms:8.2f} ms")
+        print(f"      mesmos resultados: {'✅' if iguais else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
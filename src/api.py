@@ -4,120 +4,390 @@ API de Automação de Lançamento de Notas - SGN
 Este módulo fornece o endpoint principal para lançamento de conceitos trimestrais
 de forma automatizada no sistema SGN.
 """
-from fastapi import FastAPI, Body, File, UploadFile, Form
+from fastapi import FastAPI, Body, File, UploadFile, Form, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from .models import LoginRequest, LoginRequestRA, ParecerRequest, AutomationResponse, AtitudeObservada, ConceitoHabilidade, TrimestreReferencia
-from .selenium_config import SeleniumManager
-from .sgn_automation import SGNAutomation
+from fastapi.responses import StreamingResponse, JSONResponse
+from .models import LoginRequest, LoginRequestRA, ParecerRequest, LoteTurmasRequest, PlanoRequest, AutomationResponse, AtitudeObservada, ConceitoHabilidade, TrimestreReferencia, JobSubmitResponse, JobStatusResponse
+from .automation_context import create_automation_context
+from .selenium_config import BrowserPool
+from .jobs import JobManager
 import tempfile
 import os
-import sys
-import io
 import json
-import asyncio
-from queue import Queue
-import threading
-
-# Classe TeeOutput para escrever no terminal E capturar logs
-class TeeOutput:
-    """Escreve tanto no terminal quanto captura para enviar ao frontend"""
-    def __init__(self, *outputs):
-        self.outputs = outputs
-    
-    def write(self, text):
-        for output in self.outputs:
-            output.write(text)
-            output.flush()
-    
-    def flush(self):
-        for output in self.outputs:
-            output.flush()
-
-# Classe para streaming de logs em tempo real
-class LogStreamer:
-    """Captura logs e envia em tempo real via queue"""
-    def __init__(self):
-        self.queue = Queue()
-        self.original_stdout = sys.stdout
-        self.all_logs = []
-        self.buffer = ""
-    
-    def write(self, text):
-        # Escrever no terminal IMEDIATAMENTE
-        self.original_stdout.write(text)
-        self.original_stdout.flush()
-        
-        # Adicionar ao buffer
-        self.buffer += text
-        
-        # Se tem quebra de linha, enviar para queue IMEDIATAMENTE
-        if '\n' in self.buffer:
-            lines = self.buffer.split('\n')
-            # Enviar todas as linhas completas
-            for line in lines[:-1]:
-                if line.strip():
-                    self.queue.put(line)
-                    self.all_logs.append(line)
-            # Manter última linha incompleta no buffer
-            self.buffer = lines[-1]
-        
-        # Se buffer está grande, enviar mesmo sem quebra de linha
-        if len(self.buffer) > 100:
-            if self.buffer.strip():
-                self.queue.put(self.buffer)
-                self.all_logs.append(self.buffer)
-            self.buffer = ""
-    
-    def flush(self):
-        self.original_stdout.flush()
-        # Enviar buffer restante
-        if self.buffer.strip():
-            self.queue.put(self.buffer)
-            self.all_logs.append(self.buffer)
-            self.buffer = ""
-    
-    def get_log(self, timeout=0.01):
-        """Pega próximo log da queue (non-blocking com timeout muito curto)"""
+
+# Pool de workers que executa as automações fora do event loop
+job_manager = JobManager()
+
+# Navegadores pré-aquecidos entregues aos jobs
+browser_pool = BrowserPool()
+
+# Intervalo (segundos) sem logs antes de enviar heartbeat nos streams SSE
+INTERVALO_HEARTBEAT_SSE = 15.0
+
+
+def _executar_em_contexto(fluxo):
+    """
+    Executa um fluxo de automação em um contexto isolado (navegador próprio)
+
+    Cada job recebe seu próprio SeleniumManager (retirado do pool de
+    navegadores), SGNAutomation e helpers, sem afetar outros jobs.
+
+    Args:
+        fluxo (callable): Função que recebe o SGNAutomation do contexto
+
+    Returns:
+        tuple: (success, message) retornado pelo fluxo
+    """
+    with create_automation_context(browser_pool) as contexto:
+        return fluxo(contexto.sgn_automation)
+
+
+def _tarefa_conceito_trimestre(request):
+    """
+    Monta a tarefa (executada no worker) de lançamento simples de conceitos
+
+    Args:
+        request (LoginRequest): Dados da requisição
+
+    Returns:
+        callable: Função sem argumentos que retorna (success, message)
+    """
+    def executar():
+        # Log da requisição recebida (sem a senha por segurança)
+        request_dict = request.dict()
+        if 'password' in request_dict:
+            request_dict['password'] = '***'  # Ofuscar senha nos logs
+
+        print("\n" + "="*80)
+        print(" NOVA REQUISIÇÃO RECEBIDA")
+        print("-"*80)
+        print(f"Dados da requisição: {request_dict}")
+
+        # Extrair valores dos Enums (usar None para que o método lance exceção se os valores forem inválidos)
+        atitude_val = request.atitude_observada.value if hasattr(request, 'atitude_observada') and request.atitude_observada else None
+        conceito_val = request.conceito_habilidade.value if hasattr(request, 'conceito_habilidade') and request.conceito_habilidade else None
+
+        print(f"🔧 Parâmetros recebidos:")
+        print(f"   - Usuário: {request.username}")
+        print(f"   - Código da turma: {request.codigo_turma}")
+        print(f"   - Atitude observada: {atitude_val or 'Padrão (Raramente)'}")
+        print(f"   - Conceito habilidade: {conceito_val or 'Padrão (B)'}")
+        print(f"   - Trimestre referência: {request.trimestre_referencia}")
+        print(f"   - Retomar do checkpoint: {request.resume}")
+        try:
+            print(f"   - Trocar C por NE (request): {getattr(request, 'trocar_c_por_ne', None)}")
+        except Exception:
+            pass
+        print("-"*80 + "\n")
+
+        # Executar lançamento de conceitos com opções configuráveis
+        return _executar_em_contexto(lambda automacao: automacao.lancar_conceito_trimestre(
+            username=request.username,
+            password=request.password,
+            codigo_turma=request.codigo_turma,
+            atitude_observada=atitude_val,
+            conceito_habilidade=conceito_val,
+            trimestre_referencia=request.trimestre_referencia,
+            resume=request.resume,
+        ))
+    return executar
+
+
+def _tarefa_conceito_inteligente(username, password, codigo_turma, atitude_observada,
+                                 conceito_habilidade, trimestre_referencia, trocar_c_por_ne, resume=False):
+    """
+    Monta a tarefa (executada no worker) de lançamento inteligente de conceitos
+
+    Returns:
+        callable: Função sem argumentos que retorna (success, message)
+    """
+    def executar():
+        print("\n" + "="*80)
+        print(" 🆕 NOVA REQUISIÇÃO - MODO INTELIGENTE")
+        print("-"*80)
+        print(f"🔧 Parâmetros recebidos:")
+        print(f"   - Usuário: {username}")
+        print(f"   - Código da turma: {codigo_turma}")
+        print(f"   - Atitude observada: {atitude_observada or 'Padrão (Raramente)'}")
+        print(f"   - Conceito habilidade (fallback): {conceito_habilidade or 'Padrão (B)'}")
+        print(f"   - Trimestre referência: {trimestre_referencia}")
+        print(f"   - Trocar C por NE: {trocar_c_por_ne}")
+        print(f"   - Retomar do checkpoint: {resume}")
+        print(f"   - Modo: INTELIGENTE (baseado em avaliações)")
+        print("-"*80 + "\n")
+
+        # Executar lançamento INTELIGENTE de conceitos
+        return _executar_em_contexto(lambda automacao: automacao.lancar_conceito_inteligente(
+            username=username,
+            password=password,
+            codigo_turma=codigo_turma,
+            atitude_observada=atitude_observada,
+            conceito_habilidade=conceito_habilidade,
+            trimestre_referencia=trimestre_referencia,
+            trocar_c_por_ne=trocar_c_por_ne,
+            resume=resume,
+        ))
+    return executar
+
+
+def _tarefa_conceito_inteligente_ra(username, password, codigo_turma, inicio_ra, termino_ra,
+                                    descricao_ra, nome_arquivo_ra, caminho_arquivo_ra,
+                                    atitude_observada, conceito_habilidade, trimestre_referencia, resume=False):
+    """
+    Monta a tarefa (executada no worker) de lançamento inteligente com RA
+
+    O arquivo da RA já deve estar salvo em disco (caminho_arquivo_ra); quem
+    submete o job registra _remover_arquivo_temporario como limpeza do job.
+
+    Returns:
+        callable: Função sem argumentos que retorna (success, message)
+    """
+    def executar():
+        print("\n" + "="*80)
+        print(" 🆕 NOVA REQUISIÇÃO - MODO INTELIGENTE COM RA")
+        print("-"*80)
+        print(f"🔧 Parâmetros recebidos:")
+        print(f"   - Usuário: {username}")
+        print(f"   - Código da turma: {codigo_turma}")
+        print(f"   - Atitude observada: {atitude_observada}")
+        print(f"   - Conceito habilidade (fallback): {conceito_habilidade}")
+        print(f"   - Trimestre referência: {trimestre_referencia}")
+        print(f"   - Início RA: {inicio_ra}")
+        print(f"   - Término RA: {termino_ra}")
+        print(f"   - Nome arquivo RA: {nome_arquivo_ra}")
+        print(f"   - Arquivo RA: {caminho_arquivo_ra}")
+        print(f"   - Modo: INTELIGENTE COM RA (C mantido + cadastro de RA)")
+        print(f"   - Retomar do checkpoint: {resume}")
+        print("-"*80 + "\n")
+
+        # Executar lançamento INTELIGENTE com RA
+        return _executar_em_contexto(lambda automacao: automacao.lancar_conceito_inteligente_com_ra(
+            username=username,
+            password=password,
+            codigo_turma=codigo_turma,
+            atitude_observada=atitude_observada,
+            conceito_habilidade=conceito_habilidade,
+            trimestre_referencia=trimestre_referencia,
+            inicio_ra=inicio_ra,
+            termino_ra=termino_ra,
+            descricao_ra=descricao_ra,
+            nome_arquivo_ra=nome_arquivo_ra,
+            caminho_arquivo_ra=caminho_arquivo_ra,
+            resume=resume,
+        ))
+    return executar
+
+
+def _remover_arquivo_temporario(caminho_arquivo):
+    """
+    Monta a limpeza do arquivo temporário de um job
+
+    Registrada no Job (ao_finalizar) para rodar mesmo quando o job é
+    cancelado antes de iniciar e a tarefa nunca executa.
+
+    Returns:
+        callable: Função sem argumentos que remove o arquivo
+    """
+    def remover():
         try:
-            return self.queue.get(timeout=timeout)
-        except:
-            return None
+            os.remove(caminho_arquivo)
+            print(f"🗑️ Arquivo temporário removido: {caminho_arquivo}")
+        except Exception as e:
+            print(f"⚠️ Não foi possível remover arquivo temporário: {e}")
+    return remover
+
+
+def _tarefa_pareceres_por_nota(username, password, codigo_turma, trimestre_referencia):
+    """
+    Monta a tarefa (executada no worker) de lançamento de pareceres por nota
+
+    Returns:
+        callable: Função sem argumentos que retorna (success, message)
+    """
+    def executar():
+        print("\n" + "="*80)
+        print(" 📝 NOVA REQUISIÇÃO - LANÇAMENTO DE PARECERES POR NOTA")
+        print("-"*80)
+        print(f"🔧 Parâmetros recebidos:")
+        print(f"   - Usuário: {username}")
+        print(f"   - Código da turma: {codigo_turma}")
+        print(f"   - Trimestre referência: {trimestre_referencia}")
+        print("-"*80 + "\n")
+
+        # Executar lançamento de pareceres
+        return _executar_em_contexto(lambda automacao: automacao.lancar_pareceres_por_nota(
+            username=username,
+            password=password,
+            codigo_turma=codigo_turma,
+            trimestre_referencia=trimestre_referencia
+        ))
+    return executar
+
+
+def _tarefa_plano(request):
+    """
+    Monta a tarefa (executada no worker) do plano (dry-run) do lançamento inteligente
+
+    Args:
+        request (PlanoRequest): Dados da requisição
+
+    Returns:
+        callable: Função sem argumentos que retorna (success, message, plano)
+    """
+    def executar():
+        print("\n" + "="*80)
+        print(" 🧪 NOVA REQUISIÇÃO - PLANO (DRY-RUN)")
+        print("-"*80)
+        print(f"🔧 Parâmetros recebidos:")
+        print(f"   - Usuário: {request.username}")
+        print(f"   - Código da turma: {request.codigo_turma}")
+        print(f"   - Trimestre referência: {_valor_enum(request.trimestre_referencia)}")
+        print(f"   - Ler valores atuais: {request.ler_valores_atuais}")
+        print("-"*80 + "\n")
+
+        return _executar_em_contexto(lambda automacao: automacao.planejar_lancamento_inteligente(
+            username=request.username,
+            password=request.password,
+            codigo_turma=request.codigo_turma,
+            atitude_observada=_valor_enum(request.atitude_observada),
+            conceito_habilidade=_valor_enum(request.conceito_habilidade),
+            trimestre_referencia=_valor_enum(request.trimestre_referencia),
+            trocar_c_por_ne=request.trocar_c_por_ne,
+            ler_valores_atuais=request.ler_valores_atuais,
+        ))
+    return executar
+
+
+def _tarefa_lote(request):
+    """
+    Monta a tarefa (executada no worker) de lançamento em lote de várias turmas
+
+    Um único navegador e um único login atendem todas as turmas do lote.
+
+    Args:
+        request (LoteTurmasRequest): Dados da requisição
+
+    Returns:
+        callable: Função sem argumentos que retorna (success, message)
+    """
+    def executar():
+        modo = _valor_enum(request.modo)
+        turmas = [
+            {
+                "codigo_turma": turma.codigo_turma,
+                "atitude_observada": _valor_enum(turma.atitude_observada),
+                "conceito_habilidade": _valor_enum(turma.conceito_habilidade),
+                "trimestre_referencia": _valor_enum(turma.trimestre_referencia),
+                "trocar_c_por_ne": turma.trocar_c_por_ne,
+                "resume": turma.resume,
+            }
+            for turma in request.turmas
+        ]
+
+        print("\n" + "="*80)
+        print(" 📚 NOVA REQUISIÇÃO - LANÇAMENTO EM LOTE")
+        print("-"*80)
+        print(f"🔧 Parâmetros recebidos:")
+        print(f"   - Usuário: {request.username}")
+        print(f"   - Modo: {modo}")
+        print(f"   - Turmas: {', '.join(t['codigo_turma'] for t in turmas)}")
+        print("-"*80 + "\n")
+
+        return _executar_em_contexto(lambda automacao: automacao.lancar_conceitos_lote(
+            username=request.username,
+            password=request.password,
+            turmas=turmas,
+            modo=modo,
+        ))
+    return executar
+
+
+def _valor_enum(valor):
+    """Extrai o valor de um Enum opcional (ou None)"""
+    return valor.value if valor is not None and hasattr(valor, 'value') else valor
 
-# Instâncias globais compartilhadas
-selenium_manager = SeleniumManager()
-sgn_automation = SGNAutomation(selenium_manager)
 
-def reiniciar_browser():
+async def _salvar_arquivo_ra(arquivo_ra):
     """
-    Fecha o browser atual e abre um novo para garantir sessão limpa.
-    Chamado no início de cada requisição.
+    Salva o PDF da RA recebido no upload em um arquivo temporário
+
+    Cada upload ganha um arquivo de nome único (jobs simultâneos com o mesmo
+    nome de arquivo não se sobrescrevem); o nome exibido no SGN é o
+    nome_arquivo_ra do formulário.
+
+    Returns:
+        str: Caminho do arquivo salvo
     """
-    print("🔄 Reiniciando browser para nova requisição...")
+    extensao = os.path.splitext(os.path.basename(arquivo_ra.filename or ""))[1] or ".pdf"
+    descritor, temp_file_path = tempfile.mkstemp(prefix="sgn_ra_", suffix=extensao)
+
     try:
-        selenium_manager.close_driver()
-    except Exception as e:
-        print(f"⚠️ Aviso ao fechar driver: {e}")
-    
-    # Limpar caches do helpers
-    if hasattr(sgn_automation, 'helpers') and sgn_automation.helpers:
-        sgn_automation.helpers._cached_cookies = None
-        sgn_automation.helpers._cached_headers = None
-        sgn_automation.helpers._cached_url = None
-        sgn_automation.helpers._cache_timestamp = 0
-        sgn_automation.helpers._cache_total_atitudes = None
-        sgn_automation.helpers._cache_total_conceitos = None
-        sgn_automation.helpers._cache_contadores_timestamp = 0
-        sgn_automation.helpers._cache_capacidades_expandidas = False
-        sgn_automation.helpers._cache_estrutura_capacidades = None
-    
-    # Forçar criação de novo driver
-    new_driver = selenium_manager.get_driver()
-    sgn_automation.driver = new_driver
-    if hasattr(sgn_automation, 'helpers') and sgn_automation.helpers:
-        sgn_automation.helpers.driver = new_driver
-    
-    print("✅ Novo browser iniciado com sessão limpa")
+        with os.fdopen(descritor, "wb") as buffer:
+            content = await arquivo_ra.read()
+            buffer.write(content)
+    except Exception:
+        os.remove(temp_file_path)
+        raise
+
+    print(f"📁 Arquivo salvo temporariamente em: {temp_file_path}")
+    return temp_file_path
+
+
+def _resposta_submissao(job):
+    """Monta a resposta de submissão de um job (HTTP 202)"""
+    return JobSubmitResponse(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/jobs/{job.id}",
+        result_url=f"/jobs/{job.id}/result"
+    )
+
+
+def _stream_job(job, logs=True, progresso=True):
+    """
+    Gera os eventos SSE de um job: logs, progresso estruturado e resultado final
+
+    Eventos enviados (campo "type"):
+    - "log": linha de log ({"message"})
+    - phase_started / phase_finished / student_started / student_done / throughput / class_done
+    - "done": resultado final ({"success", "message"})
+
+    Args:
+        job (Job): Job acompanhado
+        logs (bool): Incluir linhas de log
+        progresso (bool): Incluir eventos de progresso
+
+    Returns:
+        StreamingResponse: Resposta text/event-stream
+    """
+    async def event_generator():
+        # Enviar eventos em tempo real (orientado a eventos, sem polling)
+        async for item in job.acompanhar(logs=logs, progresso=progresso, intervalo_heartbeat=INTERVALO_HEARTBEAT_SSE):
+            if item is None:
+                # Comentário SSE: mantém a conexão viva através de proxies
+                yield ": heartbeat\n\n"
+            else:
+                yield f"data: {json.dumps(_evento_do_item(item))}\n\n"
+
+        # Enviar resultado final
+        yield f"data: {json.dumps(_evento_final(job))}\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+def _evento_do_item(item):
+    """Converte um item de Job.acompanhar() no evento enviado ao cliente"""
+    tipo, dado = item
+    if tipo == "log":
+        return {'type': 'log', 'message': dado}
+    return dado
+
+
+def _evento_final(job):
+    """Evento final (type=done) com o resultado do job"""
+    resultado = job.resultado
+    return {'type': 'done', 'success': resultado.success, 'message': resultado.message}
+
 
 def create_app():
     """
@@ -142,6 +412,16 @@ def create_app():
         allow_headers=["*"],
     )
     
+    @app.on_event("startup")
+    async def aquecer_navegadores():
+        """Inicia o aquecimento do pool de navegadores em background"""
+        browser_pool.iniciar()
+    
+    @app.on_event("shutdown")
+    async def encerrar_navegadores():
+        """Fecha os navegadores do pool ao encerrar a API"""
+        browser_pool.encerrar()
+    
     @app.post("/lancar-conceito-trimestre", response_model=AutomationResponse)
     async def lancar_conceito_trimestre(
         request: LoginRequest = Body(
@@ -243,81 +523,8 @@ def create_app():
                 ]
             }
         """
-        # Capturar logs (com Tee para também exibir no terminal)
-        log_capture = io.StringIO()
-        original_stdout = sys.stdout
-        sys.stdout = TeeOutput(original_stdout, log_capture)
-        
-        try:
-            # Reiniciar browser para sessão limpa
-            reiniciar_browser()
-            
-            # Log da requisição recebida (sem a senha por segurança)
-            request_dict = request.dict()
-            if 'password' in request_dict:
-                request_dict['password'] = '***'  # Ofuscar senha nos logs
-            
-            print("\n" + "="*80)
-            print(" NOVA REQUISIÇÃO RECEBIDA")
-            print("-"*80)
-            print(f"Dados da requisição: {request_dict}")
-            
-            # Extrair valores dos Enums (usar None para que o método lance exceção se os valores forem inválidos)
-            atitude_val = request.atitude_observada.value if hasattr(request, 'atitude_observada') and request.atitude_observada else None
-            conceito_val = request.conceito_habilidade.value if hasattr(request, 'conceito_habilidade') and request.conceito_habilidade else None
-            
-            print(f"🔧 Parâmetros recebidos:")
-            print(f"   - Usuário: {request.username}")
-            print(f"   - Código da turma: {request.codigo_turma}")
-            print(f"   - Atitude observada: {atitude_val or 'Padrão (Raramente)'}")
-            print(f"   - Conceito habilidade: {conceito_val or 'Padrão (B)'}")
-            print(f"   - Trimestre referência: {request.trimestre_referencia}")
-            try:
-                print(f"   - Trocar C por NE (request): {getattr(request, 'trocar_c_por_ne', None)}")
-            except Exception:
-                pass
-            print("-"*80 + "\n")
-
-            # Executar lançamento de conceitos com opções configuráveis
-            success, message = sgn_automation.lancar_conceito_trimestre(
-                username=request.username,
-                password=request.password,
-                codigo_turma=request.codigo_turma,
-                atitude_observada=atitude_val,
-                conceito_habilidade=conceito_val,
-                trimestre_referencia=request.trimestre_referencia
-            )
-            
-            # Capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]
-            
-            return AutomationResponse(
-                success=success,
-                message=message,
-                logs=logs
-            )
-            
-        except Exception as e:
-            # Captura qualquer erro não tratado pela automação
-            error_msg = f"Erro na API: {str(e)}"
-            print(f"❌ {error_msg}")
-            
-            # Restaurar stdout e capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]
-            
-            return AutomationResponse(
-                success=False,
-                message=error_msg,
-                logs=logs
-            )
-        finally:
-            # Garantir que stdout seja sempre restaurado
-            sys.stdout = original_stdout
-            log_capture.close()
+        job = job_manager.submeter("lancar_conceito_trimestre", _tarefa_conceito_trimestre(request))
+        return await job_manager.aguardar(job)
     
     @app.post("/lancar-conceito-inteligente", response_model=AutomationResponse)
     async def lancar_conceito_inteligente(
@@ -380,76 +587,20 @@ def create_app():
         Returns:
             AutomationResponse: Resultado da automação com estatísticas
         """
-        # Capturar logs (com Tee para também exibir no terminal)
-        log_capture = io.StringIO()
-        original_stdout = sys.stdout
-        sys.stdout = TeeOutput(original_stdout, log_capture)
-        
-        try:
-            # Reiniciar browser para sessão limpa
-            reiniciar_browser()
-            
-            request_dict = request.dict()
-            if 'password' in request_dict:
-                request_dict['password'] = '***'
-            
-            print("\n" + "="*80)
-            print(" 🆕 NOVA REQUISIÇÃO - MODO INTELIGENTE")
-            print("-"*80)
-            print(f"Dados da requisição: {request_dict}")
-            
-            atitude_val = request.atitude_observada.value if hasattr(request, 'atitude_observada') and request.atitude_observada else None
-            conceito_val = request.conceito_habilidade.value if hasattr(request, 'conceito_habilidade') and request.conceito_habilidade else None
-            
-            print(f"🔧 Parâmetros recebidos:")
-            print(f"   - Usuário: {request.username}")
-            print(f"   - Código da turma: {request.codigo_turma}")
-            print(f"   - Atitude observada: {atitude_val or 'Padrão (Raramente)'}")
-            print(f"   - Conceito habilidade (fallback): {conceito_val or 'Padrão (B)'}")
-            print(f"   - Trimestre referência: {request.trimestre_referencia}")
-            print(f"   - Modo: INTELIGENTE (baseado em avaliações)")
-            print("-"*80 + "\n")
-
-            # Executar lançamento INTELIGENTE de conceitos
-            success, message = sgn_automation.lancar_conceito_inteligente(
+        job = job_manager.submeter(
+            "lancar_conceito_inteligente",
+            _tarefa_conceito_inteligente(
                 username=request.username,
                 password=request.password,
                 codigo_turma=request.codigo_turma,
-                atitude_observada=atitude_val,
-                conceito_habilidade=conceito_val,
+                atitude_observada=_valor_enum(request.atitude_observada),
+                conceito_habilidade=_valor_enum(request.conceito_habilidade),
                 trimestre_referencia=request.trimestre_referencia,
                 trocar_c_por_ne=request.trocar_c_por_ne if hasattr(request, 'trocar_c_por_ne') else True,
+                resume=request.resume,
             )
-            
-            # Capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]  # Remover linhas vazias
-            
-            return AutomationResponse(
-                success=success,
-                message=message,
-                logs=logs
-            )
-            
-        except Exception as e:
-            error_msg = f"Erro na API: {str(e)}"
-            print(f"❌ {error_msg}")
-            
-            # Restaurar stdout e capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]
-            
-            return AutomationResponse(
-                success=False,
-                message=error_msg,
-                logs=logs
-            )
-        finally:
-            # Garantir que stdout seja sempre restaurado
-            sys.stdout = original_stdout
-            log_capture.close()
+        )
+        return await job_manager.aguardar(job)
     
     @app.get("/lancar-conceito-inteligente-stream")
     async def lancar_conceito_inteligente_stream(
@@ -460,6 +611,7 @@ def create_app():
         atitude_observada: str = "Raramente",
         conceito_habilidade: str = "B",
         trocar_c_por_ne: str = "true",
+        resume: str = "false",
     ):
         """
         🆕 Endpoint com STREAMING de logs em tempo real via Server-Sent Events (SSE)
@@ -467,62 +619,25 @@ def create_app():
         Este endpoint retorna logs em tempo real conforme são gerados durante a execução.
         Use este endpoint para ver o progresso da automação em tempo real no frontend.
         """
-        async def event_generator():
-            log_streamer = LogStreamer()
-            original_stdout = sys.stdout
-            sys.stdout = log_streamer
-            
-            result = {"success": False, "message": ""}
-            
-            def run_automation():
-                nonlocal result
-                try:
-                    # Reiniciar browser para sessão limpa
-                    reiniciar_browser()
-                    
-                    # Normalizar flag vinda da query (robusto a diferentes formatos)
-                    flag_str = str(trocar_c_por_ne).strip().lower()
-                    trocar_flag = flag_str in ("true", "1", "yes", "on")
-                    print("\nParametros recebidos (STREAM):")
-                    print(f" - usuario: {username}")
-                    print(f" - codigo_turma: {codigo_turma}")
-                    print(f" - trimestre: {trimestre_referencia}")
-                    print(f" - atitude: {atitude_observada}")
-                    print(f" - conceito_fallback: {conceito_habilidade}")
-                    print(f" - trocar_c_por_ne: {trocar_flag} (raw='{flag_str}')")
-                    success, message = sgn_automation.lancar_conceito_inteligente(
-                        username=username,
-                        password=password,
-                        codigo_turma=codigo_turma,
-                        atitude_observada=atitude_observada,
-                        conceito_habilidade=conceito_habilidade,
-                        trimestre_referencia=trimestre_referencia,
-                        trocar_c_por_ne=trocar_flag,
-                    )
-                    result = {"success": success, "message": message}
-                except Exception as e:
-                    result = {"success": False, "message": f"Erro: {str(e)}"}
-                finally:
-                    sys.stdout = original_stdout
-            
-            # Executar automação em thread separada
-            thread = threading.Thread(target=run_automation)
-            thread.start()
-            
-            # Enviar logs em tempo real (MUITO RÁPIDO)
-            while thread.is_alive() or not log_streamer.queue.empty():
-                log = log_streamer.get_log(timeout=0.01)
-                if log:
-                    # Enviar IMEDIATAMENTE
-                    yield f"data: {json.dumps({'type': 'log', 'message': log})}\n\n"
-                else:
-                    # Pequeno delay apenas se não tem log
-                    await asyncio.sleep(0.001)
-            
-            # Enviar resultado final
-            yield f"data: {json.dumps({'type': 'done', 'success': result['success'], 'message': result['message']})}\n\n"
+        # Normalizar flag vinda da query (robusto a diferentes formatos)
+        flag_str = str(trocar_c_por_ne).strip().lower()
+        trocar_flag = flag_str in ("true", "1", "yes", "on")
+        resume_flag = str(resume).strip().lower() in ("true", "1", "yes", "on")
         
-        return StreamingResponse(event_generator(), media_type="text/event-stream")
+        job = job_manager.submeter(
+            "lancar_conceito_inteligente",
+            _tarefa_conceito_inteligente(
+                username=username,
+                password=password,
+                codigo_turma=codigo_turma,
+                atitude_observada=atitude_observada,
+                conceito_habilidade=conceito_habilidade,
+                trimestre_referencia=trimestre_referencia,
+                trocar_c_por_ne=trocar_flag,
+                resume=resume_flag,
+            )
+        )
+        return _stream_job(job)
     
     @app.get("/lancar-pareceres-por-nota-stream")
     async def lancar_pareceres_por_nota_stream(
@@ -535,53 +650,16 @@ def create_app():
         🆕 Versão com STREAMING (SSE) para lançamento de pareceres por nota
         Não altera o endpoint existente (POST). Apenas adiciona uma alternativa em tempo real.
         """
-        async def event_generator():
-            log_streamer = LogStreamer()
-            original_stdout = sys.stdout
-            sys.stdout = log_streamer
-            result = {"success": False, "message": ""}
-
-            def run_automation():
-                nonlocal result
-                try:
-                    # Reiniciar browser para sessão limpa
-                    reiniciar_browser()
-                    
-                    print("\n" + "="*80)
-                    print(" 📝 NOVA REQUISIÇÃO - PARECERES (STREAM)")
-                    print("-"*80)
-                    print(f" - usuario: {username}")
-                    print(f" - codigo_turma: {codigo_turma}")
-                    print(f" - trimestre: {trimestre_referencia}")
-
-                    success, message = sgn_automation.lancar_pareceres_por_nota(
-                        username=username,
-                        password=password,
-                        codigo_turma=codigo_turma,
-                        trimestre_referencia=trimestre_referencia,
-                    )
-                    result = {"success": success, "message": message}
-                except Exception as e:
-                    result = {"success": False, "message": f"Erro: {str(e)}"}
-                finally:
-                    sys.stdout = original_stdout
-
-            # Executar em thread separada
-            thread = threading.Thread(target=run_automation)
-            thread.start()
-
-            # Enviar logs em tempo real
-            while thread.is_alive() or not log_streamer.queue.empty():
-                log = log_streamer.get_log(timeout=0.01)
-                if log:
-                    yield f"data: {json.dumps({'type': 'log', 'message': log})}\n\n"
-                else:
-                    await asyncio.sleep(0.001)
-
-            # Final
-            yield f"data: {json.dumps({'type': 'done', 'success': result['success'], 'message': result['message']})}\n\n"
-
-        return StreamingResponse(event_generator(), media_type="text/event-stream")
+        job = job_manager.submeter(
+            "lancar_pareceres_por_nota",
+            _tarefa_pareceres_por_nota(
+                username=username,
+                password=password,
+                codigo_turma=codigo_turma,
+                trimestre_referencia=trimestre_referencia,
+            )
+        )
+        return _stream_job(job)
 
     
     @app.post("/lancar-conceito-inteligente-RA", response_model=AutomationResponse)
@@ -597,6 +675,7 @@ def create_app():
         atitude_observada: str = Form(default="Raramente", description="Atitude observada"),
         conceito_habilidade: str = Form(default="B", description="Conceito padrão (fallback)"),
         trimestre_referencia: str = Form(default="TR2", description="Trimestre de referência"),
+        resume: bool = Form(default=False, description="Pular alunos já confirmados no checkpoint"),
     ):
         """
         🆕 NOVO: Lança conceitos INTELIGENTES com cadastro de Recomposição de Aprendizagem (RA)
@@ -643,103 +722,35 @@ def create_app():
             atitude_observada: Atitude padrão (default: "Raramente")
             conceito_habilidade: Conceito padrão fallback (default: "B")
             trimestre_referencia: Trimestre (default: "TR2")
+            resume: Pular alunos já confirmados no checkpoint de uma execução anterior
             
         Returns:
             AutomationResponse: Resultado da automação com estatísticas
         """
-        # Capturar logs (com Tee para também exibir no terminal)
-        log_capture = io.StringIO()
-        original_stdout = sys.stdout
-        sys.stdout = TeeOutput(original_stdout, log_capture)
-        
         try:
-            # Reiniciar browser para sessão limpa
-            reiniciar_browser()
-            
-            print("\n" + "="*80)
-            print(" 🆕 NOVA REQUISIÇÃO - MODO INTELIGENTE COM RA")
-            print("-"*80)
-            print(f"🔧 Parâmetros recebidos:")
-            print(f"   - Usuário: {username}")
-            print(f"   - Código da turma: {codigo_turma}")
-            print(f"   - Atitude observada: {atitude_observada}")
-            print(f"   - Conceito habilidade (fallback): {conceito_habilidade}")
-            print(f"   - Trimestre referência: {trimestre_referencia}")
-            print(f"   - Início RA: {inicio_ra}")
-            print(f"   - Término RA: {termino_ra}")
-            print(f"   - Nome arquivo RA: {nome_arquivo_ra}")
-            print(f"   - Arquivo RA: {arquivo_ra.filename} ({arquivo_ra.content_type})")
-            print(f"   - Modo: INTELIGENTE COM RA (C mantido + cadastro de RA)")
-            print("-"*80 + "\n")
-            
-            # Salvar arquivo temporariamente
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, arquivo_ra.filename)
-            
-            with open(temp_file_path, "wb") as buffer:
-                content = await arquivo_ra.read()
-                buffer.write(content)
-            
-            print(f"📁 Arquivo salvo temporariamente em: {temp_file_path}")
-            
-            # Executar lançamento INTELIGENTE com RA
-            success, message = sgn_automation.lancar_conceito_inteligente_com_ra(
+            temp_file_path = await _salvar_arquivo_ra(arquivo_ra)
+        except Exception as e:
+            return AutomationResponse(success=False, message=f"Erro na API: {str(e)}", logs=[])
+        
+        job = job_manager.submeter(
+            "lancar_conceito_inteligente_ra",
+            _tarefa_conceito_inteligente_ra(
                 username=username,
                 password=password,
                 codigo_turma=codigo_turma,
-                atitude_observada=atitude_observada,
-                conceito_habilidade=conceito_habilidade,
-                trimestre_referencia=trimestre_referencia,
                 inicio_ra=inicio_ra,
                 termino_ra=termino_ra,
                 descricao_ra=descricao_ra,
                 nome_arquivo_ra=nome_arquivo_ra,
-                caminho_arquivo_ra=temp_file_path
-            )
-            
-            # Limpar arquivo temporário
-            try:
-                os.remove(temp_file_path)
-                print(f"🗑️ Arquivo temporário removido: {temp_file_path}")
-            except Exception as e:
-                print(f"⚠️ Não foi possível remover arquivo temporário: {e}")
-            
-            # Capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]
-            
-            return AutomationResponse(
-                success=success,
-                message=message,
-                logs=logs
-            )
-            
-        except Exception as e:
-            error_msg = f"Erro na API: {str(e)}"
-            print(f"❌ {error_msg}")
-            
-            # Tentar limpar arquivo temporário em caso de erro
-            try:
-                if 'temp_file_path' in locals():
-                    os.remove(temp_file_path)
-            except:
-                pass
-            
-            # Restaurar stdout e capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]
-            
-            return AutomationResponse(
-                success=False,
-                message=error_msg,
-                logs=logs
-            )
-        finally:
-            # Garantir que stdout seja sempre restaurado
-            sys.stdout = original_stdout
-            log_capture.close()
+                caminho_arquivo_ra=temp_file_path,
+                atitude_observada=atitude_observada,
+                conceito_habilidade=conceito_habilidade,
+                trimestre_referencia=trimestre_referencia,
+                resume=resume,
+            ),
+            ao_finalizar=_remover_arquivo_temporario(temp_file_path),
+        )
+        return await job_manager.aguardar(job)
     
     @app.post("/lancar-pareceres-por-nota", response_model=AutomationResponse)
     async def lancar_pareceres_por_nota(request: ParecerRequest = Body(...)):
@@ -770,68 +781,267 @@ def create_app():
         Returns:
             AutomationResponse: Resultado da automação com estatísticas
         """
-        # Capturar logs (com Tee para também exibir no terminal)
-        log_capture = io.StringIO()
-        original_stdout = sys.stdout
-        sys.stdout = TeeOutput(original_stdout, log_capture)
-        
-        try:
-            # Reiniciar browser para sessão limpa
-            reiniciar_browser()
-            
-            request_dict = request.dict()
-            if 'password' in request_dict:
-                request_dict['password'] = '***'
-            
-            print("\n" + "="*80)
-            print(" 📝 NOVA REQUISIÇÃO - LANÇAMENTO DE PARECERES POR NOTA")
-            print("-"*80)
-            print(f"Dados da requisição: {request_dict}")
-            
-            print(f"🔧 Parâmetros recebidos:")
-            print(f"   - Usuário: {request.username}")
-            print(f"   - Código da turma: {request.codigo_turma}")
-            print(f"   - Trimestre referência: {request.trimestre_referencia}")
-            print("-"*80 + "\n")
-
-            # Executar lançamento de pareceres
-            success, message = sgn_automation.lancar_pareceres_por_nota(
+        job = job_manager.submeter(
+            "lancar_pareceres_por_nota",
+            _tarefa_pareceres_por_nota(
                 username=request.username,
                 password=request.password,
                 codigo_turma=request.codigo_turma,
-                trimestre_referencia=request.trimestre_referencia
+                trimestre_referencia=request.trimestre_referencia,
             )
+        )
+        return await job_manager.aguardar(job)
+    
+    @app.post("/plan", response_model=AutomationResponse)
+    async def planejar_lancamento(request: PlanoRequest = Body(...)):
+        """
+        🧪 DRY-RUN: Calcula o plano de escrita do modo inteligente sem gravar nada no SGN
+        
+        Faz login, coleta a estrutura da turma e as notas dos alunos e devolve em
+        "dados" o conceito exato por aluno e habilidade, as atitudes, quantos campos
+        já estão corretos e quantas requisições JSF o lançamento real enviaria
+        (com tempo estimado). Útil para conferir o resultado e agendar turmas
+        grandes fora do horário de pico.
+        
+        Args:
+            request (PlanoRequest): Mesmos campos de /lancar-conceito-inteligente
             
-            # Capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]
+        Returns:
+            AutomationResponse: Resumo em "message" e plano completo em "dados"
+        """
+        job = job_manager.submeter("planejar_lancamento", _tarefa_plano(request))
+        return await job_manager.aguardar(job)
+    
+    @app.post("/lancar-conceitos-lote", response_model=AutomationResponse)
+    async def lancar_conceitos_lote(request: LoteTurmasRequest = Body(...)):
+        """
+        📚 LOTE: Lança conceitos em várias turmas com um único login
+        
+        Faz login uma vez e processa as turmas em sequência (diário → conceitos →
+        próxima turma), sem reiniciar o navegador nem refazer o login a cada turma.
+        Cada turma tem suas próprias opções; uma falha não interrompe as demais.
+        
+        Para acompanhar o resultado de cada turma em tempo real, use
+        POST /jobs/lancar-conceitos-lote e GET /jobs/{job_id}/events
+        (evento "class_done" ao final de cada turma).
+        
+        Args:
+            request (LoteTurmasRequest): Credenciais, modo e lista de turmas
             
-            return AutomationResponse(
-                success=success,
-                message=message,
-                logs=logs
+        Returns:
+            AutomationResponse: Resumo por turma
+        """
+        job = job_manager.submeter("lancar_conceitos_lote", _tarefa_lote(request))
+        return await job_manager.aguardar(job)
+    
+    @app.post("/jobs/lancar-conceito-trimestre", response_model=JobSubmitResponse, status_code=202)
+    async def job_lancar_conceito_trimestre(request: LoginRequest = Body(...)):
+        """
+        Submete um job de lançamento SIMPLES de conceitos (mesmo fluxo de /lancar-conceito-trimestre)
+
+        Retorna imediatamente o identificador do job. Acompanhe em GET /jobs/{job_id}
+        e obtenha o resultado final em GET /jobs/{job_id}/result.
+        """
+        job = job_manager.submeter("lancar_conceito_trimestre", _tarefa_conceito_trimestre(request))
+        return _resposta_submissao(job)
+
+    @app.post("/jobs/lancar-conceito-inteligente", response_model=JobSubmitResponse, status_code=202)
+    async def job_lancar_conceito_inteligente(request: LoginRequest = Body(...)):
+        """
+        Submete um job de lançamento INTELIGENTE de conceitos (mesmo fluxo de /lancar-conceito-inteligente)
+
+        Retorna imediatamente o identificador do job.
+        """
+        job = job_manager.submeter(
+            "lancar_conceito_inteligente",
+            _tarefa_conceito_inteligente(
+                username=request.username,
+                password=request.password,
+                codigo_turma=request.codigo_turma,
+                atitude_observada=_valor_enum(request.atitude_observada),
+                conceito_habilidade=_valor_enum(request.conceito_habilidade),
+                trimestre_referencia=request.trimestre_referencia,
+                trocar_c_por_ne=request.trocar_c_por_ne if hasattr(request, 'trocar_c_por_ne') else True,
+                resume=request.resume,
             )
-            
+        )
+        return _resposta_submissao(job)
+
+    @app.post("/jobs/lancar-conceito-inteligente-RA", response_model=JobSubmitResponse, status_code=202)
+    async def job_lancar_conceito_inteligente_ra(
+        username: str = Form(..., description="Nome de usuário do SGN"),
+        password: str = Form(..., description="Senha do usuário"),
+        codigo_turma: str = Form(..., description="Código da turma"),
+        inicio_ra: str = Form(..., description="Data início RA (DD/MM/YYYY)", example="01/10/2025"),
+        termino_ra: str = Form(..., description="Data término RA (DD/MM/YYYY)", example="31/10/2025"),
+        descricao_ra: str = Form(..., description="Descrição da RA"),
+        nome_arquivo_ra: str = Form(..., description="Nome do arquivo PDF"),
+        arquivo_ra: UploadFile = File(..., description="Arquivo PDF da RA"),
+        atitude_observada: str = Form(default="Raramente", description="Atitude observada"),
+        conceito_habilidade: str = Form(default="B", description="Conceito padrão (fallback)"),
+        trimestre_referencia: str = Form(default="TR2", description="Trimestre de referência"),
+        resume: bool = Form(default=False, description="Pular alunos já confirmados no checkpoint"),
+    ):
+        """
+        Submete um job de lançamento INTELIGENTE COM RA (mesmo fluxo de /lancar-conceito-inteligente-RA)
+
+        O arquivo é salvo antes da submissão; o job o remove ao terminar.
+        """
+        try:
+            temp_file_path = await _salvar_arquivo_ra(arquivo_ra)
         except Exception as e:
-            error_msg = f"Erro na API: {str(e)}"
-            print(f"❌ {error_msg}")
-            
-            # Restaurar stdout e capturar logs
-            sys.stdout = original_stdout
-            logs = log_capture.getvalue().split('\n')
-            logs = [log for log in logs if log.strip()]
-            
-            return AutomationResponse(
-                success=False,
-                message=error_msg,
-                logs=logs
+            raise HTTPException(status_code=400, detail=f"Erro ao salvar o arquivo da RA: {str(e)}")
+        job = job_manager.submeter(
+            "lancar_conceito_inteligente_ra",
+            _tarefa_conceito_inteligente_ra(
+                username=username,
+                password=password,
+                codigo_turma=codigo_turma,
+                inicio_ra=inicio_ra,
+                termino_ra=termino_ra,
+                descricao_ra=descricao_ra,
+                nome_arquivo_ra=nome_arquivo_ra,
+                caminho_arquivo_ra=temp_file_path,
+                atitude_observada=atitude_observada,
+                conceito_habilidade=conceito_habilidade,
+                trimestre_referencia=trimestre_referencia,
+                resume=resume,
+            ),
+            ao_finalizar=_remover_arquivo_temporario(temp_file_path),
+        )
+        return _resposta_submissao(job)
+
+    @app.post("/jobs/lancar-pareceres-por-nota", response_model=JobSubmitResponse, status_code=202)
+    async def job_lancar_pareceres_por_nota(request: ParecerRequest = Body(...)):
+        """
+        Submete um job de lançamento de pareceres (mesmo fluxo de /lancar-pareceres-por-nota)
+
+        Retorna imediatamente o identificador do job.
+        """
+        job = job_manager.submeter(
+            "lancar_pareceres_por_nota",
+            _tarefa_pareceres_por_nota(
+                username=request.username,
+                password=request.password,
+                codigo_turma=request.codigo_turma,
+                trimestre_referencia=request.trimestre_referencia,
             )
-        finally:
-            # Garantir que stdout seja sempre restaurado
-            sys.stdout = original_stdout
-            log_capture.close()
-    
+        )
+        return _resposta_submissao(job)
+
+    @app.post("/jobs/lancar-conceitos-lote", response_model=JobSubmitResponse, status_code=202)
+    async def job_lancar_conceitos_lote(request: LoteTurmasRequest = Body(...)):
+        """
+        Submete um job de lançamento em lote (mesmo fluxo de /lancar-conceitos-lote)
+
+        Os eventos "class_done" em GET /jobs/{job_id}/events trazem o resultado
+        de cada turma assim que ela termina.
+        """
+        job = job_manager.submeter("lancar_conceitos_lote", _tarefa_lote(request))
+        return _resposta_submissao(job)
+
+    @app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+    async def status_job(job_id: str):
+        """
+        Consulta status e progresso de um job
+
+        Args:
+            job_id (str): Identificador retornado na submissão
+
+        Returns:
+            JobStatusResponse: Status, posição na fila e progresso do job
+        """
+        job = job_manager.obter(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job não encontrado")
+        return job_manager.status(job)
+
+    @app.delete("/jobs/{job_id}", response_model=JobStatusResponse)
+    async def cancelar_job(job_id: str):
+        """
+        Cancela um job
+
+        Um job na fila é removido imediatamente. Um job em execução para no
+        próximo ponto de verificação (entre alunos ou entre requisições JSF) e
+        libera o worker e o navegador; acompanhe em GET /jobs/{job_id} até o
+        status "cancelado".
+
+        Args:
+            job_id (str): Identificador retornado na submissão
+
+        Returns:
+            JobStatusResponse: Status do job após o pedido de cancelamento
+        """
+        job = job_manager.obter(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job não encontrado")
+        if not job_manager.cancelar(job):
+            raise HTTPException(status_code=409, detail="Job já finalizado")
+        return job_manager.status(job)
+
+    @app.get("/jobs/{job_id}/result", response_model=AutomationResponse)
+    async def resultado_job(job_id: str):
+        """
+        Obtém o resultado final de um job
+
+        Enquanto o job não terminou, retorna HTTP 202 com o status atual.
+
+        Args:
+            job_id (str): Identificador retornado na submissão
+
+        Returns:
+            AutomationResponse: Resultado da automação (success, message, logs)
+        """
+        job = job_manager.obter(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job não encontrado")
+        if not job.finalizado:
+            return JSONResponse(status_code=202, content=job_manager.status(job).model_dump(mode="json"))
+        return job.resultado
+
+    @app.get("/jobs/{job_id}/events")
+    async def eventos_job(job_id: str, logs: bool = False):
+        """
+        Stream SSE com os eventos estruturados de progresso de um job
+
+        Por padrão envia apenas eventos de progresso (fase, aluno, vazão, ETA)
+        e o evento final "done", sem o texto dos logs.
+
+        Args:
+            job_id (str): Identificador do job
+            logs (bool): Incluir também as linhas de log
+        """
+        job = job_manager.obter(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job não encontrado")
+        return _stream_job(job, logs=logs, progresso=True)
+
+    @app.websocket("/jobs/{job_id}/ws")
+    async def websocket_job(websocket: WebSocket, job_id: str, logs: bool = False):
+        """
+        WebSocket com os eventos estruturados de progresso de um job
+
+        Envia o mesmo esquema de eventos do stream SSE (um JSON por mensagem)
+        e fecha a conexão após o evento final "done".
+        """
+        await websocket.accept()
+        job = job_manager.obter(job_id)
+        if job is None:
+            await websocket.send_json({'type': 'error', 'message': 'Job não encontrado'})
+            await websocket.close(code=1008)
+            return
+
+        try:
+            async for item in job.acompanhar(logs=logs, progresso=True, intervalo_heartbeat=INTERVALO_HEARTBEAT_SSE):
+                if item is None:
+                    await websocket.send_json({'type': 'heartbeat'})
+                else:
+                    await websocket.send_json(_evento_do_item(item))
+            await websocket.send_json(_evento_final(job))
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+
     @app.get("/")
     async def root():
         """
@@ -861,6 +1071,14 @@ def create_app():
                 "lancar_conceito_inteligente": "POST /lancar-conceito-inteligente - 🧠 INTELIGENTE: Aplica conceitos baseados nas avaliações de cada habilidade",
                 "lancar_conceito_inteligente_RA": "POST /lancar-conceito-inteligente-RA - 🎓 INTELIGENTE COM RA: Igual ao inteligente mas mantém C e cadastra RA",
                 "lancar_pareceres_por_nota": "POST /lancar-pareceres-por-nota - 📊 PARECERES: Coleta conceitos e lança pareceres baseados na moda",
+                "lancar_conceitos_lote": "POST /lancar-conceitos-lote - 📚 LOTE: Várias turmas com um único login",
+                "plan": "POST /plan - 🧪 DRY-RUN: Plano de escrita do modo inteligente sem gravar nada",
+                "jobs": "POST /jobs/<modo> - ⏳ Submete a automação como job e retorna o job_id imediatamente",
+                "job_status": "GET /jobs/{job_id} - Status e progresso do job",
+                "job_result": "GET /jobs/{job_id}/result - Resultado final do job",
+                "job_cancel": "DELETE /jobs/{job_id} - 🛑 Cancela o job (na fila ou em execução)",
+                "job_events": "GET /jobs/{job_id}/events - 📈 SSE com eventos de progresso (fase, aluno, ETA)",
+                "job_ws": "WS /jobs/{job_id}/ws - 📈 WebSocket com eventos de progresso",
                 "health": "GET /health - Health check da API",
                 "docs": "GET /docs - Documentação Swagger",
                 "redoc": "GET /redoc - Documentação ReDoc"
@@ -869,7 +1087,8 @@ def create_app():
                 "simples": "Aplica o mesmo conceito (ex: B) para todas as habilidades de todos os alunos",
                 "inteligente": "Lê as avaliações cadastradas e aplica o conceito específico de cada avaliação para sua habilidade correspondente",
                 "inteligente_com_ra": "Igual ao inteligente, mas mantém conceito C (não troca por NE) e cadastra Recomposição de Aprendizagem para cada habilidade C",
-                "pareceres_por_nota": "Coleta conceitos de cada aluno, calcula a moda (nota mais frequente) e lança pareceres pedagógicos"
+                "pareceres_por_nota": "Coleta conceitos de cada aluno, calcula a moda (nota mais frequente) e lança pareceres pedagógicos",
+                "lote": "Aplica o modo simples ou inteligente em várias turmas seguidas reaproveitando a mesma sessão"
             }
         }
     
@@ -0,0 +1,79 @@
+"""
+Contexto isolado de automação por job
+
+Este módulo é responsável por:
+- Criar, para cada job, o seu próprio SeleniumManager (navegador),
+  SGNAutomation e SGNAutomationHelpers
+- Garantir que o navegador e os caches de um job não sejam compartilhados
+  com outro job executando em paralelo
+- Liberar o navegador ao final do job (devolvendo-o ao pool, quando houver)
+
+Substitui as instâncias globais compartilhadas e o antigo reiniciar_browser(),
+que fechava o navegador em uso por qualquer outra requisição.
+"""
+from .selenium_config import SeleniumManager
+from .sgn_automation import SGNAutomation
+
+
+class AutomationContext:
+    """
+    Conjunto de objetos de automação pertencentes a um único job
+
+    Pode ser usado como context manager: o navegador é fechado ao sair do bloco.
+
+    Attributes:
+        selenium_manager (SeleniumManager): Gerenciador do navegador do job
+        sgn_automation (SGNAutomation): Automação do SGN do job
+        helpers (SGNAutomationHelpers): Helpers (caches, cliente HTTP) do job
+    """
+
+    def __init__(self, selenium_manager=None, browser_pool=None):
+        """
+        Inicializa o contexto de automação
+
+        Args:
+            selenium_manager (SeleniumManager, optional): Gerenciador a ser usado.
+                                                          Padrão: um novo SeleniumManager
+            browser_pool (BrowserPool, optional): Pool ao qual o navegador é devolvido
+        """
+        self.browser_pool = browser_pool
+        self.selenium_manager = selenium_manager or SeleniumManager()
+        self.sgn_automation = SGNAutomation(self.selenium_manager)
+        self.helpers = self.sgn_automation.helpers
+
+    def fechar(self):
+        """Devolve o navegador ao pool ou o fecha (se aberto)"""
+        # Conexões keep-alive do cliente HTTP pertencem só a este job
+        self.helpers.jsf.fechar()
+        try:
+            if self.browser_pool is not None:
+                self.browser_pool.checkin(self.selenium_manager)
+            else:
+                self.selenium_manager.close_driver()
+        except Exception as e:
+            print(f"⚠️ Aviso ao fechar driver do contexto: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fechar()
+        return False
+
+
+def create_automation_context(browser_pool=None):
+    """
+    Factory de contextos de automação
+
+    Cada chamada retorna um contexto novo, com navegador e caches próprios.
+    Com um BrowserPool, o navegador já vem aquecido do pool.
+
+    Args:
+        browser_pool (BrowserPool, optional): Pool de navegadores pré-aquecidos
+
+    Returns:
+        AutomationContext: Contexto isolado para um job
+    """
+    if browser_pool is None:
+        return AutomationContext()
+    return AutomationContext(browser_pool.checkout(), browser_pool)
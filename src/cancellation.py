@@ -0,0 +1,76 @@
+"""
+Cancelamento cooperativo dos jobs
+
+Este módulo é responsável por:
+- Definir o token de cancelamento de um job (sinalizado por DELETE /jobs/{id})
+- Associar o token ao job em execução via ContextVar
+- Interromper a automação nos pontos de verificação (entre alunos e entre
+  requisições JSF), liberando o worker e o navegador imediatamente
+
+JobCancelado herda de BaseException (como asyncio.CancelledError) para não ser
+engolida pelos "except Exception" dos loops da automação: ela atravessa os
+loops até o JobManager, e os context managers (navegador, checkpoint) fazem a
+limpeza no caminho.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+
+# Token de cancelamento do job em execução no contexto atual
+_token_atual = contextvars.ContextVar("sgn_token_cancelamento", default=None)
+
+
+class JobCancelado(BaseException):
+    """Sinaliza que o job foi cancelado e a automação deve parar"""
+
+
+class TokenCancelamento:
+    """
+    Token de cancelamento de um job
+
+    O cancelamento apenas sinaliza; quem executa verifica o token nos pontos
+    seguros (verificar_cancelamento) e interrompe a execução.
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        """Sinaliza o cancelamento"""
+        self._evento.set()
+
+    @property
+    def cancelado(self):
+        """Indica se o cancelamento foi solicitado"""
+        return self._evento.is_set()
+
+    def verificar(self):
+        """Levanta JobCancelado se o cancelamento foi solicitado"""
+        if self._evento.is_set():
+            raise JobCancelado("Job cancelado pelo usuário")
+
+
+@contextmanager
+def cancelamento_do_job(token):
+    """
+    Associa o token de cancelamento ao contexto atual durante o bloco
+
+    Args:
+        token (TokenCancelamento): Token do job
+    """
+    contexto = _token_atual.set(token)
+    try:
+        yield token
+    finally:
+        _token_atual.reset(contexto)
+
+
+def verificar_cancelamento():
+    """
+    Ponto de verificação: levanta JobCancelado se o job atual foi cancelado
+
+    Fora de um job não faz nada.
+    """
+    token = _token_atual.get()
+    if token is not None:
+        token.verificar()
@@ -0,0 +1,212 @@
+"""
+Journal de checkpoint para retomar lançamentos interrompidos
+
+Este módulo é responsável por:
+- Gravar em um arquivo JSONL (somente acréscimo) cada aluno concluído e cada
+  campo gravado no SGN durante um lançamento
+- Identificar o journal por turma/trimestre/modo, para que uma nova execução
+  da mesma turma encontre o que já foi confirmado
+- Permitir retomar (resume=True) pulando os alunos já confirmados
+
+Se o Chrome cair ou o SGN devolver uma sequência de erros 500 no aluno 35 de
+40, a nova execução com resume=True processa apenas os 5 restantes.
+
+Os loops da automação chamam as funções de módulo (aluno_confirmado,
+iniciar_aluno, registrar_campo, confirmar_aluno). Fora de um journal ativo
+elas não fazem nada.
+
+Registros do journal (todos com "evento" e "ts"):
+- run_started:   {"resume"} - início de uma execução
+- aluno_iniciado: {"aluno"}
+- campo:         {"aluno", "campo", "valor"}
+- aluno_confirmado: {"aluno", "campos"}
+- aluno_falhou:  {"aluno"}
+
+Uma execução sem resume não apaga o arquivo: ela grava um run_started com
+resume=false e, na leitura, só valem as confirmações posteriores a ele.
+"""
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Diretório padrão dos journals (pode ser trocado por SGN_CHECKPOINT_DIR)
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "checkpoints")
+
+# Registros que marcam o limite de retomada: gravados com fsync
+EVENTOS_SINCRONIZADOS = {"aluno_confirmado", "aluno_falhou"}
+
+# Journal do lançamento em execução no contexto atual
+_journal_atual = contextvars.ContextVar("sgn_journal_checkpoint", default=None)
+
+# Aluno em processamento no contexto atual (cada faixa paralela tem o seu)
+_aluno_do_contexto = contextvars.ContextVar("sgn_aluno_checkpoint", default=None)
+
+
+def _normalizar_nome(nome):
+    """Normaliza o nome do aluno para comparação (espaços e caixa)"""
+    return re.sub(r"\s+", " ", str(nome or "")).strip().upper()
+
+
+class JournalCheckpoint:
+    """
+    Journal JSONL de um lançamento (turma + trimestre + modo)
+
+    Attributes:
+        caminho (str): Caminho do arquivo .jsonl
+        resume (bool): Se True, alunos confirmados em execuções anteriores são pulados
+        confirmados (set): Nomes normalizados dos alunos já confirmados
+    """
+
+    def __init__(self, codigo_turma, trimestre_referencia, modo, resume=False, diretorio=None):
+        diretorio = diretorio or os.environ.get("SGN_CHECKPOINT_DIR", DIRETORIO_PADRAO)
+        os.makedirs(diretorio, exist_ok=True)
+        chave = f"{codigo_turma}_{trimestre_referencia}_{modo}"
+        self.caminho = os.path.join(diretorio, re.sub(r"[^\w.-]", "_", chave) + ".jsonl")
+        self.resume = resume
+        self.confirmados = self._carregar_confirmados() if resume else set()
+        # Campos gravados por aluno em andamento
+        self._campos_aluno = {}
+        self._lock = threading.Lock()
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+        if self._termina_com_linha_truncada():
+            # Isolar a linha truncada para não corromper o próximo registro
+            self._arquivo.write("\n")
+        self._gravar("run_started", resume=resume)
+
+    def _termina_com_linha_truncada(self):
+        """Verifica se o arquivo existente não termina com quebra de linha"""
+        if os.path.getsize(self.caminho) == 0:
+            return False
+        with open(self.caminho, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _carregar_confirmados(self):
+        """Lê o journal e retorna os alunos confirmados desde a última execução sem resume"""
+        confirmados = set()
+        if not os.path.exists(self.caminho):
+            return confirmados
+        with open(self.caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    # Última linha pode estar truncada se o processo morreu no meio da escrita
+                    continue
+                evento = registro.get("evento")
+                if evento == "run_started" and not registro.get("resume"):
+                    confirmados.clear()
+                elif evento == "aluno_confirmado":
+                    confirmados.add(_normalizar_nome(registro.get("aluno")))
+        return confirmados
+
+    def _gravar(self, evento, **dados):
+        """
+        Acrescenta um registro (flush a cada registro)
+
+        Só os limites de retomada (aluno confirmado/falhou) forçam o fsync: os
+        registros de campo ficam no cache do sistema operacional e não
+        acrescentam uma escrita síncrona em disco a cada campo gravado no SGN.
+        """
+        registro = {"evento": evento, "ts": round(time.time(), 3)}
+        registro.update(dados)
+        with self._lock:
+            if self._arquivo.closed:
+                return
+            self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._arquivo.flush()
+            if evento in EVENTOS_SINCRONIZADOS:
+                os.fsync(self._arquivo.fileno())
+
+    def aluno_confirmado(self, nome):
+        """Retorna True se o aluno já foi confirmado e deve ser pulado"""
+        return self.resume and _normalizar_nome(nome) in self.confirmados
+
+    def iniciar_aluno(self, nome):
+        """Marca o aluno atual do contexto (os campos gravados a seguir pertencem a ele)"""
+        _aluno_do_contexto.set(nome)
+        with self._lock:
+            self._campos_aluno[nome] = 0
+        self._gravar("aluno_iniciado", aluno=nome)
+
+    def registrar_campo(self, campo, valor):
+        """Registra um campo gravado no SGN para o aluno atual do contexto"""
+        nome = _aluno_do_contexto.get()
+        with self._lock:
+            self._campos_aluno[nome] = self._campos_aluno.get(nome, 0) + 1
+        self._gravar("campo", aluno=nome, campo=campo, valor=valor)
+
+    def confirmar_aluno(self, nome, sucesso=True):
+        """Registra o fim do aluno; apenas alunos com sucesso são pulados no resume"""
+        with self._lock:
+            campos = self._campos_aluno.pop(nome, 0)
+        if sucesso:
+            self._gravar("aluno_confirmado", aluno=nome, campos=campos)
+            self.confirmados.add(_normalizar_nome(nome))
+        else:
+            self._gravar("aluno_falhou", aluno=nome)
+        _aluno_do_contexto.set(None)
+
+    def fechar(self):
+        """Fecha o arquivo do journal"""
+        with self._lock:
+            if not self._arquivo.closed:
+                self._arquivo.close()
+
+
+@contextmanager
+def journal_checkpoint(codigo_turma, trimestre_referencia, modo, resume=False):
+    """
+    Abre o journal da turma e o associa ao contexto atual durante o bloco
+
+    Args:
+        codigo_turma (str): Código da turma
+        trimestre_referencia (str): Trimestre (TR1, TR2 ou TR3)
+        modo (str): Modo de lançamento (ex: "simples", "inteligente", "inteligente_ra")
+        resume (bool): Pular alunos já confirmados em execuções anteriores
+    """
+    journal = JournalCheckpoint(codigo_turma, trimestre_referencia, modo, resume)
+    if resume:
+        print(f"💾 Checkpoint: retomando com {len(journal.confirmados)} aluno(s) já confirmado(s)")
+    token = _journal_atual.set(journal)
+    try:
+        yield journal
+    finally:
+        _journal_atual.reset(token)
+        journal.fechar()
+
+
+def journal_atual():
+    """Retorna o journal do contexto atual (ou None)"""
+    return _journal_atual.get()
+
+
+def aluno_confirmado(nome):
+    """Retorna True se o aluno já foi confirmado no journal atual (False fora de journal)"""
+    journal = _journal_atual.get()
+    return journal is not None and journal.aluno_confirmado(nome)
+
+
+def iniciar_aluno(nome):
+    """Marca o início de um aluno no journal atual (no-op fora de journal)"""
+    journal = _journal_atual.get()
+    if journal is not None:
+        journal.iniciar_aluno(nome)
+
+
+def registrar_campo(campo, valor):
+    """Registra um campo gravado no journal atual (no-op fora de journal)"""
+    journal = _journal_atual.get()
+    if journal is not None:
+        journal.registrar_campo(campo, valor)
+
+
+def confirmar_aluno(nome, sucesso=True):
+    """Registra o fim de um aluno no journal atual (no-op fora de journal)"""
+    journal = _journal_atual.get()
+    if journal is not None:
+        journal.confirmar_aluno(nome, sucesso)
@@ -0,0 +1,502 @@
+"""
+Controle adaptativo de concorrência das gravações no SGN
+
+Este módulo é responsável por:
+- Limitar quantas requisições de gravação ficam em voo ao mesmo tempo
+- Aumentar o limite aos poucos enquanto a latência e os erros estão saudáveis
+  (aumento aditivo: +1 a cada "janela" de respostas boas)
+- Reduzir o limite pela metade ao ver sinais de sobrecarga do SGN
+  (redirect para /errors/500.html, timeout, sessão expirada)
+- Publicar o limite atual e seu histórico nas métricas de progresso do job
+- Limitar a taxa de requisições (token bucket), permitindo rajadas curtas
+- Suspender todas as gravações quando o SGN está fora do ar (disjuntor)
+
+É o mesmo esquema AIMD (additive increase / multiplicative decrease) do
+controle de congestionamento do TCP: em um dia bom o limite sobe sozinho e a
+vazão aumenta; em um dia ruim ele recua antes que os 500 se acumulem.
+
+O token bucket espaça as requisições de todas as threads de todos os jobs
+para o mesmo host (substitui o intervalo fixo de 500 ms, que não tinha lock e
+deixava duas threads saírem juntas). Quem governa a vazão de um job é o AIMD
+(requisições em voo ÷ latência do SGN) junto com o disjuntor; a taxa
+(SGN_TAXA_REQUISICOES) é só um teto de segurança do host, acima do que os
+jobs alcançam com a latência normal do SGN. Com a antiga taxa de 2 req/s o
+AIMD subia o limite sem ganho de vazão (benchmark_concorrencia.py).
+
+O disjuntor (circuit breaker) é compartilhado por host: depois de algumas
+falhas seguidas (redirect para /errors/500.html, HTTP 5xx, timeout) ele abre e
+todas as threads de todos os jobs aguardam em vez de repetir cada uma seus
+próprios retries. Passado o tempo de espera, uma única requisição barata testa
+o servidor (semiaberto); se ela passar, as gravações são retomadas.
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .cancellation import verificar_cancelamento
+from .progress import registrar_limite_concorrencia
+
+# Limite inicial: o valor fixo (2 threads) usado antes do controle adaptativo
+LIMITE_INICIAL = 2
+LIMITE_MINIMO = 1
+
+# Teto de taxa do host: 20 requisições/s com rajada de 8 (o limite AIMD máximo
+# padrão). Acima da vazão de um job no limite máximo (8 em voo ÷ ~0,65 s por POST)
+TAXA_PADRAO = 20.0
+RAJADA_PADRAO = 8
+
+# Disjuntor: falhas seguidas para abrir, espera inicial (s) e teto da espera (s)
+FALHAS_PARA_ABRIR = 5
+ESPERA_ABERTO = 10.0
+ESPERA_ABERTO_MAX = 60.0
+# Tempo (s) com o SGN fora do ar após o qual as gravações falham na hora
+INDISPONIBILIDADE_MAX = 300.0
+
+
+class LimitadorTaxa:
+    """
+    Token bucket thread-safe
+
+    O balde acumula fichas à taxa configurada, até o tamanho da rajada. Cada
+    requisição consome uma ficha; sem fichas, a thread reserva a próxima e
+    dorme (fora do lock) até ela estar disponível, então as esperas ficam
+    enfileiradas em vez de várias threads saírem juntas.
+
+    Attributes:
+        taxa (float): Fichas por segundo (SGN_TAXA_REQUISICOES, padrão 20.0)
+        rajada (int): Capacidade do balde (SGN_RAJADA_REQUISICOES, padrão 8)
+    """
+
+    def __init__(self, taxa=None, rajada=None):
+        """
+        Args:
+            taxa (float, optional): Requisições por segundo em regime
+            rajada (int, optional): Requisições permitidas de uma vez após um período ocioso
+        """
+        if taxa is None:
+            taxa = float(os.environ.get("SGN_TAXA_REQUISICOES", TAXA_PADRAO))
+        if rajada is None:
+            rajada = int(os.environ.get("SGN_RAJADA_REQUISICOES", RAJADA_PADRAO))
+        self.taxa = max(0.01, taxa)
+        self.rajada = max(1, rajada)
+        self._fichas = float(self.rajada)
+        self._atualizado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reservar(self):
+        """
+        Reserva uma ficha sem aguardar (usado pelo cliente assíncrono)
+
+        Returns:
+            float: Tempo (s) que quem reservou deve aguardar antes de enviar
+        """
+        with self._lock:
+            agora = time.monotonic()
+            self._fichas = min(float(self.rajada), self._fichas + (agora - self._atualizado) * self.taxa)
+            self._atualizado = agora
+            # A ficha é reservada mesmo que ainda não exista (saldo negativo = fila)
+            self._fichas -= 1.0
+            return -self._fichas / self.taxa if self._fichas < 0 else 0.0
+
+    def adquirir(self):
+        """
+        Consome uma ficha, aguardando se necessário
+
+        Returns:
+            float: Tempo aguardado em segundos
+        """
+        espera = self.reservar()
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+
+class _Requisicao:
+    """
+    Resultado de uma requisição controlada (preenchido por quem a executa)
+
+    Attributes:
+        sobrecarga (bool): A resposta indicou sobrecarga
+        latencia (float): Tempo (s) só da ida e volta ao SGN (ex: response.duracao
+                          do JsfClient); sem ele vale o tempo total dentro do bloco
+    """
+
+    def __init__(self):
+        self.sobrecarga = False
+        self.latencia = None
+
+
+class ControladorAIMD:
+    """
+    Controlador AIMD do número de requisições simultâneas ao SGN
+
+    Uma instância por job (pertence ao SGNAutomationHelpers). É seguro usar a
+    mesma instância a partir das threads de gravação paralela.
+
+    Limita requisições em voo, não a taxa: com a latência do SGN, o limite
+    define a vazão do job (o LimitadorTaxa do host é só um teto de segurança).
+
+    Attributes:
+        limite (int): Requisições simultâneas permitidas agora
+        limite_max (int): Teto do limite (SGN_MAX_CONCORRENCIA, padrão 8)
+        latencia_alvo (float): Latência (s) acima da qual o limite não sobe
+        historico (deque): Mudanças de limite ({"ts", "limite", "motivo"})
+    """
+
+    def __init__(self, limite_inicial=LIMITE_INICIAL, limite_min=LIMITE_MINIMO, limite_max=None,
+                 latencia_alvo=4.0, fator_reducao=0.5, intervalo_reducao=1.0):
+        """
+        Args:
+            limite_inicial (int): Limite no início do job
+            limite_min (int): Piso do limite
+            limite_max (int, optional): Teto do limite. Padrão: SGN_MAX_CONCORRENCIA ou 8
+            latencia_alvo (float): Latência saudável máxima em segundos
+            fator_reducao (float): Fator aplicado ao limite em caso de sobrecarga
+            intervalo_reducao (float): Tempo mínimo (s) entre duas reduções, para que
+                                       as falhas de uma mesma rajada reduzam uma vez só
+        """
+        if limite_max is None:
+            limite_max = int(os.environ.get("SGN_MAX_CONCORRENCIA", "8"))
+        self.limite_min = max(1, limite_min)
+        self.limite_max = max(self.limite_min, limite_max)
+        self.latencia_alvo = latencia_alvo
+        self.fator_reducao = fator_reducao
+        self.intervalo_reducao = intervalo_reducao
+
+        self._limite = float(min(max(limite_inicial, self.limite_min), self.limite_max))
+        self._em_voo = 0
+        self._ultima_reducao = 0.0
+        self._condicao = threading.Condition()
+
+        self.sucessos = 0
+        self.sobrecargas = 0
+        self.historico = deque(maxlen=200)
+        self._registrar(int(self._limite), "inicial")
+
+    @property
+    def limite(self):
+        """Requisições simultâneas permitidas agora"""
+        return int(self._limite)
+
+    @property
+    def em_voo(self):
+        """Requisições em andamento"""
+        return self._em_voo
+
+    def adquirir(self):
+        """Aguarda até haver vaga dentro do limite atual"""
+        with self._condicao:
+            while self._em_voo >= int(self._limite):
+                self._condicao.wait()
+            self._em_voo += 1
+
+    def tentar_adquirir(self):
+        """
+        Ocupa uma vaga se houver, sem aguardar (usado pelo cliente assíncrono)
+
+        Returns:
+            bool: True se ocupou a vaga (devolver com liberar)
+        """
+        with self._condicao:
+            if self._em_voo >= int(self._limite):
+                return False
+            self._em_voo += 1
+            return True
+
+    def liberar(self, latencia, sobrecarga=False):
+        """
+        Devolve a vaga e ajusta o limite conforme o resultado da requisição
+
+        Args:
+            latencia (float): Duração da requisição em segundos
+            sobrecarga (bool): A resposta indicou sobrecarga (500, timeout, sessão)
+        """
+        mudanca = None
+        with self._condicao:
+            self._em_voo -= 1
+            anterior = int(self._limite)
+            if sobrecarga:
+                self.sobrecargas += 1
+                agora = time.monotonic()
+                if agora - self._ultima_reducao >= self.intervalo_reducao:
+                    self._ultima_reducao = agora
+                    self._limite = max(float(self.limite_min), self._limite * self.fator_reducao)
+                    mudanca = "sobrecarga"
+            else:
+                self.sucessos += 1
+                if latencia <= self.latencia_alvo:
+                    # +1 a cada "limite" respostas saudáveis
+                    self._limite = min(float(self.limite_max), self._limite + 1.0 / self._limite)
+                    mudanca = "saudavel"
+            atual = int(self._limite)
+            self._condicao.notify_all()
+
+        if mudanca and atual != anterior:
+            self._registrar(atual, mudanca)
+            seta = "⬆️" if atual > anterior else "⬇️"
+            print(f"   {seta} Concorrência SGN: {anterior} → {atual} ({mudanca})")
+
+    @contextmanager
+    def requisicao(self):
+        """
+        Executa uma requisição dentro do limite
+
+        Quem executa marca req.sobrecarga conforme a resposta; exceções
+        (timeout, conexão recusada) também contam como sobrecarga. A latência
+        comparada com latencia_alvo é req.latencia quando informada, para que
+        as esperas do disjuntor e do token bucket não contem como lentidão.
+
+        Yields:
+            _Requisicao: Objeto para marcar o resultado
+        """
+        self.adquirir()
+        req = _Requisicao()
+        inicio = time.monotonic()
+        try:
+            yield req
+        except Exception:
+            req.sobrecarga = True
+            raise
+        finally:
+            latencia = req.latencia if req.latencia is not None else time.monotonic() - inicio
+            self.liberar(latencia, req.sobrecarga)
+
+    def _registrar(self, limite, motivo):
+        """Guarda a mudança no histórico e nas métricas do job"""
+        self.historico.append({"ts": round(time.time(), 3), "limite": limite, "motivo": motivo})
+        registrar_limite_concorrencia(limite, motivo)
+
+    def metricas(self):
+        """Resumo do controlador (limite atual, contadores e histórico)"""
+        with self._condicao:
+            return {
+                "limite_atual": int(self._limite),
+                "limite_max": self.limite_max,
+                "em_voo": self._em_voo,
+                "sucessos": self.sucessos,
+                "sobrecargas": self.sobrecargas,
+                "historico": list(self.historico),
+            }
+
+
+class CircuitoAberto(Exception):
+    """O SGN está indisponível há mais tempo que o tolerado (disjuntor aberto)"""
+
+
+class DisjuntorCircuito:
+    """
+    Disjuntor (fechado/aberto/semiaberto) das requisições a um host do SGN
+
+    - fechado: requisições passam; falhas seguidas são contadas
+    - aberto: requisições aguardam até o fim da espera (que dobra a cada
+      sonda que falha, até ESPERA_ABERTO_MAX)
+    - semiaberto: uma única thread sonda o servidor; as demais aguardam o
+      resultado
+
+    Uma instância por host (ver disjuntor_do_host), compartilhada por todos os
+    jobs. Se o SGN ficar fora do ar por mais que indisponibilidade_max, as
+    requisições passam a levantar CircuitoAberto imediatamente, limitando o
+    tempo do job durante o incidente.
+
+    Attributes:
+        nome (str): Host protegido
+        estado (str): "fechado", "aberto" ou "semiaberto"
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    SEMIABERTO = "semiaberto"
+
+    def __init__(self, nome, falhas_para_abrir=None, espera=ESPERA_ABERTO, espera_max=ESPERA_ABERTO_MAX,
+                 indisponibilidade_max=None):
+        """
+        Args:
+            nome (str): Host protegido (usado nos logs)
+            falhas_para_abrir (int, optional): Falhas seguidas que abrem o circuito.
+                                               Padrão: SGN_DISJUNTOR_FALHAS ou 5
+            espera (float): Espera inicial (s) antes da primeira sonda
+            espera_max (float): Teto da espera entre sondas
+            indisponibilidade_max (float, optional): Tempo aberto (s) após o qual as
+                                                     requisições falham na hora.
+                                                     Padrão: SGN_DISJUNTOR_ESPERA_MAX ou 300
+        """
+        if falhas_para_abrir is None:
+            falhas_para_abrir = int(os.environ.get("SGN_DISJUNTOR_FALHAS", FALHAS_PARA_ABRIR))
+        if indisponibilidade_max is None:
+            indisponibilidade_max = float(os.environ.get("SGN_DISJUNTOR_ESPERA_MAX", INDISPONIBILIDADE_MAX))
+        self.nome = nome
+        self.falhas_para_abrir = max(1, falhas_para_abrir)
+        self.espera_inicial = espera
+        self.espera_max = max(espera, espera_max)
+        self.indisponibilidade_max = indisponibilidade_max
+
+        self.estado = self.FECHADO
+        self._falhas_seguidas = 0
+        self._espera = espera
+        self._aberto_desde = 0.0
+        self._proxima_sonda = 0.0
+        self._sondando = False
+        self._condicao = threading.Condition()
+
+    @property
+    def fechado(self):
+        """Indica se as requisições passam sem esperar"""
+        return self.estado == self.FECHADO
+
+    def aguardar(self, sonda=None):
+        """
+        Aguarda o circuito permitir uma requisição
+
+        Com o circuito fechado retorna na hora. Quando esta thread é escolhida
+        para sondar o servidor, executa a sonda (se houver); sem sonda, a
+        própria requisição que vem a seguir faz esse papel.
+
+        Args:
+            sonda (callable, optional): Requisição barata; retorna True se o SGN respondeu bem
+
+        Raises:
+            CircuitoAberto: O SGN está fora do ar há mais de indisponibilidade_max
+        """
+        while True:
+            if not self._esperar_vez():
+                return
+            if sonda is None:
+                return
+            try:
+                ok = sonda()
+            except Exception:
+                ok = False
+            if ok:
+                self.registrar_sucesso()
+                return
+            self.registrar_falha()
+
+    def _esperar_vez(self):
+        """
+        Bloqueia enquanto o circuito está aberto ou outra thread sonda
+
+        Returns:
+            bool: True se esta thread deve sondar, False se o circuito está fechado
+        """
+        while True:
+            verificar_cancelamento()
+            with self._condicao:
+                if self.estado == self.FECHADO:
+                    return False
+                agora = time.monotonic()
+                if self.estado == self.ABERTO:
+                    restante = self._proxima_sonda - agora
+                    if restante <= 0:
+                        self.estado = self.SEMIABERTO
+                        self._sondando = False
+                    elif agora - self._aberto_desde >= self.indisponibilidade_max:
+                        raise CircuitoAberto(
+                            f"SGN ({self.nome}) indisponível há {agora - self._aberto_desde:.0f}s"
+                        )
+                    else:
+                        # Espera em fatias curtas para atender cancelamentos
+                        self._condicao.wait(min(restante, 1.0))
+                        continue
+                if not self._sondando:
+                    self._sondando = True
+                    print(f"   🔌 Disjuntor SGN semiaberto: testando {self.nome}...")
+                    return True
+                self._condicao.wait(1.0)
+
+    def registrar_sucesso(self):
+        """Resposta saudável: zera as falhas e fecha o circuito se estava sondando"""
+        with self._condicao:
+            self._falhas_seguidas = 0
+            if self.estado == self.FECHADO:
+                return
+            fora_do_ar = time.monotonic() - self._aberto_desde
+            self.estado = self.FECHADO
+            self._sondando = False
+            self._espera = self.espera_inicial
+            self._condicao.notify_all()
+        print(f"   ✅ Disjuntor SGN fechado: {self.nome} voltou após {fora_do_ar:.0f}s, retomando gravações")
+
+    def registrar_falha(self):
+        """Erro do servidor ou timeout: conta a falha e abre o circuito se preciso"""
+        with self._condicao:
+            agora = time.monotonic()
+            if self.estado == self.SEMIABERTO:
+                # Sonda falhou: volta a abrir com espera maior
+                self._espera = min(self.espera_max, self._espera * 2)
+                self._proxima_sonda = agora + self._espera
+                self.estado = self.ABERTO
+                self._sondando = False
+                espera = self._espera
+                self._condicao.notify_all()
+                reaberto = True
+            elif self.estado == self.FECHADO:
+                self._falhas_seguidas += 1
+                if self._falhas_seguidas < self.falhas_para_abrir:
+                    return
+                self.estado = self.ABERTO
+                self._aberto_desde = agora
+                self._proxima_sonda = agora + self._espera
+                espera = self._espera
+                reaberto = False
+            else:
+                return
+        if reaberto:
+            print(f"   ⚡ Disjuntor SGN continua aberto: nova tentativa em {espera:.0f}s")
+        else:
+            print(f"   ⚡ Disjuntor SGN aberto após {self.falhas_para_abrir} falhas seguidas em "
+                  f"{self.nome}: gravações suspensas por {espera:.0f}s")
+
+    def metricas(self):
+        """Estado atual do disjuntor"""
+        with self._condicao:
+            return {
+                "estado": self.estado,
+                "falhas_seguidas": self._falhas_seguidas,
+                "espera": self._espera,
+            }
+
+
+# Disjuntores por host, compartilhados por todos os jobs do processo
+_disjuntores = {}
+_lock_disjuntores = threading.Lock()
+
+
+def disjuntor_do_host(host):
+    """
+    Disjuntor compartilhado de um host do SGN (criado no primeiro uso)
+
+    Args:
+        host (str): Host (netloc) do SGN
+
+    Returns:
+        DisjuntorCircuito: Disjuntor do host
+    """
+    with _lock_disjuntores:
+        disjuntor = _disjuntores.get(host)
+        if disjuntor is None:
+            disjuntor = _disjuntores[host] = DisjuntorCircuito(host)
+        return disjuntor
+
+
+# Limitadores de taxa por host: a taxa vale para o SGN, não para cada job
+_limitadores = {}
+_lock_limitadores = threading.Lock()
+
+
+def limitador_do_host(host):
+    """
+    Token bucket compartilhado de um host do SGN (criado no primeiro uso)
+
+    Args:
+        host (str): Host (netloc) do SGN
+
+    Returns:
+        LimitadorTaxa: Limitador do host
+    """
+    with _lock_limitadores:
+        limitador = _limitadores.get(host)
+        if limitador is None:
+            limitador = _limitadores[host] = LimitadorTaxa()
+        return limitador
@@ -0,0 +1,342 @@
+"""
+Subsistema de jobs da API
+
+Este módulo é responsável por:
+- Executar as automações (bloqueantes, baseadas em Selenium) fora do event loop
+- Limitar quantas automações rodam ao mesmo tempo (pool de workers)
+- Manter status, progresso, logs e resultado de cada job para consulta posterior
+
+Cada requisição de lançamento vira um job com identificador próprio. O endpoint
+que recebe a requisição apenas submete o job e retorna imediatamente (ou aguarda
+o resultado de forma assíncrona), deixando o event loop livre para /health,
+/docs e demais clientes.
+"""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .cancellation import JobCancelado, TokenCancelamento, cancelamento_do_job
+from .log_capture import CanalLog, canal_de_log
+from .models import AutomationResponse, JobStatus, JobStatusResponse
+from .progress import RastreadorProgresso, rastreamento_progresso
+
+
+class Job:
+    """
+    Representa uma execução de automação submetida à API
+
+    Attributes:
+        id (str): Identificador único do job
+        tipo (str): Tipo de automação (ex: "lancar_conceito_inteligente")
+        status (JobStatus): Status atual
+        logs (list): Linhas de log capturadas durante a execução
+        resultado (AutomationResponse): Resultado final (quando concluído)
+    """
+
+    def __init__(self, tipo, tarefa, ao_finalizar=None):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.tarefa = tarefa
+        # Limpeza de recursos do job (ex: arquivo temporário), executada uma
+        # única vez quando o job termina por qualquer motivo
+        self.ao_finalizar = ao_finalizar
+        self.status = JobStatus.PENDENTE
+        self.criado_em = time.time()
+        self.iniciado_em = None
+        self.finalizado_em = None
+        self.resultado = None
+        self.future = None
+        # Canal que recebe os prints da automação (roteados por ContextVar)
+        self.canal = CanalLog()
+        # Eventos estruturados de progresso (fase, aluno, vazão, ETA)
+        self.rastreador = RastreadorProgresso()
+        # Sinalizado por JobManager.cancelar (DELETE /jobs/{id})
+        self.cancelamento = TokenCancelamento()
+
+    @property
+    def logs(self):
+        """Linhas de log capturadas até o momento"""
+        return self.canal.obter_linhas()
+
+    @property
+    def finalizado(self):
+        """Indica se o job já terminou (com sucesso, falha ou cancelado)"""
+        return self.status in (JobStatus.CONCLUIDO, JobStatus.FALHOU, JobStatus.CANCELADO)
+
+    def adicionar_log(self, linha):
+        """Registra uma linha de log do job"""
+        self.canal.adicionar(linha)
+
+    async def acompanhar(self, logs=True, progresso=False, intervalo_heartbeat=15.0):
+        """
+        Gera os logs e/ou eventos de progresso do job conforme são produzidos
+
+        Entrega primeiro o histórico e depois os novos itens. A thread do worker
+        entrega cada item ao event loop via call_soon_threadsafe; o gerador
+        apenas aguarda a fila, sem polling. Quando não há itens por
+        intervalo_heartbeat segundos, gera None para que o consumidor envie
+        um heartbeat.
+
+        Args:
+            logs (bool): Incluir linhas de log
+            progresso (bool): Incluir eventos de progresso
+            intervalo_heartbeat (float): Segundos sem itens antes de gerar None
+
+        Yields:
+            tuple | None: ("log", linha), ("progress", evento) ou None (heartbeat)
+        """
+        loop = asyncio.get_running_loop()
+        fila = asyncio.Queue()
+        fim = object()
+
+        def entregar(item):
+            try:
+                loop.call_soon_threadsafe(fila.put_nowait, item)
+            except RuntimeError:
+                # Event loop encerrado (cliente desconectou e servidor parou)
+                pass
+
+        def entregar_log(linha):
+            entregar(("log", linha))
+
+        def entregar_evento(evento):
+            entregar(("progress", evento))
+
+        historico = []
+        if logs:
+            historico.extend(("log", linha) for linha in self.canal.assinar(entregar_log))
+        if progresso:
+            historico.extend(("progress", evento) for evento in self.rastreador.assinar(entregar_evento))
+        try:
+            for item in historico:
+                yield item
+
+            self.future.add_done_callback(lambda _: entregar(fim))
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(fila.get(), timeout=intervalo_heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if item is fim:
+                    break
+                yield item
+        finally:
+            self.canal.cancelar_assinatura(entregar_log)
+            self.rastreador.cancelar_assinatura(entregar_evento)
+
+    def progresso(self):
+        """Resumo do progresso atual (logs capturados + eventos estruturados)"""
+        linhas = self.canal.obter_linhas()
+        total_linhas = len(linhas)
+        ultima = linhas[-1] if linhas else None
+
+        inicio = self.iniciado_em
+        fim = self.finalizado_em or time.time()
+        return {
+            "linhas_log": total_linhas,
+            "ultima_mensagem": ultima,
+            "tempo_decorrido": round(fim - inicio, 1) if inicio else 0.0,
+            **self.rastreador.resumo(),
+        }
+
+
+class JobManager:
+    """
+    Gerenciador dos jobs de automação
+
+    Mantém um pool limitado de workers (threads) que executam as automações
+    e um registro dos jobs submetidos para consulta de status e resultado.
+    """
+
+    def __init__(self, max_workers=None, retencao_segundos=3600):
+        """
+        Inicializa o gerenciador de jobs
+
+        Args:
+            max_workers (int, optional): Número máximo de automações simultâneas.
+                                         Padrão: variável SGN_MAX_JOBS ou 2
+            retencao_segundos (int): Tempo que jobs finalizados ficam disponíveis
+        """
+        if max_workers is None:
+            # Cada job tem seu próprio navegador; o limite é a memória/CPU da máquina
+            max_workers = int(os.environ.get("SGN_MAX_JOBS", "2"))
+        self.max_workers = max(1, max_workers)
+        self.retencao_segundos = retencao_segundos
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sgn-job")
+        self._jobs = {}
+        self._fila = deque()
+        self._lock = threading.Lock()
+
+    def submeter(self, tipo, tarefa, ao_finalizar=None):
+        """
+        Submete uma nova automação para execução no pool de workers
+
+        Args:
+            tipo (str): Tipo de automação (usado para consulta/diagnóstico)
+            tarefa (callable): Função sem argumentos que retorna (success, message)
+                               ou (success, message, dados)
+            ao_finalizar (callable, optional): Limpeza sem argumentos executada ao
+                               término do job, inclusive se cancelado antes de iniciar
+
+        Returns:
+            Job: Job criado (já enfileirado)
+        """
+        self._limpar_jobs_antigos()
+
+        job = Job(tipo, tarefa, ao_finalizar)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._fila.append(job.id)
+        job.future = self._executor.submit(self._executar, job)
+
+        print(f"📥 Job {job.id} ({tipo}) enfileirado")
+        return job
+
+    def obter(self, job_id):
+        """Retorna o job pelo identificador (ou None se não existir)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def posicao_fila(self, job):
+        """Posição do job na fila de espera (1 = próximo) ou None se não está pendente"""
+        with self._lock:
+            try:
+                return list(self._fila).index(job.id) + 1
+            except ValueError:
+                return None
+
+    def status(self, job):
+        """Monta o status público do job"""
+        return JobStatusResponse(
+            job_id=job.id,
+            tipo=job.tipo,
+            status=job.status,
+            criado_em=job.criado_em,
+            iniciado_em=job.iniciado_em,
+            finalizado_em=job.finalizado_em,
+            posicao_fila=self.posicao_fila(job) if job.status == JobStatus.PENDENTE else None,
+            progresso=job.progresso(),
+            message=job.resultado.message if job.resultado else None,
+        )
+
+    async def aguardar(self, job):
+        """
+        Aguarda o término do job sem bloquear o event loop
+
+        Returns:
+            AutomationResponse: Resultado final do job
+        """
+        try:
+            await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            # Job cancelado antes de começar: o resultado já foi preenchido
+            if not job.future.cancelled():
+                raise
+        return job.resultado
+
+    def cancelar(self, job):
+        """
+        Solicita o cancelamento de um job
+
+        Um job pendente é retirado da fila imediatamente. Um job em execução
+        para no próximo ponto de verificação (entre alunos ou entre requisições
+        JSF), liberando o worker e o navegador.
+
+        Returns:
+            bool: False se o job já havia terminado
+        """
+        if job.finalizado:
+            return False
+
+        job.cancelamento.cancelar()
+        if job.future.cancel():
+            # Ainda não tinha começado: finalizar aqui mesmo
+            with self._lock:
+                try:
+                    self._fila.remove(job.id)
+                except ValueError:
+                    pass
+            # A tarefa nunca vai rodar: liberar os recursos do job aqui
+            self._liberar_recursos(job)
+            self._finalizar(job, False, "Job cancelado antes de iniciar", status=JobStatus.CANCELADO)
+        print(f"🛑 Cancelamento solicitado para o job {job.id}")
+        return True
+
+    def _executar(self, job):
+        """Executa a tarefa do job no worker, capturando logs e resultado"""
+        with self._lock:
+            try:
+                self._fila.remove(job.id)
+            except ValueError:
+                pass
+
+        job.status = JobStatus.EXECUTANDO
+        job.iniciado_em = time.time()
+        status = None
+        dados = None
+
+        # Prints desta thread (e das threads auxiliares que propagam o contexto)
+        # vão para o canal do job, sem trocar o sys.stdout do processo
+        with canal_de_log(job.canal), rastreamento_progresso(job.rastreador), \
+                cancelamento_do_job(job.cancelamento):
+            try:
+                job.cancelamento.verificar()
+                resultado = job.tarefa()
+                success, message = resultado[0], resultado[1]
+                # Tarefas podem devolver dados estruturados como terceiro elemento
+                dados = resultado[2] if len(resultado) > 2 else None
+            except JobCancelado:
+                success = False
+                message = "Job cancelado pelo usuário"
+                status = JobStatus.CANCELADO
+                print(f"🛑 {message}")
+            except Exception as e:
+                # Captura qualquer erro não tratado pela automação
+                success = False
+                message = f"Erro na API: {str(e)}"
+                print(f"❌ {message}")
+            finally:
+                self._liberar_recursos(job)
+            job.rastreador.finalizar(success)
+
+        return self._finalizar(job, success, message, dados, status)
+
+    def _liberar_recursos(self, job):
+        """Executa a limpeza registrada no job (uma única vez)"""
+        with self._lock:
+            limpeza, job.ao_finalizar = job.ao_finalizar, None
+        if limpeza is None:
+            return
+        try:
+            limpeza()
+        except Exception as e:
+            print(f"⚠️ Erro ao liberar recursos do job {job.id}: {e}")
+
+    def _finalizar(self, job, success, message, dados=None, status=None):
+        """Registra o resultado final do job"""
+        job.resultado = AutomationResponse(
+            success=success,
+            message=message,
+            logs=job.logs,
+            dados=dados
+        )
+        job.finalizado_em = time.time()
+        job.status = status or (JobStatus.CONCLUIDO if success else JobStatus.FALHOU)
+        return job.resultado
+
+    def _limpar_jobs_antigos(self):
+        """Remove do registro os jobs finalizados há mais tempo que a retenção"""
+        limite = time.time() - self.retencao_segundos
+        with self._lock:
+            expirados = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finalizado and job.finalizado_em and job.finalizado_em < limite
+            ]
+            for job_id in expirados:
+                del self._jobs[job_id]
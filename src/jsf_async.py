@@ -0,0 +1,280 @@
+"""
+Cliente assíncrono (asyncio + httpx) para leituras JSF partial/ajax em paralelo
+
+Este módulo é responsável por:
+- Executar muitas leituras independentes ao SGN ao mesmo tempo, sem uma
+  thread por requisição
+- Abrir views extras da página do diário (GET com os cookies do job) para que
+  cada leitura em andamento tenha a sua view
+- Reaproveitar o estado do JsfClient síncrono do job: montagem de payload,
+  cookies/URL/headers copiados do Selenium, ViewState, limite de taxa e
+  disjuntor do host
+- Passar cada requisição pelo controle adaptativo de concorrência (AIMD) do job
+- Oferecer ao código síncrono da automação um ponto de entrada
+  (executar_leituras) que roda o lote e devolve os resultados
+
+Uma leitura é uma sequência de payloads enviados em ordem (ex: abrir a modal
+e depois carregar o conteúdo). A seleção feita pelo primeiro POST fica
+guardada na view do servidor, então duas sequências não podem usar a mesma
+view ao mesmo tempo: as views (a do navegador + as extras) formam um pool e
+cada sequência usa uma view livre do pool, com o ViewState trocado no
+payload. As leituras simultâneas são, portanto, o número de views; dentro
+disso, o AIMD limita as requisições em voo.
+"""
+import asyncio
+import time
+
+import httpx
+
+from .cancellation import JobCancelado, verificar_cancelamento
+from .jsf_client import CAMPO_VIEWSTATE, indica_erro_servidor, indica_sobrecarga
+
+# Intervalo (s) entre tentativas de ocupar uma vaga do controle de concorrência
+ESPERA_VAGA = 0.02
+
+# Headers que só valem para as requisições partial/ajax (não para o GET da página)
+HEADERS_PARTIAL = ("Accept", "Faces-Request", "X-Requested-With")
+
+
+class AsyncJsfClient:
+    """
+    Cliente partial/ajax assíncrono que compartilha o estado de um JsfClient
+
+    Deve ser criado e usado dentro de um único event loop (ver executar_leituras).
+
+    Attributes:
+        jsf (JsfClient): Cliente síncrono do job (cookies, URL, ViewState, limites)
+        concorrencia (ControladorAIMD): Controle de concorrência do job (opcional)
+        requisicoes (int): POSTs partial/ajax enviados pelo cliente
+        tempo_requisicoes (float): Soma das durações (s) desses POSTs
+    """
+
+    def __init__(self, jsf, concorrencia=None):
+        """
+        Args:
+            jsf (JsfClient): Cliente síncrono do job
+            concorrencia (ControladorAIMD, optional): Limite adaptativo de requisições em voo
+        """
+        self.jsf = jsf
+        self.concorrencia = concorrencia
+        self.requisicoes = 0
+        self.tempo_requisicoes = 0.0
+        self.url = jsf.sincronizar()
+        headers = dict(jsf.session.headers)
+        self._headers_partial = {nome: headers.pop(nome) for nome in HEADERS_PARTIAL if nome in headers}
+        # O cookie jar é o mesmo da sessão requests: cookies novos valem para os dois
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            cookies=jsf.session.cookies,
+            follow_redirects=False,
+        )
+
+    async def _ocupar_vaga(self):
+        """Aguarda uma vaga no limite AIMD sem bloquear o event loop"""
+        while not self.concorrencia.tentar_adquirir():
+            verificar_cancelamento()
+            await asyncio.sleep(ESPERA_VAGA)
+
+    async def _enviar(self, metodo, url, timeout, **kwargs):
+        """
+        Envia uma requisição pelo AIMD, disjuntor e limite de taxa do job
+
+        Returns:
+            httpx.Response: Resposta do SGN, com response.duracao = tempo (s) só do envio
+        """
+        verificar_cancelamento()
+        if self.concorrencia is not None:
+            await self._ocupar_vaga()
+        inicio = time.monotonic()
+        latencia = None
+        sobrecarga = True
+        try:
+            disjuntor = self.jsf.disjuntor
+            if not disjuntor.fechado:
+                # A espera do disjuntor bloqueia: fica fora do event loop
+                await asyncio.to_thread(disjuntor.aguardar, self.jsf._sondar)
+            espera = self.jsf.limitador.reservar()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            envio = time.monotonic()
+            try:
+                response = await self.client.request(metodo, url, timeout=timeout, **kwargs)
+            except (httpx.TimeoutException, httpx.ConnectError):
+                disjuntor.registrar_falha()
+                raise
+            latencia = time.monotonic() - envio
+            response.duracao = latencia
+            if indica_erro_servidor(response):
+                disjuntor.registrar_falha()
+            else:
+                disjuntor.registrar_sucesso()
+            sobrecarga = indica_sobrecarga(response)
+            return response
+        finally:
+            if self.concorrencia is not None:
+                # Como em ControladorAIMD.requisicao: as esperas não contam como lentidão
+                self.concorrencia.liberar(latencia if latencia is not None else time.monotonic() - inicio,
+                                          sobrecarga)
+
+    async def post(self, dados, timeout=30):
+        """
+        Envia um payload já montado (mesmas regras do JsfClient.post)
+
+        Args:
+            dados (dict): Dados do POST
+            timeout (int): Timeout em segundos
+
+        Returns:
+            httpx.Response: Resposta do SGN
+        """
+        response = await self._enviar("POST", self.url, timeout, data=dados, headers=self._headers_partial)
+        self.requisicoes += 1
+        self.tempo_requisicoes += response.duracao
+        if response.status_code == 200 and self.jsf.acompanha_view(dados):
+            self.jsf.viewstate.atualizar_da_resposta(response.text)
+        return response
+
+    async def abrir_view(self, preparar_view=None, marcador=None, timeout=30):
+        """
+        Abre uma view extra da página do diário (mesmas regras do JsfClient.abrir_view)
+
+        Args:
+            preparar_view (callable, optional): view -> payloads enviados na nova view
+                                                antes de usá-la (ex: selecionar o trimestre)
+            marcador (str, optional): Texto que a última resposta do preparo deve conter
+            timeout (int): Timeout por requisição
+
+        Returns:
+            str: ViewState da nova view ou None (sessão expirada, limite de views, preparo falhou)
+        """
+        response = await self._enviar("GET", self.jsf.url_pagina, timeout,
+                                      headers={"Accept": "text/html,application/xhtml+xml"})
+        if response.status_code != 200:
+            return None
+        view = self.jsf.registrar_view(response.text)
+        if view and preparar_view:
+            try:
+                textos = await self.executar_sequencia(preparar_view(view), view, timeout)
+            except httpx.HTTPError:
+                return None
+            if marcador and marcador not in textos[-1]:
+                return None
+        return view
+
+    async def abrir_views(self, quantidade, preparar_view=None, marcador=None, timeout=30):
+        """
+        Abre várias views extras ao mesmo tempo
+
+        Returns:
+            list: ViewStates das views abertas (as que falharam ficam de fora)
+        """
+        tarefas = [self.abrir_view(preparar_view, marcador, timeout) for _ in range(max(0, quantidade))]
+        resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+        views = []
+        for resultado in resultados:
+            if isinstance(resultado, JobCancelado):
+                raise resultado
+            if isinstance(resultado, str):
+                views.append(resultado)
+            elif isinstance(resultado, Exception):
+                print(f"   ⚠️ Não foi possível abrir view extra do diário: {str(resultado)[:80]}")
+        return views
+
+    async def executar_sequencia(self, payloads, view=None, timeout=30):
+        """
+        Envia os payloads de uma leitura em ordem
+
+        Args:
+            payloads (list): Payloads (dict) montados com JsfClient.montar_payload
+            view (str, optional): ViewState usado no lugar do que está nos payloads
+            timeout (int): Timeout por requisição
+
+        Returns:
+            list: Texto de cada resposta, na ordem dos payloads
+
+        Raises:
+            httpx.HTTPStatusError: Alguma resposta não foi 2xx
+        """
+        textos = []
+        for dados in payloads:
+            if view is not None:
+                dados = dict(dados, **{CAMPO_VIEWSTATE: view})
+            response = await self.post(dados, timeout=timeout)
+            response.raise_for_status()
+            textos.append(response.text)
+        return textos
+
+    async def executar_lote(self, sequencias, views, timeout=30):
+        """
+        Executa várias leituras ao mesmo tempo, uma por view livre
+
+        Args:
+            sequencias (list): Lista de leituras (cada uma uma lista de payloads)
+            views (list): ViewStates disponíveis (ao menos um)
+            timeout (int): Timeout por requisição
+
+        Returns:
+            list: Para cada leitura, a lista de textos ou a exceção que a interrompeu
+        """
+        livres = asyncio.Queue()
+        for view in views:
+            livres.put_nowait(view)
+
+        async def executar(payloads):
+            view = await livres.get()
+            try:
+                return await self.executar_sequencia(payloads, view, timeout)
+            finally:
+                livres.put_nowait(view)
+
+        resultados = await asyncio.gather(*(executar(p) for p in sequencias), return_exceptions=True)
+        # gather devolve também o JobCancelado (BaseException): o cancelamento não pode ser engolido
+        for resultado in resultados:
+            if isinstance(resultado, JobCancelado):
+                raise resultado
+        return resultados
+
+    async def fechar(self):
+        """Fecha as conexões do cliente"""
+        await self.client.aclose()
+
+
+def executar_leituras(jsf, sequencias, view, views_extras=0, preparar_view=None, marcador=None,
+                      concorrencia=None, timeout=30, estatisticas=None):
+    """
+    Executa um lote de leituras assíncronas a partir do código síncrono
+
+    Roda um event loop próprio na thread atual (o worker do job), então
+    logs, progresso e cancelamento do job continuam valendo dentro do lote.
+
+    Args:
+        jsf (JsfClient): Cliente síncrono do job
+        sequencias (list): Lista de leituras (cada uma uma lista de payloads)
+        view (str): ViewState da view do navegador (sempre faz parte do pool)
+        views_extras (int): Views extras a abrir para ler em paralelo
+        preparar_view (callable, optional): view -> payloads enviados em cada view extra
+        marcador (str, optional): Texto esperado na última resposta do preparo
+        concorrencia (ControladorAIMD, optional): Controle de concorrência do job
+        timeout (int): Timeout por requisição
+        estatisticas (dict, optional): Preenchido com "views", "requisicoes" (POSTs)
+                                       e "tempo_requisicoes" (soma das durações, s)
+
+    Returns:
+        list: Para cada leitura, a lista de textos ou a exceção que a interrompeu
+    """
+    async def _executar():
+        cliente = AsyncJsfClient(jsf, concorrencia)
+        try:
+            views = [view]
+            if views_extras > 0 and len(sequencias) > 1:
+                views += await cliente.abrir_views(min(views_extras, len(sequencias) - 1),
+                                                   preparar_view, marcador, timeout)
+            resultados = await cliente.executar_lote(sequencias, views, timeout)
+            if estatisticas is not None:
+                estatisticas.update(views=len(views), requisicoes=cliente.requisicoes,
+                                    tempo_requisicoes=cliente.tempo_requisicoes)
+            return resultados
+        finally:
+            await cliente.fechar()
+
+    return asyncio.run(_executar())
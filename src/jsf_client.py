@@ -0,0 +1,411 @@
+"""
+Cliente HTTP para requisições JSF/PrimeFaces partial/ajax
+
+Este módulo é responsável por:
+- Manter uma única requests.Session por job, com pool de conexões keep-alive
+  (HTTPAdapter) para o SGN, evitando um handshake TCP+TLS a cada campo gravado
+- Sincronizar cookies, URL do formulário e User-Agent a partir do Selenium
+- Montar o payload partial/ajax (source, execute, render, valores, ViewState)
+  em um único lugar, usado por todos os caminhos HTTP da automação
+- Acompanhar o ViewState a partir das respostas partial/ajax, lendo o DOM
+  apenas depois de uma navegação de página inteira
+- Abrir views extras da página atual (mesma sessão, ViewState próprio) para
+  processar alunos em paralelo
+- Aplicar o limite de taxa (token bucket) a toda requisição enviada ao diário
+- Passar toda requisição pelo disjuntor do host do SGN, registrando erros do
+  servidor (HTTP 5xx, redirect para /errors/500.html) e timeouts
+
+O navegador continua sendo a fonte da sessão (login, navegação); o cliente só
+copia o estado dele para as requisições diretas.
+"""
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .concurrency import disjuntor_do_host, limitador_do_host
+from .partial_response import CAMPO_VIEWSTATE, analisar_resposta
+
+ORIGEM_SGN = "https://sgn.sesisenai.org.br"
+
+# Conexões mantidas abertas com o SGN (as gravações paralelas usam até 2 threads)
+TAMANHO_POOL_PADRAO = 4
+
+# Tempo (s) em que cookies/URL copiados do Selenium são considerados válidos
+VALIDADE_SINCRONIZACAO = 30
+
+# Timeout (s) da sonda que testa se o SGN voltou com o disjuntor semiaberto
+TIMEOUT_SONDA = 5
+
+# ViewState no HTML de uma página inteira (<input name="javax.faces.ViewState" ... value="...">)
+_PADRAO_VIEWSTATE_HTML = re.compile(r'name="javax\.faces\.ViewState"[^>]*value="([^"]*)"')
+
+
+def extrair_viewstate(texto):
+    """
+    Extrai o ViewState de uma resposta partial/ajax
+
+    Args:
+        texto (str): XML da resposta
+
+    Returns:
+        str: ViewState ou None
+    """
+    return analisar_resposta(texto).viewstate
+
+
+def indica_erro_servidor(response):
+    """
+    Indica se a resposta é um erro do próprio SGN (conta para o disjuntor)
+
+    Sessão expirada não entra aqui: o servidor está respondendo normalmente.
+
+    Args:
+        response (requests.Response): Resposta HTTP
+
+    Returns:
+        bool: True para HTTP 5xx ou redirect para /errors/500.html
+    """
+    return response.status_code >= 500 or analisar_resposta(response.text).erro_servidor
+
+
+def indica_sobrecarga(response):
+    """
+    Indica se a resposta é sinal de sobrecarga do SGN (reduz o limite AIMD)
+
+    Args:
+        response (requests.Response | httpx.Response): Resposta HTTP
+
+    Returns:
+        bool: True para HTTP != 200, redirect para /errors/500.html ou sessão expirada
+    """
+    if response.status_code != 200:
+        return True
+    resposta = analisar_resposta(response.text)
+    return resposta.erro_servidor or resposta.sessao_expirada
+
+
+def valores_select(element_id, valor):
+    """
+    Campos enviados por um p:selectOneMenu ao mudar de valor
+
+    Args:
+        element_id (str): ID do componente (sem sufixo)
+        valor (str): Valor selecionado
+
+    Returns:
+        dict: {"<id>_focus": "", "<id>_input": valor}
+    """
+    return {f"{element_id}_focus": "", f"{element_id}_input": valor}
+
+
+class RastreadorViewState:
+    """
+    ViewState atual da página, compartilhado entre as threads do job
+
+    O SGN usa state saving no servidor: o token só muda quando a página é
+    recarregada. Ele é atualizado a cada resposta partial/ajax e descartado
+    em uma navegação (invalidar), quando então é relido do DOM uma vez.
+    """
+
+    def __init__(self):
+        self._valor = None
+        self._lock = threading.Lock()
+
+    @property
+    def atual(self):
+        """ViewState conhecido (ou None se precisa ser lido do DOM)"""
+        with self._lock:
+            return self._valor
+
+    def atualizar(self, valor):
+        """Registra um novo ViewState (valores vazios são ignorados)"""
+        if valor:
+            with self._lock:
+                self._valor = valor
+
+    def atualizar_da_resposta(self, texto):
+        """
+        Atualiza o ViewState a partir de uma resposta partial/ajax
+
+        Returns:
+            str: ViewState encontrado na resposta ou None
+        """
+        valor = extrair_viewstate(texto or "")
+        self.atualizar(valor)
+        return valor
+
+    def invalidar(self):
+        """Descarta o ViewState (a página foi recarregada)"""
+        with self._lock:
+            self._valor = None
+
+
+class JsfClient:
+    """
+    Cliente partial/ajax do SGN com sessão HTTP de longa duração
+
+    Uma instância por job (pertence ao SGNAutomationHelpers do contexto de
+    automação). É seguro usar a mesma instância a partir de várias threads.
+
+    Attributes:
+        session (requests.Session): Sessão com pool de conexões keep-alive
+        url (str): URL do formulário (página atual do navegador, sem query)
+        url_pagina (str): URL completa da página atual do navegador
+        viewstate (RastreadorViewState): ViewState atual da página
+        limitador (LimitadorTaxa): Token bucket compartilhado por todos os jobs do host
+    """
+
+    def __init__(self, obter_driver, ler_viewstate_dom=None, tamanho_pool=TAMANHO_POOL_PADRAO,
+                 limitador=None, disjuntor=None):
+        """
+        Args:
+            obter_driver (callable): Função que retorna o WebDriver do job
+            ler_viewstate_dom (callable, optional): Lê o ViewState do DOM (após navegação)
+            tamanho_pool (int): Conexões mantidas abertas com o SGN
+            limitador (LimitadorTaxa, optional): Limite de taxa. Padrão: o limitador compartilhado do host
+            disjuntor (DisjuntorCircuito, optional): Padrão: o disjuntor compartilhado do host
+        """
+        self._obter_driver = obter_driver
+        self._ler_viewstate_dom = ler_viewstate_dom
+        self.viewstate = RastreadorViewState()
+        host = urlsplit(ORIGEM_SGN).netloc
+        self.limitador = limitador or limitador_do_host(host)
+        self.disjuntor = disjuntor or disjuntor_do_host(host)
+        self.session = requests.Session()
+        adaptador = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=tamanho_pool,
+            max_retries=0,  # retry é feito pelos chamadores (com backoff e renovação de sessão)
+        )
+        self.session.mount("https://", adaptador)
+        self.session.mount("http://", adaptador)
+        self.session.headers.update({
+            "Accept": "application/xml, text/xml, */*; q=0.01",
+            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+            "X-Requested-With": "XMLHttpRequest",
+            "Faces-Request": "partial/ajax",
+            "Origin": ORIGEM_SGN,
+        })
+        self.url = None
+        self.url_pagina = None
+        self._sincronizado_em = 0
+        # ViewStates das views abertas por abrir_view (não são a view do navegador)
+        self._views_extras = set()
+        self._lock = threading.Lock()
+
+    def sincronizar(self, forcar=False):
+        """
+        Copia cookies, URL e headers do navegador para a sessão HTTP
+
+        A cópia é reaproveitada por VALIDADE_SINCRONIZACAO segundos.
+
+        Args:
+            forcar (bool): Ignorar a validade e copiar de novo
+
+        Returns:
+            str: URL do formulário
+        """
+        with self._lock:
+            if (not forcar and self.url and
+                    time.time() - self._sincronizado_em < VALIDADE_SINCRONIZACAO):
+                return self.url
+
+            driver = self._obter_driver()
+            url_atual = driver.current_url
+            for cookie in driver.get_cookies() or []:
+                self.session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain", ""),
+                    path=cookie.get("path", "/"),
+                )
+            try:
+                user_agent = driver.execute_script("return navigator.userAgent;")
+            except Exception:
+                user_agent = None
+            if user_agent:
+                self.session.headers["User-Agent"] = user_agent
+            self.session.headers["Referer"] = url_atual
+
+            self.url = url_atual.split("?", 1)[0]
+            self.url_pagina = url_atual
+            self._sincronizado_em = time.time()
+            return self.url
+
+    def invalidar(self):
+        """
+        Registra uma navegação de página inteira (troca de turma, renovação de sessão)
+
+        Força nova cópia de cookies/URL e nova leitura do ViewState no DOM.
+        """
+        with self._lock:
+            self._sincronizado_em = 0
+            self._views_extras.clear()
+        self.viewstate.invalidar()
+
+    def obter_viewstate(self):
+        """
+        ViewState atual, sem acessar o navegador quando já é conhecido
+
+        Returns:
+            str: ViewState ou None
+        """
+        valor = self.viewstate.atual
+        if valor or self._ler_viewstate_dom is None:
+            return valor
+        valor = self._ler_viewstate_dom()
+        self.viewstate.atualizar(valor)
+        return valor
+
+    def abrir_view(self, timeout=30):
+        """
+        Abre uma nova view da página atual do navegador com os mesmos cookies
+
+        O GET cria no servidor uma view independente (ViewState próprio), cujas
+        seleções não interferem na view do navegador. Respostas dessa view não
+        alteram o ViewState acompanhado.
+
+        Args:
+            timeout (int): Timeout em segundos
+
+        Returns:
+            str: ViewState da nova view ou None (sessão expirada, limite de views)
+        """
+        self.sincronizar()
+        self.disjuntor.aguardar(self._sondar)
+        self.limitador.adquirir()
+        response = self.session.get(
+            self.url_pagina,
+            timeout=timeout,
+            # Requisição de página inteira: sem os headers partial/ajax da sessão
+            headers={"Accept": "text/html,application/xhtml+xml", "Faces-Request": None,
+                     "X-Requested-With": None},
+        )
+        if response.status_code != 200:
+            return None
+        return self.registrar_view(response.text)
+
+    def registrar_view(self, pagina):
+        """
+        Registra a view de uma página inteira aberta com os cookies do job
+
+        Args:
+            pagina (str): HTML da página (GET de url_pagina)
+
+        Returns:
+            str: ViewState da nova view ou None (sem ViewState ou é a view do navegador)
+        """
+        match = _PADRAO_VIEWSTATE_HTML.search(pagina)
+        if not match or match.group(1) == self.viewstate.atual:
+            return None
+        with self._lock:
+            self._views_extras.add(match.group(1))
+        return match.group(1)
+
+    def acompanha_view(self, dados):
+        """Indica se o payload é da view do navegador (a acompanhada pelo RastreadorViewState)"""
+        return dados.get(CAMPO_VIEWSTATE) not in self._views_extras
+
+    def cookies(self):
+        """Cookies atuais da sessão HTTP como dicionário"""
+        return self.session.cookies.get_dict()
+
+    @staticmethod
+    def montar_payload(source, execute=None, render=None, values=None, viewstate=None, evento=None):
+        """
+        Monta o payload de uma requisição partial/ajax
+
+        Args:
+            source (str): Componente que dispara a requisição
+            execute (str, optional): Componentes processados (padrão: source)
+            render (str, optional): Componentes renderizados (padrão: source)
+            values (dict, optional): Campos do formulário enviados
+            viewstate (str, optional): javax.faces.ViewState
+            evento (str, optional): Evento do behavior (ex: "valueChange")
+
+        Returns:
+            dict: Dados do POST
+        """
+        payload = {
+            "javax.faces.partial.ajax": "true",
+            "javax.faces.source": source,
+            "javax.faces.partial.execute": execute or source,
+            "javax.faces.partial.render": render or source,
+        }
+        if evento:
+            payload["javax.faces.behavior.event"] = evento
+            payload["javax.faces.partial.event"] = "change" if evento == "valueChange" else evento
+        if values:
+            payload.update(values)
+        if viewstate is not None:
+            payload[CAMPO_VIEWSTATE] = viewstate
+        return payload
+
+    def post(self, dados, timeout=30):
+        """
+        Envia um payload já montado para a URL do formulário
+
+        Args:
+            dados (dict): Dados do POST
+            timeout (int): Timeout em segundos
+
+        Returns:
+            requests.Response: Resposta do SGN, com response.duracao = tempo (s) só
+                               do POST (sem as esperas do disjuntor e do limite de taxa)
+
+        Raises:
+            CircuitoAberto: O SGN está fora do ar há mais tempo que o tolerado
+        """
+        url = self.sincronizar()
+        self.disjuntor.aguardar(self._sondar)
+        self.limitador.adquirir()
+        inicio = time.monotonic()
+        try:
+            response = self.session.post(url, data=dados, timeout=timeout)
+        except (requests.Timeout, requests.ConnectionError):
+            self.disjuntor.registrar_falha()
+            raise
+        response.duracao = time.monotonic() - inicio
+        if indica_erro_servidor(response):
+            self.disjuntor.registrar_falha()
+        else:
+            self.disjuntor.registrar_sucesso()
+        if response.status_code == 200 and self.acompanha_view(dados):
+            self.viewstate.atualizar_da_resposta(response.text)
+        return response
+
+    def _sondar(self):
+        """
+        Requisição barata (HEAD, sem seguir redirects) para testar se o SGN voltou
+
+        Returns:
+            bool: True se o servidor respondeu sem erro
+        """
+        try:
+            response = self.session.head(self.url or ORIGEM_SGN, timeout=TIMEOUT_SONDA,
+                                         allow_redirects=False)
+        except requests.RequestException:
+            return False
+        return (response.status_code < 500 and
+                '/errors/500' not in response.headers.get("Location", ""))
+
+    def post_partial(self, source, execute=None, render=None, values=None, viewstate=None,
+                     evento=None, timeout=30):
+        """
+        Monta e envia uma requisição partial/ajax
+
+        Args: ver montar_payload; timeout em segundos
+
+        Returns:
+            requests.Response: Resposta do SGN
+        """
+        dados = self.montar_payload(source, execute, render, values, viewstate, evento)
+        return self.post(dados, timeout=timeout)
+
+    def fechar(self):
+        """Fecha as conexões do pool"""
+        self.session.close()
@@ -1,60 +1,244 @@
 """
 Sistema de captura de logs para retornar ao frontend
+
+Os prints da automação (sgn_automation.py / sgn_automation_helpers.py) são
+roteados para o canal de log do job em execução, identificado por uma
+ContextVar. Não há troca de sys.stdout por requisição: um único roteador é
+instalado no processo e decide, a cada escrita, para qual canal enviar.
+
+Componentes:
+- CanalLog: buffer de linhas de um job + assinantes (streaming)
+- canal_de_log(): context manager que associa um canal ao contexto atual
+- RoteadorStdout: substituto de sys.stdout instalado uma única vez
+- EcoTerminal: eco opcional no terminal, feito por uma thread em background
+- submeter_com_contexto(): propaga o canal para threads de ThreadPoolExecutor
 """
+import contextvars
+import os
 import sys
-import io
+import threading
+from contextlib import contextmanager
+from queue import SimpleQueue
+
+# Canal de log do job em execução no contexto atual (None = fora de job)
+_canal_atual = contextvars.ContextVar("sgn_canal_log", default=None)
+
+# Se o buffer passar deste tamanho sem quebra de linha, é enviado mesmo assim
+_TAMANHO_MAXIMO_BUFFER = 100
+
+
+class CanalLog:
+    """
+    Canal de log de um job
+
+    Acumula as linhas completas escritas pelo job e notifica os assinantes
+    (ex: fila de streaming SSE). O enfileiramento nunca bloqueia quem escreve.
+
+    Attributes:
+        linhas (list): Todas as linhas registradas no canal
+    """
+
+    def __init__(self):
+        self.linhas = []
+        self._assinantes = []
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def assinar(self, callback):
+        """
+        Registra um assinante que recebe cada nova linha
+
+        Args:
+            callback (callable): Função chamada com a linha (não deve bloquear)
+
+        Returns:
+            list: Linhas já registradas antes da assinatura (histórico), obtidas
+                  de forma atômica com o registro para não perder nem duplicar linhas
+        """
+        with self._lock:
+            self._assinantes.append(callback)
+            return list(self.linhas)
 
-class TeeOutput:
+    def cancelar_assinatura(self, callback):
+        """Remove um assinante registrado"""
+        with self._lock:
+            try:
+                self._assinantes.remove(callback)
+            except ValueError:
+                pass
+
+    def escrever(self, text):
+        """
+        Recebe texto bruto (como sys.stdout.write) e registra linhas completas
+
+        O buffer de linha incompleta é mantido por thread, para que prints de
+        threads auxiliares do mesmo job não se misturem no meio da linha.
+        """
+        thread_id = threading.get_ident()
+        with self._lock:
+            buffer = self._buffers.get(thread_id, "") + text
+            linhas = []
+            if '\n' in buffer:
+                partes = buffer.split('\n')
+                linhas.extend(partes[:-1])
+                buffer = partes[-1]
+            if len(buffer) > _TAMANHO_MAXIMO_BUFFER:
+                linhas.append(buffer)
+                buffer = ""
+            self._buffers[thread_id] = buffer
+
+        for linha in linhas:
+            if linha.strip():
+                self.adicionar(linha)
+
+    def adicionar(self, linha):
+        """Registra uma linha completa e notifica os assinantes"""
+        with self._lock:
+            self.linhas.append(linha)
+            assinantes = list(self._assinantes)
+        for callback in assinantes:
+            try:
+                callback(linha)
+            except Exception:
+                pass
+
+    def descarregar(self):
+        """Registra as linhas incompletas que ainda estão nos buffers"""
+        with self._lock:
+            pendentes = [buffer for buffer in self._buffers.values() if buffer.strip()]
+            self._buffers.clear()
+        for linha in pendentes:
+            self.adicionar(linha)
+
+    def obter_linhas(self):
+        """Retorna uma cópia das linhas registradas até o momento"""
+        with self._lock:
+            return list(self.linhas)
+
+
+class EcoTerminal:
     """
-    Classe que escreve tanto no terminal quanto captura para enviar ao frontend
-    Similar ao comando 'tee' do Unix
+    Eco assíncrono no terminal
+
+    As escritas são apenas enfileiradas; uma thread em background escreve no
+    terminal real. Assim um print da automação não paga o custo de I/O nem de
+    flush síncrono.
+    """
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self._fila = SimpleQueue()
+        self._thread = threading.Thread(target=self._escrever_em_background, daemon=True, name="sgn-log-eco")
+        self._thread.start()
+
+    def enviar(self, text):
+        """Enfileira o texto para ser escrito no terminal"""
+        self._fila.put(text)
+
+    def _escrever_em_background(self):
+        while True:
+            text = self._fila.get()
+            partes = [text]
+            # Agrupar o que já estiver na fila em uma única escrita
+            while not self._fila.empty():
+                partes.append(self._fila.get())
+            try:
+                self.terminal.write("".join(partes))
+                self.terminal.flush()
+            except Exception:
+                pass
+
+
+class RoteadorStdout:
     """
-    def __init__(self, original_stdout, string_io):
-        self.original_stdout = original_stdout
-        self.string_io = string_io
-    
+    Substituto de sys.stdout que roteia cada escrita para o canal do job atual
+
+    Instalado uma única vez no processo (instalar_roteador). Fora de um job,
+    o texto só vai para o terminal.
+
+    Modos de eco no terminal (variável SGN_LOG_ECO):
+    - "async" (padrão): eco em thread de background
+    - "sync": escrita direta no terminal
+    - "off": sem eco no terminal
+    """
+
+    def __init__(self, terminal, modo_eco=None):
+        self.terminal = terminal
+        self.modo_eco = (modo_eco or os.environ.get("SGN_LOG_ECO", "async")).lower()
+        self._eco = EcoTerminal(terminal) if self.modo_eco == "async" else None
+
     def write(self, text):
-        """Escreve no terminal E captura"""
-        self.original_stdout.write(text)  # Escreve no terminal
-        self.original_stdout.flush()
-        self.string_io.write(text)  # Captura para enviar ao frontend
-    
+        canal = _canal_atual.get()
+        if canal is not None:
+            canal.escrever(text)
+            if self.modo_eco == "off":
+                return len(text)
+
+        if self._eco is not None:
+            self._eco.enviar(text)
+        else:
+            self.terminal.write(text)
+        return len(text)
+
     def flush(self):
-        """Flush em ambos os outputs"""
-        self.original_stdout.flush()
-        self.string_io.flush()
+        if self._eco is None:
+            self.terminal.flush()
 
-class LogCapture:
-    """Captura prints e logs do Python para retornar ao frontend"""
-    
-    def __init__(self):
-        self.logs = []
-        self.original_stdout = None
-        self.string_io = None
-        self.tee = None
-    
-    def start(self):
-        """Inicia a captura de logs"""
-        self.logs = []
-        self.original_stdout = sys.stdout
-        self.string_io = io.StringIO()
-        self.tee = TeeOutput(self.original_stdout, self.string_io)
-        sys.stdout = self.tee
-    
-    def stop(self):
-        """Para a captura e retorna os logs"""
-        if self.original_stdout:
-            sys.stdout = self.original_stdout
-        
-        if self.string_io:
-            captured = self.string_io.getvalue()
-            self.logs = captured.split('\n') if captured else []
-            self.string_io.close()
-        
-        return self.logs
-    
-    def get_logs(self):
-        """Retorna os logs capturados até o momento"""
-        if self.string_io:
-            return self.string_io.getvalue().split('\n')
-        return self.logs
+    def __getattr__(self, nome):
+        # encoding, isatty, fileno etc. vêm do terminal real
+        return getattr(self.terminal, nome)
+
+
+_roteador_lock = threading.Lock()
+
+
+def instalar_roteador():
+    """
+    Instala o RoteadorStdout em sys.stdout (idempotente)
+
+    Returns:
+        RoteadorStdout: Roteador instalado
+    """
+    with _roteador_lock:
+        if not isinstance(sys.stdout, RoteadorStdout):
+            sys.stdout = RoteadorStdout(sys.stdout)
+        return sys.stdout
+
+
+@contextmanager
+def canal_de_log(canal):
+    """
+    Associa um canal de log ao contexto atual durante o bloco
+
+    Todo print executado dentro do bloco (inclusive em threads submetidas com
+    submeter_com_contexto) vai para este canal.
+
+    Args:
+        canal (CanalLog): Canal do job
+    """
+    instalar_roteador()
+    token = _canal_atual.set(canal)
+    try:
+        yield canal
+    finally:
+        canal.descarregar()
+        _canal_atual.reset(token)
+
+
+def canal_atual():
+    """Retorna o canal de log do contexto atual (ou None)"""
+    return _canal_atual.get()
+
+
+def submeter_com_contexto(executor, funcao, *args, **kwargs):
+    """
+    Submete uma função a um ThreadPoolExecutor preservando as ContextVars
+
+    Threads do pool não herdam o contexto de quem submete; sem isso os prints
+    das threads auxiliares não chegariam ao canal do job.
+
+    Returns:
+        concurrent.futures.Future: Future da tarefa
+    """
+    contexto = contextvars.copy_context()
+    return executor.submit(contexto.run, funcao, *args, **kwargs)
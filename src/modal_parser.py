@@ -0,0 +1,240 @@
+"""
+Leitura em uma passada dos selects das páginas e respostas do SGN
+
+Este módulo é responsável por:
+- Encontrar todos os <select> (selectOneMenu do PrimeFaces) de uma página
+  inteira ou de uma resposta partial/ajax em uma única varredura do texto
+- Devolver, para cada select, as opções, o valor selecionado e se está
+  desabilitado
+- Montar os valores da modal de conceitos (atitudes e habilidades) a partir
+  dessa mesma varredura
+- Montar a matriz alunos × avaliações da tabela de conceitos da turma
+  (resposta do mediasConceito), marcando as células desabilitadas
+- Ler os cabeçalhos dessa mesma tabela (identificador, coluna e tooltip)
+
+As expressões são compiladas uma vez e cada trecho do texto é percorrido uma
+única vez, em vez de uma busca DOTALL por índice de atitude/habilidade. A
+modal é lida só no trecho entre a primeira tabela dela e o último campo, e
+apenas os selects de atitude/habilidade são interpretados: numa página
+inteira ou numa resposta que re-renderiza o diário, o resto do texto não é
+varrido por regex. O conteúdo dos blocos CDATA de uma resposta partial/ajax
+é HTML cru, então o mesmo texto serve sem extração.
+"""
+import html
+import re
+
+# <select ...>...</select> (o JSF escapa ">" dentro de atributos como &gt;)
+_RE_SELECT = re.compile(r"<select\b([^>]*)>(.*?)</select>", re.S | re.I)
+# <option ... value="..." ...>rótulo (os atributos depois do value trazem o "selected")
+_RE_OPTION = re.compile(r'<option\b[^>]*?\bvalue="([^"]*)"([^>]*)>([^<]*)', re.I)
+_RE_ID = re.compile(r'\bid="([^"]*)"')
+_RE_DISABLED = re.compile(r'\bdisabled\b')
+_RE_TAG = re.compile(r'<[^>]+>')
+
+# Componentes da modal de conceitos (modalDadosAtitudes)
+_RE_CAMPO_MODAL = re.compile(
+    r'<select\b[^>]*?\bid="[^"]*?dataTable(Atitudes|Habilidades):(\d+):(?:observacaoAtitude|notaConceito)_input"'
+    r'[^>]*>(.*?)</select>', re.S
+)
+_RE_LINHA_HABILIDADE = re.compile(
+    r'<tr data-ri="(\d+)"[^>]*>\s*<td[^>]*>.*?</td>\s*<td[^>]*>(.*?)</td>', re.S
+)
+
+# Tabela de conceitos da turma (dataTableConceitos)
+_RE_LINHA = re.compile(r'<tr data-ri="(\d+)"[^>]*>(.*?)</tr>', re.S)
+_RE_CELULA = re.compile(r'<td\b')
+# Colunas fixas antes das avaliações: número, ações, estudante
+COLUNAS_FIXAS_CONCEITOS = 3
+_RE_CABECALHO = re.compile(r'<th\b([^>]*)>(.*?)</th>', re.S)
+_RE_ARIA_LABEL = re.compile(r'\baria-label="([^"]*)"')
+_RE_TITLE = re.compile(r'\btitle="([^"]*)"')
+
+
+def _texto(valor):
+    """Decodifica entidades HTML apenas quando existem"""
+    return html.unescape(valor) if "&" in valor else valor
+
+
+def ler_selects(texto):
+    """
+    Lê todos os selects do texto em uma passada
+
+    Args:
+        texto (str): HTML de uma página ou XML de uma resposta partial/ajax
+
+    Returns:
+        dict: {id_do_componente (sem "_input"): {
+                  "opcoes": [(valor, rotulo)],
+                  "selecionado": str ("" se nenhum),
+                  "desabilitado": bool}}
+              na ordem do documento
+    """
+    selects = {}
+    for atributos, corpo in _RE_SELECT.findall(texto or ""):
+        match_id = _RE_ID.search(atributos)
+        if not match_id:
+            continue
+        element_id = match_id.group(1)
+        if element_id.endswith("_input"):
+            element_id = element_id[:-len("_input")]
+        selects[element_id] = _ler_select(atributos, corpo)
+    return selects
+
+
+def _ler_select(atributos, corpo):
+    """Opções, valor selecionado e estado de um <select> já recortado"""
+    opcoes = []
+    selecionado = ""
+    for valor, atributos_opcao, rotulo in _RE_OPTION.findall(corpo):
+        valor = _texto(valor).strip()
+        opcoes.append((valor, _texto(rotulo).strip()))
+        if not selecionado and "selected" in atributos_opcao:
+            selecionado = valor
+
+    return {
+        "opcoes": opcoes,
+        "selecionado": selecionado,
+        "desabilitado": bool(_RE_DISABLED.search(atributos)),
+    }
+
+
+def _recortar_modal(texto):
+    """
+    Trecho do texto com os campos da modal de conceitos
+
+    Vai da primeira tabela da modal (atitudes ou habilidades) até o fim do
+    último select de atitude/habilidade. Usa só buscas de substring.
+
+    Returns:
+        str: Trecho ("" se o texto não tem a modal)
+    """
+    inicios = [i for i in (texto.find("dataTableAtitudes"), texto.find("dataTableHabilidades")) if i >= 0]
+    if not inicios:
+        return ""
+    ultimo = max(texto.rfind("observacaoAtitude_input"), texto.rfind("notaConceito_input"))
+    fim = texto.find("</select>", ultimo)
+    return texto[min(inicios):fim + len("</select>") if fim >= 0 else len(texto)]
+
+
+def ler_modal_conceitos(texto):
+    """
+    Valores atuais da modal de conceitos de um aluno
+
+    Args:
+        texto (str): Resposta do contentLoad da modal (ou a página com a modal aberta)
+
+    Returns:
+        dict: {
+            "atitudes": {indice: valor_atual},
+            "habilidades": [{"indice": int, "habilidade": str, "valor": str}]
+        }
+    """
+    trecho = _recortar_modal(texto or "")
+    atitudes = {}
+    valores_habilidades = {}
+    for tabela, indice, corpo in _RE_CAMPO_MODAL.findall(trecho):
+        selecionado = ""
+        for opcao in _RE_OPTION.finditer(corpo):
+            if "selected" in opcao.group(2):
+                selecionado = _texto(opcao.group(1)).strip()
+                break
+        if tabela == "Atitudes":
+            atitudes[int(indice)] = selecionado
+        else:
+            valores_habilidades[int(indice)] = selecionado
+
+    habilidades = []
+    inicio = trecho.find("dataTableHabilidades_data")
+    if inicio >= 0 and valores_habilidades:
+        fim = trecho.find("</tbody>", inicio)
+        linhas = trecho[inicio:fim if fim >= 0 else len(trecho)]
+        for indice, celula in _RE_LINHA_HABILIDADE.findall(linhas):
+            indice = int(indice)
+            if indice not in valores_habilidades:
+                continue
+            habilidades.append({
+                "indice": indice,
+                "habilidade": _texto(_RE_TAG.sub("", celula)).strip(),
+                "valor": valores_habilidades[indice],
+            })
+
+    return {"atitudes": atitudes, "habilidades": habilidades}
+
+
+def ler_matriz_conceitos(texto):
+    """
+    Matriz de conceitos da turma (alunos × colunas de avaliação)
+
+    Lê as linhas de dataTableConceitos_data de uma vez. A coluna de cada célula
+    é a mesma posição usada nos mapeamentos de cabeçalho: a primeira coluna
+    depois de número/ações/estudante é a 0. Células sem select (situação,
+    matrícula) ficam de fora.
+
+    Args:
+        texto (str): Resposta partial do mediasConceito (ou a página do diário)
+
+    Returns:
+        dict: {data_ri: {coluna: {"valor": str, "desabilitado": bool}}}
+    """
+    matriz = {}
+    inicio = (texto or "").find("dataTableConceitos_data")
+    if inicio < 0:
+        return matriz
+    fim = texto.find("</tbody>", inicio)
+    trecho = texto[inicio:fim if fim >= 0 else len(texto)]
+
+    for data_ri, linha in _RE_LINHA.findall(trecho):
+        celulas = {}
+        for posicao, celula in enumerate(_RE_CELULA.split(linha)[1:]):
+            coluna = posicao - COLUNAS_FIXAS_CONCEITOS
+            if coluna < 0:
+                continue
+            match = _RE_SELECT.search(celula)
+            if not match:
+                continue
+            select = _ler_select(*match.groups())
+            celulas[coluna] = {
+                "valor": "" if select["desabilitado"] else select["selecionado"],
+                "desabilitado": select["desabilitado"],
+            }
+        matriz[data_ri] = celulas
+    return matriz
+
+
+def ler_cabecalhos_conceitos(texto):
+    """
+    Cabeçalhos das colunas da tabela de conceitos da turma
+
+    Lê apenas o thead dataTableConceitos_head (o clone do corpo rolável não
+    tem os tooltips). O identificador vem do aria-label (AV1, RP2...) ou, nas
+    colunas sem ele (CF, SA, SM), do texto do cabeçalho. A coluna segue a
+    mesma contagem de ler_matriz_conceitos.
+
+    Args:
+        texto (str): Resposta partial do mediasConceito (ou a página do diário)
+
+    Returns:
+        list: [{"identificador": str, "coluna": int, "tooltip": str}] na ordem da tabela
+    """
+    cabecalhos = []
+    inicio = (texto or "").find("dataTableConceitos_head")
+    if inicio < 0:
+        return cabecalhos
+    fim = texto.find("</thead>", inicio)
+    trecho = texto[inicio:fim if fim >= 0 else len(texto)]
+
+    for posicao, (atributos, conteudo) in enumerate(_RE_CABECALHO.findall(trecho)):
+        coluna = posicao - COLUNAS_FIXAS_CONCEITOS
+        if coluna < 0:
+            continue
+        match = _RE_ARIA_LABEL.search(atributos)
+        identificador = _texto(match.group(1) if match else _RE_TAG.sub("", conteudo)).strip().upper()
+        if not identificador:
+            continue
+        match = _RE_TITLE.search(conteudo)
+        cabecalhos.append({
+            "identificador": identificador,
+            "coluna": coluna,
+            "tooltip": _texto(match.group(1)).strip() if match else "",
+        })
+    return cabecalhos
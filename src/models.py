@@ -45,6 +45,8 @@ class LoginRequest(BaseModel):
         atitude_observada (AtitudeObservada): Opção para observações de atitudes (padrão: "Raramente")
         conceito_habilidade (ConceitoHabilidade): Opção para conceitos de habilidades (padrão: "B")
         trimestre_referencia (TrimestreReferencia): Trimestre em que os conceitos serão lançados
+        trocar_c_por_ne (bool): Troca conceito 'C' por 'NE' no fluxo inteligente
+        resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
     """
     username: str = Field(
         ..., 
@@ -89,6 +91,11 @@ class LoginRequest(BaseModel):
         description="Se verdadeiro, troca conceito 'C' por 'NE' no fluxo inteligente (evita exigir RA)",
         example=True
     )
+    resume: bool = Field(
+        default=False,
+        description="Se verdadeiro, pula os alunos já confirmados no checkpoint de uma execução anterior interrompida",
+        example=False
+    )
 
     class Config:
         json_schema_extra = {
@@ -125,6 +132,7 @@ class LoginRequestRA(BaseModel):
         termino_ra (str): Data de término da RA (formato: DD/MM/YYYY)
         descricao_ra (str): Descrição da RA (O quê/Por quê/Como)
         nome_arquivo_ra (str): Nome do arquivo PDF da RA
+        resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
     """
     username: str = Field(..., min_length=3, max_length=100, description="Nome de usuário do SGN")
     password: str = Field(..., min_length=3, max_length=100, description="Senha do usuário")
@@ -136,6 +144,7 @@ class LoginRequestRA(BaseModel):
     termino_ra: str = Field(..., pattern=r'^\d{2}/\d{2}/\d{4}$', description="Data término RA (DD/MM/YYYY)", example="31/10/2025")
     descricao_ra: str = Field(..., min_length=10, max_length=5000, description="Descrição da RA", example="Reforço em programação orientada a objetos")
     nome_arquivo_ra: str = Field(..., min_length=1, max_length=80, description="Nome do arquivo PDF", example="RA_Turma_369528_TR2.pdf")
+    resume: bool = Field(default=False, description="Pular alunos já confirmados no checkpoint")
 
 class ParecerRequest(BaseModel):
     """
@@ -175,6 +184,57 @@ class ParecerRequest(BaseModel):
         example="TR2"
     )
 
+class PlanoRequest(LoginRequest):
+    """
+    Modelo para o plano (dry-run) do lançamento inteligente
+    
+    Mesmos campos de LoginRequest, mais:
+        ler_valores_atuais (bool): Ler a modal de cada aluno para saber o que já está correto
+    """
+    ler_valores_atuais: bool = Field(
+        default=True,
+        description="Lê os valores atuais de cada aluno (somente leitura) para contar campos já corretos e estimar o tempo"
+    )
+
+class ModoLancamento(str, Enum):
+    """Modos de lançamento de conceitos disponíveis no lote"""
+    INTELIGENTE = "inteligente"
+    SIMPLES = "simples"
+
+class TurmaLote(BaseModel):
+    """
+    Opções de uma turma dentro de um lançamento em lote
+    
+    Attributes:
+        codigo_turma (str): Código identificador da turma
+        atitude_observada (AtitudeObservada): Opção para observações de atitudes (padrão: "Raramente")
+        conceito_habilidade (ConceitoHabilidade): Conceito aplicado (simples) ou fallback (inteligente)
+        trimestre_referencia (TrimestreReferencia): Trimestre em que os conceitos serão lançados
+        trocar_c_por_ne (bool): Troca conceito 'C' por 'NE' no modo inteligente
+        resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
+    """
+    codigo_turma: str = Field(..., min_length=1, max_length=20, pattern=r'^\d+$', description="Código da turma", example="369528")
+    atitude_observada: AtitudeObservada = Field(default=AtitudeObservada.RARAMENTE, description="Opção para atitudes")
+    conceito_habilidade: ConceitoHabilidade = Field(default=ConceitoHabilidade.B, description="Conceito (ou fallback no modo inteligente)")
+    trimestre_referencia: TrimestreReferencia = Field(default=TrimestreReferencia.TR2, description="Trimestre de referência")
+    trocar_c_por_ne: bool = Field(default=True, description="Troca conceito 'C' por 'NE' no modo inteligente")
+    resume: bool = Field(default=False, description="Pular alunos já confirmados no checkpoint")
+
+class LoteTurmasRequest(BaseModel):
+    """
+    Modelo para lançamento de conceitos em várias turmas com um único login
+    
+    Attributes:
+        username (str): Nome de usuário para login no SGN
+        password (str): Senha do usuário
+        modo (ModoLancamento): "inteligente" (baseado em notas) ou "simples"
+        turmas (list[TurmaLote]): Turmas processadas em sequência, com opções próprias
+    """
+    username: str = Field(..., min_length=3, max_length=100, description="Nome de usuário do SGN")
+    password: str = Field(..., min_length=3, max_length=100, description="Senha do usuário")
+    modo: ModoLancamento = Field(default=ModoLancamento.INTELIGENTE, description="Modo de lançamento aplicado a todas as turmas")
+    turmas: list[TurmaLote] = Field(..., min_length=1, max_length=30, description="Turmas do lote (processadas em ordem)")
+
 class AutomationResponse(BaseModel):
     """
     Modelo para resposta da automação
@@ -183,7 +243,57 @@ class AutomationResponse(BaseModel):
         success (bool): Indica se a operação foi bem-sucedida
         message (str): Mensagem descritiva do resultado
         logs (list): Lista de logs da execução
+        dados (dict): Dados estruturados do resultado (ex: plano do dry-run)
     """
     success: bool = Field(..., description="Status da operação (true/false)")
     message: str = Field(..., description="Mensagem descritiva do resultado")
     logs: list[str] = Field(default=[], description="Logs da execução")
+    dados: Optional[dict] = Field(default=None, description="Dados estruturados do resultado (quando houver)")
+
+class JobStatus(str, Enum):
+    """Estados possíveis de um job de automação"""
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
+    CANCELADO = "cancelado"
+
+class JobSubmitResponse(BaseModel):
+    """
+    Modelo para resposta da submissão de um job
+    
+    Attributes:
+        job_id (str): Identificador do job criado
+        status (JobStatus): Status inicial do job
+        status_url (str): URL para consultar status e progresso
+        result_url (str): URL para obter o resultado final
+    """
+    job_id: str = Field(..., description="Identificador do job")
+    status: JobStatus = Field(..., description="Status atual do job")
+    status_url: str = Field(..., description="URL de consulta do status")
+    result_url: str = Field(..., description="URL de consulta do resultado")
+
+class JobStatusResponse(BaseModel):
+    """
+    Modelo para consulta de status de um job
+    
+    Attributes:
+        job_id (str): Identificador do job
+        tipo (str): Tipo de automação executada pelo job
+        status (JobStatus): Status atual
+        criado_em (float): Timestamp (epoch) de criação
+        iniciado_em (float): Timestamp (epoch) de início da execução
+        finalizado_em (float): Timestamp (epoch) de término
+        posicao_fila (int): Posição na fila enquanto pendente
+        progresso (dict): Informações de progresso da execução
+        message (str): Mensagem final (quando concluído)
+    """
+    job_id: str = Field(..., description="Identificador do job")
+    tipo: str = Field(..., description="Tipo de automação")
+    status: JobStatus = Field(..., description="Status atual do job")
+    criado_em: float = Field(..., description="Timestamp de criação (epoch)")
+    iniciado_em: Optional[float] = Field(default=None, description="Timestamp de início (epoch)")
+    finalizado_em: Optional[float] = Field(default=None, description="Timestamp de término (epoch)")
+    posicao_fila: Optional[int] = Field(default=None, description="Posição na fila (apenas jobs pendentes)")
+    progresso: dict = Field(default={}, description="Progresso da execução")
+    message: Optional[str] = Field(default=None, description="Mensagem final do job")
@@ -0,0 +1,185 @@
+"""
+Leitura das respostas partial/ajax (<partial-response>) do JSF/PrimeFaces
+
+Este módulo é responsável por:
+- Interpretar o XML de uma resposta partial/ajax uma única vez (lxml, com as
+  expressões XPath compiladas na carga do módulo)
+- Expor o resultado em uma estrutura: updates por id, ViewState, redirect,
+  erro (<error>), scripts (<eval>) e parâmetros de callback (<extension>)
+- Classificar a resposta: erro do servidor (/errors/500.html) ou sessão
+  expirada, inclusive quando o SGN devolve uma página HTML (login, "Oops!")
+  em vez do XML
+
+O resultado fica em cache pelo texto da resposta: o cliente HTTP lê o
+ViewState, o disjuntor confere o erro do servidor e a automação lê os
+updates da mesma resposta sem interpretá-la de novo. A estrutura em cache
+é preenchida só no construtor e não guarda árvores lxml, então pode ser lida
+por várias threads.
+"""
+import re
+import threading
+from functools import lru_cache
+
+from lxml import etree, html
+
+# Respostas recentes mantidas já interpretadas
+TAMANHO_CACHE = 8
+
+CAMPO_VIEWSTATE = "javax.faces.ViewState"
+
+# Sinais de sessão expirada (no redirect/erro do XML ou em uma página HTML)
+INDICADORES_SESSAO_EXPIRADA = [
+    'Oops! Ocorreu um erro ao carregar essa página',
+    'logic:notAuthenticated',
+    'login.html',
+    'autenticacao',
+    'session expired',
+    'sessão expirou',
+    '/errors/403.html',
+    'ViewExpiredException',
+]
+_RE_SESSAO_EXPIRADA = re.compile("|".join(re.escape(i) for i in INDICADORES_SESSAO_EXPIRADA), re.I)
+
+ERRO_SERVIDOR = "/errors/500.html"
+
+_XP_UPDATES = etree.XPath("/partial-response/changes/update")
+_XP_EVALS = etree.XPath("/partial-response/changes/eval/text()")
+_XP_EXTENSOES = etree.XPath("/partial-response/changes/extension")
+_XP_REDIRECT = etree.XPath("string(/partial-response/redirect/@url)")
+_XP_ERRO_NOME = etree.XPath("string(/partial-response/error/error-name)")
+_XP_ERRO_MENSAGEM = etree.XPath("string(/partial-response/error/error-message)")
+
+# Parser lxml não deve ser compartilhado entre threads (gravações paralelas)
+_parsers = threading.local()
+
+
+def _parser():
+    """Parser XML da thread atual"""
+    parser = getattr(_parsers, "parser", None)
+    if parser is None:
+        parser = _parsers.parser = etree.XMLParser(
+            huge_tree=True, resolve_entities=False, no_network=True
+        )
+    return parser
+
+
+class RespostaParcial:
+    """
+    Resposta partial/ajax interpretada
+
+    Attributes:
+        texto (str): Texto original da resposta
+        valida (bool): True se o texto é um <partial-response> bem formado
+        updates (dict): {id: conteúdo (HTML/texto do CDATA)} na ordem da resposta
+        viewstate (str): ViewState devolvido (ou None)
+        redirect (str): URL do <redirect> (ou None)
+        erro (dict): {"nome", "mensagem"} do <error> (ou None)
+        evals (list): Scripts dos <eval>
+        extensoes (dict): {tipo: conteúdo} dos <extension> (ex: "args" do PrimeFaces)
+    """
+
+    def __init__(self, texto):
+        """
+        Args:
+            texto (str): Texto da resposta HTTP
+        """
+        self.texto = texto or ""
+        self.valida = False
+        self.updates = {}
+        self.viewstate = None
+        self.redirect = None
+        self.erro = None
+        self.evals = []
+        self.extensoes = {}
+
+        if "<partial-response" not in self.texto:
+            return
+        try:
+            raiz = etree.fromstring(self.texto.encode("utf-8"), _parser())
+        except (etree.XMLSyntaxError, ValueError):
+            return
+        if raiz is None or raiz.tag != "partial-response":
+            return
+        self.valida = True
+
+        for update in _XP_UPDATES(raiz):
+            element_id = update.get("id", "")
+            conteudo = update.text or ""
+            if element_id == CAMPO_VIEWSTATE or element_id.endswith(f"{CAMPO_VIEWSTATE}:0"):
+                self.viewstate = conteudo.strip() or None
+            else:
+                self.updates[element_id] = conteudo
+
+        self.evals = [str(script) for script in _XP_EVALS(raiz)]
+        for extensao in _XP_EXTENSOES(raiz):
+            self.extensoes[extensao.get("type") or extensao.get("ln") or ""] = extensao.text or ""
+        self.redirect = _XP_REDIRECT(raiz) or None
+        nome_erro = _XP_ERRO_NOME(raiz)
+        if nome_erro:
+            self.erro = {"nome": nome_erro.strip(), "mensagem": _XP_ERRO_MENSAGEM(raiz).strip()}
+
+    def conteudo(self, element_id, parcial=False):
+        """
+        Conteúdo do update de um componente
+
+        Args:
+            element_id (str): ID do componente
+            parcial (bool): Aceitar o primeiro update cujo id contém element_id
+
+        Returns:
+            str: HTML do update ou None
+        """
+        if element_id in self.updates or not parcial:
+            return self.updates.get(element_id)
+        for update_id, conteudo in self.updates.items():
+            if element_id in update_id:
+                return conteudo
+        return None
+
+    def fragmento(self, element_id, parcial=False):
+        """
+        Árvore lxml.html do update de um componente
+
+        A árvore é nova a cada chamada: a RespostaParcial em cache é
+        compartilhada entre threads, e árvores lxml não devem ser.
+
+        Returns:
+            lxml.html.HtmlElement: Raiz do fragmento ou None
+        """
+        conteudo = self.conteudo(element_id, parcial)
+        if not conteudo or not conteudo.strip():
+            return None
+        return html.fragment_fromstring(conteudo, create_parent="div")
+
+    @property
+    def erro_servidor(self):
+        """True se o SGN redirecionou para a página de erro 500"""
+        if self.valida:
+            return bool(self.redirect and ERRO_SERVIDOR in self.redirect)
+        return ERRO_SERVIDOR in self.texto
+
+    @property
+    def sessao_expirada(self):
+        """True se a resposta indica sessão/view expirada ou falta de autenticação"""
+        if self.valida:
+            sinais = " ".join(filter(None, [
+                self.redirect,
+                self.erro and self.erro["nome"],
+                self.erro and self.erro["mensagem"],
+            ]))
+            return bool(sinais and _RE_SESSAO_EXPIRADA.search(sinais))
+        return bool(_RE_SESSAO_EXPIRADA.search(self.texto))
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def analisar_resposta(texto):
+    """
+    Interpreta uma resposta partial/ajax (com cache pelo texto)
+
+    Args:
+        texto (str): Texto da resposta HTTP
+
+    Returns:
+        RespostaParcial: Resposta interpretada (não deve ser alterada)
+    """
+    return RespostaParcial(texto)
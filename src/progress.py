@@ -0,0 +1,299 @@
+"""
+Eventos estruturados de progresso dos jobs
+
+Este módulo é responsável por:
+- Definir o esquema de eventos de progresso (fase, aluno, vazão, ETA)
+- Associar um rastreador de progresso ao job em execução via ContextVar
+- Calcular vazão (alunos/minuto) e ETA por média móvel exponencial (EWMA)
+
+Os loops da automação chamam as funções de módulo (iniciar_fase, aluno_iniciado,
+aluno_concluido, registrar_campos_escritos). Fora de um job elas não fazem nada.
+No lote de turmas, iniciar_turma zera a contagem de alunos a cada turma (vazão e
+ETA são da turma atual) e acumula os totais do lote.
+
+Esquema dos eventos (todos com "type" e "ts"):
+- phase_started:   {"phase"}
+- phase_finished:  {"phase", "duration", "success"}
+- student_started: {"index", "total", "name"}
+- student_done:    {"index", "total", "name", "success", "fields_written", "duration"}
+- throughput:      {"done", "total", "students_per_minute", "ewma_seconds", "eta_seconds"}
+- class_done:      {"codigo_turma", "index", "total", "success", "message", "duration"} (lote)
+- concurrency:     {"limit", "reason"} (mudança do limite adaptativo de requisições ao SGN)
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Rastreador de progresso do job em execução no contexto atual
+_rastreador_atual = contextvars.ContextVar("sgn_rastreador_progresso", default=None)
+
+# Aluno em processamento no contexto atual (cada faixa paralela tem o seu)
+_aluno_do_contexto = contextvars.ContextVar("sgn_aluno_progresso", default=None)
+
+
+class RastreadorProgresso:
+    """
+    Acumula os eventos de progresso de um job e notifica os assinantes
+
+    Attributes:
+        eventos (list): Todos os eventos emitidos
+        alpha (float): Peso da amostra mais recente na EWMA do tempo por aluno
+    """
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.eventos = []
+        self._assinantes = []
+        self._lock = threading.Lock()
+
+        self.fase_atual = None
+        self._inicio_fase = None
+
+        self.total_alunos = 0
+        self.alunos_concluidos = 0
+        self.alunos_com_erro = 0
+        self.campos_escritos = 0
+        self.ewma_segundos = None
+        self._inicio_alunos = None
+        # Totais das turmas já encerradas no lote (os contadores acima são da turma atual)
+        self.alunos_concluidos_lote = 0
+        self.alunos_com_erro_lote = 0
+        # Alunos em andamento: {nome: {"inicio", "campos"}} (vários com faixas paralelas)
+        self._alunos_em_andamento = {}
+        # Alunos processados ao mesmo tempo (divide o ETA)
+        self.paralelismo = 1
+
+        self.limite_concorrencia = None
+        self.historico_concorrencia = []
+
+    def assinar(self, callback):
+        """
+        Registra um assinante que recebe cada novo evento
+
+        Returns:
+            list: Eventos já emitidos antes da assinatura (histórico)
+        """
+        with self._lock:
+            self._assinantes.append(callback)
+            return list(self.eventos)
+
+    def cancelar_assinatura(self, callback):
+        """Remove um assinante registrado"""
+        with self._lock:
+            try:
+                self._assinantes.remove(callback)
+            except ValueError:
+                pass
+
+    def emitir(self, tipo, **dados):
+        """Emite um evento de progresso"""
+        evento = {"type": tipo, "ts": round(time.time(), 3)}
+        evento.update(dados)
+        with self._lock:
+            self.eventos.append(evento)
+            assinantes = list(self._assinantes)
+        for callback in assinantes:
+            try:
+                callback(evento)
+            except Exception:
+                pass
+        return evento
+
+    def iniciar_fase(self, nome):
+        """Inicia uma fase, finalizando a fase anterior (as fases são sequenciais)"""
+        self.finalizar_fase()
+        self.fase_atual = nome
+        self._inicio_fase = time.time()
+        self.emitir("phase_started", phase=nome)
+
+    def finalizar_fase(self, sucesso=True):
+        """Finaliza a fase atual (se houver) emitindo sua duração"""
+        if self.fase_atual is None:
+            return
+        duracao = time.time() - self._inicio_fase
+        self.emitir("phase_finished", phase=self.fase_atual, duration=round(duracao, 2), success=sucesso)
+        self.fase_atual = None
+        self._inicio_fase = None
+
+    def iniciar_turma(self):
+        """
+        Começa a contagem de alunos de uma nova turma do lote
+
+        Cada turma tem seu próprio total: sem zerar, os concluídos das turmas
+        anteriores passariam do total da atual e o ETA ficaria errado. O tempo
+        médio por aluno (EWMA) é mantido como estimativa para a nova turma.
+        """
+        with self._lock:
+            self.alunos_concluidos_lote += self.alunos_concluidos
+            self.alunos_com_erro_lote += self.alunos_com_erro
+            self.total_alunos = 0
+            self.alunos_concluidos = 0
+            self.alunos_com_erro = 0
+            self._inicio_alunos = None
+            self._alunos_em_andamento.clear()
+            self.paralelismo = 1
+
+    def aluno_iniciado(self, indice, total, nome):
+        """Marca o início do processamento de um aluno"""
+        agora = time.time()
+        anterior = _aluno_do_contexto.get()
+        _aluno_do_contexto.set(nome)
+        with self._lock:
+            # Aluno anterior deste contexto que terminou sem aluno_concluido (erro no meio)
+            if anterior is not None and anterior != nome:
+                self._alunos_em_andamento.pop(anterior, None)
+            if self._inicio_alunos is None:
+                self._inicio_alunos = agora
+            self.total_alunos = total
+            self._alunos_em_andamento[nome] = {"inicio": agora, "campos": 0}
+        self.emitir("student_started", index=indice, total=total, name=nome)
+
+    def registrar_campos_escritos(self, quantidade):
+        """Soma campos gravados no SGN para o aluno atual do contexto"""
+        with self._lock:
+            estado = self._alunos_em_andamento.get(_aluno_do_contexto.get())
+            if estado is not None:
+                estado["campos"] += quantidade
+            self.campos_escritos += quantidade
+
+    def aluno_concluido(self, indice, total, nome, sucesso=True, campos_escritos=None):
+        """Marca o fim do processamento de um aluno e emite vazão/ETA atualizados"""
+        agora = time.time()
+        with self._lock:
+            self.paralelismo = max(1, len(self._alunos_em_andamento))
+            estado = self._alunos_em_andamento.pop(nome, None) or {"inicio": None, "campos": 0}
+            if campos_escritos is not None:
+                self.campos_escritos += campos_escritos - estado["campos"]
+                estado["campos"] = campos_escritos
+            duracao = agora - estado["inicio"] if estado["inicio"] else 0.0
+
+            # Faixas paralelas concluem alunos ao mesmo tempo: contadores, EWMA e
+            # o retrato da vazão são atualizados juntos, sob o lock
+            self.total_alunos = total
+            self.alunos_concluidos += 1
+            if not sucesso:
+                self.alunos_com_erro += 1
+            if self.ewma_segundos is None:
+                self.ewma_segundos = duracao
+            else:
+                self.ewma_segundos = self.alpha * duracao + (1 - self.alpha) * self.ewma_segundos
+            vazao = self._vazao(agora)
+        _aluno_do_contexto.set(None)
+
+        self.emitir(
+            "student_done",
+            index=indice, total=total, name=nome, success=sucesso,
+            fields_written=estado["campos"], duration=round(duracao, 2)
+        )
+        self.emitir("throughput", **vazao)
+
+    def _vazao(self, agora=None):
+        """Calcula vazão e ETA atuais (chamar com self._lock adquirido)"""
+        agora = agora or time.time()
+        decorrido = agora - self._inicio_alunos if self._inicio_alunos else 0.0
+        por_minuto = self.alunos_concluidos / decorrido * 60 if decorrido > 0 else 0.0
+        restantes = max(0, self.total_alunos - self.alunos_concluidos)
+        eta = self.ewma_segundos * restantes / self.paralelismo if self.ewma_segundos is not None else None
+        return {
+            "done": self.alunos_concluidos,
+            "total": self.total_alunos,
+            "students_per_minute": round(por_minuto, 2),
+            "ewma_seconds": round(self.ewma_segundos, 2) if self.ewma_segundos is not None else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+
+    def registrar_limite_concorrencia(self, limite, motivo):
+        """Registra uma mudança do limite de requisições simultâneas ao SGN"""
+        self.limite_concorrencia = limite
+        evento = self.emitir("concurrency", limit=limite, reason=motivo)
+        with self._lock:
+            self.historico_concorrencia.append({"ts": evento["ts"], "limite": limite, "motivo": motivo})
+
+    def finalizar(self, sucesso=True):
+        """Fecha a fase em aberto ao término do job"""
+        self.finalizar_fase(sucesso)
+
+    def resumo(self):
+        """Resumo do progresso para consulta de status"""
+        with self._lock:
+            resumo = self._vazao()
+            resumo.update({
+                "fase_atual": self.fase_atual,
+                "alunos_com_erro": self.alunos_com_erro,
+                "alunos_concluidos_lote": self.alunos_concluidos_lote + self.alunos_concluidos,
+                "alunos_com_erro_lote": self.alunos_com_erro_lote + self.alunos_com_erro,
+                "campos_escritos": self.campos_escritos,
+                "limite_concorrencia": self.limite_concorrencia,
+                "historico_concorrencia": list(self.historico_concorrencia[-50:]),
+            })
+        return resumo
+
+
+@contextmanager
+def rastreamento_progresso(rastreador):
+    """
+    Associa um rastreador de progresso ao contexto atual durante o bloco
+
+    Args:
+        rastreador (RastreadorProgresso): Rastreador do job
+    """
+    token = _rastreador_atual.set(rastreador)
+    try:
+        yield rastreador
+    finally:
+        _rastreador_atual.reset(token)
+
+
+def rastreador_atual():
+    """Retorna o rastreador de progresso do contexto atual (ou None)"""
+    return _rastreador_atual.get()
+
+
+def iniciar_fase(nome):
+    """Inicia uma fase do job atual (no-op fora de job)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is not None:
+        rastreador.iniciar_fase(nome)
+
+
+def iniciar_turma():
+    """Zera a contagem de alunos para a próxima turma do lote (no-op fora de job)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is not None:
+        rastreador.iniciar_turma()
+
+
+def aluno_iniciado(indice, total, nome):
+    """Registra o início do processamento de um aluno (no-op fora de job)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is not None:
+        rastreador.aluno_iniciado(indice, total, nome)
+
+
+def aluno_concluido(indice, total, nome, sucesso=True, campos_escritos=None):
+    """Registra o fim do processamento de um aluno (no-op fora de job)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is not None:
+        rastreador.aluno_concluido(indice, total, nome, sucesso, campos_escritos)
+
+
+def registrar_campos_escritos(quantidade):
+    """Soma campos gravados para o aluno atual (no-op fora de job)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is not None:
+        rastreador.registrar_campos_escritos(quantidade)
+
+
+def emitir_evento(tipo, **dados):
+    """Emite um evento avulso no job atual (no-op fora de job)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is not None:
+        rastreador.emitir(tipo, **dados)
+
+
+def registrar_limite_concorrencia(limite, motivo):
+    """Registra uma mudança do limite de concorrência no job atual (no-op fora de job)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is not None:
+        rastreador.registrar_limite_concorrencia(limite, motivo)
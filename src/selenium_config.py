@@ -6,12 +6,40 @@ Este módulo é responsável por:
 - Gerenciar o ciclo de vida do WebDriver (criar/fechar)
 - Fornecer uma interface simples para obter o driver
 - Garantir que apenas uma instância do driver seja criada
+- Manter um pool de navegadores pré-aquecidos (BrowserPool) para os jobs
 """
+import os
+import threading
+import time
+from queue import Queue, Empty
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Caminho do ChromeDriver resolvido uma única vez por processo
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def _obter_caminho_chromedriver():
+    """
+    Retorna o caminho do ChromeDriver, instalando-o apenas na primeira chamada
+
+    ChromeDriverManager().install() consulta versões e o cache em disco a cada
+    chamada; como o resultado não muda durante a vida do processo, guardamos
+    o caminho em memória.
+
+    Returns:
+        str: Caminho do executável do ChromeDriver
+    """
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        with _chromedriver_lock:
+            if _chromedriver_path is None:
+                _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
 class SeleniumManager:
     """
     Gerenciador do Selenium WebDriver
@@ -89,8 +117,8 @@ class SeleniumManager:
         chrome_options.add_argument("--window-size=1920,1080")  # Define tamanho da janela
         # chrome_options.add_argument("--headless")  # Descomente para modo headless (sem interface)
         
-        # Usa WebDriverManager para baixar automaticamente o ChromeDriver compatível
-        service = Service(ChromeDriverManager().install())
+        # Usa WebDriverManager para baixar automaticamente o ChromeDriver compatível (cacheado)
+        service = Service(_obter_caminho_chromedriver())
         
         # Cria a instância do WebDriver com as configurações
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -161,3 +189,169 @@ class SeleniumManager:
             return self.setup_driver()
         
         return self.driver
+
+
+class BrowserPool:
+    """
+    Pool de navegadores Chrome pré-aquecidos
+
+    Mantém um número configurável de SeleniumManager com o driver já iniciado
+    (e deslogado), para que um job comece a usar o navegador assim que sai da
+    fila, sem pagar a inicialização do Chrome.
+
+    Fluxo:
+    - checkout(): entrega um SeleniumManager pronto (ou cria um na hora se o pool estiver vazio)
+    - checkin(): limpa o estado (cookies, storage, janelas extras) e devolve ao pool
+    - Instâncias inválidas (navegador fechado/travado) são descartadas e repostas em background
+    """
+
+    def __init__(self, tamanho=None):
+        """
+        Inicializa o pool de navegadores
+
+        Args:
+            tamanho (int, optional): Quantidade de navegadores mantidos aquecidos.
+                                     Padrão: variável SGN_BROWSER_POOL ou 1
+        """
+        if tamanho is None:
+            tamanho = int(os.environ.get("SGN_BROWSER_POOL", "1"))
+        self.tamanho = max(0, tamanho)
+        self._disponiveis = Queue()
+        self._lock = threading.Lock()
+        self._criando = 0
+        self._encerrado = False
+
+    def iniciar(self):
+        """Inicia o aquecimento dos navegadores em background"""
+        self._encerrado = False
+        self._repor_em_background()
+
+    def checkout(self):
+        """
+        Retira um navegador pronto do pool
+
+        Returns:
+            SeleniumManager: Gerenciador com driver já iniciado
+        """
+        inicio = time.time()
+        while True:
+            try:
+                manager = self._disponiveis.get_nowait()
+            except Empty:
+                break
+
+            if manager._is_session_valid():
+                self._repor_em_background()
+                print(f"🌡️ Navegador retirado do pool em {(time.time() - inicio)*1000:.0f}ms")
+                return manager
+
+            # Navegador morto: descartar e tentar o próximo
+            print("⚠️ Navegador inválido no pool, descartando...")
+            self._fechar(manager)
+
+        # Pool vazio: criar na hora (cold start) e repor em background
+        print("🥶 Pool de navegadores vazio, iniciando navegador novo...")
+        self._repor_em_background()
+        manager = SeleniumManager()
+        manager.setup_driver()
+        return manager
+
+    def checkin(self, manager):
+        """
+        Devolve um navegador ao pool após limpar seu estado
+
+        Se o navegador estiver inválido, o pool estiver cheio ou encerrado,
+        o navegador é fechado.
+
+        Args:
+            manager (SeleniumManager): Gerenciador retirado via checkout()
+        """
+        if manager is None:
+            return
+
+        if (not self._encerrado
+                and self._disponiveis.qsize() < self.tamanho
+                and manager._is_session_valid()
+                and self._resetar(manager)):
+            self._disponiveis.put(manager)
+            return
+
+        self._fechar(manager)
+        self._repor_em_background()
+
+    def encerrar(self):
+        """Fecha todos os navegadores disponíveis no pool"""
+        self._encerrado = True
+        while True:
+            try:
+                manager = self._disponiveis.get_nowait()
+            except Empty:
+                break
+            self._fechar(manager)
+
+    def _resetar(self, manager):
+        """
+        Limpa o estado do navegador para o próximo job (logout implícito)
+
+        Returns:
+            bool: True se o navegador ficou limpo e pode ser reutilizado
+        """
+        driver = manager.driver
+        try:
+            # Fechar janelas/abas extras abertas durante o job
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            # Limpar storage da página atual antes de sair dela
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+
+            # Limpar cookies de TODOS os domínios (SGN e WSO2)
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except Exception:
+                driver.delete_all_cookies()
+
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"⚠️ Não foi possível limpar o navegador para reutilização: {e}")
+            return False
+
+    def _fechar(self, manager):
+        """Fecha o navegador de um gerenciador ignorando erros"""
+        try:
+            manager.close_driver()
+        except Exception:
+            pass
+
+    def _repor_em_background(self):
+        """Cria navegadores em background até completar o tamanho do pool"""
+        with self._lock:
+            faltando = self.tamanho - self._disponiveis.qsize() - self._criando
+            if self._encerrado or faltando <= 0:
+                return
+            self._criando += faltando
+
+        for _ in range(faltando):
+            threading.Thread(target=self._criar_navegador, daemon=True, name="sgn-browser-pool").start()
+
+    def _criar_navegador(self):
+        """Inicia um navegador e o adiciona ao pool"""
+        try:
+            manager = SeleniumManager()
+            manager.setup_driver()
+            if self._encerrado:
+                self._fechar(manager)
+            else:
+                self._disponiveis.put(manager)
+        except Exception as e:
+            print(f"⚠️ Erro ao aquecer navegador do pool: {e}")
+        finally:
+            with self._lock:
+                self._criando -= 1
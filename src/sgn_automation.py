@@ -21,9 +21,25 @@ import unicodedata
 import json
 import random
 import os
-import requests
+from functools import lru_cache
 from lxml import html
 from .sgn_automation_helpers import SGNAutomationHelpers
+from .progress import iniciar_fase, iniciar_turma, aluno_iniciado, aluno_concluido, emitir_evento
+from . import checkpoint
+from .cancellation import verificar_cancelamento
+from .jsf_async import executar_leituras
+from .partial_response import analisar_resposta
+
+
+@lru_cache(maxsize=4096)
+def normalizar_texto(valor):
+    """Texto sem acentos, com espaços simples e em minúsculas (para comparar habilidades)"""
+    if not valor:
+        return ""
+    valor = unicodedata.normalize("NFD", valor)
+    valor = "".join(c for c in valor if unicodedata.category(c) != "Mn")
+    return re.sub(r"\s+", " ", valor).strip().lower()
+
 
 class SGNAutomation:
     """
@@ -51,6 +67,8 @@ class SGNAutomation:
         self.driver = None
         # Inicializar helpers para métodos aprimorados
         self.helpers = SGNAutomationHelpers(selenium_manager)
+        # Após renovar a sessão, os helpers voltam ao diário e reabrem aba/trimestre aqui
+        self.helpers.reabrir_aba_conceitos = self._reabrir_aba_conceitos
         
         # Delegar métodos auxiliares para a classe principal
         self._validar_elementos_conceitos = self.helpers._validar_elementos_conceitos
@@ -129,6 +147,86 @@ class SGNAutomation:
             print(f"❌ {error_msg}")
             return False, error_msg
     
+    def _normalizar_parametros_conceitos(self, atitude_observada, conceito_habilidade, trimestre_referencia):
+        """
+        Aplica valores padrão, valida o trimestre e mapeia atitude/conceito para os enums
+        
+        Args:
+            atitude_observada (str | AtitudeObservada): Atitude (padrão "Raramente")
+            conceito_habilidade (str | ConceitoHabilidade): Conceito (padrão "B")
+            trimestre_referencia (str | TrimestreReferencia): Trimestre (padrão "TR2")
+            
+        Returns:
+            tuple: (atitude_mapeada, conceito_mapeado, trimestre_referencia)
+            
+        Raises:
+            ValueError: Se algum dos valores for inválido
+        """
+        from .models import AtitudeObservada, ConceitoHabilidade
+        
+        if atitude_observada is None:
+            atitude_observada = "Raramente"
+        if conceito_habilidade is None:
+            conceito_habilidade = "B"
+        if trimestre_referencia is None:
+            trimestre_referencia = "TR2"
+
+        if hasattr(trimestre_referencia, "value"):
+            trimestre_referencia = trimestre_referencia.value
+
+        trimestre_referencia = str(trimestre_referencia).strip().upper()
+        valid_trimestres = {"TR1", "TR2", "TR3"}
+        if trimestre_referencia not in valid_trimestres:
+            raise ValueError(
+                f"Trimestre de referência inválido. Valores aceitos: {', '.join(sorted(valid_trimestres))}"
+            )
+
+        # Mapear parâmetros para enums
+        def normalize_str(s):
+            import unicodedata
+            return ''.join(c for c in unicodedata.normalize('NFD', str(s).lower()) 
+                        if unicodedata.category(c) != 'Mn')
+
+        if isinstance(atitude_observada, str):
+            input_normalized = normalize_str(atitude_observada)
+            for a in AtitudeObservada:
+                if normalize_str(a.value) == input_normalized:
+                    atitude_mapeada = a
+                    break
+            else:
+                for a in AtitudeObservada:
+                    if input_normalized in normalize_str(a.value) or normalize_str(a.value) in input_normalized:
+                        atitude_mapeada = a
+                        break
+                else:
+                    raise ValueError(
+                        f"Atitude observada inválida. Valores aceitos: {', '.join(e.value for e in AtitudeObservada)}"
+                    )
+        else:
+            atitude_mapeada = atitude_observada
+
+        if isinstance(conceito_habilidade, str):
+            conceito_upper = conceito_habilidade.strip().upper()
+            conceito_mapeado = next(
+                (c for c in ConceitoHabilidade 
+                 if c.value.upper() == conceito_upper),
+                None
+            )
+            if conceito_mapeado is None:
+                for c in ConceitoHabilidade:
+                    if c.value.upper() == conceito_upper or \
+                       (len(conceito_upper) == 1 and c.value.upper() == conceito_upper):
+                        conceito_mapeado = c
+                        break
+                else:
+                    raise ValueError(
+                        f"Conceito de habilidade inválido. Valores aceitos: {', '.join(e.value for e in ConceitoHabilidade if e != ConceitoHabilidade.SELECIONE)}"
+                    )
+        else:
+            conceito_mapeado = conceito_habilidade
+        
+        return atitude_mapeada, conceito_mapeado, trimestre_referencia
+    
     def lancar_conceito_trimestre(
         self,
         username,
@@ -137,6 +235,7 @@ class SGNAutomation:
         atitude_observada=None,
         conceito_habilidade=None,
         trimestre_referencia="TR2",
+        resume=False,
     ):
         """
         Executa o fluxo completo: login -> navegação -> lançamento de conceitos
@@ -158,6 +257,7 @@ class SGNAutomation:
             atitude_observada (str, optional): Opção para observações de atitudes. Padrão: "Raramente"
             conceito_habilidade (str, optional): Opção para conceitos de habilidades. Padrão: "B"
             trimestre_referencia (str): Trimestre de referência (TR1, TR2 ou TR3)
+            resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
                 
         Returns:
             tuple: (success: bool, message: str)
@@ -184,85 +284,14 @@ class SGNAutomation:
                 - message: Mensagem descritiva do resultado com estatísticas
         """
         try:
-            from .models import AtitudeObservada, ConceitoHabilidade
-            
             # Validar e definir valores padrão
             if not isinstance(username, str) or not isinstance(password, str) or not isinstance(codigo_turma, str):
                 raise TypeError("Parâmetros username, password e codigo_turma devem ser strings")
             
-            # Definir valores padrão se não fornecidos
-            if atitude_observada is None:
-                atitude_observada = "Raramente"
-            if conceito_habilidade is None:
-                conceito_habilidade = "B"
-            if trimestre_referencia is None:
-                trimestre_referencia = "TR2"
-
-            # Garantir que trimestre_referencia seja uma string válida (TR1/TR2/TR3)
-            if hasattr(trimestre_referencia, "value"):
-                trimestre_referencia = trimestre_referencia.value
-
-            trimestre_referencia = str(trimestre_referencia).strip().upper()
-            valid_trimestres = {"TR1", "TR2", "TR3"}
-            if trimestre_referencia not in valid_trimestres:
-                raise ValueError(
-                    f"Trimestre de referência inválido. Valores aceitos: {', '.join(sorted(valid_trimestres))}"
-                )
-            
-            # Mapear atitude_observada para o enum
-            try:
-                # Normaliza a string para comparação (remove acentos e converte para minúsculas)
-                def normalize_str(s):
-                    import unicodedata
-                    return ''.join(c for c in unicodedata.normalize('NFD', str(s).lower()) 
-                                if unicodedata.category(c) != 'Mn')
-                
-                # Processar atitude_observada
-                if isinstance(atitude_observada, str):
-                    input_normalized = normalize_str(atitude_observada)
-                    for a in AtitudeObservada:
-                        if normalize_str(a.value) == input_normalized:
-                            atitude_mapeada = a
-                            break
-                    else:
-                        # Tenta encontrar correspondência parcial
-                        for a in AtitudeObservada:
-                            if input_normalized in normalize_str(a.value) or normalize_str(a.value) in input_normalized:
-                                atitude_mapeada = a
-                                break
-                        else:
-                            raise ValueError(
-                                f"Atitude observada inválida. Valores aceitos: {', '.join(e.value for e in AtitudeObservada)}"
-                            )
-                else:
-                    atitude_mapeada = atitude_observada
-                
-                # Processar conceito_habilidade
-                if isinstance(conceito_habilidade, str):
-                    conceito_upper = conceito_habilidade.strip().upper()
-                    conceito_mapeado = next(
-                        (c for c in ConceitoHabilidade 
-                         if c.value.upper() == conceito_upper),
-                        None
-                    )
-                    if conceito_mapeado is None:
-                        # Tenta encontrar correspondência parcial
-                        for c in ConceitoHabilidade:
-                            if c.value.upper() == conceito_upper or \
-                               (len(conceito_upper) == 1 and c.value.upper() == conceito_upper):
-                                conceito_mapeado = c
-                                break
-                        else:
-                            raise ValueError(
-                                f"Conceito de habilidade inválido. Valores aceitos: {', '.join(e.value for e in ConceitoHabilidade if e != ConceitoHabilidade.SELECIONE)}"
-                            )
-                else:
-                    conceito_mapeado = conceito_habilidade
-                    
-            except ValueError as e:
-                raise ValueError(str(e))
-            except Exception as e:
-                raise ValueError(f"Erro ao processar parâmetros: {str(e)}")
+            # Definir valores padrão, validar trimestre e mapear para os enums
+            atitude_mapeada, conceito_mapeado, trimestre_referencia = self._normalizar_parametros_conceitos(
+                atitude_observada, conceito_habilidade, trimestre_referencia
+            )
             
             print(f"🔧 Parâmetros recebidos:")
             print(f"   - Usuário: {username}")
@@ -272,34 +301,16 @@ class SGNAutomation:
             
             # 1. Fazer login
             print("\n1. Iniciando processo de login...")
+            iniciar_fase("login")
             success, message = self.perform_login(username, password)
             if not success:
                 return False, f"Falha no login: {message}"
             
-            # 2. Navegar para a aba de conceitos
-            print("\n2. Navegando para a aba de conceitos...")
-            success, message = self.navigate_to_conceitos(codigo_turma)
-            if not success:
-                return False, f"Falha ao navegar para conceitos: {message}"
-
-            # 2.1 Validar trimestre de referência antes do lançamento
-            print("\n2.1. Validando trimestre de referência antes do lançamento...")
-            self._selecionar_trimestre_referencia(trimestre_referencia)
-
-            # 3. Lançar conceitos para todos os alunos
-            print("\n3. Iniciando lançamento de conceitos...")
-            print(f"🔧 Usando valores mapeados:")
-            print(f"   - Atitude: {atitude_mapeada}")
-            print(f"   - Conceito: {conceito_mapeado}")
-            
-            success, message = self._lancar_conceitos_todos_alunos(
-                atitude_observada=atitude_mapeada,
-                conceito_habilidade=conceito_mapeado,
-                trimestre_referencia=trimestre_referencia
+            # 2-3. Navegar para a turma e lançar conceitos
+            return self._processar_turma_simples(
+                codigo_turma, atitude_mapeada, conceito_mapeado, trimestre_referencia, resume
             )
             
-            return success, message
-            
         except Exception as e:
             error_msg = f"Erro ao lançar conceitos: {str(e)}"
             print(f"❌ {error_msg}")
@@ -314,6 +325,7 @@ class SGNAutomation:
         conceito_habilidade=None,
         trimestre_referencia="TR2",
         trocar_c_por_ne: bool = True,
+        resume=False,
     ):
         """
         🆕 NOVO: Executa o fluxo completo com lançamento INTELIGENTE de conceitos
@@ -341,76 +353,18 @@ class SGNAutomation:
             atitude_observada (str, optional): Opção para observações de atitudes. Padrão: "Raramente"
             conceito_habilidade (str, optional): Conceito padrão (fallback) se não houver mapeamento. Padrão: "B"
             trimestre_referencia (str): Trimestre de referência (TR1, TR2 ou TR3)
+            resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
                 
         Returns:
             tuple: (success: bool, message: str)
         """
         try:
-            from .models import AtitudeObservada, ConceitoHabilidade
-            
             if not isinstance(username, str) or not isinstance(password, str) or not isinstance(codigo_turma, str):
                 raise TypeError("Parâmetros username, password e codigo_turma devem ser strings")
             
-            if atitude_observada is None:
-                atitude_observada = "Raramente"
-            if conceito_habilidade is None:
-                conceito_habilidade = "B"
-            if trimestre_referencia is None:
-                trimestre_referencia = "TR2"
-
-            if hasattr(trimestre_referencia, "value"):
-                trimestre_referencia = trimestre_referencia.value
-
-            trimestre_referencia = str(trimestre_referencia).strip().upper()
-            valid_trimestres = {"TR1", "TR2", "TR3"}
-            if trimestre_referencia not in valid_trimestres:
-                raise ValueError(
-                    f"Trimestre de referência inválido. Valores aceitos: {', '.join(sorted(valid_trimestres))}"
-                )
-            
-            # Mapear parâmetros para enums
-            def normalize_str(s):
-                import unicodedata
-                return ''.join(c for c in unicodedata.normalize('NFD', str(s).lower()) 
-                            if unicodedata.category(c) != 'Mn')
-            
-            if isinstance(atitude_observada, str):
-                input_normalized = normalize_str(atitude_observada)
-                for a in AtitudeObservada:
-                    if normalize_str(a.value) == input_normalized:
-                        atitude_mapeada = a
-                        break
-                else:
-                    for a in AtitudeObservada:
-                        if input_normalized in normalize_str(a.value) or normalize_str(a.value) in input_normalized:
-                            atitude_mapeada = a
-                            break
-                    else:
-                        raise ValueError(
-                            f"Atitude observada inválida. Valores aceitos: {', '.join(e.value for e in AtitudeObservada)}"
-                        )
-            else:
-                atitude_mapeada = atitude_observada
-            
-            if isinstance(conceito_habilidade, str):
-                conceito_upper = conceito_habilidade.strip().upper()
-                conceito_mapeado = next(
-                    (c for c in ConceitoHabilidade 
-                     if c.value.upper() == conceito_upper),
-                    None
-                )
-                if conceito_mapeado is None:
-                    for c in ConceitoHabilidade:
-                        if c.value.upper() == conceito_upper or \
-                           (len(conceito_upper) == 1 and c.value.upper() == conceito_upper):
-                            conceito_mapeado = c
-                            break
-                    else:
-                        raise ValueError(
-                            f"Conceito de habilidade inválido. Valores aceitos: {', '.join(e.value for e in ConceitoHabilidade if e != ConceitoHabilidade.SELECIONE)}"
-                        )
-            else:
-                conceito_mapeado = conceito_habilidade
+            atitude_mapeada, conceito_mapeado, trimestre_referencia = self._normalizar_parametros_conceitos(
+                atitude_observada, conceito_habilidade, trimestre_referencia
+            )
             
             print(f"🔧 Parâmetros recebidos (MODO INTELIGENTE):")
             print(f"   - Usuário: {username}")
@@ -421,66 +375,174 @@ class SGNAutomation:
             
             # 1. Fazer login
             print("\n1. Iniciando processo de login...")
+            iniciar_fase("login")
             success, message = self.perform_login(username, password)
             if not success:
                 return False, f"Falha no login: {message}"
             
-            # 2. Navegar para o diário (mas NÃO para aba conceitos ainda)
-            print("\n2. Navegando para o diário da turma...")
-            diario_url = f"https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html?idDiario={codigo_turma}"
-            self.driver.get(diario_url)
-            time.sleep(3)
-            
-            # 3. COLETAR AVALIAÇÕES PRIMEIRO (antes de ir para aba Conceitos)
-            print("\n3. Coletando avaliações cadastradas...")
-            dados_av = self._coletar_avaliacoes_turma()
+            # 2-8. Navegar para a turma, coletar estrutura e lançar conceitos
+            return self._processar_turma_inteligente(
+                codigo_turma, atitude_mapeada, conceito_mapeado, trimestre_referencia, trocar_c_por_ne, resume
+            )
             
-            # VERIFICAÇÃO CRÍTICA: Se não há avaliações, encerrar com erro
-            if not dados_av or len(dados_av) == 0:
-                erro_msg = "❌ ERRO CRÍTICO: Nenhuma avaliação encontrada na turma. É necessário cadastrar avaliações antes de lançar conceitos no modo inteligente."
-                print(f"   {erro_msg}")
-                raise Exception(erro_msg)
+        except Exception as e:
+            error_msg = f"Erro ao lançar conceitos inteligentes: {str(e)}"
+            print(f"❌ {error_msg}")
+            return False, error_msg
+    
+    def _processar_turma_simples(self, codigo_turma, atitude_mapeada, conceito_mapeado, trimestre_referencia, resume=False):
+        """
+        Processa UMA turma no modo simples (assume que o login já foi feito)
+        
+        Navega para a aba de Conceitos da turma, seleciona o trimestre e lança o
+        mesmo conceito para todas as habilidades. Usado por lancar_conceito_trimestre()
+        e pelo lançamento em lote (uma sessão para várias turmas).
+        
+        Args:
+            codigo_turma (str): Código identificador da turma
+            atitude_mapeada (AtitudeObservada): Atitude já normalizada
+            conceito_mapeado (ConceitoHabilidade): Conceito já normalizado
+            trimestre_referencia (str): Trimestre (TR1, TR2 ou TR3)
+            resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
             
-            dados_rp = self._coletar_recuperacoes_paralelas()
-
-            # 4. AGORA SIM, navegar para aba Conceitos
-            print("\n4. Navegando para aba Conceitos...")
-            try:
-                self._open_conceitos_tab()
-            except Exception as e:
-                return False, f"Erro ao acessar aba Conceitos: {e}"
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        # 2. Navegar para a aba de conceitos
+        print("\n2. Navegando para a aba de conceitos...")
+        iniciar_fase("navegacao")
+        success, message = self.navigate_to_conceitos(codigo_turma)
+        if not success:
+            return False, f"Falha ao navegar para conceitos: {message}"
+
+        # 2.1 Validar trimestre de referência antes do lançamento
+        print("\n2.1. Validando trimestre de referência antes do lançamento...")
+        self._selecionar_trimestre_referencia(trimestre_referencia)
+
+        # 3. Lançar conceitos para todos os alunos
+        print("\n3. Iniciando lançamento de conceitos...")
+        iniciar_fase("lancamento")
+        print(f"🔧 Usando valores mapeados:")
+        print(f"   - Atitude: {atitude_mapeada}")
+        print(f"   - Conceito: {conceito_mapeado}")
+
+        with checkpoint.journal_checkpoint(codigo_turma, trimestre_referencia, "simples", resume):
+            success, message = self._lancar_conceitos_todos_alunos(
+                atitude_observada=atitude_mapeada,
+                conceito_habilidade=conceito_mapeado,
+                trimestre_referencia=trimestre_referencia
+            )
 
-            # 5. Selecionar trimestre de referência
-            print("\n5. Selecionando trimestre de referência...")
-            self._selecionar_trimestre_referencia(trimestre_referencia)
+        return success, message
+    
+    def _coletar_estrutura_turma(self, codigo_turma, trimestre_referencia):
+        """
+        Coleta a estrutura da turma usada no modo inteligente (sem gravar nada)
+        
+        Acessa o diário, coleta avaliações e recuperações, abre a aba de Conceitos,
+        seleciona o trimestre, coleta os cabeçalhos e constrói os mapeamentos
+        avaliação → coluna/habilidades. Usado pelo lançamento e pelo plano (dry-run).
+        
+        Args:
+            codigo_turma (str): Código identificador da turma
+            trimestre_referencia (str): Trimestre (TR1, TR2 ou TR3)
             
-            # 6. COLETAR CABEÇALHOS APÓS SELECIONAR O TRIMESTRE (CRÍTICO!)
-            print("\n6. Coletando cabeçalhos da tabela de conceitos...")
-            cabecalhos = self._coletar_configuracao_conceitos()
+        Returns:
+            tuple: (mapeamentos: dict | None, erro: str | None)
             
-            # 7. Construir mapeamentos
-            mapeamentos = self._construir_mapeamento_avaliacoes(cabecalhos, dados_av, dados_rp)
+        Raises:
+            Exception: Se a turma não tiver avaliações cadastradas
+        """
+        # 2. Navegar para o diário (mas NÃO para aba conceitos ainda)
+        print("\n2. Navegando para o diário da turma...")
+        iniciar_fase("navegacao")
+        diario_url = f"https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html?idDiario={codigo_turma}"
+        self.driver.get(diario_url)
+        # Navegação de página inteira: o cliente HTTP relê cookies/URL e ViewState
+        self.helpers.jsf.invalidar()
+        time.sleep(3)
+
+        # 3. COLETAR AVALIAÇÕES PRIMEIRO (antes de ir para aba Conceitos)
+        print("\n3. Coletando avaliações cadastradas...")
+        iniciar_fase("coleta_avaliacoes")
+        dados_av = self._coletar_avaliacoes_turma()
+
+        # VERIFICAÇÃO CRÍTICA: Se não há avaliações, encerrar com erro
+        if not dados_av or len(dados_av) == 0:
+            erro_msg = "❌ ERRO CRÍTICO: Nenhuma avaliação encontrada na turma. É necessário cadastrar avaliações antes de lançar conceitos no modo inteligente."
+            print(f"   {erro_msg}")
+            raise Exception(erro_msg)
+
+        dados_rp = self._coletar_recuperacoes_paralelas()
+
+        # 4. AGORA SIM, navegar para aba Conceitos
+        print("\n4. Navegando para aba Conceitos...")
+        iniciar_fase("navegacao_conceitos")
+        try:
+            self._open_conceitos_tab()
+        except Exception as e:
+            return None, f"Erro ao acessar aba Conceitos: {e}"
+
+        # 5. Selecionar trimestre de referência
+        print("\n5. Selecionando trimestre de referência...")
+        self._selecionar_trimestre_referencia(trimestre_referencia)
+
+        # 6. COLETAR CABEÇALHOS APÓS SELECIONAR O TRIMESTRE (CRÍTICO!)
+        print("\n6. Coletando cabeçalhos da tabela de conceitos...")
+        iniciar_fase("coleta_estrutura")
+        cabecalhos = self._coletar_configuracao_conceitos(trimestre_referencia)
+
+        # 7. Construir mapeamentos
+        mapeamentos = self._construir_mapeamento_avaliacoes(cabecalhos, dados_av, dados_rp)
+
+        # PRINTAR RESUMO DAS AVALIAÇÕES COLETADAS
+        self._printar_resumo_avaliacoes(dados_av, dados_rp, mapeamentos)
+
+        # 7.1 Validação crítica: bloquear se houver avaliações sem habilidades
+        avs_sem_hab = mapeamentos.get("avaliacoes_sem_habilidade", [])
+        if avs_sem_hab:
+            msg_bloqueio = (
+                "❌ ERRO: Existem avaliações sem habilidades vinculadas para o trimestre selecionado: "
+                + ", ".join(avs_sem_hab)
+                + ". Cadastre habilidades nessas avaliações antes de continuar."
+            )
+            print(msg_bloqueio)
+            return None, msg_bloqueio
+
+        return mapeamentos, None
+    
+    def _processar_turma_inteligente(self, codigo_turma, atitude_mapeada, conceito_mapeado, trimestre_referencia, trocar_c_por_ne=True, resume=False):
+        """
+        Processa UMA turma no modo inteligente (assume que o login já foi feito)
+        
+        Coleta avaliações, recuperações e cabeçalhos da turma, constrói os
+        mapeamentos e lança os conceitos baseados nas notas. Usado por
+        lancar_conceito_inteligente() e pelo lançamento em lote.
+        
+        Args:
+            codigo_turma (str): Código identificador da turma
+            atitude_mapeada (AtitudeObservada): Atitude já normalizada
+            conceito_mapeado (ConceitoHabilidade): Conceito (fallback) já normalizado
+            trimestre_referencia (str): Trimestre (TR1, TR2 ou TR3)
+            trocar_c_por_ne (bool): Se True, conceito C vira NE
+            resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
             
-            # PRINTAR RESUMO DAS AVALIAÇÕES COLETADAS
-            self._printar_resumo_avaliacoes(dados_av, dados_rp, mapeamentos)
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        # 2-7. Coletar avaliações, cabeçalhos e construir os mapeamentos
+        mapeamentos, erro = self._coletar_estrutura_turma(codigo_turma, trimestre_referencia)
+        if erro:
+            return False, erro
 
-            # 7.1 Validação crítica: bloquear se houver avaliações sem habilidades
-            avs_sem_hab = mapeamentos.get("avaliacoes_sem_habilidade", [])
-            if avs_sem_hab:
-                msg_bloqueio = (
-                    "❌ ERRO: Existem avaliações sem habilidades vinculadas para o trimestre selecionado: "
-                    + ", ".join(avs_sem_hab)
-                    + ". Cadastre habilidades nessas avaliações antes de continuar."
-                )
-                print(msg_bloqueio)
-                return False, msg_bloqueio
+        # 8. Lançar conceitos INTELIGENTES para todos os alunos
+        print("\n8. Iniciando lançamento INTELIGENTE de conceitos...")
+        iniciar_fase("lancamento")
+        print(f"🔧 Usando valores mapeados:")
+        print(f"   - Atitude: {atitude_mapeada}")
+        print(f"   - Conceito (fallback): {conceito_mapeado}")
 
-            # 8. Lançar conceitos INTELIGENTES para todos os alunos
-            print("\n8. Iniciando lançamento INTELIGENTE de conceitos...")
-            print(f"🔧 Usando valores mapeados:")
-            print(f"   - Atitude: {atitude_mapeada}")
-            print(f"   - Conceito (fallback): {conceito_mapeado}")
-            
+        with checkpoint.journal_checkpoint(codigo_turma, trimestre_referencia, "inteligente", resume):
             success, message = self._lancar_conceitos_inteligente(
                 atitude_observada=atitude_mapeada,
                 conceito_habilidade=conceito_mapeado,
@@ -488,13 +550,305 @@ class SGNAutomation:
                 mapeamentos_prontos=mapeamentos,  # Passar mapeamentos já coletados
                 trocar_c_por_ne=trocar_c_por_ne,
             )
+
+        return success, message
+    
+    def planejar_lancamento_inteligente(
+        self,
+        username,
+        password,
+        codigo_turma,
+        atitude_observada=None,
+        conceito_habilidade=None,
+        trimestre_referencia="TR2",
+        trocar_c_por_ne: bool = True,
+        ler_valores_atuais: bool = True,
+    ):
+        """
+        Calcula o plano de escrita do modo inteligente SEM gravar nada no SGN (dry-run)
+        
+        Faz login, coleta a estrutura da turma (avaliações, cabeçalhos, mapeamentos)
+        e as notas de cada aluno, e devolve o conceito exato que seria aplicado em
+        cada habilidade de cada aluno, as atitudes, quantos campos já estão corretos
+        e quantas requisições JSF o lançamento real enviaria.
+        
+        Com ler_valores_atuais=True, a modal de cada aluno é lida via HTTP (seleção +
+        carregamento, sem valueChange) para obter os valores atuais. O tempo médio
+        dessas leituras é usado para estimar a duração do lançamento real.
+        
+        Args:
+            username (str): Nome de usuário para login no SGN
+            password (str): Senha do usuário
+            codigo_turma (str): Código identificador da turma
+            atitude_observada (str, optional): Atitude aplicada. Padrão: "Raramente"
+            conceito_habilidade (str, optional): Conceito padrão (fallback). Padrão: "B"
+            trimestre_referencia (str): Trimestre de referência (TR1, TR2 ou TR3)
+            trocar_c_por_ne (bool): Se True, conceito C vira NE (como no lançamento)
+            ler_valores_atuais (bool): Ler a modal de cada aluno para comparar com o plano
+            
+        Returns:
+            tuple: (success: bool, message: str, plano: dict | None)
+        """
+        try:
+            atitude_mapeada, _, trimestre_referencia = self._normalizar_parametros_conceitos(
+                atitude_observada, conceito_habilidade, trimestre_referencia
+            )
+            atitude_valor = getattr(atitude_mapeada, "value", str(atitude_mapeada))
             
-            return success, message
+            print(f"🧪 PLANO (dry-run) da turma {codigo_turma} - nenhum dado será gravado")
+            
+            # 1. Fazer login
+            print("\n1. Iniciando processo de login...")
+            iniciar_fase("login")
+            success, message = self.perform_login(username, password)
+            if not success:
+                return False, f"Falha no login: {message}", None
+            
+            # 2-7. Estrutura da turma (mesma coleta do lançamento)
+            mapeamentos, erro = self._coletar_estrutura_turma(codigo_turma, trimestre_referencia)
+            if erro:
+                return False, erro, None
+            
+            # 8. Alunos e notas
+            print("\n8. Coletando alunos e notas...")
+            iniciar_fase("planejamento")
+            alunos = self._obter_lista_alunos(mapa_colunas=mapeamentos["colunas"], trimestre=trimestre_referencia)
+            if not alunos:
+                return False, "Nenhum aluno encontrado na tabela", None
+            
+            # Habilidades conhecidas pelos mapeamentos (usadas se a modal não for lida)
+            habilidades_mapeadas = []
+            normalizadas = set()
+            for av in mapeamentos["colunas"]:
+                for h in mapeamentos["habilidades"].get(av, []):
+                    texto = h["habilidade"]
+                    chave = normalizar_texto(texto)
+                    if chave not in normalizadas:
+                        normalizadas.add(chave)
+                        habilidades_mapeadas.append(texto)
+            
+            viewstate = self.helpers._obter_viewstate_atual() if ler_valores_atuais else None
+            if ler_valores_atuais and not viewstate:
+                print("   ⚠️ ViewState indisponível: plano seguirá sem ler os valores atuais")
+                ler_valores_atuais = False
+            
+            requisicoes_leitura = 0
+            tempo_leitura = 0.0
+            plano_alunos = []
+            total = len(alunos)
+            
+            # Modais de todos os alunos em um lote assíncrono (uma leitura por view)
+            valores_lidos = {}
+            if ler_valores_atuais:
+                estatisticas = {}
+                valores_lidos = self.helpers._ler_modais_alunos_via_http(
+                    [aluno["data_ri"] for aluno in alunos], viewstate, trimestre_referencia,
+                    estatisticas=estatisticas
+                )
+                requisicoes_leitura = estatisticas.get("requisicoes", 0)
+                tempo_leitura = estatisticas.get("tempo_requisicoes", 0.0)
+                print(f"   📥 {len(valores_lidos)}/{total} modais lidas em {estatisticas.get('views', 1)} view(s)")
+            
+            for indice, aluno in enumerate(alunos, 1):
+                verificar_cancelamento()
+                nome = aluno["nome"]
+                aluno_iniciado(indice, total, nome)
+                notas = aluno.get("notas_preview", {})
+                
+                valores = valores_lidos.get(aluno["data_ri"])
+                if ler_valores_atuais and valores is None:
+                    print(f"   ⚠️ Não foi possível ler a modal de {nome}")
+                
+                if valores and valores["habilidades"]:
+                    habilidades_aluno = [(h["habilidade"], h["valor"]) for h in valores["habilidades"]]
+                else:
+                    habilidades_aluno = [(texto, None) for texto in habilidades_mapeadas]
+                
+                habilidades_plano = []
+                for habilidade_texto, valor_atual in habilidades_aluno:
+                    conceito, origem = self._resolver_conceito_habilidade(habilidade_texto, notas, mapeamentos)
+                    if not conceito:
+                        continue
+                    if trocar_c_por_ne and conceito.strip().upper() == "C":
+                        conceito = "NE"
+                    habilidades_plano.append({
+                        "habilidade": habilidade_texto,
+                        "conceito": conceito,
+                        "origem": origem,
+                        "valor_atual": valor_atual,
+                        "ja_correto": None if valor_atual is None else valor_atual == conceito,
+                    })
+                
+                if valores and valores["atitudes"]:
+                    total_atitudes = len(valores["atitudes"])
+                    atitudes_corretas = sum(1 for v in valores["atitudes"].values() if v == atitude_valor)
+                else:
+                    total_atitudes = None
+                    atitudes_corretas = None
+                
+                habilidades_a_gravar = sum(1 for h in habilidades_plano if h["ja_correto"] is not True)
+                atitudes_a_gravar = (total_atitudes - atitudes_corretas) if total_atitudes is not None else None
+                # Abertura da modal (seleção + contentLoad) + um valueChange por campo alterado
+                requisicoes = 2 + habilidades_a_gravar + (atitudes_a_gravar or 0)
+                
+                plano_alunos.append({
+                    "nome": nome,
+                    "data_ri": aluno["data_ri"],
+                    "ja_preenchido": aluno.get("ja_preenchido", False),
+                    "notas": notas,
+                    "atitudes": {
+                        "valor": atitude_valor,
+                        "total": total_atitudes,
+                        "ja_corretas": atitudes_corretas,
+                    },
+                    "habilidades": habilidades_plano,
+                    "requisicoes_estimadas": requisicoes,
+                })
+                aluno_concluido(indice, total, nome, campos_escritos=0)
+                print(f"   📋 {nome}: {len(habilidades_plano)} habilidade(s), {habilidades_a_gravar} a gravar, ~{requisicoes} requisições")
+            
+            total_requisicoes = sum(a["requisicoes_estimadas"] for a in plano_alunos)
+            tempo_medio = tempo_leitura / requisicoes_leitura if requisicoes_leitura else None
+            totais = {
+                "alunos": total,
+                "alunos_ja_preenchidos": sum(1 for a in plano_alunos if a["ja_preenchido"]),
+                "habilidades_planejadas": sum(len(a["habilidades"]) for a in plano_alunos),
+                "habilidades_ja_corretas": sum(1 for a in plano_alunos for h in a["habilidades"] if h["ja_correto"]),
+                "atitudes_planejadas": sum(a["atitudes"]["total"] or 0 for a in plano_alunos),
+                "atitudes_ja_corretas": sum(a["atitudes"]["ja_corretas"] or 0 for a in plano_alunos),
+                "requisicoes_jsf_estimadas": total_requisicoes,
+                "tempo_medio_requisicao": round(tempo_medio, 3) if tempo_medio is not None else None,
+                "tempo_estimado_segundos": round(tempo_medio * total_requisicoes, 1) if tempo_medio is not None else None,
+            }
+            plano = {
+                "codigo_turma": codigo_turma,
+                "trimestre_referencia": trimestre_referencia,
+                "modo": "inteligente",
+                "trocar_c_por_ne": trocar_c_por_ne,
+                "valores_atuais_lidos": ler_valores_atuais,
+                "avaliacoes": list(mapeamentos["colunas"].keys()),
+                "alunos": plano_alunos,
+                "totais": totais,
+            }
+            
+            mensagem = (
+                f"Plano: {total} alunos, {totais['habilidades_planejadas']} habilidades "
+                f"({totais['habilidades_ja_corretas']} já corretas), "
+                f"~{total_requisicoes} requisições JSF"
+            )
+            if totais["tempo_estimado_segundos"] is not None:
+                mensagem += f", ~{totais['tempo_estimado_segundos']:.0f}s estimados"
+            print(f"\n✅ {mensagem}")
+            return True, mensagem, plano
             
         except Exception as e:
-            error_msg = f"Erro ao lançar conceitos inteligentes: {str(e)}"
+            error_msg = f"Erro ao planejar lançamento: {str(e)}"
             print(f"❌ {error_msg}")
-            return False, error_msg
+            return False, error_msg, None
+    
+    def lancar_conceitos_lote(self, username, password, turmas, modo="inteligente"):
+        """
+        Lança conceitos em várias turmas reaproveitando uma única sessão de login
+        
+        Faz login uma vez e, para cada turma, acessa o diário, processa e segue
+        para a próxima. Evita repetir o login (página inicial, redirecionamento
+        WSO2, esperas fixas) e a abertura do navegador a cada turma.
+        
+        Cada turma é processada de forma independente: uma falha é registrada e o
+        lote continua. Se a sessão cair no meio do lote, o login é refeito.
+        
+        Args:
+            username (str): Nome de usuário para login no SGN
+            password (str): Senha do usuário
+            turmas (list[dict]): Turmas com as opções de cada uma. Chaves:
+                codigo_turma (obrigatória), atitude_observada, conceito_habilidade,
+                trimestre_referencia, trocar_c_por_ne, resume
+            modo (str): "inteligente" (baseado nas notas) ou "simples" (mesmo conceito para todos)
+            
+        Returns:
+            tuple: (success: bool, message: str)
+                - success: True se todas as turmas foram processadas com sucesso
+                - message: Resumo por turma
+        """
+        if modo not in ("inteligente", "simples"):
+            return False, f"Modo inválido: {modo}. Use 'inteligente' ou 'simples'"
+        if not turmas:
+            return False, "Nenhuma turma informada para o lote"
+        
+        total = len(turmas)
+        print(f"📚 Lançamento em lote: {total} turma(s) no modo {modo}")
+        
+        # 1. Fazer login uma única vez
+        print("\n1. Iniciando processo de login...")
+        iniciar_fase("login")
+        success, message = self.perform_login(username, password)
+        if not success:
+            return False, f"Falha no login: {message}"
+        
+        resultados = []
+        for indice, turma in enumerate(turmas, start=1):
+            verificar_cancelamento()
+            codigo_turma = str(turma.get("codigo_turma", "")).strip()
+            inicio = time.time()
+            print(f"\n{'=' * 60}")
+            print(f"🏫 Turma {indice}/{total}: {codigo_turma}")
+            print(f"{'=' * 60}")
+            iniciar_fase(f"turma_{codigo_turma}")
+            iniciar_turma()
+            
+            try:
+                if not codigo_turma:
+                    raise ValueError("codigo_turma não informado")
+                
+                atitude_mapeada, conceito_mapeado, trimestre_referencia = self._normalizar_parametros_conceitos(
+                    turma.get("atitude_observada"),
+                    turma.get("conceito_habilidade"),
+                    turma.get("trimestre_referencia") or "TR2",
+                )
+                
+                # Sessão pode expirar em lotes longos: refazer login se necessário
+                logado, _ = self.check_login_status()
+                if not logado:
+                    print("🔐 Sessão perdida, refazendo login...")
+                    success, message = self.perform_login(username, password)
+                    if not success:
+                        raise RuntimeError(f"Falha ao refazer login: {message}")
+                
+                # Caches de contadores/capacidades são da turma anterior
+                self.helpers.limpar_caches_turma()
+                
+                if modo == "inteligente":
+                    trocar_c_por_ne = turma.get("trocar_c_por_ne")
+                    success, message = self._processar_turma_inteligente(
+                        codigo_turma, atitude_mapeada, conceito_mapeado, trimestre_referencia,
+                        True if trocar_c_por_ne is None else trocar_c_por_ne,
+                        bool(turma.get("resume"))
+                    )
+                else:
+                    success, message = self._processar_turma_simples(
+                        codigo_turma, atitude_mapeada, conceito_mapeado, trimestre_referencia,
+                        bool(turma.get("resume"))
+                    )
+            except Exception as e:
+                success, message = False, f"Erro ao processar turma {codigo_turma}: {str(e)}"
+                print(f"❌ {message}")
+            
+            duracao = time.time() - inicio
+            print(f"{'✅' if success else '❌'} Turma {codigo_turma}: {message}")
+            resultados.append((codigo_turma, success, message))
+            emitir_evento(
+                "class_done",
+                codigo_turma=codigo_turma, index=indice, total=total,
+                success=success, message=message, duration=round(duracao, 2)
+            )
+        
+        sucessos = sum(1 for _, ok, _ in resultados if ok)
+        linhas = [f"Lote concluído: {sucessos}/{total} turma(s) com sucesso"]
+        for codigo_turma, ok, msg in resultados:
+            linhas.append(f"{'✅' if ok else '❌'} {codigo_turma}: {msg}")
+        resumo = "\n".join(linhas)
+        print(f"\n📊 {resumo}")
+        return sucessos == total, resumo
     
     def lancar_conceito_inteligente_com_ra(
         self,
@@ -509,6 +863,7 @@ class SGNAutomation:
         atitude_observada=None,
         conceito_habilidade=None,
         trimestre_referencia="TR2",
+        resume=False,
     ):
         """
         🆕 NOVO: Executa o fluxo completo com lançamento INTELIGENTE de conceitos COM CADASTRO DE RA
@@ -529,76 +884,18 @@ class SGNAutomation:
             atitude_observada (str, optional): Opção para observações de atitudes. Padrão: "Raramente"
             conceito_habilidade (str, optional): Conceito padrão (fallback). Padrão: "B"
             trimestre_referencia (str): Trimestre de referência (TR1, TR2 ou TR3)
+            resume (bool): Pular alunos já confirmados no checkpoint de uma execução anterior
                 
         Returns:
             tuple: (success: bool, message: str)
         """
         try:
-            from .models import AtitudeObservada, ConceitoHabilidade
-            
             if not isinstance(username, str) or not isinstance(password, str) or not isinstance(codigo_turma, str):
                 raise TypeError("Parâmetros username, password e codigo_turma devem ser strings")
             
-            if atitude_observada is None:
-                atitude_observada = "Raramente"
-            if conceito_habilidade is None:
-                conceito_habilidade = "B"
-            if trimestre_referencia is None:
-                trimestre_referencia = "TR2"
-
-            if hasattr(trimestre_referencia, "value"):
-                trimestre_referencia = trimestre_referencia.value
-
-            trimestre_referencia = str(trimestre_referencia).strip().upper()
-            valid_trimestres = {"TR1", "TR2", "TR3"}
-            if trimestre_referencia not in valid_trimestres:
-                raise ValueError(
-                    f"Trimestre de referência inválido. Valores aceitos: {', '.join(sorted(valid_trimestres))}"
-                )
-            
-            # Mapear parâmetros para enums
-            def normalize_str(s):
-                import unicodedata
-                return ''.join(c for c in unicodedata.normalize('NFD', str(s).lower()) 
-                            if unicodedata.category(c) != 'Mn')
-            
-            if isinstance(atitude_observada, str):
-                input_normalized = normalize_str(atitude_observada)
-                for a in AtitudeObservada:
-                    if normalize_str(a.value) == input_normalized:
-                        atitude_mapeada = a
-                        break
-                else:
-                    for a in AtitudeObservada:
-                        if input_normalized in normalize_str(a.value) or normalize_str(a.value) in input_normalized:
-                            atitude_mapeada = a
-                            break
-                    else:
-                        raise ValueError(
-                            f"Atitude observada inválida. Valores aceitos: {', '.join(e.value for e in AtitudeObservada)}"
-                        )
-            else:
-                atitude_mapeada = atitude_observada
-            
-            if isinstance(conceito_habilidade, str):
-                conceito_upper = conceito_habilidade.strip().upper()
-                conceito_mapeado = next(
-                    (c for c in ConceitoHabilidade 
-                     if c.value.upper() == conceito_upper),
-                    None
-                )
-                if conceito_mapeado is None:
-                    for c in ConceitoHabilidade:
-                        if c.value.upper() == conceito_upper or \
-                           (len(conceito_upper) == 1 and c.value.upper() == conceito_upper):
-                            conceito_mapeado = c
-                            break
-                    else:
-                        raise ValueError(
-                            f"Conceito de habilidade inválido. Valores aceitos: {', '.join(e.value for e in ConceitoHabilidade if e != ConceitoHabilidade.SELECIONE)}"
-                        )
-            else:
-                conceito_mapeado = conceito_habilidade
+            atitude_mapeada, conceito_mapeado, trimestre_referencia = self._normalizar_parametros_conceitos(
+                atitude_observada, conceito_habilidade, trimestre_referencia
+            )
             
             print(f"🔧 Parâmetros recebidos (MODO INTELIGENTE COM RA):")
             print(f"   - Usuário: {username}")
@@ -611,18 +908,22 @@ class SGNAutomation:
             
             # 1. Fazer login
             print("\n1. Iniciando processo de login...")
+            iniciar_fase("login")
             success, message = self.perform_login(username, password)
             if not success:
                 return False, f"Falha no login: {message}"
             
             # 2. Navegar para o diário
             print("\n2. Navegando para o diário da turma...")
+            iniciar_fase("navegacao")
             diario_url = f"https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html?idDiario={codigo_turma}"
             self.driver.get(diario_url)
+            self.helpers.jsf.invalidar()
             time.sleep(3)
             
             # 3. COLETAR AVALIAÇÕES
             print("\n3. Coletando avaliações cadastradas...")
+            iniciar_fase("coleta_avaliacoes")
             dados_av = self._coletar_avaliacoes_turma()
             
             if not dados_av or len(dados_av) == 0:
@@ -634,6 +935,7 @@ class SGNAutomation:
 
             # 4. Navegar para aba Conceitos
             print("\n4. Navegando para aba Conceitos...")
+            iniciar_fase("navegacao_conceitos")
             try:
                 self._open_conceitos_tab()
             except Exception as e:
@@ -645,7 +947,8 @@ class SGNAutomation:
             
             # 6. Coletar cabeçalhos
             print("\n6. Coletando cabeçalhos da tabela de conceitos...")
-            cabecalhos = self._coletar_configuracao_conceitos()
+            iniciar_fase("coleta_estrutura")
+            cabecalhos = self._coletar_configuracao_conceitos(trimestre_referencia)
             
             # 7. Construir mapeamentos
             mapeamentos = self._construir_mapeamento_avaliacoes(cabecalhos, dados_av, dados_rp)
@@ -666,22 +969,24 @@ class SGNAutomation:
 
             # 8. Lançar conceitos INTELIGENTES COM RA
             print("\n8. Iniciando lançamento INTELIGENTE de conceitos COM RA...")
+            iniciar_fase("lancamento")
             print(f"🔧 Usando valores mapeados:")
             print(f"   - Atitude: {atitude_mapeada}")
             print(f"   - Conceito (fallback): {conceito_mapeado}")
             print(f"   - Modo: MANTÉM C + CADASTRA RA")
             
-            success, message = self._lancar_conceitos_inteligente_com_ra(
-                atitude_observada=atitude_mapeada,
-                conceito_habilidade=conceito_mapeado,
-                trimestre_referencia=trimestre_referencia,
-                mapeamentos_prontos=mapeamentos,
-                inicio_ra=inicio_ra,
-                termino_ra=termino_ra,
-                descricao_ra=descricao_ra,
-                nome_arquivo_ra=nome_arquivo_ra,
-                caminho_arquivo_ra=caminho_arquivo_ra
-            )
+            with checkpoint.journal_checkpoint(codigo_turma, trimestre_referencia, "inteligente_ra", resume):
+                success, message = self._lancar_conceitos_inteligente_com_ra(
+                    atitude_observada=atitude_mapeada,
+                    conceito_habilidade=conceito_mapeado,
+                    trimestre_referencia=trimestre_referencia,
+                    mapeamentos_prontos=mapeamentos,
+                    inicio_ra=inicio_ra,
+                    termino_ra=termino_ra,
+                    descricao_ra=descricao_ra,
+                    nome_arquivo_ra=nome_arquivo_ra,
+                    caminho_arquivo_ra=caminho_arquivo_ra
+                )
             
             return success, message
             
@@ -813,6 +1118,7 @@ class SGNAutomation:
             diario_url = f"https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html?idDiario={codigo_turma}"
             print(f"   Navegando para: {diario_url}")
             self.driver.get(diario_url)
+            self.helpers.jsf.invalidar()
             time.sleep(3)  # Reduzido de 5 para 3 segundos
             
             # Tentar abrir a aba de Conceitos
@@ -849,6 +1155,7 @@ class SGNAutomation:
             try:
                 print(f"   Tentativa {i}: {url}")
                 self.driver.get(url)
+                self.helpers.jsf.invalidar()
                 time.sleep(2)  # Reduzido de 5 para 2 segundos
                 
                 # Verifica se a página carregou
@@ -1051,6 +1358,7 @@ class SGNAutomation:
         """
         print("4. Navegando para buscar diário...")
         self.driver.get("https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe-consulta.html")
+        self.helpers.jsf.invalidar()
         time.sleep(1)  # Reduzido de 3 para 1 segundo (página intermediária)
     
     def _access_class_diary(self, codigo_turma):
@@ -1078,6 +1386,7 @@ class SGNAutomation:
             try:
                 print(f"   🔄 Tentativa {tentativa}/{max_tentativas} de abrir o diário...")
                 self.driver.get(diario_url)
+                self.helpers.jsf.invalidar()
                 time.sleep(3)  # Aguardar carregamento da página
 
                 if self._pagina_erro_diario_detectada():
@@ -1300,6 +1609,20 @@ class SGNAutomation:
         
         raise Exception("Não foi possível encontrar a aba de Conceitos com nenhum seletor")
     
+    def _reabrir_aba_conceitos(self, trimestre_referencia=None):
+        """
+        Reabre a aba de Conceitos e o trimestre após a página do diário ser recarregada
+        
+        Usado pelos helpers depois de renovar a sessão, para o ViewState do
+        navegador voltar ao estado em que o lançamento foi iniciado.
+        
+        Args:
+            trimestre_referencia (str, optional): Trimestre (TR1, TR2, TR3)
+        """
+        self._open_conceitos_tab()
+        if trimestre_referencia:
+            self._selecionar_trimestre_referencia(trimestre_referencia)
+    
     def close_browser(self):
         """
         Fecha o navegador de forma segura
@@ -1522,6 +1845,7 @@ class SGNAutomation:
             # Fallback: navegar diretamente para a home
             try:
                 self.driver.get("https://sgn.sesisenai.org.br/pages/common/home.html")
+                self.helpers.jsf.invalidar()
                 WebDriverWait(self.driver, 10).until(
                     EC.url_contains("/pages/common/home.html")
                 )
@@ -1564,6 +1888,7 @@ class SGNAutomation:
             # Fallback: navegar diretamente para a home
             try:
                 self.driver.get("https://sgn.sesisenai.org.br/pages/common/home.html")
+                self.helpers.jsf.invalidar()
                 WebDriverWait(self.driver, 10).until(
                     EC.url_contains("/pages/common/home.html")
                 )
@@ -1626,7 +1951,8 @@ class SGNAutomation:
                 lista_alunos=alunos,
                 atitude_valor=atitude_observada,
                 conceito_valor=conceito_habilidade,
-                timeout=30  # Timeout aumentado para servidor lento
+                timeout=30,  # Timeout aumentado para servidor lento
+                trimestre=trimestre_referencia  # Permite abrir views extras do diário em paralelo
             )
             
             # 3. CALCULAR ESTATÍSTICAS FINAIS
@@ -1689,7 +2015,7 @@ class SGNAutomation:
                 # IMPORTANTE: Coletar cabeçalhos DEPOIS de selecionar o trimestre
                 # (os cabeçalhos mudam conforme o trimestre selecionado)
                 print("   🔍 Coletando cabeçalhos da tabela de conceitos...")
-                cabecalhos = self._coletar_configuracao_conceitos()
+                cabecalhos = self._coletar_configuracao_conceitos(trimestre_referencia)
                 print(f"   ✓ Cabeçalhos coletados: {cabecalhos['identificadores']}")
                 
                 dados_av = self._coletar_avaliacoes_turma()
@@ -1719,13 +2045,24 @@ class SGNAutomation:
 
             alunos_processados = 0
             alunos_com_erro = 0
+            alunos_retomados = 0
 
             conceito_padrao = getattr(conceito_habilidade, "value", str(conceito_habilidade))
             atitude_padrao = getattr(atitude_observada, "value", str(atitude_observada))
 
             for indice, aluno_info in enumerate(alunos, 1):
+                verificar_cancelamento()
                 try:
                     print(f"\n   👤 Processando aluno {indice}/{total_alunos}: {aluno_info['nome']}")
+                    aluno_iniciado(indice, total_alunos, aluno_info['nome'])
+
+                    if checkpoint.aluno_confirmado(aluno_info['nome']):
+                        print(f"   ⏭️ {aluno_info['nome']} já confirmado no checkpoint, pulando")
+                        alunos_processados += 1
+                        alunos_retomados += 1
+                        aluno_concluido(indice, total_alunos, aluno_info['nome'], campos_escritos=0)
+                        continue
+                    checkpoint.iniciar_aluno(aluno_info['nome'])
 
                     # 1️⃣ COLETAR NOTAS DA TABELA PRINCIPAL (ANTES de abrir a modal)
                     notas = self._coletar_notas_aluno(aluno_info, mapeamentos["colunas"])
@@ -1735,10 +2072,15 @@ class SGNAutomation:
                     if not self._acessar_aba_notas_aluno(aluno_info):
                         print(f"   ❌ Não foi possível abrir a modal de notas de {aluno_info['nome']}")
                         alunos_com_erro += 1
+                        aluno_concluido(indice, total_alunos, aluno_info['nome'], sucesso=False)
+                        checkpoint.confirmar_aluno(aluno_info['nome'], sucesso=False)
                         continue
 
                     # 3️⃣ PREENCHER ATITUDES
-                    if not self._preencher_observacoes_atitudes(atitude_padrao):
+                    atitudes_ok = self._preencher_observacoes_atitudes(atitude_padrao)
+                    if atitudes_ok:
+                        checkpoint.registrar_campo("atitudes", atitude_padrao)
+                    else:
                         print(f"   ⚠️ Observações de atitudes não preenchidas para {aluno_info['nome']}")
 
                     # 4️⃣ PREENCHER HABILIDADES BASEADO NAS NOTAS (respeita trocar_c_por_ne)
@@ -1754,8 +2096,16 @@ class SGNAutomation:
                     if not preencheu_ok:
                         print(f"   ⚠️ Conceitos de habilidades não atualizados para {aluno_info['nome']}")
 
-                    print(f"   ✅ Conceitos aplicados para {aluno_info['nome']} (salvamento automático)")
-                    alunos_processados += 1
+                    # Só confirma no journal o aluno cujas atitudes e habilidades foram gravadas;
+                    # os demais ficam pendentes e são refeitos na retomada
+                    sucesso_aluno = preencheu_ok and atitudes_ok
+                    if sucesso_aluno:
+                        print(f"   ✅ Conceitos aplicados para {aluno_info['nome']} (salvamento automático)")
+                        alunos_processados += 1
+                    else:
+                        alunos_com_erro += 1
+                    aluno_concluido(indice, total_alunos, aluno_info['nome'], sucesso=sucesso_aluno)
+                    checkpoint.confirmar_aluno(aluno_info['nome'], sucesso=sucesso_aluno)
                     
                     self._fechar_modal_conceitos()
                     print("")
@@ -1765,6 +2115,8 @@ class SGNAutomation:
                     import traceback
                     traceback.print_exc()
                     alunos_com_erro += 1
+                    aluno_concluido(indice, total_alunos, aluno_info.get('nome', 'desconhecido'), sucesso=False)
+                    checkpoint.confirmar_aluno(aluno_info.get('nome', 'desconhecido'), sucesso=False)
                     try:
                         self._fechar_modal_conceitos()
                     except Exception:
@@ -1773,6 +2125,8 @@ class SGNAutomation:
             mensagem = f"Processados: {alunos_processados}/{total_alunos} alunos"
             if alunos_com_erro:
                 mensagem += f", {alunos_com_erro} com erro"
+            if alunos_retomados:
+                mensagem += f", {alunos_retomados} retomado(s) do checkpoint"
 
             print(f"\n✅ Lançamento concluído: {mensagem}")
             return alunos_processados > 0, mensagem
@@ -1812,7 +2166,7 @@ class SGNAutomation:
                 print("   ✓ Usando mapeamentos já coletados")
             else:
                 print("   🔍 Coletando configuração de avaliações...")
-                cabecalhos = self._coletar_configuracao_conceitos()
+                cabecalhos = self._coletar_configuracao_conceitos(trimestre_referencia)
                 print(f"   ✓ Cabeçalhos coletados: {cabecalhos['identificadores']}")
                 
                 dados_av = self._coletar_avaliacoes_turma()
@@ -1839,14 +2193,25 @@ class SGNAutomation:
 
             alunos_processados = 0
             alunos_com_erro = 0
+            alunos_retomados = 0
             total_ras_cadastradas = 0
 
             conceito_padrao = getattr(conceito_habilidade, "value", str(conceito_habilidade))
             atitude_padrao = getattr(atitude_observada, "value", str(atitude_observada))
 
             for indice, aluno_info in enumerate(alunos, 1):
+                verificar_cancelamento()
                 try:
                     print(f"\n   👤 Processando aluno {indice}/{total_alunos}: {aluno_info['nome']}")
+                    aluno_iniciado(indice, total_alunos, aluno_info['nome'])
+
+                    if checkpoint.aluno_confirmado(aluno_info['nome']):
+                        print(f"   ⏭️ {aluno_info['nome']} já confirmado no checkpoint, pulando")
+                        alunos_processados += 1
+                        alunos_retomados += 1
+                        aluno_concluido(indice, total_alunos, aluno_info['nome'], campos_escritos=0)
+                        continue
+                    checkpoint.iniciar_aluno(aluno_info['nome'])
 
                     # 1️⃣ COLETAR NOTAS DA TABELA PRINCIPAL
                     notas = self._coletar_notas_aluno(aluno_info, mapeamentos["colunas"])
@@ -1856,14 +2221,20 @@ class SGNAutomation:
                     if not self._acessar_aba_notas_aluno(aluno_info):
                         print(f"   ❌ Não foi possível abrir a modal de notas de {aluno_info['nome']}")
                         alunos_com_erro += 1
+                        aluno_concluido(indice, total_alunos, aluno_info['nome'], sucesso=False)
+                        checkpoint.confirmar_aluno(aluno_info['nome'], sucesso=False)
                         continue
 
                     # 3️⃣ PREENCHER ATITUDES
-                    if not self._preencher_observacoes_atitudes(atitude_padrao):
+                    atitudes_ok = self._preencher_observacoes_atitudes(atitude_padrao)
+                    if atitudes_ok:
+                        checkpoint.registrar_campo("atitudes", atitude_padrao)
+                    else:
                         print(f"   ⚠️ Observações de atitudes não preenchidas para {aluno_info['nome']}")
 
                     # 4️⃣ PREENCHER HABILIDADES BASEADO NAS NOTAS (MANTENDO C)
                     habilidades_com_c = self._preencher_conceitos_habilidades_por_notas_mantendo_c(notas, mapeamentos)
+                    preencheu_ok = True
                     
                     # 5️⃣ SE TEM HABILIDADES COM C, CADASTRAR RA
                     if habilidades_com_c and len(habilidades_com_c) > 0:
@@ -1881,9 +2252,20 @@ class SGNAutomation:
                         
                         total_ras_cadastradas += ras_cadastradas
                         print(f"   ✅ {ras_cadastradas} RA(s) cadastrada(s) para {aluno_info['nome']}")
-
-                    print(f"   ✅ Conceitos aplicados para {aluno_info['nome']} (salvamento automático)")
-                    alunos_processados += 1
+                        if ras_cadastradas < len(habilidades_com_c):
+                            print(f"   ⚠️ RA não cadastrada para todas as habilidades de {aluno_info['nome']}")
+                            preencheu_ok = False
+
+                    # Só confirma no journal o aluno cujas atitudes, habilidades e RAs foram gravadas;
+                    # os demais ficam pendentes e são refeitos na retomada
+                    sucesso_aluno = preencheu_ok and atitudes_ok
+                    if sucesso_aluno:
+                        print(f"   ✅ Conceitos aplicados para {aluno_info['nome']} (salvamento automático)")
+                        alunos_processados += 1
+                    else:
+                        alunos_com_erro += 1
+                    aluno_concluido(indice, total_alunos, aluno_info['nome'], sucesso=sucesso_aluno)
+                    checkpoint.confirmar_aluno(aluno_info['nome'], sucesso=sucesso_aluno)
                     
                     self._fechar_modal_conceitos()
                     print("")
@@ -1893,6 +2275,8 @@ class SGNAutomation:
                     import traceback
                     traceback.print_exc()
                     alunos_com_erro += 1
+                    aluno_concluido(indice, total_alunos, aluno_info.get('nome', 'desconhecido'), sucesso=False)
+                    checkpoint.confirmar_aluno(aluno_info.get('nome', 'desconhecido'), sucesso=False)
                     try:
                         self._fechar_modal_conceitos()
                     except Exception:
@@ -1901,6 +2285,8 @@ class SGNAutomation:
             mensagem = f"Processados: {alunos_processados}/{total_alunos} alunos, {total_ras_cadastradas} RA(s) cadastrada(s)"
             if alunos_com_erro:
                 mensagem += f", {alunos_com_erro} com erro"
+            if alunos_retomados:
+                mensagem += f", {alunos_retomados} retomado(s) do checkpoint"
 
             print(f"\n✅ Lançamento concluído: {mensagem}")
             return alunos_processados > 0, mensagem
@@ -1973,15 +2359,20 @@ class SGNAutomation:
                             
                             # Se mapa_colunas foi fornecido, coletar notas
                             if mapa_colunas:
-                                print(f"   🔄 DEBUG: Coletando notas para {aluno['nome'][:20]}...")
-                                notas_start = time.time()
-                                
-                                notas_preview = self._coletar_notas_preview_sgn(aluno["data_ri"], mapa_colunas)
+                                if aluno.get("notas_colunas"):
+                                    # Notas já vieram na resposta do mediasConceito
+                                    aluno_info["notas_colunas"] = aluno["notas_colunas"]
+                                    notas_preview = self._notas_da_matriz(aluno["notas_colunas"], mapa_colunas)
+                                else:
+                                    print(f"   🔄 DEBUG: Coletando notas para {aluno['nome'][:20]}...")
+                                    notas_start = time.time()
+                                    
+                                    notas_preview = self._coletar_notas_preview_sgn(aluno["data_ri"], mapa_colunas)
+                                    
+                                    notas_elapsed = time.time() - notas_start
+                                    print(f"   ⏱️ DEBUG: Coleta de notas levou {notas_elapsed:.2f}s")
                                 aluno_info["notas_preview"] = notas_preview
                                 
-                                notas_elapsed = time.time() - notas_start
-                                print(f"   ⏱️ DEBUG: Coleta de notas levou {notas_elapsed:.2f}s")
-                                
                                 # Formatar notas para exibição
                                 notas_str = ", ".join([f"{k}={v if v else '∅'}" for k, v in notas_preview.items()])
                                 print(f"     👤 Aluno {aluno['linha']}: {aluno['nome']} → {notas_str}")
@@ -2185,6 +2576,43 @@ class SGNAutomation:
         print(f"        📋 DEBUG: notas finais = {notas}")
         return notas
     
+    def _notas_da_matriz(self, notas_colunas, mapa_colunas):
+        """
+        Notas de um aluno a partir da linha da matriz de conceitos (sem WebDriver)
+        
+        Args:
+            notas_colunas (dict): {coluna: {"valor": str, "desabilitado": bool}}
+            mapa_colunas: Mapeamento de colunas
+        
+        Returns:
+            dict: Notas do aluno {identificador: valor} ("" se vazia ou bloqueada)
+        """
+        notas = {}
+        for ident, idx in sorted(mapa_colunas.items(), key=lambda x: x[1]):
+            celula = notas_colunas.get(idx)
+            notas[ident] = celula["valor"] if celula else ""
+        return notas
+    
+    def _coletar_notas_aluno(self, aluno_info, mapa_colunas):
+        """
+        Notas de um aluno na tabela principal, da fonte mais barata disponível
+        
+        Usa o preview já montado na lista de alunos ou a linha da matriz de
+        conceitos; só consulta o navegador quando nenhum dos dois existe.
+        
+        Args:
+            aluno_info (dict): Informações do aluno (de _obter_lista_alunos)
+            mapa_colunas: Mapeamento de colunas
+        
+        Returns:
+            dict: Notas do aluno {identificador: valor}
+        """
+        if "notas_preview" in aluno_info:
+            return aluno_info["notas_preview"]
+        if aluno_info.get("notas_colunas"):
+            return self._notas_da_matriz(aluno_info["notas_colunas"], mapa_colunas)
+        return self._coletar_notas_preview_sgn(aluno_info["data_ri"], mapa_colunas)
+    
     def _coletar_notas_preview_sgn(self, data_ri, mapa_colunas):
         """
         Versão aprimorada para coletar notas baseada na estrutura HTML real do SGN
@@ -2318,9 +2746,8 @@ class SGNAutomation:
             # Usar contadores globais (todos os alunos têm a mesma quantidade)
             max_atitudes, _ = self.helpers._get_contadores_globais()
             
-            # OTIMIZAÇÃO 1: Processar em lotes menores com timeout reduzido (evitar erro 500)
+            # OTIMIZAÇÃO 1: Processar em lotes com timeout reduzido (evitar erro 500)
             atitudes_processadas = 0
-            lote_size = 10  # Lotes menores para evitar sobrecarregar servidor
             timeout_reduzido = 8  # Timeout um pouco maior para dar tempo ao servidor
             
             # OTIMIZAÇÃO 2: Pré-validar se atitudes já estão preenchidas (usando cache global)
@@ -2332,11 +2759,16 @@ class SGNAutomation:
                 return True
             
             # OTIMIZAÇÃO 3: Processar apenas as pendentes em lotes PARALELOS
-            for lote_inicio in range(0, len(atitudes_pendentes), lote_size):
+            lote_inicio = 0
+            numero_lote = 0
+            while lote_inicio < len(atitudes_pendentes):
+                # Tamanho do lote acompanha o limite adaptativo de concorrência
+                lote_size = max(10, self.helpers.concorrencia.limite * 5)
                 lote_fim = min(lote_inicio + lote_size, len(atitudes_pendentes))
                 lote_indices = atitudes_pendentes[lote_inicio:lote_fim]
+                numero_lote += 1
                 
-                print(f"   🧵 Processando lote {lote_inicio//lote_size + 1} PARALELO: {len(lote_indices)} atitudes pendentes")
+                print(f"   🧵 Processando lote {numero_lote} PARALELO: {len(lote_indices)} atitudes pendentes")
                 
                 # OTIMIZAÇÃO 4: Processar lote em PARALELO com threads (modo conservador)
                 sucessos_lote, falhas_lote = self.helpers._lancar_lote_atitudes_paralelo(
@@ -2344,7 +2776,7 @@ class SGNAutomation:
                 )
                 
                 atitudes_processadas += sucessos_lote
-                print(f"   📊 Lote {lote_inicio//lote_size + 1}: {sucessos_lote} sucessos, {falhas_lote} falhas")
+                print(f"   📊 Lote {numero_lote}: {sucessos_lote} sucessos, {falhas_lote} falhas")
                 
                 # Se muitas falhas (>70%), verificar se é problema de sessão
                 if falhas_lote > 0 and (falhas_lote / len(lote_indices)) > 0.7:
@@ -2355,18 +2787,20 @@ class SGNAutomation:
                         print(f"   ✅ Sessão renovada, continuando processamento")
                     else:
                         print(f"   ❌ Não foi possível renovar sessão, forçando renovação de cache")
-                        # Forçar renovação de cache para próximo lote
-                        self.helpers._get_cached_request_data(force_refresh=True)
+                        # Forçar nova cópia de cookies/URL para o próximo lote
+                        self.helpers.jsf.sincronizar(forcar=True)
                 
                 # OTIMIZAÇÃO 5: Renovar ViewState apenas entre lotes
                 if lote_fim < len(atitudes_pendentes):
                     viewstate_novo = self.helpers._obter_viewstate_atual()
                     if viewstate_novo:
                         viewstate = viewstate_novo
-                        print(f"   🔄 ViewState renovado após lote {lote_inicio//lote_size + 1}")
+                        print(f"   🔄 ViewState renovado após lote {numero_lote}")
                     
                     # Pausa mínima entre lotes
                     time.sleep(0.1)  # Pausa ainda menor
+                
+                lote_inicio = lote_fim
             
             if atitudes_processadas > 0:
                 print(f"   ✅ {atitudes_processadas} atitudes preenchidas com sucesso")
@@ -2597,11 +3031,13 @@ class SGNAutomation:
                         
                         # OTIMIZAÇÃO: Processar conceitos em PARALELO com retry
                         max_tentativas = 3
-                        lote_size_conceitos = 10  # Lotes menores para conceitos
                         
                         for tentativa in range(max_tentativas):
                             if not conceitos_pendentes_data_ri:
                                 break
+                            
+                            # Lotes acompanham o limite adaptativo de concorrência
+                            lote_size_conceitos = max(10, self.helpers.concorrencia.limite * 5)
                                 
                             print(f"       🔄 Tentativa {tentativa + 1}/{max_tentativas}: {len(conceitos_pendentes_data_ri)} conceitos pendentes")
                             
@@ -3006,19 +3442,41 @@ class SGNAutomation:
     # NOVOS MÉTODOS - Sistema Inteligente de Lançamento de Conceitos
     # ============================================================================
     
-    def _coletar_configuracao_conceitos(self):
+    def _coletar_configuracao_conceitos(self, trimestre=None):
         """
         Retorna informações dos cabeçalhos da tabela de conceitos (AV1, RP1, etc.)
         
+        Lê os cabeçalhos da resposta do mediasConceito (a mesma que a lista de
+        alunos usa em seguida); percorre o DOM pelo Selenium só se ela falhar.
+        
         Estrutura HTML:
         <th id="...avaliacoes:0" aria-label="AV1">
             <span class="ui-column-title">
                 <span title="06/08/2025 - Avaliação 03...">AV1</span>
             </span>
         </th>
+        
+        Args:
+            trimestre (str, optional): Trimestre da requisição HTTP (TR1, TR2, TR3)
         """
         resultado = {"identificadores": [], "tooltip": {}}
 
+        if hasattr(self, 'helpers') and self.helpers:
+            cabecalhos = self.helpers._obter_cabecalhos_via_requisicao(trimestre=trimestre or "TR1")
+            for cabecalho in cabecalhos:
+                identificador = cabecalho["identificador"]
+                # Filtrar apenas AV* e RP*
+                if not identificador.startswith(("AV", "RP")):
+                    continue
+                resultado["identificadores"].append(identificador)
+                info = self._extrair_info_tooltip(cabecalho["tooltip"]) if cabecalho["tooltip"] else {}
+                resultado["tooltip"][identificador] = info
+                print(f"        ✓ {identificador}: {info.get('titulo') or '(sem tooltip)'}")
+            if resultado["identificadores"]:
+                print(f"     ✅ Encontrados {len(resultado['identificadores'])} cabeçalhos: {resultado['identificadores']}")
+                return resultado
+            print("     ⚠️ Cabeçalhos não lidos via HTTP, usando o navegador...")
+
         try:
             # Buscar TODOS os <th> que têm aria-label começando com AV ou RP
             base_head_xpath = "//thead[@id='tabViewDiarioClasse:formAbaConceitos:dataTableConceitos_head']/tr/th[@aria-label]"
@@ -3342,6 +3800,7 @@ class SGNAutomation:
         habilidades = {}  # {identificador: [habilidades]} (tanto cabeçalho quanto original)
         av_original_para_cabecalho = {}  # {AV4: AV1, AV5: AV2}
         avaliacoes_sem_habilidade = []  # lista de identificadores (cabeçalho) sem habilidades
+        avaliacoes_mapeadas = []  # [(av_info, identificador_cabecalho)]
         
         for av_info in dados_avaliacoes:
             ident_original = av_info["identificador"]
@@ -3368,23 +3827,38 @@ class SGNAutomation:
                 colunas[ident_cabecalho_match] = idx_coluna
                 av_original_para_cabecalho[ident_original] = ident_cabecalho_match
                 print(f"   ✓ Match: {ident_original} ({titulo_av}) → {ident_cabecalho_match} (coluna {idx_coluna})")
-                
-                # SEMPRE coletar habilidades
-                habilidades_coletadas = self._coletar_habilidades_modal(av_info)
-                # Armazenar tanto pelo identificador do cabeçalho (ex.: AV1) quanto pelo original (ex.: AV4)
-                habilidades[ident_cabecalho_match] = habilidades_coletadas
-                habilidades[ident_original] = habilidades_coletadas
-                
-                # AVISO: Se não há habilidades, o conceito padrão será usado
-                if not habilidades_coletadas or len(habilidades_coletadas) == 0:
-                    print(f"   ❌ {ident_original} não tem habilidades vinculadas")
-                    # Registrar a coluna efetiva (cabeçalho) como sem habilidades
-                    if ident_cabecalho_match not in avaliacoes_sem_habilidade:
-                        avaliacoes_sem_habilidade.append(ident_cabecalho_match)
+                avaliacoes_mapeadas.append((av_info, ident_cabecalho_match))
             else:
                 print(f"   ⚠️ {ident_original} ({data_av} - {titulo_av}) não encontrado nos cabeçalhos (trimestre diferente)")
                 continue
         
+        # Carregar as modais das avaliações mapeadas em um único lote HTTP
+        try:
+            modais_http = self._http_fetch_modais_conteudo(
+                [str(av_info.get("data_ri")) for av_info, _ in avaliacoes_mapeadas]
+            )
+        except Exception as e_lote:
+            print(f"   ⚠️ Falha no lote HTTP de modais: {str(e_lote)[:120]}")
+            modais_http = {}
+        
+        for av_info, ident_cabecalho_match in avaliacoes_mapeadas:
+            ident_original = av_info["identificador"]
+            
+            # SEMPRE coletar habilidades
+            habilidades_coletadas = self._coletar_habilidades_modal(
+                av_info, modais_http.get(str(av_info.get("data_ri")))
+            )
+            # Armazenar tanto pelo identificador do cabeçalho (ex.: AV1) quanto pelo original (ex.: AV4)
+            habilidades[ident_cabecalho_match] = habilidades_coletadas
+            habilidades[ident_original] = habilidades_coletadas
+            
+            # AVISO: Se não há habilidades, o conceito padrão será usado
+            if not habilidades_coletadas or len(habilidades_coletadas) == 0:
+                print(f"   ❌ {ident_original} não tem habilidades vinculadas")
+                # Registrar a coluna efetiva (cabeçalho) como sem habilidades
+                if ident_cabecalho_match not in avaliacoes_sem_habilidade:
+                    avaliacoes_sem_habilidade.append(ident_cabecalho_match)
+        
         # Mapear recuperações para cabeçalhos
         recuperacao_por_av = {}  # {identificador_cabecalho_av: identificador_cabecalho_rp}
         
@@ -3453,6 +3927,9 @@ class SGNAutomation:
         total_habilidades = sum(len(h) for h in habilidades.values())
         print(f"     ✓ Mapeamento: {len(colunas)} colunas, {len(habilidades)} avaliações, {total_habilidades} habilidades vinculadas")
         
+        # Índice habilidade → avaliações (uma vez por turma, usado por todos os alunos)
+        resultado["indice_habilidades"] = self._indexar_habilidades(resultado)
+        
         # Voltar para aba Conceitos
         try:
             print("     🔙 Voltando para aba Conceitos...")
@@ -3506,9 +3983,10 @@ class SGNAutomation:
         print(f"✅ Total: {len(dados_av)} avaliações | {sum(len(h) for h in mapeamentos['habilidades'].values())} habilidades vinculadas")
         print("="*80 + "\n")
 
-    def _coletar_habilidades_modal(self, avaliacao_info):
+    def _coletar_habilidades_modal(self, avaliacao_info, modal_html=None):
         """
         Abre a modal da avaliação e extrai as habilidades configuradas
+        (modal_html: conteúdo já carregado pelo lote HTTP, se houver)
         FLUXO:
         1. Clicar no lápis (ação) da linha específica
         2. Aguardar modal carregar (AJAX do PrimeFaces)
@@ -3529,7 +4007,8 @@ class SGNAutomation:
 
             # TENTAR CAMINHO HTTP (JSF partial/ajax) PRIMEIRO
             try:
-                modal_html = self._http_fetch_modal_conteudo(str(data_ri))
+                if not modal_html:
+                    modal_html = self._http_fetch_modal_conteudo(str(data_ri))
                 if modal_html:
                     print("       🌐 Modal carregada via HTTP (partial/ajax)")
                     habilidades_http = self._parse_habilidades_from_modal_html(modal_html)
@@ -3752,98 +4231,88 @@ class SGNAutomation:
 
         return habilidades
 
-    def _build_requests_session(self):
-        """Monta uma requests.Session com os cookies do Selenium."""
-        sess = requests.Session()
-        try:
-            ua = self.driver.execute_script("return navigator.userAgent;")
-        except Exception:
-            ua = "Mozilla/5.0"
-        sess.headers.update({
-            "User-Agent": ua,
-            "Accept": "application/xml, text/xml, */*; q=0.01",
-            "X-Requested-With": "XMLHttpRequest",
-            "Faces-Request": "partial/ajax",
-            "Origin": "https://sgn.sesisenai.org.br",
-            "Referer": self.driver.current_url,
-        })
-        for c in (self.driver.get_cookies() or []):
-            try:
-                sess.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
-            except Exception:
-                continue
-        return sess
-
-    def _extract_view_state(self) -> str:
-        """Extrai o javax.faces.ViewState da página atual aberta no Selenium."""
-        try:
-            # Tentativas comuns de localização
-            candidates = [
-                "//input[@name='javax.faces.ViewState']",
-                "//input[contains(@name,'javax.faces.ViewState')]",
-                "//input[contains(@id,'javax.faces.ViewState')]",
-            ]
-            for xp in candidates:
-                els = self.driver.find_elements(By.XPATH, xp)
-                if els:
-                    val = els[0].get_attribute("value") or ""
-                    if val:
-                        return val
-        except Exception:
-            pass
-        return ""
+    def _payloads_modal_avaliacao(self, data_ri: str, view: str) -> list:
+        """
+        Payloads das duas requisições JSF partial/ajax que abrem a modal de
+        avaliação (clique no lápis) e carregam o seu conteúdo.
+        """
+        jsf = self.helpers.jsf
+        source_id = (
+            f"tabViewDiarioClasse:formAbaAulasAvaliacoes:panelAvaliacao:avaliacoesDataTable:{data_ri}:aulasAvaliacao"
+        )
+        return [
+            # 1) Abrir a modal (clique no lápis)
+            jsf.montar_payload(
+                source_id,
+                render="modalAvaliacao",
+                values={source_id: source_id},
+                viewstate=view,
+            ),
+            # 2) Carregar conteúdo da modal
+            jsf.montar_payload(
+                "modalAvaliacao",
+                values={"modalAvaliacao": "modalAvaliacao", "modalAvaliacao_contentLoad": "true"},
+                viewstate=view,
+            ),
+        ]
 
     def _http_fetch_modal_conteudo(self, data_ri: str) -> str | None:
         """
         Executa as duas requisições JSF partial/ajax para abrir e carregar a modal
         de avaliação e retorna o HTML da modal (conteúdo) como string.
         """
-        view = self._extract_view_state()
+        view = self.helpers._obter_viewstate_atual()
         if not view:
             raise RuntimeError("ViewState não encontrado para requisição HTTP")
 
-        sess = self._build_requests_session()
-        # URL base da página do diário (sem query)
-        base_url = self.driver.current_url.split("?", 1)[0]
+        # Sessão HTTP do job (keep-alive), com cookies/URL da página do diário
+        jsf = self.helpers.jsf
+        jsf.sincronizar()
 
-        # 1) Abrir a modal (clique no lápis)
-        source_id = (
-            f"tabViewDiarioClasse:formAbaAulasAvaliacoes:panelAvaliacao:avaliacoesDataTable:{data_ri}:aulasAvaliacao"
+        r2 = None
+        for dados in self._payloads_modal_avaliacao(data_ri, view):
+            r2 = jsf.post(dados)
+            r2.raise_for_status()
+
+        return self._extrair_conteudo_modal_avaliacao(r2.text or "")
+
+    def _http_fetch_modais_conteudo(self, data_ris: list) -> dict:
+        """
+        Carrega as modais de várias avaliações em um lote assíncrono.
+
+        A modal depende da avaliação selecionada na view, então cada leitura
+        usa uma view própria: além da view do navegador, o lote abre views
+        extras do diário (até SGN_VIEWS_POR_SESSAO) e lê uma modal por view ao
+        mesmo tempo, dentro do limite do controle de concorrência do job.
+
+        Returns:
+            dict: {data_ri: html da modal} apenas das modais carregadas
+        """
+        view = self.helpers._obter_viewstate_atual()
+        if not view or not data_ris:
+            return {}
+
+        sequencias = [self._payloads_modal_avaliacao(str(d), view) for d in data_ris]
+        resultados = executar_leituras(
+            self.helpers.jsf, sequencias, view,
+            views_extras=self.helpers._quantidade_views(len(data_ris)) - 1,
+            concorrencia=self.helpers.concorrencia,
         )
-        data1 = {
-            "javax.faces.partial.ajax": "true",
-            "javax.faces.source": source_id,
-            "javax.faces.partial.execute": source_id,
-            "javax.faces.partial.render": "modalAvaliacao",
-            source_id: source_id,
-            "javax.faces.ViewState": view,
-        }
-        r1 = sess.post(base_url, data=data1)
-        r1.raise_for_status()
-
-        # 2) Carregar conteúdo da modal
-        data2 = {
-            "javax.faces.partial.ajax": "true",
-            "javax.faces.source": "modalAvaliacao",
-            "javax.faces.partial.execute": "modalAvaliacao",
-            "javax.faces.partial.render": "modalAvaliacao",
-            "modalAvaliacao": "modalAvaliacao",
-            "modalAvaliacao_contentLoad": "true",
-            "javax.faces.ViewState": view,
-        }
-        r2 = sess.post(base_url, data=data2)
-        r2.raise_for_status()
 
+        modais = {}
+        for data_ri, resultado in zip(data_ris, resultados):
+            if isinstance(resultado, Exception):
+                print(f"       ⚠️ Modal da avaliação {data_ri} não carregada via HTTP: {str(resultado)[:80]}")
+                continue
+            conteudo = self._extrair_conteudo_modal_avaliacao(resultado[-1] or "")
+            if conteudo:
+                modais[str(data_ri)] = conteudo
+        return modais
+
+    def _extrair_conteudo_modal_avaliacao(self, text: str) -> str | None:
+        """Extrai o HTML da modal de avaliação da resposta do contentLoad."""
         # A resposta é um XML <partial-response> com <update id="modalAvaliacao"><![CDATA[...]]></update>
-        text = r2.text or ""
-        try:
-            # Extração simples via regex para o CDATA do update de modalAvaliacao
-            m = re.search(r"<update id=\"modalAvaliacao\"><!\[CDATA\[(.*?)\]\]>\</update>", text, re.S)
-            if m:
-                return m.group(1)
-        except Exception:
-            pass
-        return None
+        return analisar_resposta(text).conteudo("modalAvaliacao")
 
     def _parse_habilidades_from_modal_html(self, modal_html: str):
         """Extrai a lista de habilidades do HTML da modal retornado via HTTP."""
@@ -4178,31 +4647,8 @@ class SGNAutomation:
                     print(f"       ⚠️ Erro ao ler linha {idx}: {e}")
                     continue
 
-                conceito = ""
-                av_utilizada = None
-                
                 # Procurar em qual avaliação esta habilidade está vinculada
-                for av, habilidades_av in mapeamentos["habilidades"].items():
-                    for h in habilidades_av:
-                        hab_coletada = h["habilidade"].lstrip("*").strip()
-                        hab_modal = habilidade_texto.lstrip("*").strip()
-                        if self._texto_corresponde(hab_modal, hab_coletada):
-                            # REGRA: SEMPRE priorizar RP se existir
-                            recuperacao = mapeamentos["recuperacao_por_avaliacao"].get(av)
-                            conceito_rec = notas_aluno.get(recuperacao, "") if recuperacao else ""
-                            conceito_av = notas_aluno.get(av, "")
-                            
-                            if conceito_rec:
-                                conceito = conceito_rec
-                                av_utilizada = recuperacao
-                                print(f"       🔄 USANDO RP! Habilidade de {av} → Aplicando nota da {recuperacao}: '{conceito_rec}'")
-                            elif conceito_av:
-                                conceito = conceito_av
-                                av_utilizada = av
-
-                            break
-                    if av_utilizada:
-                        break
+                conceito, av_utilizada = self._resolver_conceito_habilidade(habilidade_texto, notas_aluno, mapeamentos)
 
                 # Se encontrou conceito, adicionar à lista
                 if av_utilizada and conceito:
@@ -4219,6 +4665,7 @@ class SGNAutomation:
             print(f"     🔧 Aplicando {len(habilidades_para_preencher)} conceitos...")
             
             for data_ri, habilidade_texto, conceito in habilidades_para_preencher:
+                verificar_cancelamento()
                 try:
                     # Construir o ID do select
                     select_id = f"formAtitudes:panelAtitudes:dataTableHabilidades:{data_ri}:notaConceito_input"
@@ -4308,7 +4755,9 @@ class SGNAutomation:
                             else:
                                 raise e_tentativa
                     
-                    if not sucesso:
+                    if sucesso:
+                        checkpoint.registrar_campo(habilidade_texto, conceito)
+                    else:
                         print(f"          ❌ Não foi possível aplicar conceito após {max_tentativas} tentativas")
                         
                 except Exception as e:
@@ -4324,18 +4773,78 @@ class SGNAutomation:
 
         return preenchidos > 0
 
+    def _resolver_conceito_habilidade(self, habilidade_texto, notas_aluno, mapeamentos):
+        """
+        Determina o conceito de uma habilidade a partir das notas do aluno
+        
+        Procura a avaliação à qual a habilidade está vinculada e usa a nota da
+        recuperação paralela (RP) quando existir; senão, a nota da avaliação.
+        Regra compartilhada entre o lançamento e o plano (dry-run).
+        
+        Args:
+            habilidade_texto (str): Texto da habilidade (como aparece na modal)
+            notas_aluno (dict): Notas do aluno por identificador ({"AV1": "B", "RP1": "A"})
+            mapeamentos (dict): Resultado de _construir_mapeamento_avaliacoes()
+            
+        Returns:
+            tuple: (conceito: str, av_utilizada: str | None)
+        """
+        indice = mapeamentos.get("indice_habilidades")
+        if indice is None:
+            # Mapeamentos montados fora de _construir_mapeamento_avaliacoes
+            indice = mapeamentos["indice_habilidades"] = self._indexar_habilidades(mapeamentos)
+        
+        for av, recuperacao in indice.get(normalizar_texto(habilidade_texto.lstrip("*")), ()):
+            # REGRA: SEMPRE priorizar RP se existir
+            conceito_rec = notas_aluno.get(recuperacao, "") if recuperacao else ""
+            conceito_av = notas_aluno.get(av, "")
+            
+            if conceito_rec:
+                print(f"       🔄 USANDO RP! Habilidade de {av} → Aplicando nota da {recuperacao}: '{conceito_rec}'")
+                return conceito_rec, recuperacao
+            if conceito_av:
+                return conceito_av, av
+        return "", None
+
+    def _indexar_habilidades(self, mapeamentos):
+        """
+        Índice das habilidades vinculadas às avaliações da turma
+        
+        Cada texto de habilidade é normalizado uma única vez; depois, resolver a
+        habilidade de uma linha da modal é uma consulta ao dicionário. Cada
+        avaliação aparece uma vez por habilidade, mesmo guardada sob duas chaves
+        (identificador do cabeçalho e original, ex: AV1 e AV4).
+        
+        Args:
+            mapeamentos (dict): Resultado de _construir_mapeamento_avaliacoes()
+            
+        Returns:
+            dict: {habilidade_normalizada: [(avaliacao, recuperacao | None)]}
+                  na ordem das avaliações em mapeamentos["habilidades"]
+        """
+        recuperacoes = mapeamentos.get("recuperacao_por_avaliacao", {})
+        indice = {}
+        listas_indexadas = set()
+        for av, habilidades_av in mapeamentos["habilidades"].items():
+            # A mesma lista sob o identificador original: o cabeçalho (primeiro) já cobre
+            if id(habilidades_av) in listas_indexadas:
+                continue
+            listas_indexadas.add(id(habilidades_av))
+            vistas = set()
+            for h in habilidades_av:
+                chave = normalizar_texto(h["habilidade"].lstrip("*"))
+                # Só a primeira ocorrência da habilidade na avaliação decide
+                if chave in vistas:
+                    continue
+                vistas.add(chave)
+                indice.setdefault(chave, []).append((av, recuperacoes.get(av)))
+        return indice
+
     def _texto_corresponde(self, texto_alvo, texto_fonte):
         """
         Compara duas strings ignorando acentos, espaços extras e caixa
         """
-        def normalizar(valor):
-            if not valor:
-                return ""
-            valor = unicodedata.normalize("NFD", valor)
-            valor = "".join(c for c in valor if unicodedata.category(c) != "Mn")
-            return re.sub(r"\s+", " ", valor).strip().lower()
-
-        return normalizar(texto_alvo) == normalizar(texto_fonte)
+        return normalizar_texto(texto_alvo) == normalizar_texto(texto_fonte)
 
     def _fechar_modal_senha_chrome(self):
         """
@@ -4452,31 +4961,8 @@ class SGNAutomation:
                     print(f"       ⚠️ Erro ao ler linha {idx}: {e}")
                     continue
 
-                conceito = ""
-                av_utilizada = None
-                
                 # Procurar em qual avaliação esta habilidade está vinculada
-                for av, habilidades_av in mapeamentos["habilidades"].items():
-                    for h in habilidades_av:
-                        hab_coletada = h["habilidade"].lstrip("*").strip()
-                        hab_modal = habilidade_texto.lstrip("*").strip()
-                        if self._texto_corresponde(hab_modal, hab_coletada):
-                            # REGRA: SEMPRE priorizar RP se existir
-                            recuperacao = mapeamentos["recuperacao_por_avaliacao"].get(av)
-                            conceito_rec = notas_aluno.get(recuperacao, "") if recuperacao else ""
-                            conceito_av = notas_aluno.get(av, "")
-                            
-                            if conceito_rec:
-                                conceito = conceito_rec
-                                av_utilizada = recuperacao
-                                print(f"       🔄 USANDO RP! Habilidade de {av} → Aplicando nota da {recuperacao}: '{conceito_rec}'")
-                            elif conceito_av:
-                                conceito = conceito_av
-                                av_utilizada = av
-
-                            break
-                    if av_utilizada:
-                        break
+                conceito, av_utilizada = self._resolver_conceito_habilidade(habilidade_texto, notas_aluno, mapeamentos)
 
                 # Se encontrou conceito, adicionar à lista
                 if av_utilizada and conceito:
@@ -4492,6 +4978,7 @@ class SGNAutomation:
             print(f"     🔧 Aplicando {len(habilidades_para_preencher)} conceitos...")
             
             for data_ri, habilidade_texto, conceito in habilidades_para_preencher:
+                verificar_cancelamento()
                 try:
                     # Construir o ID do select
                     select_id = f"formAtitudes:panelAtitudes:dataTableHabilidades:{data_ri}:notaConceito_input"
@@ -4561,7 +5048,9 @@ class SGNAutomation:
                             else:
                                 raise e_tentativa
                     
-                    if not sucesso:
+                    if sucesso:
+                        checkpoint.registrar_campo(habilidade_texto, conceito)
+                    else:
                         print(f"          ❌ Não foi possível aplicar conceito após {max_tentativas} tentativas")
                         
                 except Exception as e:
@@ -4606,6 +5095,7 @@ class SGNAutomation:
             print(f"     🎓 Cadastrando RA para {len(habilidades_com_c)} habilidade(s)...")
             
             for idx, (data_ri, habilidade_texto) in enumerate(habilidades_com_c):
+                verificar_cancelamento()
                 try:
                     print(f"       📝 Cadastrando RA {idx+1}/{len(habilidades_com_c)}: {habilidade_texto[:60]}...")
                     
@@ -4966,6 +5456,7 @@ class SGNAutomation:
             print(f"   ✓ Encontrados {total_alunos} alunos")
             
             for idx, aluno_info in enumerate(alunos, 1):
+                verificar_cancelamento()
                 try:
                     nome_completo = aluno_info['nome']
                     nome_limpo = self._limpar_nome_aluno(nome_completo)
@@ -5138,17 +5629,21 @@ class SGNAutomation:
             
             # 1. Fazer login
             print("\n1. Realizando login...")
+            iniciar_fase("login")
             success, message = self.perform_login(username, password)
             if not success:
                 return False, message
             
             # 2. Navegar para o diário da turma
             print(f"\n2. Navegando para o diário da turma {codigo_turma}...")
+            iniciar_fase("navegacao")
             self.driver.get(f"https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html?idDiario={codigo_turma}")
+            self.helpers.jsf.invalidar()
             time.sleep(3)
             
             # 3. Abrir aba de Conceitos
             print("\n3. Navegando para aba Conceitos...")
+            iniciar_fase("navegacao_conceitos")
             try:
                 self._open_conceitos_tab()
             except Exception as e:
@@ -5160,6 +5655,7 @@ class SGNAutomation:
             
             # 5. Coletar conceitos de todos os alunos
             print("\n5. Coletando conceitos de todos os alunos...")
+            iniciar_fase("coleta_conceitos")
             alunos_conceitos = self._coletar_conceitos_alunos(trimestre_referencia)
             
             if not alunos_conceitos:
@@ -5174,6 +5670,7 @@ class SGNAutomation:
             
             # 7. Lançar pareceres para cada aluno
             print("\n7. Lançando pareceres...")
+            iniciar_fase("lancamento_pareceres")
             pareceres_lancados = 0
             total_alunos = len(alunos_conceitos)
             
@@ -5244,12 +5741,15 @@ class SGNAutomation:
                 print(f"      {i}. '{nome}'")
             
             for idx, (nome_aluno, conceito_moda) in enumerate(alunos_conceitos.items(), 1):
+                verificar_cancelamento()
                 try:
                     print(f"\n   [{idx}/{total_alunos}] {nome_aluno} (Conceito: {conceito_moda})")
+                    aluno_iniciado(idx, total_alunos, nome_aluno)
                     
                     # Verificar se o aluno está no dropdown
                     if nome_aluno not in alunos_dropdown:
                         print(f"      ⚠️ Aluno não está nesta disciplina")
+                        aluno_concluido(idx, total_alunos, nome_aluno, campos_escritos=0)
                         continue
                     
                     # Selecionar aluno usando JavaScript (mais confiável)
@@ -5296,6 +5796,7 @@ class SGNAutomation:
                     indice_trimestre = trimestre_para_indice.get(tr_label)
                     if indice_trimestre is None:
                         print(f"      ⚠️ Trimestre inválido para parecer: {trimestre_referencia}")
+                        aluno_concluido(idx, total_alunos, nome_aluno, sucesso=False)
                         continue
 
                     # 3) Gerar parecer
@@ -5379,11 +5880,14 @@ class SGNAutomation:
                         print(f"      ✅ Parecer salvo para {nome_aluno} ({tr_label})")
 
                         pareceres_lancados += 1
+                        aluno_concluido(idx, total_alunos, nome_aluno, campos_escritos=1)
                     except Exception as e_p:
                         print(f"      ❌ Erro ao preencher/salvar parecer: {str(e_p)[:120]}")
+                        aluno_concluido(idx, total_alunos, nome_aluno, sucesso=False)
                     
                 except Exception as e:
                     print(f"      ❌ Erro: {str(e)[:80]}")
+                    aluno_concluido(idx, total_alunos, nome_aluno, sucesso=False)
                     continue
             
             # Mensagem final
@@ -9,11 +9,39 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from lxml import etree, html as lxml_html
+import os
 import time
 import requests
 import threading
 import concurrent.futures
 from queue import Queue
+from .log_capture import submeter_com_contexto
+from .progress import aluno_iniciado, aluno_concluido, registrar_campos_escritos
+from . import checkpoint
+from .cancellation import verificar_cancelamento
+from .jsf_client import JsfClient, extrair_viewstate, indica_sobrecarga, valores_select
+from .jsf_async import executar_leituras
+from .modal_parser import ler_cabecalhos_conceitos, ler_matriz_conceitos, ler_modal_conceitos, ler_selects
+from .partial_response import analisar_resposta
+from .concurrency import CircuitoAberto, ControladorAIMD
+
+# Linhas da tabela de conceitos da turma e links de cada linha
+_XP_LINHAS_CONCEITOS = etree.XPath(".//tbody[contains(@id, 'dataTableConceitos_data')]/tr[@data-ri]")
+_XP_NOME_ALUNO = etree.XPath(".//a[contains(@id, 'linkNomeEstudanteAbaConceitos')]")
+_XP_BOTAO_ATITUDES = etree.XPath(".//a[contains(@id, 'linkEditarAtitudes')]")
+
+# Campos (selects da modal) enviados por requisição na escrita em lote
+TAMANHO_LOTE_CAMPOS = 30
+
+# Valor do select mediasConceito para cada trimestre
+VALORES_TRIMESTRE = {'TR1': '1', 'TR2': '2', 'TR3': '3'}
+
+# Views do diário abertas ao mesmo tempo na sessão (a do navegador + extras)
+VIEWS_POR_SESSAO = 4
+
+# Renovações de sessão tentadas pelo lançamento HTTP puro antes de desistir
+MAX_RENOVACOES_SESSAO = 2
 
 
 class SGNAutomationHelpers:
@@ -22,14 +50,28 @@ class SGNAutomationHelpers:
     def __init__(self, selenium_manager):
         self.selenium_manager = selenium_manager
         self.driver = None
-        # Cache para otimização de performance
-        self._cached_cookies = None
-        self._cached_headers = None
-        self._cached_url = None
-        self._cache_timestamp = 0
-        # Rate limiting para evitar erro 500
-        self._last_request_time = 0
-        self._min_request_interval = 0.5  # 500ms entre requisições
+        # Cliente partial/ajax do job (sessão HTTP keep-alive reaproveitada e
+        # ViewState acompanhado pelas respostas)
+        self.jsf = JsfClient(self._get_driver, self._ler_viewstate_dom)
+        # Limite adaptativo (AIMD) de requisições simultâneas ao SGN
+        self.concorrencia = ControladorAIMD()
+        # Renovação de sessão: uma thread por vez navega no Selenium; a geração
+        # conta as renovações, para quem detectou a expiração antes não repetir
+        self._lock_renovacao = threading.Lock()
+        self._geracao_sessao = 0
+        # Sinalizado por _fazer_requisicao_ajax quando o SGN indica sessão/view
+        # expirada; o coordenador do lançamento HTTP puro renova a sessão
+        self._sessao_expirada = threading.Event()
+        # URL do diário da turma (com idDiario) para onde a renovação volta, e
+        # callable(trimestre) que reabre a aba Conceitos e o trimestre no
+        # navegador; definido pela SGNAutomation
+        self._url_diario = None
+        self.reabrir_aba_conceitos = None
+        # Escrita em lote na modal: None = ainda não verificada no servidor,
+        # True = confirmada, False = rejeitada (usa gravação campo a campo).
+        # A verificação é feita por uma faixa de cada vez (lock)
+        self._escrita_em_lote = None
+        self._lock_escrita_em_lote = threading.Lock()
         # Cache global de contadores (todos os alunos têm a mesma quantidade)
         self._cache_total_atitudes = None
         self._cache_total_conceitos = None
@@ -37,6 +79,25 @@ class SGNAutomationHelpers:
         # Cache de estrutura de capacidades (todos alunos têm a mesma estrutura)
         self._cache_capacidades_expandidas = False
         self._cache_estrutura_capacidades = None
+        # Última resposta do mediasConceito (trimestre, XML): lida pelos
+        # cabeçalhos e consumida pela lista de alunos, sem um segundo POST
+        self._cache_tabela_conceitos = None
+    
+    def limpar_caches_turma(self):
+        """
+        Descarta os caches que dependem da turma aberta
+        
+        Usado no lançamento em lote: a sessão (login) é reaproveitada, mas
+        contadores, estrutura de capacidades e URL/cookies do formulário mudam
+        de um diário para outro.
+        """
+        self.jsf.invalidar()
+        self._cache_total_atitudes = None
+        self._cache_total_conceitos = None
+        self._cache_contadores_timestamp = 0
+        self._cache_capacidades_expandidas = False
+        self._cache_estrutura_capacidades = None
+        self._cache_tabela_conceitos = None
     
     def _get_driver(self):
         """Obtém o driver atual"""
@@ -44,42 +105,6 @@ class SGNAutomationHelpers:
             self.driver = self.selenium_manager.get_driver()
         return self.driver
     
-    def _get_cached_request_data(self, force_refresh=False):
-        """
-        Obtém dados de requisição em cache (cookies, headers, URL) para otimizar performance
-        
-        Args:
-            force_refresh (bool): Forçar atualização do cache
-            
-        Returns:
-            tuple: (cookies, headers, url)
-        """
-        current_time = time.time()
-        
-        # Cache válido por 30 segundos
-        if (not force_refresh and 
-            self._cached_cookies and 
-            self._cached_headers and 
-            self._cached_url and 
-            current_time - self._cache_timestamp < 30):
-            return self._cached_cookies, self._cached_headers, self._cached_url
-        
-        # Atualizar cache
-        driver = self._get_driver()
-        
-        self._cached_cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
-        self._cached_url = driver.current_url.split('?')[0]
-        self._cached_headers = {
-            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-            'X-Requested-With': 'XMLHttpRequest',
-            'Faces-Request': 'partial/ajax',
-            'User-Agent': driver.execute_script("return navigator.userAgent;"),
-            'Referer': driver.current_url
-        }
-        self._cache_timestamp = current_time
-        
-        return self._cached_cookies, self._cached_headers, self._cached_url
-    
     def _get_contadores_globais(self, force_refresh=False):
         """
         Obtém contadores globais de atitudes e conceitos (cache por sessão)
@@ -262,18 +287,17 @@ class SGNAutomationHelpers:
             print(f"   ❌ Erro ao expandir capacidades: {e}")
             return False
     
-    def _rate_limit_request(self):
+    def _resposta_indica_sobrecarga(self, response):
         """
-        Implementa rate limiting para evitar sobrecarregar o servidor SGN
-        """
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
+        Indica se a resposta é sinal de sobrecarga do SGN (reduz a concorrência)
         
-        if time_since_last_request < self._min_request_interval:
-            sleep_time = self._min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self._last_request_time = time.time()
+        Args:
+            response (requests.Response): Resposta HTTP
+            
+        Returns:
+            bool: True para HTTP != 200, redirect para /errors/500.html ou sessão expirada
+        """
+        return indica_sobrecarga(response)
     
     def _detectar_sessao_expirada(self, response_text):
         """
@@ -285,57 +309,80 @@ class SGNAutomationHelpers:
         Returns:
             bool: True se sessão expirou, False caso contrário
         """
-        indicadores_sessao_expirada = [
-            'Oops! Ocorreu um erro ao carregar essa página',
-            'logic:notAuthenticated',
-            'login.html',
-            'autenticacao',
-            'session expired',
-            'sessão expirou',
-            'redirect url="/login.html"',
-            'redirect url="/errors/403.html"'
-        ]
-        
-        response_lower = response_text.lower()
-        for indicador in indicadores_sessao_expirada:
-            if indicador.lower() in response_lower:
-                return True
-        
-        return False
+        return analisar_resposta(response_text).sessao_expirada
     
-    def _tentar_renovar_sessao(self):
+    def _tentar_renovar_sessao(self, geracao=None):
         """
         Tenta renovar a sessão navegando para a página principal
         
+        Várias threads podem detectar a mesma expiração: só uma navega por vez,
+        e quem chega depois de uma renovação concluída reaproveita o resultado.
+        
+        Args:
+            geracao (int, optional): Geração da sessão (self._geracao_sessao) lida
+                                     antes da requisição que detectou a expiração.
+                                     Padrão: a geração atual
+        
         Returns:
-            bool: True se conseguiu renovar, False caso contrário
+            bool: True se conseguiu renovar (ou outra thread já renovou), False caso contrário
         """
-        try:
-            print("   🔄 Tentando renovar sessão...")
-            driver = self._get_driver()
-            
-            # Navegar para página principal do SGN
-            driver.get("https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html")
-            
-            # Aguardar carregamento
-            time.sleep(3)
-            
-            # Verificar se conseguiu acessar
-            current_url = driver.current_url
-            if "diario-classe.html" in current_url and "login" not in current_url:
-                print("   ✅ Sessão renovada com sucesso")
-                # Limpar cache para forçar atualização
-                self._cached_cookies = None
-                self._cached_headers = None
-                self._cached_url = None
+        if geracao is None:
+            geracao = self._geracao_sessao
+        
+        with self._lock_renovacao:
+            if self._geracao_sessao != geracao:
+                print("   ✅ Sessão já renovada por outra thread")
                 return True
-            else:
-                print(f"   ❌ Falha ao renovar sessão - URL atual: {current_url}")
-                return False
+            
+            try:
+                print("   🔄 Tentando renovar sessão...")
+                driver = self._get_driver()
                 
-        except Exception as e:
-            print(f"   ❌ Erro ao tentar renovar sessão: {e}")
-            return False
+                # Voltar ao diário da turma: sem o idDiario o SGN abre o diário
+                # vazio e as views reabertas não têm a tabela de conceitos
+                url_diario = self._lembrar_url_diario(driver)
+                driver.get(url_diario or "https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html")
+                # Página recarregada: cookies/URL e ViewState do cliente HTTP ficam obsoletos
+                self.jsf.invalidar()
+                
+                # Aguardar carregamento
+                time.sleep(3)
+                
+                # Verificar se conseguiu acessar
+                current_url = driver.current_url
+                if "diario-classe.html" in current_url and "login" not in current_url:
+                    self._geracao_sessao += 1
+                    print("   ✅ Sessão renovada com sucesso")
+                    return True
+                else:
+                    print(f"   ❌ Falha ao renovar sessão - URL atual: {current_url}")
+                    return False
+                    
+            except Exception as e:
+                print(f"   ❌ Erro ao tentar renovar sessão: {e}")
+                return False
+    
+    def _lembrar_url_diario(self, driver):
+        """
+        Guarda a URL do diário da turma aberto (com idDiario)
+        
+        Procura no navegador e na última sincronização do cliente HTTP; se a
+        página atual já não é o diário (ex.: login), mantém a última conhecida.
+        
+        Returns:
+            str: URL do diário da turma, ou None se nenhuma foi vista
+        """
+        candidatas = []
+        try:
+            candidatas.append(driver.current_url)
+        except Exception:
+            pass
+        candidatas.append(self.jsf.url_pagina)
+        for url in candidatas:
+            if url and "diario-classe.html" in url and "idDiario=" in url:
+                self._url_diario = url
+                break
+        return self._url_diario
     
     def _validar_elementos_conceitos(self):
         """
@@ -1143,88 +1190,31 @@ class SGNAutomationHelpers:
             print(f"      ⚠️ Erro ao fechar modal: {str(e)}")
             return False
     
-    def _mapear_colunas_avaliacoes_sgn(self):
+    def _mapear_colunas_avaliacoes_sgn(self, trimestre="TR1"):
         """
         Mapeia as colunas de avaliações baseado na estrutura HTML real do SGN
         
+        Lê os cabeçalhos da resposta do mediasConceito (sem percorrer o DOM).
+        
+        Args:
+            trimestre: Trimestre a selecionar (TR1, TR2, TR3) - padrão TR1
+        
         Returns:
             dict: Mapeamento {identificador: índice_coluna}
         """
         print("   🔍 Mapeando colunas de avaliações SGN...")
         
-        try:
-            driver = self._get_driver()
-            
-            # Aguardar cabeçalho da tabela carregar
-            time.sleep(2)
-            
-            # Seletores para o cabeçalho da tabela
-            seletores_header = [
-                "#tabViewDiarioClasse\\:formAbaConceitos\\:dataTableConceitos_head tr",
-                ".ui-datatable-scrollable-header thead tr",
-                "thead tr"
-            ]
-            
-            header_row = None
-            for seletor in seletores_header:
-                try:
-                    header_row = driver.find_element(By.CSS_SELECTOR, seletor)
-                    print(f"   ✅ Cabeçalho encontrado: {seletor}")
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not header_row:
-                print("   ❌ Cabeçalho da tabela não encontrado")
-                return {}
-            
-            # Obter todas as colunas do cabeçalho
-            colunas_th = header_row.find_elements(By.TAG_NAME, "th")
-            print(f"   📊 {len(colunas_th)} colunas encontradas no cabeçalho")
-            
-            mapeamento = {}
-            
-            for i, th in enumerate(colunas_th):
-                try:
-                    # Obter texto da coluna
-                    texto_coluna = th.text.strip()
-                    
-                    # Obter span com title para mais informações
-                    try:
-                        span_title = th.find_element(By.CSS_SELECTOR, "span[title]")
-                        title_info = span_title.get_attribute("title")
-                        print(f"      Coluna {i+1}: '{texto_coluna}' - {title_info}")
-                    except NoSuchElementException:
-                        print(f"      Coluna {i+1}: '{texto_coluna}'")
-                    
-                    # Mapear baseado no texto da coluna
-                    if texto_coluna in ["AV1", "AV2", "AV3", "AV4", "AV5"]:
-                        # Índice relativo (descontando as primeiras 3 colunas: número, ação, estudante)
-                        indice_relativo = i - 3
-                        mapeamento[texto_coluna] = indice_relativo
-                        print(f"         → Mapeado: {texto_coluna} = índice {indice_relativo}")
-                    
-                    elif texto_coluna.startswith("RP"):  # RP1, RP2, etc.
-                        indice_relativo = i - 3
-                        mapeamento[texto_coluna] = indice_relativo
-                        print(f"         → Mapeado: {texto_coluna} = índice {indice_relativo}")
-                    
-                    elif texto_coluna in ["CF", "SA", "SM"]:
-                        # Conceito Final, Situação Atual, Situação Matrícula
-                        indice_relativo = i - 3
-                        mapeamento[texto_coluna] = indice_relativo
-                        print(f"         → Mapeado: {texto_coluna} = índice {indice_relativo}")
-                
-                except Exception as e:
-                    print(f"      ⚠️ Erro ao processar coluna {i+1}: {e}")
-                    continue
-            
-            print(f"   ✅ Mapeamento concluído: {mapeamento}")
-            return mapeamento
-            
-        except Exception as e:
-            print(f"   ❌ Erro ao mapear colunas SGN: {e}")
-            return {}
+        mapeamento = {}
+        for cabecalho in self._obter_cabecalhos_via_requisicao(trimestre):
+            identificador = cabecalho["identificador"]
+            # AV*, RP* e CF/SA/SM (Conceito Final, Situação Atual, Situação Matrícula)
+            if identificador.startswith(("AV", "RP")) or identificador in ["CF", "SA", "SM"]:
+                mapeamento[identificador] = cabecalho["coluna"]
+                detalhe = f" - {cabecalho['tooltip']}" if cabecalho["tooltip"] else ""
+                print(f"      → Mapeado: {identificador} = índice {cabecalho['coluna']}{detalhe}")
+        
+        print(f"   ✅ Mapeamento concluído: {mapeamento}")
+        return mapeamento
     
     def _atualizar_tabela_conceitos_ajax(self):
         """
@@ -1396,99 +1386,117 @@ class SGNAutomationHelpers:
             print(f"   ❌ Erro ao aguardar carregamento: {e}")
             return False
     
-    def _obter_lista_alunos_via_requisicao(self, trimestre="TR1"):
+    def _carregar_tabela_conceitos(self, trimestre="TR1", reaproveitar=False):
         """
-        Obtém lista de alunos fazendo requisição HTTP direta ao servidor
+        Baixa a tabela de conceitos da turma (cabeçalhos + alunos + notas)
         
         Baseado no HAR capturado: a requisição correta é selecionar o trimestre
         no dropdown mediasConceito, que retorna a tabela com os alunos.
         
         Args:
             trimestre: Trimestre a selecionar (TR1, TR2, TR3) - padrão TR1
+            reaproveitar (bool): Consumir a resposta guardada pela leitura dos
+                                 cabeçalhos, se for do mesmo trimestre
         
         Returns:
-            list: Lista de dicionários com informações dos alunos
+            str: XML da resposta partial, ou None se a requisição falhar
         """
-        print("   🌐 Obtendo lista de alunos via requisição HTTP...")
+        trimestre = (trimestre or "TR1").upper()
+        cache = self._cache_tabela_conceitos
+        self._cache_tabela_conceitos = None
+        if reaproveitar and cache and cache[0] == trimestre:
+            print(f"   ♻️ Reaproveitando tabela de conceitos já baixada ({len(cache[1])} bytes)")
+            return cache[1]
         
+        driver = self._get_driver()
+        
+        # Obter ViewState
         try:
-            driver = self._get_driver()
-            
-            # Obter cookies e headers necessários
-            cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
-            
-            # Obter ViewState
-            try:
-                viewstate_input = driver.find_element(By.NAME, "javax.faces.ViewState")
-                viewstate = viewstate_input.get_attribute("value")
-                print(f"   📋 ViewState: {viewstate[:50]}...")
-            except NoSuchElementException:
-                print("   ❌ ViewState não encontrado")
+            viewstate_input = driver.find_element(By.NAME, "javax.faces.ViewState")
+            viewstate = viewstate_input.get_attribute("value")
+            print(f"   📋 ViewState: {viewstate[:50]}...")
+        except NoSuchElementException:
+            print("   ❌ ViewState não encontrado")
+            return None
+        
+        # Mapear trimestre para valor do select (1=TR1, 2=TR2, 3=TR3)
+        trimestre_valor = VALORES_TRIMESTRE.get(trimestre, '1')
+        
+        # Payload CORRETO baseado no HAR capturado:
+        # A requisição é selecionar o trimestre no dropdown mediasConceito
+        # Isso retorna a tabela completa com os alunos
+        element_id = "tabViewDiarioClasse:formAbaConceitos:mediasConceito"
+        
+        print(f"   🚀 Fazendo requisição AJAX (selecionando {trimestre})...")
+        
+        # Página do diário acabou de ser aberta no navegador: copiar cookies/URL
+        self.jsf.sincronizar(forcar=True)
+        response = self.jsf.post_partial(
+            element_id,
+            render='tabViewDiarioClasse:formAbaConceitos:tabelaConceitos tabViewDiarioClasse:formAbaConceitos:panelAvisoMediaReferenciaSemHabilidadesOuAtitudes',
+            values=valores_select(element_id, trimestre_valor),
+            viewstate=viewstate,
+            evento='valueChange',
+            timeout=30
+        )
+        
+        if response.status_code != 200:
+            print(f"   ❌ Erro na requisição: {response.status_code}")
+            return None
+        
+        print(f"   ✅ Requisição bem-sucedida ({len(response.text)} bytes)")
+        return response.text
+    
+    def _obter_cabecalhos_via_requisicao(self, trimestre="TR1"):
+        """
+        Lê os cabeçalhos da tabela de conceitos na resposta do mediasConceito
+        
+        A resposta fica guardada para a lista de alunos logo em seguida
+        (_obter_lista_alunos_via_requisicao), que não precisa repetir o POST.
+        
+        Args:
+            trimestre: Trimestre a selecionar (TR1, TR2, TR3) - padrão TR1
+        
+        Returns:
+            list: [{"identificador", "coluna", "tooltip"}] (vazia se falhar)
+        """
+        print("   🌐 Obtendo cabeçalhos da tabela de conceitos via requisição HTTP...")
+        
+        try:
+            xml_content = self._carregar_tabela_conceitos(trimestre)
+            if not xml_content:
                 return []
             
-            # Preparar dados da requisição baseados nas requisições capturadas
-            url = driver.current_url
-            if "?" in url:
-                url = url.split("?")[0]
-            
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Faces-Request': 'partial/ajax',
-                'User-Agent': driver.execute_script("return navigator.userAgent;"),
-                'Referer': driver.current_url,
-                'Origin': 'https://sgn.sesisenai.org.br'
-            }
-            
-            # Mapear trimestre para valor do select (1=TR1, 2=TR2, 3=TR3)
-            trimestre_map = {'TR1': '1', 'TR2': '2', 'TR3': '3'}
-            trimestre_valor = trimestre_map.get(trimestre.upper(), '1')
-            
-            # Payload CORRETO baseado no HAR capturado:
-            # A requisição é selecionar o trimestre no dropdown mediasConceito
-            # Isso retorna a tabela completa com os alunos
-            element_id = "tabViewDiarioClasse:formAbaConceitos:mediasConceito"
-            
-            post_data = {
-                'javax.faces.partial.ajax': 'true',
-                'javax.faces.source': element_id,
-                'javax.faces.partial.execute': element_id,
-                'javax.faces.partial.render': 'tabViewDiarioClasse:formAbaConceitos:tabelaConceitos tabViewDiarioClasse:formAbaConceitos:panelAvisoMediaReferenciaSemHabilidadesOuAtitudes',
-                'javax.faces.behavior.event': 'valueChange',
-                'javax.faces.partial.event': 'change',
-                f'{element_id}_focus': '',
-                f'{element_id}_input': trimestre_valor,
-                'javax.faces.ViewState': viewstate
-            }
-            
-            print(f"   🚀 Fazendo requisição AJAX (selecionando {trimestre})...")
-            
-            # Fazer requisição usando requests
-            import requests
-            from urllib.parse import urlencode
-            
-            session = requests.Session()
-            
-            # Adicionar cookies
-            for name, value in cookies.items():
-                session.cookies.set(name, value)
-            
-            # Fazer POST
-            response = session.post(
-                url,
-                data=urlencode(post_data),
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                print(f"   ✅ Requisição bem-sucedida ({len(response.text)} bytes)")
+            cabecalhos = ler_cabecalhos_conceitos(xml_content)
+            if cabecalhos:
+                self._cache_tabela_conceitos = ((trimestre or "TR1").upper(), xml_content)
+            return cabecalhos
                 
-                # Extrair dados do XML retornado
-                return self._extrair_alunos_do_xml(response.text)
-            else:
-                print(f"   ❌ Erro na requisição: {response.status_code}")
+        except Exception as e:
+            print(f"   ❌ Erro na requisição HTTP: {e}")
+            return []
+    
+    def _obter_lista_alunos_via_requisicao(self, trimestre="TR1"):
+        """
+        Obtém lista de alunos fazendo requisição HTTP direta ao servidor
+        
+        Reaproveita a resposta baixada pela leitura dos cabeçalhos, se houver.
+        
+        Args:
+            trimestre: Trimestre a selecionar (TR1, TR2, TR3) - padrão TR1
+        
+        Returns:
+            list: Lista de dicionários com informações dos alunos
+        """
+        print("   🌐 Obtendo lista de alunos via requisição HTTP...")
+        
+        try:
+            xml_content = self._carregar_tabela_conceitos(trimestre, reaproveitar=True)
+            if not xml_content:
                 return []
+            
+            # Extrair dados do XML retornado
+            return self._extrair_alunos_do_xml(xml_content)
                 
         except Exception as e:
             print(f"   ❌ Erro na requisição HTTP: {e}")
@@ -1509,88 +1517,97 @@ class SGNAutomationHelpers:
         print("   🔍 Extraindo dados dos alunos do XML...")
         
         try:
-            import re
+            resposta = analisar_resposta(xml_content)
             
-            # Debug: mostrar início do XML recebido
-            print(f"   🔍 DEBUG: XML recebido ({len(xml_content)} chars): {xml_content[:200]}...")
+            # Debug: mostrar o que veio na resposta
+            print(f"   🔍 DEBUG: XML recebido ({len(xml_content)} chars), updates: {list(resposta.updates)}")
             
             # VERIFICAR SE É ERRO 500 DO SERVIDOR
-            if 'redirect url="/errors/500.html"' in xml_content:
+            if resposta.erro_servidor:
                 print("   🚨 ERRO 500 DETECTADO: Servidor SGN com problema interno!")
                 print("   ⚠️ Retornando lista vazia para forçar fallback para Selenium")
                 return []
             
             # VERIFICAR SE É OUTRO TIPO DE ERRO
-            if '<redirect url=' in xml_content and 'error' in xml_content.lower():
+            if resposta.redirect or resposta.erro:
                 print("   🚨 ERRO DO SERVIDOR DETECTADO no XML!")
-                print(f"   📋 Conteúdo do erro: {xml_content}")
+                print(f"   📋 Conteúdo do erro: {resposta.erro or resposta.redirect}")
                 print("   ⚠️ Retornando lista vazia para forçar fallback para Selenium")
                 return []
             
-            alunos = []
-            
-            # Buscar por nomes dos estudantes no XML
-            pattern_nomes = r'linkNomeEstudanteAbaConceitos[^>]*>([^<]+)</a>'
-            nomes_encontrados = re.findall(pattern_nomes, xml_content)
-            
-            print(f"   📊 {len(nomes_encontrados)} nomes encontrados no XML")
-            
-            # Buscar por data-ri para cada linha
-            pattern_linhas = r'<tr data-ri="(\d+)"[^>]*>(.*?)</tr>'
-            linhas_encontradas = re.findall(pattern_linhas, xml_content, re.DOTALL)
+            # Tabela renderizada pelo mediasConceito (ou a página inteira, fora de uma resposta partial)
+            conteudo, tabela = None, None
+            for id_tabela in ("formAbaConceitos:tabelaConceitos", "formAbaConceitos:dataTableConceitos"):
+                conteudo = resposta.conteudo(id_tabela, parcial=True)
+                if conteudo:
+                    tabela = resposta.fragmento(id_tabela, parcial=True)
+                    break
+            if tabela is None:
+                if resposta.valida:
+                    print("   ⚠️ Resposta sem a tabela de conceitos")
+                    return []
+                conteudo = xml_content
+                tabela = lxml_html.fromstring(xml_content)
             
+            alunos = []
+            linhas_encontradas = _XP_LINHAS_CONCEITOS(tabela)
             print(f"   📊 {len(linhas_encontradas)} linhas encontradas no XML")
             
+            # Matriz de notas da turma (mesma resposta, sem voltar ao navegador)
+            matriz_notas = ler_matriz_conceitos(conteudo)
+            if matriz_notas:
+                colunas_matriz = max(len(celulas) for celulas in matriz_notas.values())
+                bloqueadas = sum(1 for celulas in matriz_notas.values()
+                                 for celula in celulas.values() if celula["desabilitado"])
+                print(f"   📊 Matriz de notas: {len(matriz_notas)} alunos × {colunas_matriz} colunas ({bloqueadas} células bloqueadas)")
+            
             # Processar cada linha
             alunos_preenchidos = 0
-            for i, (data_ri, linha_html) in enumerate(linhas_encontradas):
+            for i, linha in enumerate(linhas_encontradas):
                 try:
-                    # Extrair nome da linha
-                    nome_match = re.search(r'linkNomeEstudanteAbaConceitos[^>]*>([^<]+)</a>', linha_html)
-                    if nome_match:
-                        nome_aluno = nome_match.group(1).strip()
+                    data_ri = linha.get("data-ri")
+                    links_nome = _XP_NOME_ALUNO(linha)
+                    if not links_nome:
+                        continue
+                    nome_aluno = (links_nome[0].text or "").strip()
+                    
+                    # Validar nome
+                    if not self._validar_nome_aluno(nome_aluno):
+                        continue
+                    
+                    # Buscar botão de atitudes
+                    botao_atitudes = None
+                    ja_preenchido = False
+                    
+                    links_atitudes = _XP_BOTAO_ATITUDES(linha)
+                    if links_atitudes:
+                        botao = links_atitudes[0]
+                        botao_atitudes = botao.get("id")
                         
-                        # Validar nome
-                        if self._validar_nome_aluno(nome_aluno):
-                            # Buscar botão de atitudes
-                            botao_atitudes = None
-                            ja_preenchido = False
-                            
-                            if 'linkEditarAtitudes' in linha_html:
-                                botao_match = re.search(r'id="([^"]*linkEditarAtitudes[^"]*)"', linha_html)
-                                if botao_match:
-                                    botao_atitudes = botao_match.group(1)
-                                
-                                # DETECTAR SE JÁ FOI PREENCHIDO:
-                                # Lápis verde tem style="color:#00b900" e title="Habilidades/Atitudes (Preenchido)"
-                                # Lápis normal tem style="" e title="Habilidades/Atitudes "
-                                # Buscar o link completo do botão de atitudes
-                                link_pattern = rf'<a[^>]*id="{re.escape(botao_atitudes)}"[^>]*>'
-                                link_match = re.search(link_pattern, linha_html)
-                                
-                                if link_match:
-                                    link_html = link_match.group(0)
-                                    # Verificar se está preenchido (cor verde ou título com "Preenchido")
-                                    if 'color:#00b900' in link_html or '(Preenchido)' in link_html:
-                                        ja_preenchido = True
-                                        alunos_preenchidos += 1
-                            
-                            aluno_info = {
-                                "nome": nome_aluno,
-                                "linha": i + 1,
-                                "data_ri": data_ri,
-                                "seletores": {
-                                    "botao_atitudes": f"#{botao_atitudes}" if botao_atitudes else None
-                                },
-                                "xml_source": True,  # Indicar que veio do XML
-                                "ja_preenchido": ja_preenchido  # NOVO: indica se já foi preenchido
-                            }
-                            
-                            alunos.append(aluno_info)
-                            
-                            if i < 5:  # Debug apenas primeiros 5
-                                status = "✅ PREENCHIDO" if ja_preenchido else "⏳ Pendente"
-                                print(f"   {status} Aluno {i+1}: {nome_aluno} (data-ri={data_ri})")
+                        # DETECTAR SE JÁ FOI PREENCHIDO:
+                        # Lápis verde tem style="color:#00b900" e title="Habilidades/Atitudes (Preenchido)"
+                        # Lápis normal tem style="" e title="Habilidades/Atitudes "
+                        if 'color:#00b900' in (botao.get("style") or "") or '(Preenchido)' in (botao.get("title") or ""):
+                            ja_preenchido = True
+                            alunos_preenchidos += 1
+                    
+                    aluno_info = {
+                        "nome": nome_aluno,
+                        "linha": i + 1,
+                        "data_ri": data_ri,
+                        "seletores": {
+                            "botao_atitudes": f"#{botao_atitudes}" if botao_atitudes else None
+                        },
+                        "xml_source": True,  # Indicar que veio do XML
+                        "ja_preenchido": ja_preenchido,  # NOVO: indica se já foi preenchido
+                        "notas_colunas": matriz_notas.get(data_ri, {})  # {coluna: {"valor", "desabilitado"}}
+                    }
+                    
+                    alunos.append(aluno_info)
+                    
+                    if i < 5:  # Debug apenas primeiros 5
+                        status = "✅ PREENCHIDO" if ja_preenchido else "⏳ Pendente"
+                        print(f"   {status} Aluno {i+1}: {nome_aluno} (data-ri={data_ri})")
                 
                 except Exception as e:
                     print(f"   ⚠️ Erro ao processar linha {i+1}: {e}")
@@ -1622,8 +1639,6 @@ class SGNAutomationHelpers:
         print(f"   🎯 Lançando atitude via requisição: {valor_atitude}")
         
         try:
-            driver = self._get_driver()
-            
             # Extrair valor da atitude se for Enum
             if hasattr(valor_atitude, 'value'):
                 valor_final = str(valor_atitude.value)
@@ -1632,51 +1647,20 @@ class SGNAutomationHelpers:
             else:
                 valor_final = str(valor_atitude)
             
-            # Obter cookies e URL
-            cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
-            url = driver.current_url
-            if "?" in url:
-                url = url.split("?")[0]
-            
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Faces-Request': 'partial/ajax',
-                'User-Agent': driver.execute_script("return navigator.userAgent;")
-            }
-            
             # Dados da requisição baseados na captura
             element_id = f"formAtitudes:panelAtitudes:dataTableAtitudes:{atitude_id}:observacaoAtitude"
             
-            post_data = {
-                'javax.faces.partial.ajax': 'true',
-                'javax.faces.source': element_id,
-                'javax.faces.partial.execute': element_id,
-                'javax.faces.partial.render': element_id,
-                'javax.faces.behavior.event': 'valueChange',
-                'javax.faces.partial.event': 'change',
-                f'{element_id}_focus': '',
-                f'{element_id}_input': valor_final,
-                'javax.faces.ViewState': viewstate
-            }
-            
-            import requests
-            from urllib.parse import urlencode
-            
-            session = requests.Session()
-            for name, value in cookies.items():
-                session.cookies.set(name, value)
-            
-            response = session.post(
-                url,
-                data=urlencode(post_data),
-                headers=headers,
+            response = self.jsf.post_partial(
+                element_id,
+                values=valores_select(element_id, valor_final),
+                viewstate=viewstate,
+                evento='valueChange',
                 timeout=10  # Timeout reduzido para performance
             )
             
             if response.status_code == 200:
                 # Verificar se a resposta contém erro 500
-                if 'redirect url="/errors/500.html"' in response.text:
+                if analisar_resposta(response.text).erro_servidor:
                     print(f"   🚨 ERRO 500 DETECTADO ao lançar atitude: Servidor SGN com problema!")
                     return False
                 
@@ -1705,8 +1689,6 @@ class SGNAutomationHelpers:
             bool: True se sucesso, False caso contrário
         """
         try:
-            driver = self._get_driver()
-            
             # Extrair valor da atitude se for Enum
             if hasattr(valor_atitude, 'value'):
                 valor_final = str(valor_atitude.value)
@@ -1715,46 +1697,18 @@ class SGNAutomationHelpers:
             else:
                 valor_final = str(valor_atitude)
             
-            # Obter cookies e URL (cache otimizado)
-            cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
-            url = driver.current_url.split('?')[0]
-            
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Faces-Request': 'partial/ajax',
-                'User-Agent': driver.execute_script("return navigator.userAgent;")
-            }
-            
             element_id = f"formAtitudes:panelAtitudes:dataTableAtitudes:{atitude_id}:observacaoAtitude"
             
-            post_data = {
-                'javax.faces.partial.ajax': 'true',
-                'javax.faces.source': element_id,
-                'javax.faces.partial.execute': element_id,
-                'javax.faces.partial.render': element_id,
-                'javax.faces.behavior.event': 'valueChange',
-                'javax.faces.partial.event': 'change',
-                f'{element_id}_focus': '',
-                f'{element_id}_input': valor_final,
-                'javax.faces.ViewState': viewstate
-            }
-            
-            from urllib.parse import urlencode
-            
-            session = requests.Session()
-            for name, value in cookies.items():
-                session.cookies.set(name, value)
-            
-            response = session.post(
-                url,
-                data=urlencode(post_data),
-                headers=headers,
+            response = self.jsf.post_partial(
+                element_id,
+                values=valores_select(element_id, valor_final),
+                viewstate=viewstate,
+                evento='valueChange',
                 timeout=timeout
             )
             
             # Verificação rápida de sucesso
-            return response.status_code == 200 and 'redirect url="/errors/500.html"' not in response.text
+            return response.status_code == 200 and not analisar_resposta(response.text).erro_servidor
                 
         except Exception:
             return False
@@ -1775,21 +1729,23 @@ class SGNAutomationHelpers:
         sucessos = 0
         falhas = 0
         
-        # Obter dados em cache uma vez para todo o lote
-        cookies, headers, url = self._get_cached_request_data()
+        # Sincronizar o cliente HTTP uma vez para todo o lote
+        self.jsf.sincronizar()
         
         def processar_atitude(i):
             try:
-                # Usar dados em cache para evitar acessar Selenium em cada thread
-                sucesso = self._lancar_atitude_via_requisicao_otimizada(str(i), str(i), opcao_atitude, viewstate, cookies, headers, url, timeout)
+                # Sessão compartilhada: as threads não acessam o Selenium
+                sucesso = self._lancar_atitude_via_requisicao_otimizada(str(i), str(i), opcao_atitude, viewstate, timeout)
                 return (i, sucesso)
             except Exception:
                 return (i, False)
         
-        # Usar ThreadPoolExecutor para paralelizar (máximo 2 threads para evitar erro 500)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        # Threads até o teto do controle adaptativo; as requisições em voo ficam
+        # limitadas pelo limite atual (sobe com respostas saudáveis, cai com erro 500)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concorrencia.limite_max) as executor:
             # Submeter todas as tarefas
-            futures = [executor.submit(processar_atitude, i) for i in lote_indices]
+            # Propagar o contexto (canal de log do job) para as threads do pool
+            futures = [submeter_com_contexto(executor, processar_atitude, i) for i in lote_indices]
             
             # Coletar resultados
             for future in concurrent.futures.as_completed(futures):
@@ -1807,18 +1763,15 @@ class SGNAutomationHelpers:
         
         return sucessos, falhas
 
-    def _lancar_atitude_via_requisicao_otimizada(self, data_ri, atitude_id, valor_atitude, viewstate, cookies, headers, url, timeout=3):
+    def _lancar_atitude_via_requisicao_otimizada(self, data_ri, atitude_id, valor_atitude, viewstate, timeout=3):
         """
-        Versão ultra-otimizada que usa dados em cache (thread-safe) com retry e rate limiting
+        Versão ultra-otimizada que usa a sessão HTTP do job (thread-safe) com retry e rate limiting
         
         Args:
             data_ri (str): Índice da linha do aluno
             atitude_id (str): ID da atitude
             valor_atitude (str): Valor da atitude
             viewstate (str): ViewState atual da sessão
-            cookies (dict): Cookies em cache
-            headers (dict): Headers em cache
-            url (str): URL em cache
             timeout (int): Timeout em segundos
             
         Returns:
@@ -1829,9 +1782,6 @@ class SGNAutomationHelpers:
         
         for attempt in range(max_retries + 1):
             try:
-                # Rate limiting para evitar sobrecarregar servidor
-                self._rate_limit_request()
-                
                 # Extrair valor da atitude se for Enum
                 if hasattr(valor_atitude, 'value'):
                     valor_final = str(valor_atitude.value)
@@ -1842,33 +1792,20 @@ class SGNAutomationHelpers:
                 
                 element_id = f"formAtitudes:panelAtitudes:dataTableAtitudes:{atitude_id}:observacaoAtitude"
                 
-                post_data = {
-                    'javax.faces.partial.ajax': 'true',
-                    'javax.faces.source': element_id,
-                    'javax.faces.partial.execute': element_id,
-                    'javax.faces.partial.render': element_id,
-                    'javax.faces.behavior.event': 'valueChange',
-                    'javax.faces.partial.event': 'change',
-                    f'{element_id}_focus': '',
-                    f'{element_id}_input': valor_final,
-                    'javax.faces.ViewState': viewstate
-                }
-                
-                from urllib.parse import urlencode
-                
-                session = requests.Session()
-                for name, value in cookies.items():
-                    session.cookies.set(name, value)
-                
-                response = session.post(
-                    url,
-                    data=urlencode(post_data),
-                    headers=headers,
-                    timeout=timeout
-                )
+                geracao = self._geracao_sessao
+                with self.concorrencia.requisicao() as req:
+                    response = self.jsf.post_partial(
+                        element_id,
+                        values=valores_select(element_id, valor_final),
+                        viewstate=viewstate,
+                        evento='valueChange',
+                        timeout=timeout
+                    )
+                    req.latencia = response.duracao
+                    req.sobrecarga = self._resposta_indica_sobrecarga(response)
                 
                 # Verificar se foi sucesso
-                if response.status_code == 200 and 'redirect url="/errors/500.html"' not in response.text:
+                if response.status_code == 200 and not analisar_resposta(response.text).erro_servidor:
                     # Verificar se não é erro de sessão
                     if not self._detectar_sessao_expirada(response.text):
                         return True
@@ -1876,9 +1813,9 @@ class SGNAutomationHelpers:
                 # Se foi erro de sessão, tentar renovar
                 if self._detectar_sessao_expirada(response.text):
                     print(f"   🚨 Sessão expirada detectada na atitude {atitude_id}")
-                    if attempt < max_retries and self._tentar_renovar_sessao():
-                        # Atualizar dados após renovação
-                        cookies, headers, url = self._get_cached_request_data(force_refresh=True)
+                    if attempt < max_retries and self._tentar_renovar_sessao(geracao):
+                        # Copiar cookies/URL renovados para a sessão HTTP
+                        self.jsf.sincronizar(forcar=True)
                         delay = base_delay * (2 ** attempt)
                         time.sleep(delay)
                         continue
@@ -1887,13 +1824,16 @@ class SGNAutomationHelpers:
                         return False
                 
                 # Se foi erro 500, tentar novamente
-                if 'redirect url="/errors/500.html"' in response.text and attempt < max_retries:
+                if analisar_resposta(response.text).erro_servidor and attempt < max_retries:
                     delay = base_delay * (2 ** attempt)  # Backoff exponencial
                     time.sleep(delay)
                     continue
                 
                 return False
                     
+            except CircuitoAberto:
+                # SGN fora do ar além do tolerado: não adianta repetir
+                return False
             except Exception:
                 if attempt < max_retries:
                     delay = base_delay * (2 ** attempt)
@@ -1908,7 +1848,8 @@ class SGNAutomationHelpers:
         Lança conceitos de habilidades usando o mesmo padrão otimizado das atitudes
         
         Melhorias aplicadas (igual às atitudes):
-        - Cache de cookies/headers antes do loop
+        - Sessão HTTP do job sincronizada antes do loop
+        - Requisições em paralelo, limitadas pelo controle adaptativo de concorrência
         - Retry com backoff exponencial por requisição
         - Detecção e renovação automática de sessão
         - Timeout aumentado para 10s (servidor SGN é lento)
@@ -1931,31 +1872,38 @@ class SGNAutomationHelpers:
         
         print(f"      📝 Lançando {total} conceitos com valor '{conceito_valor}'...")
         
-        # OTIMIZAÇÃO 1: Cache de cookies/headers antes do loop (igual às atitudes)
-        cookies, headers, url = self._get_cached_request_data()
+        # OTIMIZAÇÃO 1: Sincronizar a sessão HTTP antes do loop (igual às atitudes)
+        self.jsf.sincronizar()
         
-        for idx, data_ri in enumerate(conceitos_pendentes):
+        def processar_conceito(data_ri):
             try:
-                sucesso = self._lancar_conceito_habilidade_via_requisicao_otimizada(
-                    data_ri, conceito_valor, viewstate, cookies, headers, url, timeout
+                # ViewState acompanhado pelo cliente (atualizado se a sessão for renovada)
+                viewstate_atual = self.jsf.viewstate.atual or viewstate
+                return data_ri, self._lancar_conceito_habilidade_via_requisicao_otimizada(
+                    data_ri, conceito_valor, viewstate_atual, timeout
                 )
+            except Exception as e:
+                print(f"      ❌ Erro no conceito {data_ri}: {str(e)[:30]}")
+                return data_ri, False
+        
+        sessao_renovada = False
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concorrencia.limite_max) as executor:
+            futures = [submeter_com_contexto(executor, processar_conceito, d) for d in conceitos_pendentes]
+            
+            for idx, future in enumerate(concurrent.futures.as_completed(futures)):
+                _, sucesso = future.result()
                 if sucesso:
                     sucessos += 1
                 else:
                     falhas += 1
                     
-                # Se muitas falhas consecutivas (>3), tentar renovar sessão
-                if falhas > 3 and (falhas / (idx + 1)) > 0.5:
+                # Se muitas falhas (>3 e mais da metade), tentar renovar sessão uma vez
+                if not sessao_renovada and falhas > 3 and (falhas / (idx + 1)) > 0.5:
                     print(f"      ⚠️ Muitas falhas ({falhas}/{idx+1}), renovando sessão...")
+                    sessao_renovada = True
                     if self._tentar_renovar_sessao():
-                        cookies, headers, url = self._get_cached_request_data(force_refresh=True)
-                        viewstate_novo = self._obter_viewstate_atual()
-                        if viewstate_novo:
-                            viewstate = viewstate_novo
-                            
-            except Exception as e:
-                falhas += 1
-                print(f"      ❌ Erro no conceito {data_ri}: {str(e)[:30]}")
+                        self.jsf.sincronizar(forcar=True)
+                        self._obter_viewstate_atual()
         
         print(f"      ✅ Conceitos: {sucessos}/{total} OK, {falhas} falhas")
         return sucessos, falhas
@@ -1976,47 +1924,14 @@ class SGNAutomationHelpers:
         print(f"   🎯 Lançando conceito via requisição: {conceito}")
         
         try:
-            driver = self._get_driver()
-            
-            # Obter cookies e URL
-            cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
-            url = driver.current_url
-            if "?" in url:
-                url = url.split("?")[0]
-            
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Faces-Request': 'partial/ajax',
-                'User-Agent': driver.execute_script("return navigator.userAgent;")
-            }
-            
             # Dados da requisição baseados na captura
             element_id = f"tabViewDiarioClasse:formAbaConceitos:dataTableConceitos:{data_ri}:avaliacoes:{avaliacao_id}:j_idt1114"
             
-            post_data = {
-                'javax.faces.partial.ajax': 'true',
-                'javax.faces.source': element_id,
-                'javax.faces.partial.execute': element_id,
-                'javax.faces.partial.render': element_id,
-                'javax.faces.behavior.event': 'valueChange',
-                'javax.faces.partial.event': 'change',
-                f'{element_id}_focus': '',
-                f'{element_id}_input': conceito,
-                'javax.faces.ViewState': viewstate
-            }
-            
-            import requests
-            from urllib.parse import urlencode
-            
-            session = requests.Session()
-            for name, value in cookies.items():
-                session.cookies.set(name, value)
-            
-            response = session.post(
-                url,
-                data=urlencode(post_data),
-                headers=headers,
+            response = self.jsf.post_partial(
+                element_id,
+                values=valores_select(element_id, conceito),
+                viewstate=viewstate,
+                evento='valueChange',
                 timeout=30
             )
             
@@ -2038,22 +1953,20 @@ class SGNAutomationHelpers:
         Para uso quando não há cache disponível. Para melhor performance,
         use _lancar_conceito_habilidade_via_requisicao_otimizada().
         """
-        # Obter dados frescos
-        cookies, headers, url = self._get_cached_request_data()
         return self._lancar_conceito_habilidade_via_requisicao_otimizada(
-            data_ri, conceito, viewstate, cookies, headers, url, timeout=10
+            data_ri, conceito, viewstate, timeout=10
         )
     
-    def _lancar_conceito_habilidade_via_requisicao_otimizada(self, data_ri, conceito, viewstate, cookies, headers, url, timeout=10):
+    def _lancar_conceito_habilidade_via_requisicao_otimizada(self, data_ri, conceito, viewstate, timeout=10):
         """
-        Versão otimizada que usa dados em cache (thread-safe) com retry e rate limiting
+        Versão otimizada que usa a sessão HTTP do job (thread-safe) com retry e rate limiting
         
         Baseado no payload real capturado do SGN e no padrão das atitudes.
         
         Melhorias:
-        - Usa cache de cookies/headers (não acessa Selenium a cada requisição)
+        - Usa a sessão HTTP keep-alive do job (não acessa Selenium a cada requisição)
         - Retry com backoff exponencial (2 tentativas)
-        - Rate limiting para evitar erro 500
+        - Rate limiting (token bucket do cliente HTTP) para evitar erro 500
         - Timeout aumentado para 10s (servidor SGN é lento)
         - Detecção de sessão expirada
         
@@ -2061,9 +1974,6 @@ class SGNAutomationHelpers:
             data_ri: Índice da linha da habilidade (0, 1, 2, 3...)
             conceito: Conceito a ser lançado (A, B, C, NE)
             viewstate: ViewState atual da página
-            cookies: Cookies em cache
-            headers: Headers em cache
-            url: URL em cache
             timeout: Timeout em segundos (padrão: 10s)
             
         Returns:
@@ -2074,9 +1984,6 @@ class SGNAutomationHelpers:
         
         for attempt in range(max_retries + 1):
             try:
-                # Rate limiting para evitar erro 500
-                self._rate_limit_request()
-                
                 # Extrair apenas o valor do conceito - lidar com Enum e String
                 if hasattr(conceito, 'value'):
                     conceito_valor = str(conceito.value)
@@ -2091,58 +1998,42 @@ class SGNAutomationHelpers:
                 # formAtitudes:panelAtitudes:dataTableHabilidades:3:notaConceito
                 element_id = f"formAtitudes:panelAtitudes:dataTableHabilidades:{data_ri}:notaConceito"
                 
-                # Dados da requisição - EXATAMENTE como no payload capturado
-                post_data = {
-                    'javax.faces.partial.ajax': 'true',
-                    'javax.faces.source': element_id,
-                    'javax.faces.partial.execute': element_id,
-                    'javax.faces.partial.render': 'formAtitudes:panelAtitudes',
-                    'javax.faces.behavior.event': 'valueChange',
-                    'javax.faces.partial.event': 'change',
-                    f'{element_id}_focus': '',
-                    f'{element_id}_input': conceito_valor,
-                    'javax.faces.ViewState': viewstate
-                }
-                
-                from urllib.parse import urlencode
-                
-                session = requests.Session()
-                for name, value in cookies.items():
-                    session.cookies.set(name, value)
-                
-                response = session.post(
-                    url,
-                    data=urlencode(post_data),
-                    headers=headers,
-                    timeout=timeout
-                )
+                # Dados da requisição como no payload capturado, mas renderizando só o
+                # próprio select (~1 KB) em vez do painel inteiro (~20 KB)
+                geracao = self._geracao_sessao
+                with self.concorrencia.requisicao() as req:
+                    response = self.jsf.post_partial(
+                        element_id,
+                        values=valores_select(element_id, conceito_valor),
+                        viewstate=viewstate,
+                        evento='valueChange',
+                        timeout=timeout
+                    )
+                    req.latencia = response.duracao
+                    req.sobrecarga = self._resposta_indica_sobrecarga(response)
                 
                 if response.status_code == 200:
                     # Verificar se a sessão expirou
                     if self._detectar_sessao_expirada(response.text):
                         if attempt < max_retries:
                             print(f"      🚨 Sessão expirada (data-ri={data_ri}), tentando renovar...")
-                            if self._tentar_renovar_sessao():
-                                cookies, headers, url = self._get_cached_request_data(force_refresh=True)
+                            if self._tentar_renovar_sessao(geracao):
+                                self.jsf.sincronizar(forcar=True)
                                 delay = base_delay * (2 ** attempt)
                                 time.sleep(delay)
                                 continue
                         return False
                     
                     # Verificar se a resposta contém erro 500
-                    if 'redirect url="/errors/500.html"' in response.text:
+                    if analisar_resposta(response.text).erro_servidor:
                         if attempt < max_retries:
                             delay = base_delay * (2 ** attempt)
                             time.sleep(delay)
                             continue
                         return False
                     
-                    # Verificar se a resposta contém partial-response válida
-                    if '<partial-response>' in response.text and '<update' in response.text:
-                        return True
-                    
-                    # Se contém o painel, considerar sucesso
-                    if 'formAtitudes:panelAtitudes' in response.text:
+                    # Confirmar pelo select renderizado com o valor pedido
+                    if self._confirmar_escrita_na_resposta(response.text, element_id, conceito_valor):
                         return True
                     
                     # Resposta inesperada - tentar novamente
@@ -2159,6 +2050,8 @@ class SGNAutomationHelpers:
                         continue
                     return False
                     
+            except CircuitoAberto:
+                return False
             except Exception as e:
                 if attempt < max_retries:
                     delay = base_delay * (2 ** attempt)
@@ -2183,47 +2076,14 @@ class SGNAutomationHelpers:
         print(f"   🎯 Lançando conceito final via requisição: {conceito}")
         
         try:
-            driver = self._get_driver()
-            
-            # Obter cookies e URL
-            cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
-            url = driver.current_url
-            if "?" in url:
-                url = url.split("?")[0]
-            
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-Requested-With': 'XMLHttpRequest',
-                'Faces-Request': 'partial/ajax',
-                'User-Agent': driver.execute_script("return navigator.userAgent;")
-            }
-            
             # Dados da requisição baseados na captura
             element_id = f"tabViewDiarioClasse:formAbaConceitos:dataTableConceitos:{data_ri}:comboConceitoFinal"
             
-            post_data = {
-                'javax.faces.partial.ajax': 'true',
-                'javax.faces.source': element_id,
-                'javax.faces.partial.execute': element_id,
-                'javax.faces.partial.render': element_id,
-                'javax.faces.behavior.event': 'valueChange',
-                'javax.faces.partial.event': 'change',
-                f'{element_id}_focus': '',
-                f'{element_id}_input': conceito,
-                'javax.faces.ViewState': viewstate
-            }
-            
-            import requests
-            from urllib.parse import urlencode
-            
-            session = requests.Session()
-            for name, value in cookies.items():
-                session.cookies.set(name, value)
-            
-            response = session.post(
-                url,
-                data=urlencode(post_data),
-                headers=headers,
+            response = self.jsf.post_partial(
+                element_id,
+                values=valores_select(element_id, conceito),
+                viewstate=viewstate,
+                evento='valueChange',
                 timeout=30
             )
             
@@ -2242,6 +2102,18 @@ class SGNAutomationHelpers:
         """
         Obtém o ViewState atual da página
         
+        Usa o ViewState acompanhado pelo cliente HTTP (atualizado a cada
+        resposta partial/ajax); o DOM só é lido após uma navegação.
+        
+        Returns:
+            str: ViewState ou None se não encontrado
+        """
+        return self.jsf.obter_viewstate()
+    
+    def _ler_viewstate_dom(self):
+        """
+        Lê o ViewState do DOM da página aberta no navegador
+        
         Returns:
             str: ViewState ou None se não encontrado
         """
@@ -2280,6 +2152,9 @@ class SGNAutomationHelpers:
         """
         Faz uma requisição AJAX com retry e timeout aumentado.
         
+        Sessão expirada não é repetida: sinaliza self._sessao_expirada e
+        retorna falha (a renovação invalida o ViewState de post_data).
+        
         Args:
             post_data (dict): Dados do POST
             timeout (int): Timeout em segundos (padrão 30s)
@@ -2288,36 +2163,24 @@ class SGNAutomationHelpers:
         Returns:
             tuple: (sucesso: bool, response_text: str, novo_viewstate: str)
         """
-        from urllib.parse import urlencode
-        
-        cookies, headers, url = self._get_cached_request_data()
-        
         for attempt in range(max_retries):
+            # Ponto de cancelamento entre requisições JSF
+            verificar_cancelamento()
             try:
-                self._rate_limit_request()
-                
-                session = requests.Session()
-                for name, value in cookies.items():
-                    session.cookies.set(name, value)
-                
-                response = session.post(
-                    url,
-                    data=urlencode(post_data),
-                    headers=headers,
-                    timeout=timeout
-                )
+                with self.concorrencia.requisicao() as req:
+                    response = self.jsf.post(post_data, timeout=timeout)
+                    req.latencia = response.duracao
+                    req.sobrecarga = self._resposta_indica_sobrecarga(response)
                 
                 if response.status_code == 200:
                     # Extrair novo ViewState da resposta
                     novo_viewstate = self._extrair_viewstate_da_resposta(response.text)
                     
-                    # Verificar se sessão expirou
+                    # Sessão expirada: o ViewState do payload morreu com ela, então não
+                    # adianta repetir; quem coordena as views renova a sessão
                     if self._detectar_sessao_expirada(response.text):
                         print(f"   ⚠️ Sessão expirada detectada (tentativa {attempt + 1})")
-                        if attempt < max_retries - 1:
-                            self._tentar_renovar_sessao()
-                            cookies, headers, url = self._get_cached_request_data(force_refresh=True)
-                            continue
+                        self._sessao_expirada.set()
                         return False, response.text, None
                     
                     return True, response.text, novo_viewstate
@@ -2335,6 +2198,10 @@ class SGNAutomationHelpers:
                     continue
                 return False, "", None
                 
+            except CircuitoAberto as e:
+                print(f"   ❌ {e}")
+                return False, "", None
+                
             except Exception as e:
                 print(f"   ❌ Erro na requisição: {e} (tentativa {attempt + 1}/{max_retries})")
                 if attempt < max_retries - 1:
@@ -2354,21 +2221,7 @@ class SGNAutomationHelpers:
         Returns:
             str: ViewState ou None
         """
-        import re
-        
-        # Padrão para extrair ViewState do XML de resposta
-        patterns = [
-            r'<update id="j_id1:javax\.faces\.ViewState:0"><!\[CDATA\[(.*?)\]\]></update>',
-            r'<update id="javax\.faces\.ViewState"><!\[CDATA\[(.*?)\]\]></update>',
-            r'ViewState:0">\s*<!\[CDATA\[(.*?)\]\]>',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, response_text)
-            if match:
-                return match.group(1)
-        
-        return None
+        return extrair_viewstate(response_text)
     
     def _selecionar_aluno_via_http(self, data_ri, viewstate, timeout=30):
         """
@@ -2382,16 +2235,7 @@ class SGNAutomationHelpers:
         Returns:
             tuple: (sucesso: bool, novo_viewstate: str)
         """
-        element_id = f"tabViewDiarioClasse:formAbaConceitos:dataTableConceitos:{data_ri}:linkEditarAtitudes"
-        
-        post_data = {
-            'javax.faces.partial.ajax': 'true',
-            'javax.faces.source': element_id,
-            'javax.faces.partial.execute': element_id,
-            'javax.faces.partial.render': 'modalDadosAtitudes',
-            element_id: element_id,
-            'javax.faces.ViewState': viewstate
-        }
+        post_data = self._payloads_modal_aluno(data_ri, viewstate)[0]
         
         sucesso, response_text, novo_viewstate = self._fazer_requisicao_ajax(post_data, timeout)
         
@@ -2402,6 +2246,28 @@ class SGNAutomationHelpers:
         
         return False, viewstate
     
+    def _payloads_modal_aluno(self, data_ri, viewstate):
+        """
+        Payloads de abertura da modal de conceitos de um aluno
+        
+        Returns:
+            list: [seleção do aluno (linkEditarAtitudes), contentLoad da modal]
+        """
+        element_id = f"tabViewDiarioClasse:formAbaConceitos:dataTableConceitos:{data_ri}:linkEditarAtitudes"
+        return [
+            self.jsf.montar_payload(
+                element_id,
+                render='modalDadosAtitudes',
+                values={element_id: element_id},
+                viewstate=viewstate
+            ),
+            self.jsf.montar_payload(
+                'modalDadosAtitudes',
+                values={'modalDadosAtitudes': 'modalDadosAtitudes', 'modalDadosAtitudes_contentLoad': 'true'},
+                viewstate=viewstate
+            ),
+        ]
+    
     def _carregar_modal_via_http(self, viewstate, timeout=30):
         """
         Carrega o conteúdo do modal via HTTP (modalDadosAtitudes_contentLoad).
@@ -2413,15 +2279,11 @@ class SGNAutomationHelpers:
         Returns:
             tuple: (sucesso: bool, dados_modal: dict, novo_viewstate: str)
         """
-        post_data = {
-            'javax.faces.partial.ajax': 'true',
-            'javax.faces.source': 'modalDadosAtitudes',
-            'javax.faces.partial.execute': 'modalDadosAtitudes',
-            'javax.faces.partial.render': 'modalDadosAtitudes',
-            'modalDadosAtitudes': 'modalDadosAtitudes',
-            'modalDadosAtitudes_contentLoad': 'true',
-            'javax.faces.ViewState': viewstate
-        }
+        post_data = self.jsf.montar_payload(
+            'modalDadosAtitudes',
+            values={'modalDadosAtitudes': 'modalDadosAtitudes', 'modalDadosAtitudes_contentLoad': 'true'},
+            viewstate=viewstate
+        )
         
         sucesso, response_text, novo_viewstate = self._fazer_requisicao_ajax(post_data, timeout)
         
@@ -2441,7 +2303,8 @@ class SGNAutomationHelpers:
             response_text (str): HTML da resposta
             
         Returns:
-            dict: {num_atitudes: int, num_habilidades: int, nome_aluno: str}
+            dict: {num_atitudes: int, num_habilidades: int, nome_aluno: str,
+                   valores_atuais: {"atitudes": {indice: valor}, "habilidades": {indice: valor}}}
         """
         import re
         
@@ -2450,7 +2313,8 @@ class SGNAutomationHelpers:
             'num_habilidades': 0,
             'nome_aluno': '',
             'atitudes_preenchidas': [],
-            'habilidades_preenchidas': []
+            'habilidades_preenchidas': [],
+            'valores_atuais': {'atitudes': {}, 'habilidades': {}}
         }
         
         # Extrair nome do aluno
@@ -2458,32 +2322,105 @@ class SGNAutomationHelpers:
         if nome_match:
             dados['nome_aluno'] = nome_match.group(1)
         
-        # Contar atitudes (data-ri="0", "1", "2", "3" na tabela de atitudes)
-        atitudes_matches = re.findall(r'dataTableAtitudes:(\d+):observacaoAtitude', response_text)
-        if atitudes_matches:
-            dados['num_atitudes'] = max(int(m) for m in atitudes_matches) + 1
-        
-        # Contar habilidades (data-ri="0", "1", ... na tabela de habilidades)
-        habilidades_matches = re.findall(r'dataTableHabilidades:(\d+):notaConceito', response_text)
-        if habilidades_matches:
-            dados['num_habilidades'] = max(int(m) for m in habilidades_matches) + 1
-        
-        # Verificar atitudes já preenchidas (selected="selected")
-        for i in range(dados['num_atitudes']):
-            pattern = rf'dataTableAtitudes:{i}:observacaoAtitude_input.*?<option value="([^"]*)" selected="selected"'
-            match = re.search(pattern, response_text, re.DOTALL)
-            if match and match.group(1):
-                dados['atitudes_preenchidas'].append(i)
-        
-        # Verificar habilidades já preenchidas
-        for i in range(dados['num_habilidades']):
-            pattern = rf'dataTableHabilidades:{i}:notaConceito_input.*?<option value="([^"]*)" selected="selected"'
-            match = re.search(pattern, response_text, re.DOTALL)
-            if match and match.group(1):
-                dados['habilidades_preenchidas'].append(i)
+        # Uma única varredura dos selects da modal (contagem e valor selecionado)
+        valores = self._extrair_valores_modal(response_text)
+        atitudes = valores['atitudes']
+        habilidades = {h['indice']: h['valor'] for h in valores['habilidades']}
+        if atitudes:
+            dados['num_atitudes'] = max(atitudes) + 1
+        if habilidades:
+            dados['num_habilidades'] = max(habilidades) + 1
+        dados['valores_atuais'] = {'atitudes': atitudes, 'habilidades': habilidades}
+        
+        # Atitudes/habilidades já preenchidas (qualquer valor selecionado)
+        dados['atitudes_preenchidas'] = sorted(i for i, valor in atitudes.items() if valor)
+        dados['habilidades_preenchidas'] = sorted(i for i, valor in habilidades.items() if valor)
         
         return dados
-    
+
+    def _extrair_valores_modal(self, response_text):
+        """
+        Extrai os valores atuais de atitudes e habilidades da modal de um aluno.
+
+        Args:
+            response_text (str): Resposta parcial (XML) do contentLoad da modal
+
+        Returns:
+            dict: {
+                "atitudes": {indice: valor_atual},
+                "habilidades": [{"indice": int, "habilidade": str, "valor": str}]
+            }
+        """
+        return ler_modal_conceitos(response_text)
+
+    def _ler_modal_aluno_via_http(self, data_ri, viewstate, timeout=30):
+        """
+        Lê (sem gravar) os valores atuais da modal de conceitos de um aluno.
+
+        Usa as mesmas requisições de abertura da modal do lançamento HTTP puro
+        (seleção do aluno + contentLoad), que não alteram dados no SGN.
+
+        Args:
+            data_ri (int): Índice do aluno na tabela
+            viewstate (str): ViewState atual
+            timeout (int): Timeout em segundos
+
+        Returns:
+            tuple: (sucesso: bool, valores: dict, novo_viewstate: str)
+        """
+        sucesso, viewstate = self._selecionar_aluno_via_http(data_ri, viewstate, timeout)
+        if not sucesso:
+            return False, {}, viewstate
+
+        post_data = self._payloads_modal_aluno(data_ri, viewstate)[1]
+
+        sucesso, response_text, novo_viewstate = self._fazer_requisicao_ajax(post_data, timeout)
+        if not sucesso:
+            return False, {}, viewstate
+
+        return True, self._extrair_valores_modal(response_text), novo_viewstate or viewstate
+
+    def _ler_modais_alunos_via_http(self, data_ris, viewstate, trimestre, timeout=30, estatisticas=None):
+        """
+        Lê (sem gravar) as modais de conceitos de vários alunos em um lote assíncrono
+
+        Abre até SGN_VIEWS_POR_SESSAO views do diário (já com o trimestre
+        selecionado) e lê uma modal por view ao mesmo tempo; as requisições em
+        voo ficam no limite do controle de concorrência do job.
+
+        Args:
+            data_ris (list): Índices dos alunos na tabela
+            viewstate (str): ViewState da view do navegador (trimestre já selecionado)
+            trimestre (str): Trimestre selecionado (TR1, TR2, TR3)
+            timeout (int): Timeout por requisição
+            estatisticas (dict, optional): Preenchido pelo lote (ver executar_leituras)
+
+        Returns:
+            dict: {data_ri: valores} (ver _extrair_valores_modal) apenas das modais lidas
+        """
+        if not data_ris:
+            return {}
+        sequencias = [self._payloads_modal_aluno(data_ri, viewstate) for data_ri in data_ris]
+        resultados = executar_leituras(
+            self.jsf, sequencias, viewstate,
+            views_extras=self._quantidade_views(len(data_ris)) - 1,
+            preparar_view=lambda view: [self._payload_selecao_trimestre(view, trimestre)],
+            marcador='linkEditarAtitudes',
+            concorrencia=self.concorrencia,
+            timeout=timeout,
+            estatisticas=estatisticas,
+        )
+
+        valores = {}
+        for data_ri, resultado in zip(data_ris, resultados):
+            if isinstance(resultado, Exception):
+                print(f"   ⚠️ Modal do aluno {data_ri} não lida via HTTP: {str(resultado)[:80]}")
+                continue
+            if self._detectar_sessao_expirada(resultado[-1]):
+                continue
+            valores[data_ri] = self._extrair_valores_modal(resultado[-1])
+        return valores
+
     def _lancar_atitude_http_puro(self, indice, valor_atitude, viewstate, timeout=30):
         """
         Lança uma atitude via HTTP puro.
@@ -2499,19 +2436,15 @@ class SGNAutomationHelpers:
         """
         element_id = f"formAtitudes:panelAtitudes:dataTableAtitudes:{indice}:observacaoAtitude"
         
-        post_data = {
-            'javax.faces.partial.ajax': 'true',
-            'javax.faces.source': element_id,
-            'javax.faces.partial.execute': element_id,
-            'javax.faces.partial.render': element_id,
-            'javax.faces.behavior.event': 'valueChange',
-            'javax.faces.partial.event': 'change',
-            f'{element_id}_focus': '',
-            f'{element_id}_input': valor_atitude,
-            'javax.faces.ViewState': viewstate
-        }
+        post_data = self.jsf.montar_payload(
+            element_id,
+            values=valores_select(element_id, valor_atitude),
+            viewstate=viewstate,
+            evento='valueChange'
+        )
         
         sucesso, response_text, novo_viewstate = self._fazer_requisicao_ajax(post_data, timeout)
+        sucesso = sucesso and self._confirmar_escrita_na_resposta(response_text, element_id, valor_atitude)
         
         return sucesso, novo_viewstate or viewstate
     
@@ -2530,23 +2463,176 @@ class SGNAutomationHelpers:
         """
         element_id = f"formAtitudes:panelAtitudes:dataTableHabilidades:{indice}:notaConceito"
         
-        post_data = {
-            'javax.faces.partial.ajax': 'true',
-            'javax.faces.source': element_id,
-            'javax.faces.partial.execute': element_id,
-            'javax.faces.partial.render': 'formAtitudes:panelAtitudes',
-            'javax.faces.behavior.event': 'valueChange',
-            'javax.faces.partial.event': 'change',
-            f'{element_id}_focus': '',
-            f'{element_id}_input': valor_conceito,
-            'javax.faces.ViewState': viewstate
-        }
+        # Renderiza só o select gravado (a tela usa o painel inteiro, ~20x maior)
+        post_data = self.jsf.montar_payload(
+            element_id,
+            values=valores_select(element_id, valor_conceito),
+            viewstate=viewstate,
+            evento='valueChange'
+        )
         
         sucesso, response_text, novo_viewstate = self._fazer_requisicao_ajax(post_data, timeout)
+        sucesso = sucesso and self._confirmar_escrita_na_resposta(response_text, element_id, valor_conceito)
         
         return sucesso, novo_viewstate or viewstate
     
-    def _lancar_conceitos_aluno_http_puro(self, data_ri, atitude_valor, conceito_valor, viewstate, timeout=30):
+    def _extrair_selecionados_resposta(self, response_text):
+        """
+        Extrai o valor selecionado de cada select renderizado em uma resposta parcial.
+        
+        Args:
+            response_text (str): Resposta parcial (XML)
+            
+        Returns:
+            dict: {id_do_componente (sem "_input"): valor_selecionado}
+        """
+        return {element_id: select['selecionado'] for element_id, select in ler_selects(response_text).items()}
+    
+    def _confirmar_escrita_na_resposta(self, response_text, element_id, valor):
+        """
+        Valida uma gravação pela resposta de render mínimo (só o select gravado).
+        
+        Args:
+            response_text (str): Resposta parcial (XML)
+            element_id (str): ID do select gravado
+            valor (str): Valor pedido
+            
+        Returns:
+            bool: True se não há erro e o select voltou com o valor pedido
+        """
+        if analisar_resposta(response_text).erro_servidor or 'ui-messages-error' in response_text:
+            return False
+        return self._extrair_selecionados_resposta(response_text).get(element_id) == str(valor)
+    
+    def _lancar_campos_em_lote_http(self, campos, viewstate, timeout=30):
+        """
+        Grava vários selects da modal em uma única requisição partial/ajax.
+        
+        Cada campo leva exatamente os mesmos parâmetros da gravação individual
+        capturada em requisicoes/*.har (<id>_focus e <id>_input); o lote apenas
+        os concatena e lista todos os IDs em javax.faces.partial.execute e
+        javax.faces.partial.render. Um campo só conta como gravado se o
+        componente voltar renderizado com o valor pedido.
+        
+        Args:
+            campos (list): Lista de (element_id, valor)
+            viewstate (str): ViewState atual
+            timeout (int): Timeout em segundos
+            
+        Returns:
+            tuple: (ids_confirmados: set, novo_viewstate: str)
+        """
+        confirmados = set()
+        
+        for inicio in range(0, len(campos), TAMANHO_LOTE_CAMPOS):
+            lote = campos[inicio:inicio + TAMANHO_LOTE_CAMPOS]
+            ids = " ".join(element_id for element_id, _ in lote)
+            valores = {}
+            for element_id, valor in lote:
+                valores.update(valores_select(element_id, valor))
+            
+            post_data = self.jsf.montar_payload(
+                lote[0][0],
+                execute=ids,
+                render=ids,
+                values=valores,
+                viewstate=viewstate,
+                evento='valueChange'
+            )
+            
+            sucesso, response_text, novo_viewstate = self._fazer_requisicao_ajax(post_data, timeout)
+            if not sucesso or analisar_resposta(response_text).erro_servidor:
+                continue
+            viewstate = novo_viewstate or viewstate
+            
+            selecionados = self._extrair_selecionados_resposta(response_text)
+            confirmados.update(
+                element_id for element_id, valor in lote if selecionados.get(element_id) == valor
+            )
+        
+        return confirmados, viewstate
+    
+    def _verificar_escrita_em_lote(self, data_ri, campos_confirmados, trimestre=None, timeout=30):
+        """
+        Relê a modal do aluno em uma view nova para confirmar que a escrita em lote foi persistida.
+        
+        Feito uma vez por job (no primeiro aluno): o JSF dispara o evento de
+        valueChange apenas para o componente de origem, então é preciso checar
+        se o SGN salvou também os demais campos do lote. A releitura na mesma
+        view mostraria o estado dos componentes dela, não o que foi salvo; por
+        isso a modal é aberta em uma view recém-criada (GET do diário).
+        
+        Args:
+            data_ri (int): Índice do aluno na tabela
+            campos_confirmados (list): Lista de (element_id, valor) confirmados na resposta
+            trimestre (str, optional): Trimestre selecionado na view nova (como nas views paralelas)
+            timeout (int): Timeout em segundos
+            
+        Returns:
+            set: IDs persistidos, ou None se não foi possível reler a modal
+        """
+        if trimestre:
+            views = self._abrir_views_paralelas(1, trimestre, timeout)
+            view = views[0] if views else None
+        else:
+            try:
+                view = self.jsf.abrir_view(timeout)
+            except Exception as e:
+                print(f"   ⚠️ Não foi possível abrir view para verificar a escrita em lote: {str(e)[:80]}")
+                view = None
+        if not view:
+            return None
+        
+        sucesso, valores, _ = self._ler_modal_aluno_via_http(data_ri, view, timeout)
+        if not sucesso:
+            return None
+        
+        atuais = {}
+        for indice, valor in valores["atitudes"].items():
+            atuais[f"formAtitudes:panelAtitudes:dataTableAtitudes:{indice}:observacaoAtitude"] = valor
+        for habilidade in valores["habilidades"]:
+            atuais[f"formAtitudes:panelAtitudes:dataTableHabilidades:{habilidade['indice']}:notaConceito"] = habilidade["valor"]
+        
+        return {element_id for element_id, valor in campos_confirmados if atuais.get(element_id) == valor}
+    
+    def _sondar_escrita_em_lote(self, data_ri, campos, viewstate, timeout=30, trimestre=None):
+        """
+        Grava os campos do aluno em lote e decide se o SGN aceita a escrita em lote.
+        
+        Chamado com self._lock_escrita_em_lote adquirido, enquanto
+        self._escrita_em_lote ainda não foi decidido.
+        
+        Args:
+            data_ri (int): Índice do aluno na tabela
+            campos (list): Lista de (element_id, valor) a gravar
+            viewstate (str): ViewState atual
+            timeout (int): Timeout por requisição
+            trimestre (str, optional): Trimestre selecionado (view nova da verificação)
+            
+        Returns:
+            tuple: (ids_persistidos: set, novo_viewstate: str)
+        """
+        gravados, viewstate = self._lancar_campos_em_lote_http(campos, viewstate, timeout)
+        if not gravados:
+            return gravados, viewstate
+        
+        confirmados = [(eid, valor) for eid, valor in campos if eid in gravados]
+        persistidos = self._verificar_escrita_em_lote(data_ri, confirmados, trimestre, timeout)
+        if persistidos is None:
+            # Sem releitura não há confirmação: gravar campo a campo e
+            # verificar de novo no próximo aluno
+            print("   ⚠️ Não foi possível verificar a escrita em lote, gravando campo a campo")
+            return set(), viewstate
+        
+        self._escrita_em_lote = persistidos == gravados
+        if self._escrita_em_lote:
+            print(f"   📦 Escrita em lote confirmada pelo SGN ({len(gravados)} campos)")
+        else:
+            print("   ⚠️ SGN não persistiu a escrita em lote, usando gravação campo a campo")
+        return persistidos, viewstate
+    
+    def _lancar_conceitos_aluno_http_puro(self, data_ri, atitude_valor, conceito_valor, viewstate, timeout=30,
+                                          trimestre=None):
         """
         Lança conceitos e atitudes para um aluno usando 100% HTTP (sem modal visual).
         
@@ -2558,6 +2644,7 @@ class SGNAutomationHelpers:
             conceito_valor (str): Valor do conceito (A, B, C, NE)
             viewstate (str): ViewState inicial
             timeout (int): Timeout por requisição
+            trimestre (str, optional): Trimestre selecionado (view nova da verificação da escrita em lote)
             
         Returns:
             tuple: (sucesso: bool, mensagem: str, novo_viewstate: str)
@@ -2579,20 +2666,74 @@ class SGNAutomationHelpers:
             
             atitudes_ok = 0
             conceitos_ok = 0
+            campos_escritos = 0
+            
+            campos_atitudes = [
+                (f"formAtitudes:panelAtitudes:dataTableAtitudes:{i}:observacaoAtitude", i)
+                for i in range(num_atitudes)
+            ]
+            campos_conceitos = [
+                (f"formAtitudes:panelAtitudes:dataTableHabilidades:{i}:notaConceito", i)
+                for i in range(num_habilidades)
+            ]
             
-            # 3. Lançar atitudes
-            for i in range(num_atitudes):
-                sucesso, viewstate = self._lancar_atitude_http_puro(i, atitude_valor, viewstate, timeout)
+            # Diff campo a campo: não reenviar o que já está com o valor desejado
+            valores_atuais = dados_modal.get('valores_atuais', {})
+            atitudes_atuais = valores_atuais.get('atitudes', {})
+            habilidades_atuais = valores_atuais.get('habilidades', {})
+            ja_corretos = {eid for eid, i in campos_atitudes if atitudes_atuais.get(i) == atitude_valor}
+            ja_corretos.update(eid for eid, i in campos_conceitos if habilidades_atuais.get(i) == conceito_valor)
+            if ja_corretos:
+                print(f"   ⏭️ {len(ja_corretos)}/{num_atitudes + num_habilidades} campos já com o valor desejado")
+            
+            # 3. Escrita em lote (poucas requisições para todos os campos), se o SGN aceitar
+            gravados = set()
+            campos = [(eid, atitude_valor) for eid, _ in campos_atitudes if eid not in ja_corretos] + \
+                     [(eid, conceito_valor) for eid, _ in campos_conceitos if eid not in ja_corretos]
+            sondado = False
+            if campos and self._escrita_em_lote is None:
+                # Uma faixa por vez sonda o SGN; as demais aguardam o veredito
+                with self._lock_escrita_em_lote:
+                    if self._escrita_em_lote is None:
+                        gravados, viewstate = self._sondar_escrita_em_lote(
+                            data_ri, campos, viewstate, timeout, trimestre
+                        )
+                        sondado = True
+            if campos and not sondado and self._escrita_em_lote:
+                gravados, viewstate = self._lancar_campos_em_lote_http(campos, viewstate, timeout)
+            
+            # 4. Lançar atitudes (campo a campo apenas o que o lote não gravou)
+            for element_id, i in campos_atitudes:
+                if element_id in ja_corretos:
+                    atitudes_ok += 1
+                    continue
+                if element_id in gravados:
+                    sucesso = True
+                else:
+                    sucesso, viewstate = self._lancar_atitude_http_puro(i, atitude_valor, viewstate, timeout)
                 if sucesso:
                     atitudes_ok += 1
+                    campos_escritos += 1
+                    checkpoint.registrar_campo(f"atitude:{i}", atitude_valor)
             
-            # 4. Lançar conceitos de habilidades
-            for i in range(num_habilidades):
-                sucesso, viewstate = self._lancar_conceito_http_puro(i, conceito_valor, viewstate, timeout)
+            # 5. Lançar conceitos de habilidades
+            for element_id, i in campos_conceitos:
+                if element_id in ja_corretos:
+                    conceitos_ok += 1
+                    continue
+                if element_id in gravados:
+                    sucesso = True
+                else:
+                    sucesso, viewstate = self._lancar_conceito_http_puro(i, conceito_valor, viewstate, timeout)
                 if sucesso:
                     conceitos_ok += 1
+                    campos_escritos += 1
+                    checkpoint.registrar_campo(f"habilidade:{i}", conceito_valor)
             
             mensagem = f"{nome_aluno}: {atitudes_ok}/{num_atitudes} atitudes, {conceitos_ok}/{num_habilidades} conceitos"
+            if ja_corretos:
+                mensagem += f" ({len(ja_corretos)} já corretos)"
+            registrar_campos_escritos(campos_escritos)
             
             # Considerar sucesso se pelo menos 80% foi preenchido
             taxa_sucesso = (atitudes_ok + conceitos_ok) / max(1, num_atitudes + num_habilidades)
@@ -2602,16 +2743,116 @@ class SGNAutomationHelpers:
         except Exception as e:
             return False, f"Erro: {e}", viewstate
     
-    def _lancar_conceitos_todos_alunos_http_puro(self, lista_alunos, atitude_valor, conceito_valor, timeout=30, pular_preenchidos=True):
+    def _quantidade_views(self, total):
+        """
+        Views do diário a usar em paralelo para `total` alunos/leituras
+        
+        Limitada por SGN_VIEWS_POR_SESSAO (views que o SGN mantém por sessão)
+        e pelo limite atual do controle de concorrência.
+        
+        Returns:
+            int: Quantidade de views, contando a do navegador (ao menos 1)
+        """
+        return max(1, min(int(os.environ.get("SGN_VIEWS_POR_SESSAO", VIEWS_POR_SESSAO)),
+                          self.concorrencia.limite, total))
+    
+    def _payload_selecao_trimestre(self, viewstate, trimestre):
+        """Payload da seleção do trimestre no mediasConceito (carrega a tabela de conceitos na view)"""
+        element_id = "tabViewDiarioClasse:formAbaConceitos:mediasConceito"
+        return self.jsf.montar_payload(
+            element_id,
+            render='tabViewDiarioClasse:formAbaConceitos:tabelaConceitos',
+            values=valores_select(element_id, VALORES_TRIMESTRE.get(str(trimestre).upper(), '1')),
+            viewstate=viewstate,
+            evento='valueChange'
+        )
+    
+    def _abrir_views_paralelas(self, quantidade, trimestre, timeout=30):
+        """
+        Abre views extras do diário na mesma sessão, prontas para lançar conceitos.
+        
+        Cada view é um GET da página do diário (ViewState próprio) seguido da
+        seleção do trimestre no mediasConceito, como no navegador. Para na
+        primeira view que não abrir (limite de views da sessão, sessão expirada).
+        
+        Args:
+            quantidade (int): Views extras desejadas
+            trimestre (str): Trimestre selecionado (TR1, TR2, TR3)
+            timeout (int): Timeout por requisição
+            
+        Returns:
+            list: ViewStates das views extras abertas
+        """
+        views = []
+        
+        for _ in range(quantidade):
+            try:
+                view = self.jsf.abrir_view(timeout)
+                if not view:
+                    break
+                post_data = self._payload_selecao_trimestre(view, trimestre)
+                sucesso, response_text, _ = self._fazer_requisicao_ajax(post_data, timeout, max_retries=1)
+                if not sucesso or 'linkEditarAtitudes' not in response_text:
+                    break
+                views.append(view)
+            except CircuitoAberto:
+                break
+            except Exception as e:
+                print(f"   ⚠️ Não foi possível abrir view extra do diário: {str(e)[:80]}")
+                break
+        
+        return views
+    
+    def _reabrir_views_apos_renovacao(self, quantidade, trimestre, timeout=30):
+        """
+        Renova a sessão e abre de novo as views do lançamento HTTP puro.
+        
+        Chamado pelo coordenador com todas as faixas paradas: a renovação
+        volta ao diário da turma no Selenium e descarta as views extras e o
+        ViewState anteriores. A aba Conceitos e o trimestre são reabertos no
+        navegador antes de copiar de novo sessão e ViewState.
+        
+        Args:
+            quantidade (int): Views desejadas
+            trimestre (str, optional): Trimestre selecionado; sem ele usa só a view do navegador
+            timeout (int): Timeout por requisição
+            
+        Returns:
+            list: ViewStates das views abertas (vazia se não conseguiu renovar)
+        """
+        if not self._tentar_renovar_sessao():
+            return []
+        if self.reabrir_aba_conceitos:
+            try:
+                self.reabrir_aba_conceitos(trimestre)
+            except Exception as e:
+                print(f"   ❌ Não foi possível reabrir a aba de Conceitos após renovar a sessão: {str(e)[:80]}")
+                return []
+        self.jsf.sincronizar(forcar=True)
+        
+        # A página recarregada não tem o trimestre selecionado: todas as views
+        # são abertas já com a seleção, como as extras do início do lançamento
+        if trimestre:
+            return self._abrir_views_paralelas(quantidade, trimestre, timeout)
+        viewstate = self._obter_viewstate_atual()
+        return [viewstate] if viewstate else []
+    
+    def _lancar_conceitos_todos_alunos_http_puro(self, lista_alunos, atitude_valor, conceito_valor, timeout=30,
+                                                  pular_preenchidos=True, trimestre=None):
         """
         Lança conceitos para todos os alunos usando 100% HTTP.
         
+        Com o trimestre informado, abre até SGN_VIEWS_POR_SESSAO views do diário
+        (limitado também pelo controle de concorrência) e divide os alunos entre
+        elas: cada view processa sua faixa em sequência, as faixas em paralelo.
+        
         Args:
             lista_alunos (list): Lista de dicts com informações dos alunos
             atitude_valor (str): Valor da atitude
             conceito_valor (str): Valor do conceito
             timeout (int): Timeout por requisição
             pular_preenchidos (bool): Se True, pula alunos já preenchidos (lápis verde)
+            trimestre (str, optional): Trimestre selecionado; sem ele usa só a view do navegador
             
         Returns:
             tuple: (alunos_processados: int, alunos_com_erro: int, mensagens: list)
@@ -2671,27 +2912,100 @@ class SGNAutomationHelpers:
         alunos_processados = 0
         alunos_com_erro = 0
         mensagens = []
+        total = len(lista_para_processar)
+        lock_resultados = threading.Lock()
+        self._sessao_expirada.clear()
         
         inicio = time.time()
         
-        for idx, aluno in enumerate(lista_para_processar):
-            data_ri = aluno.get('data_ri', idx)
-            nome = aluno.get('nome', f'Aluno {idx}')
-            
-            print(f"\n   [{idx + 1}/{len(lista_para_processar)}] Processando: {nome[:30]}...")
-            
-            sucesso, mensagem, viewstate = self._lancar_conceitos_aluno_http_puro(
-                data_ri, atitude_valor, conceito_valor, viewstate, timeout
-            )
-            
-            if sucesso:
-                print(f"   ✅ {mensagem}")
-                alunos_processados += 1
+        # Views do diário: a do navegador + extras (limite de views da sessão e da concorrência)
+        views = [viewstate]
+        max_views = self._quantidade_views(total)
+        if trimestre and max_views > 1:
+            views.extend(self._abrir_views_paralelas(max_views - 1, trimestre, timeout))
+            if len(views) > 1:
+                print(f"   🪟 {len(views)} views do diário em paralelo")
+        
+        def processar_faixa(indices, viewstate_faixa):
+            """Processa a faixa em sequência; retorna os índices devolvidos por sessão expirada"""
+            nonlocal alunos_processados, alunos_com_erro
+            for posicao, idx in enumerate(indices):
+                verificar_cancelamento()
+                # Sessão expirada em qualquer faixa: parar e devolver o restante
+                if self._sessao_expirada.is_set():
+                    return indices[posicao:]
+                aluno = lista_para_processar[idx]
+                data_ri = aluno.get('data_ri', idx)
+                nome = aluno.get('nome', f'Aluno {idx}')
+                
+                print(f"\n   [{idx + 1}/{total}] Processando: {nome[:30]}...")
+                aluno_iniciado(idx + 1, total, nome)
+                
+                if checkpoint.aluno_confirmado(nome):
+                    print(f"   ⏭️ Já confirmado no checkpoint, pulando")
+                    with lock_resultados:
+                        alunos_processados += 1
+                    aluno_concluido(idx + 1, total, nome, campos_escritos=0)
+                    continue
+                checkpoint.iniciar_aluno(nome)
+                
+                sucesso, mensagem, viewstate_faixa = self._lancar_conceitos_aluno_http_puro(
+                    data_ri, atitude_valor, conceito_valor, viewstate_faixa, timeout, trimestre
+                )
+                
+                if not sucesso and self._sessao_expirada.is_set():
+                    # Não confirmado: volta para a fila depois da renovação
+                    print(f"   ⏸️ Sessão expirada durante {nome[:30]}, aluno volta para a fila")
+                    return indices[posicao:]
+                
+                with lock_resultados:
+                    if sucesso:
+                        print(f"   ✅ {mensagem}")
+                        alunos_processados += 1
+                    else:
+                        print(f"   ❌ {mensagem}")
+                        alunos_com_erro += 1
+                    mensagens.append(mensagem)
+                aluno_concluido(idx + 1, total, nome, sucesso)
+                checkpoint.confirmar_aluno(nome, sucesso)
+            return []
+        
+        pendentes = list(range(total))
+        renovacoes = 0
+        while pendentes:
+            # Alunos divididos entre as views de forma intercalada
+            faixas = [pendentes[i::len(views)] for i in range(len(views))]
+            if len(views) == 1:
+                devolvidos = processar_faixa(faixas[0], views[0])
             else:
-                print(f"   ❌ {mensagem}")
-                alunos_com_erro += 1
-            
-            mensagens.append(mensagem)
+                devolvidos = []
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(views)) as executor:
+                    futures = [
+                        submeter_com_contexto(executor, processar_faixa, faixa, view)
+                        for faixa, view in zip(faixas, views)
+                    ]
+                    for future in futures:
+                        devolvidos.extend(future.result())
+            pendentes = sorted(devolvidos)
+            if not pendentes:
+                break
+            
+            # Todas as faixas pararam: renovar uma vez e reabrir as views
+            print(f"\n   🔄 Sessão expirada: {len(pendentes)} aluno(s) aguardando renovação")
+            views = []
+            if renovacoes < MAX_RENOVACOES_SESSAO:
+                renovacoes += 1
+                views = self._reabrir_views_apos_renovacao(max_views, trimestre, timeout)
+            if not views:
+                print(f"   ❌ Não foi possível renovar a sessão, {len(pendentes)} aluno(s) sem lançamento")
+                for idx in pendentes:
+                    nome = lista_para_processar[idx].get('nome', f'Aluno {idx}')
+                    alunos_com_erro += 1
+                    mensagens.append(f"{nome}: sessão expirada")
+                    checkpoint.confirmar_aluno(nome, False)
+                break
+            self._sessao_expirada.clear()
+            print(f"   🪟 {len(views)} view(s) do diário reabertas após renovar a sessão")
         
         tempo_total = time.time() - inicio
         tempo_por_aluno = tempo_total / max(1, len(lista_para_processar))
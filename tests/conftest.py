@@ -0,0 +1,45 @@
+"""
+Fixtures compartilhadas dos testes
+
+As páginas (paginas/) e os HAR (requisicoes/) são capturas reais do SGN e
+servem de entrada para os leitores de resposta.
+"""
+import json
+import os
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_PAGINAS = os.path.join(RAIZ, "paginas")
+PASTA_HAR = os.path.join(RAIZ, "requisicoes")
+
+
+def ler_pagina(nome):
+    """Conteúdo de uma página de paginas/"""
+    with open(os.path.join(PASTA_PAGINAS, nome), encoding="utf-8") as f:
+        return f.read()
+
+
+def ler_respostas_har(nome):
+    """Textos das respostas gravadas em um HAR de requisicoes/"""
+    with open(os.path.join(PASTA_HAR, nome), encoding="utf-8") as f:
+        har = json.load(f)
+    return [e["response"]["content"].get("text") or "" for e in har["log"]["entries"]]
+
+
+@pytest.fixture(scope="session")
+def pagina_modal():
+    """Página do diário com a modal de conceitos de um aluno aberta"""
+    return ler_pagina("9lancar_conceito_aluno.html")
+
+
+@pytest.fixture(scope="session")
+def pagina_conceitos():
+    """Página do diário na aba de conceitos (tabela da turma)"""
+    return ler_pagina("8Conceito_aluno.html")
+
+
+@pytest.fixture(scope="session")
+def respostas_aplicando_nota():
+    """Respostas partial/ajax do HAR de gravação de notas na modal"""
+    return [t for t in ler_respostas_har("aplicando nota 2.har") if "<partial-response" in t]
@@ -0,0 +1,132 @@
+"""
+Testes dos endpoints da API que não dependem do SGN
+"""
+import asyncio
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from src import api, progress
+
+FORMULARIO_RA = {
+    "username": "professor",
+    "password": "senha",
+    "codigo_turma": "T1",
+    "inicio_ra": "01/10/2025",
+    "termino_ra": "31/10/2025",
+    "descricao_ra": "Recomposição",
+    "nome_arquivo_ra": "ra.pdf",
+}
+
+
+class UploadFalso:
+    def __init__(self, conteudo, filename="ra.pdf"):
+        self.filename = filename
+        self.conteudo = conteudo
+
+    async def read(self):
+        return self.conteudo
+
+
+def test_uploads_com_mesmo_nome_nao_colidem():
+    caminhos = [asyncio.run(api._salvar_arquivo_ra(UploadFalso(c))) for c in (b"um", b"dois")]
+    try:
+        assert caminhos[0] != caminhos[1]
+        assert [open(c, "rb").read() for c in caminhos] == [b"um", b"dois"]
+        assert all(c.endswith(".pdf") for c in caminhos)
+    finally:
+        for caminho in caminhos:
+            os.remove(caminho)
+
+
+def test_job_ra_com_falha_ao_salvar_arquivo(monkeypatch):
+    def sem_espaco(**kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(api.tempfile, "mkstemp", sem_espaco)
+    cliente = TestClient(api.create_app())
+
+    resposta = cliente.post(
+        "/jobs/lancar-conceito-inteligente-RA",
+        data=FORMULARIO_RA,
+        files={"arquivo_ra": ("ra.pdf", b"%PDF", "application/pdf")},
+    )
+
+    assert resposta.status_code == 400
+    assert "No space left on device" in resposta.json()["detail"]
+
+
+def test_stream_sse_envia_logs_e_resultado(monkeypatch):
+    def tarefa_falsa(**kwargs):
+        def executar():
+            print(f"turma {kwargs['codigo_turma']}")
+            return True, "Pareceres lançados"
+        return executar
+
+    monkeypatch.setattr(api, "_tarefa_pareceres_por_nota", tarefa_falsa)
+    cliente = TestClient(api.create_app())
+
+    with cliente.stream("GET", "/lancar-pareceres-por-nota-stream",
+                        params={"username": "professor", "password": "senha", "codigo_turma": "T1"}) as resposta:
+        assert resposta.headers["content-type"].startswith("text/event-stream")
+        eventos = [json.loads(linha[len("data: "):]) for linha in resposta.iter_lines()
+                   if linha.startswith("data: ")]
+
+    assert {"type": "log", "message": "turma T1"} in eventos
+    assert eventos[-1] == {"type": "done", "success": True, "message": "Pareceres lançados"}
+
+
+def _tarefa_com_progresso():
+    print("log que não vai para o stream de eventos")
+    progress.iniciar_fase("lancamento")
+    for indice, nome in enumerate(["Ana", "Bruno"], start=1):
+        progress.aluno_iniciado(indice, 2, nome)
+        progress.registrar_campos_escritos(3)
+        progress.aluno_concluido(indice, 2, nome)
+    return True, "ok"
+
+
+def _tipos(eventos):
+    return [e["type"] for e in eventos]
+
+
+def test_eventos_de_progresso_por_sse():
+    job = api.job_manager.submeter("teste", _tarefa_com_progresso)
+    cliente = TestClient(api.create_app())
+
+    with cliente.stream("GET", f"/jobs/{job.id}/events") as resposta:
+        eventos = [json.loads(linha[len("data: "):]) for linha in resposta.iter_lines()
+                   if linha.startswith("data: ")]
+
+    assert _tipos(eventos) == [
+        "phase_started",
+        "student_started", "student_done", "throughput",
+        "student_started", "student_done", "throughput",
+        "phase_finished", "done",
+    ]
+    assert eventos[2]["fields_written"] == 3
+    assert eventos[6]["done"] == eventos[6]["total"] == 2
+    assert eventos[6]["eta_seconds"] == 0
+    assert eventos[7]["phase"] == "lancamento" and eventos[7]["success"]
+
+
+def test_eventos_de_progresso_por_websocket():
+    job = api.job_manager.submeter("teste", _tarefa_com_progresso)
+    cliente = TestClient(api.create_app())
+
+    with cliente.websocket_connect(f"/jobs/{job.id}/ws?logs=true") as websocket:
+        eventos = []
+        while not eventos or eventos[-1]["type"] != "done":
+            eventos.append(websocket.receive_json())
+
+    assert eventos[0] == {"type": "log", "message": "log que não vai para o stream de eventos"}
+    assert _tipos(eventos).count("student_done") == 2
+    assert eventos[-1] == {"type": "done", "success": True, "message": "ok"}
+
+
+def test_websocket_de_job_inexistente():
+    cliente = TestClient(api.create_app())
+
+    with cliente.websocket_connect("/jobs/nao-existe/ws") as websocket:
+        assert websocket.receive_json() == {"type": "error", "message": "Job não encontrado"}
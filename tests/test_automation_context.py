@@ -0,0 +1,52 @@
+"""
+Testes do contexto de automação isolado por job
+"""
+from src.automation_context import AutomationContext, create_automation_context
+
+
+class SeleniumManagerFalso:
+    def __init__(self):
+        self.driver = None
+        self.fechado = False
+
+    def close_driver(self):
+        self.fechado = True
+
+
+class PoolFalso:
+    def __init__(self):
+        self.devolvidos = []
+
+    def checkout(self):
+        return SeleniumManagerFalso()
+
+    def checkin(self, manager):
+        self.devolvidos.append(manager)
+
+
+def test_cada_job_tem_navegador_e_caches_proprios():
+    pool = PoolFalso()
+    primeiro = create_automation_context(pool)
+    segundo = create_automation_context(pool)
+
+    assert primeiro.selenium_manager is not segundo.selenium_manager
+    assert primeiro.helpers is not segundo.helpers
+    assert primeiro.helpers.jsf is not segundo.helpers.jsf
+    assert primeiro.helpers.selenium_manager is primeiro.selenium_manager
+
+
+def test_navegador_volta_ao_pool_ao_sair_do_contexto():
+    pool = PoolFalso()
+    with create_automation_context(pool) as contexto:
+        manager = contexto.selenium_manager
+
+    assert pool.devolvidos == [manager]
+    assert not manager.fechado
+
+
+def test_sem_pool_o_navegador_e_fechado():
+    manager = SeleniumManagerFalso()
+    with AutomationContext(manager):
+        pass
+
+    assert manager.fechado
@@ -0,0 +1,154 @@
+"""
+Testes do pool de navegadores pré-aquecidos com um Chrome falso
+"""
+import threading
+import time
+
+import pytest
+
+from src import selenium_config
+from src.selenium_config import BrowserPool
+
+
+class TrocaJanelaFalsa:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.janela_atual = handle
+
+
+class ChromeFalso:
+    """webdriver.Chrome simulado: janelas, cookies e estado de vida do processo"""
+
+    criados = []
+    _lock = threading.Lock()
+
+    def __init__(self, service=None, options=None):
+        self.vivo = True
+        self.encerrado = False
+        self.window_handles = ["principal"]
+        self.janela_atual = "principal"
+        self.cookies = {"JSESSIONID": "sessao"}
+        self.url = "data:,"
+        self.switch_to = TrocaJanelaFalsa(self)
+        with self._lock:
+            self.criados.append(self)
+
+    @property
+    def current_url(self):
+        if not self.vivo:
+            raise RuntimeError("invalid session id")
+        return self.url
+
+    def maximize_window(self):
+        pass
+
+    def implicitly_wait(self, segundos):
+        pass
+
+    def execute_script(self, script):
+        pass
+
+    def execute_cdp_cmd(self, comando, parametros):
+        self.cookies.clear()
+
+    def close(self):
+        self.window_handles.remove(self.janela_atual)
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.encerrado = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    ChromeFalso.criados = []
+    monkeypatch.setattr(selenium_config, "_obter_caminho_chromedriver", lambda: "chromedriver")
+    monkeypatch.setattr(selenium_config.webdriver, "Chrome", ChromeFalso)
+    pool = BrowserPool(tamanho=2)
+    yield pool
+    pool.encerrar()
+
+
+def aguardar_disponiveis(pool, quantidade):
+    limite = time.time() + 5
+    while (pool._disponiveis.qsize() != quantidade or pool._criando) and time.time() < limite:
+        time.sleep(0.01)
+    assert pool._disponiveis.qsize() == quantidade
+
+
+def test_checkout_usa_navegador_aquecido_e_repoe(pool):
+    pool.iniciar()
+    aguardar_disponiveis(pool, 2)
+    aquecidos = list(ChromeFalso.criados)
+
+    manager = pool.checkout()
+
+    assert manager.driver in aquecidos
+    aguardar_disponiveis(pool, 2)
+    assert len(ChromeFalso.criados) == 3
+
+
+def test_checkin_limpa_e_reaproveita(pool):
+    pool.tamanho = 1
+    pool.iniciar()
+    aguardar_disponiveis(pool, 1)
+    manager = pool.checkout()
+    aguardar_disponiveis(pool, 1)
+    pool.tamanho = 2
+    driver = manager.driver
+    driver.window_handles.append("popup")
+    driver.url = "https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html"
+
+    pool.checkin(manager)
+
+    assert driver.window_handles == ["principal"]
+    assert driver.cookies == {}
+    assert driver.url == "about:blank"
+    assert not driver.encerrado
+    # O navegador devolvido volta para a fila
+    assert pool._disponiveis.qsize() == 2
+    assert [pool.checkout().driver for _ in range(2)][-1] is driver
+
+
+def test_checkin_com_pool_cheio_fecha_navegador(pool):
+    pool.iniciar()
+    aguardar_disponiveis(pool, 2)
+    extra = selenium_config.SeleniumManager()
+    extra.setup_driver()
+    driver = extra.driver
+
+    pool.checkin(extra)
+
+    assert driver.encerrado
+    assert pool._disponiveis.qsize() == 2
+
+
+def test_navegador_morto_e_descartado(pool):
+    pool.iniciar()
+    aguardar_disponiveis(pool, 2)
+    for driver in ChromeFalso.criados:
+        driver.vivo = False
+    mortos = list(ChromeFalso.criados)
+
+    manager = pool.checkout()
+
+    assert manager.driver not in mortos
+    assert manager._is_session_valid()
+    assert all(driver.encerrado for driver in mortos)
+    aguardar_disponiveis(pool, 2)
+
+
+def test_encerrar_fecha_disponiveis_e_nao_repoe(pool):
+    pool.iniciar()
+    aguardar_disponiveis(pool, 2)
+
+    pool.encerrar()
+    manager = pool.checkout()
+    pool.checkin(manager)
+
+    assert all(driver.encerrado for driver in ChromeFalso.criados)
+    assert pool._disponiveis.qsize() == 0
@@ -0,0 +1,129 @@
+"""
+Testes do journal de checkpoint (gravação e retomada)
+"""
+import json
+
+import pytest
+
+from src import checkpoint
+from src.checkpoint import JournalCheckpoint
+
+
+@pytest.fixture
+def abrir_journal(tmp_path):
+    """Abre journals da mesma turma no diretório temporário e fecha ao final"""
+    abertos = []
+
+    def abrir(resume=False):
+        journal = JournalCheckpoint("T1", "TR1", "inteligente", resume=resume, diretorio=str(tmp_path))
+        abertos.append(journal)
+        return journal
+
+    yield abrir
+    for journal in abertos:
+        journal.fechar()
+
+
+def _lancar(journal, nome, sucesso=True, campos=1):
+    journal.iniciar_aluno(nome)
+    for i in range(campos):
+        journal.registrar_campo(f"atitude:{i}", "Sempre")
+    journal.confirmar_aluno(nome, sucesso)
+
+
+def _eventos(journal):
+    with open(journal.caminho, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def test_resume_pula_apenas_confirmados(abrir_journal):
+    journal = abrir_journal()
+    _lancar(journal, "Ana Souza")
+    _lancar(journal, "Bruno Lima", sucesso=False)
+    journal.fechar()
+
+    retomado = abrir_journal(resume=True)
+    assert retomado.aluno_confirmado("Ana Souza")
+    # Comparação ignora caixa e espaços extras
+    assert retomado.aluno_confirmado("  ana   SOUZA ")
+    assert not retomado.aluno_confirmado("Bruno Lima")
+
+
+def test_sem_resume_nao_pula_ninguem(abrir_journal):
+    journal = abrir_journal()
+    _lancar(journal, "Ana Souza")
+    journal.fechar()
+
+    assert not abrir_journal(resume=False).aluno_confirmado("Ana Souza")
+
+
+def test_execucao_sem_resume_reinicia_confirmacoes(abrir_journal):
+    _lancar(abrir_journal(), "Ana Souza")
+    novo = abrir_journal(resume=False)
+    _lancar(novo, "Bruno Lima")
+    novo.fechar()
+
+    retomado = abrir_journal(resume=True)
+    assert not retomado.aluno_confirmado("Ana Souza")
+    assert retomado.aluno_confirmado("Bruno Lima")
+
+
+def test_resume_acumula_confirmacoes(abrir_journal):
+    _lancar(abrir_journal(), "Ana Souza")
+    segunda = abrir_journal(resume=True)
+    _lancar(segunda, "Bruno Lima")
+    segunda.fechar()
+
+    terceira = abrir_journal(resume=True)
+    assert terceira.confirmados == {"ANA SOUZA", "BRUNO LIMA"}
+
+
+def test_linha_truncada_e_ignorada(abrir_journal):
+    journal = abrir_journal()
+    _lancar(journal, "Ana Souza")
+    journal.fechar()
+    # Processo morto no meio da escrita do próximo registro
+    with open(journal.caminho, "a", encoding="utf-8") as f:
+        f.write('{"evento": "aluno_confirmado", "alu')
+
+    retomado = abrir_journal(resume=True)
+    assert retomado.confirmados == {"ANA SOUZA"}
+    _lancar(retomado, "Bruno Lima")
+    retomado.fechar()
+    assert abrir_journal(resume=True).confirmados == {"ANA SOUZA", "BRUNO LIMA"}
+
+
+def test_confirmacao_registra_campos_do_aluno(abrir_journal):
+    journal = abrir_journal()
+    _lancar(journal, "Ana Souza", campos=3)
+    journal.fechar()
+
+    confirmacao = [e for e in _eventos(journal) if e["evento"] == "aluno_confirmado"][0]
+    assert confirmacao["campos"] == 3
+
+
+def test_fsync_apenas_nos_limites_de_retomada(abrir_journal, monkeypatch):
+    sincronizados = []
+    monkeypatch.setattr(checkpoint.os, "fsync", lambda fd: sincronizados.append(fd))
+    journal = abrir_journal()
+    _lancar(journal, "Ana Souza", campos=5)
+    _lancar(journal, "Bruno Lima", sucesso=False, campos=2)
+    assert len(sincronizados) == 2
+
+
+def test_funcoes_de_modulo_usam_journal_do_contexto(tmp_path, monkeypatch):
+    monkeypatch.setenv("SGN_CHECKPOINT_DIR", str(tmp_path))
+    # Fora de um journal: nada é gravado
+    checkpoint.iniciar_aluno("Ana Souza")
+    checkpoint.confirmar_aluno("Ana Souza")
+    assert not checkpoint.aluno_confirmado("Ana Souza")
+
+    with checkpoint.journal_checkpoint("T1", "TR1", "simples") as journal:
+        assert checkpoint.journal_atual() is journal
+        checkpoint.iniciar_aluno("Ana Souza")
+        checkpoint.registrar_campo("habilidade:0", "A")
+        checkpoint.confirmar_aluno("Ana Souza")
+    assert checkpoint.journal_atual() is None
+
+    with checkpoint.journal_checkpoint("T1", "TR1", "simples", resume=True):
+        assert checkpoint.aluno_confirmado("Ana Souza")
@@ -0,0 +1,192 @@
+"""
+Testes do controle de concorrência (AIMD), do token bucket e do disjuntor
+"""
+import threading
+import time
+
+import pytest
+
+from src.concurrency import CircuitoAberto, ControladorAIMD, DisjuntorCircuito, LimitadorTaxa, limitador_do_host
+from src.jsf_client import JsfClient
+
+
+def _requisicoes(controlador, quantidade, latencia=0.0, sobrecarga=False):
+    """Executa requisições sequenciais com o resultado informado"""
+    for _ in range(quantidade):
+        with controlador.requisicao() as req:
+            req.latencia = latencia
+            req.sobrecarga = sobrecarga
+
+
+class TestControladorAIMD:
+    def test_limite_inicial_respeita_teto(self):
+        assert ControladorAIMD(limite_inicial=2, limite_max=8).limite == 2
+        assert ControladorAIMD(limite_inicial=10, limite_max=4).limite == 4
+
+    def test_aumento_aditivo_com_respostas_saudaveis(self):
+        controlador = ControladorAIMD(limite_inicial=2, limite_max=8)
+        # +1/limite por resposta saudável: 2 → 2.5 → 2.9 → 3.2
+        _requisicoes(controlador, 2)
+        assert controlador.limite == 2
+        _requisicoes(controlador, 1)
+        assert controlador.limite == 3
+        _requisicoes(controlador, 3)
+        assert controlador.limite == 4
+
+    def test_nao_passa_do_teto(self):
+        controlador = ControladorAIMD(limite_inicial=2, limite_max=3)
+        _requisicoes(controlador, 50)
+        assert controlador.limite == 3
+
+    def test_reducao_multiplicativa_na_sobrecarga(self):
+        controlador = ControladorAIMD(limite_inicial=8, limite_max=8)
+        _requisicoes(controlador, 1, sobrecarga=True)
+        assert controlador.limite == 4
+        assert controlador.sobrecargas == 1
+
+    def test_rajada_de_falhas_reduz_uma_vez(self):
+        controlador = ControladorAIMD(limite_inicial=8, limite_max=8, intervalo_reducao=60)
+        _requisicoes(controlador, 5, sobrecarga=True)
+        assert controlador.limite == 4
+
+    def test_piso_do_limite(self):
+        controlador = ControladorAIMD(limite_inicial=2, limite_min=1, limite_max=8, intervalo_reducao=0)
+        _requisicoes(controlador, 10, sobrecarga=True)
+        assert controlador.limite == 1
+
+    def test_excecao_conta_como_sobrecarga(self):
+        controlador = ControladorAIMD(limite_inicial=4, limite_max=8)
+        with pytest.raises(TimeoutError):
+            with controlador.requisicao():
+                raise TimeoutError()
+        assert controlador.limite == 2
+        assert controlador.em_voo == 0
+
+    def test_latencia_acima_do_alvo_nao_aumenta(self):
+        controlador = ControladorAIMD(limite_inicial=2, limite_max=8, latencia_alvo=1.0)
+        _requisicoes(controlador, 10, latencia=5.0)
+        assert controlador.limite == 2
+        assert controlador.sucessos == 10
+
+    def test_espera_fora_da_requisicao_nao_conta_como_latencia(self):
+        # Espera do token bucket/disjuntor dentro do bloco: vale a latência informada
+        controlador = ControladorAIMD(limite_inicial=2, limite_max=8, latencia_alvo=0.01)
+        for _ in range(3):
+            with controlador.requisicao() as req:
+                time.sleep(0.05)
+                req.latencia = 0.001
+        assert controlador.limite == 3
+
+    def test_sem_latencia_informada_usa_duracao_do_bloco(self):
+        controlador = ControladorAIMD(limite_inicial=2, limite_max=8, latencia_alvo=0.01)
+        for _ in range(3):
+            with controlador.requisicao():
+                time.sleep(0.05)
+        assert controlador.limite == 2
+
+    def test_limita_requisicoes_em_voo(self):
+        controlador = ControladorAIMD(limite_inicial=2, limite_max=2)
+        maximo = []
+        lock = threading.Lock()
+
+        def requisicao():
+            with controlador.requisicao():
+                with lock:
+                    maximo.append(controlador.em_voo)
+                time.sleep(0.02)
+
+        threads = [threading.Thread(target=requisicao) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(maximo) <= 2
+        assert controlador.em_voo == 0
+
+    def test_historico_registra_mudancas(self):
+        controlador = ControladorAIMD(limite_inicial=2, limite_max=8)
+        _requisicoes(controlador, 3)
+        motivos = [mudanca["motivo"] for mudanca in controlador.metricas()["historico"]]
+        assert motivos == ["inicial", "saudavel"]
+
+
+class TestLimitadorTaxa:
+    def test_rajada_sem_espera(self):
+        limitador = LimitadorTaxa(taxa=1.0, rajada=3)
+        assert [limitador.reservar() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_esperas_enfileiradas_depois_da_rajada(self):
+        limitador = LimitadorTaxa(taxa=10.0, rajada=1)
+        assert limitador.reservar() == 0.0
+        primeira = limitador.reservar()
+        segunda = limitador.reservar()
+        assert primeira == pytest.approx(0.1, abs=0.02)
+        assert segunda == pytest.approx(0.2, abs=0.02)
+
+    def test_jobs_compartilham_o_limitador_do_host(self):
+        primeiro, segundo = JsfClient(lambda: None), JsfClient(lambda: None)
+        assert primeiro.limitador is segundo.limitador
+        assert primeiro.limitador is limitador_do_host("sgn.sesisenai.org.br")
+        assert limitador_do_host("outro.host") is not primeiro.limitador
+
+
+class TestDisjuntorCircuito:
+    def test_abre_apos_falhas_seguidas(self):
+        disjuntor = DisjuntorCircuito("sgn", falhas_para_abrir=3)
+        disjuntor.registrar_falha()
+        disjuntor.registrar_falha()
+        assert disjuntor.fechado
+        disjuntor.registrar_falha()
+        assert disjuntor.estado == DisjuntorCircuito.ABERTO
+
+    def test_sucesso_zera_falhas(self):
+        disjuntor = DisjuntorCircuito("sgn", falhas_para_abrir=2)
+        disjuntor.registrar_falha()
+        disjuntor.registrar_sucesso()
+        disjuntor.registrar_falha()
+        assert disjuntor.fechado
+
+    def test_fechado_nao_sonda(self):
+        disjuntor = DisjuntorCircuito("sgn")
+        sondas = []
+        disjuntor.aguardar(lambda: sondas.append(1) or True)
+        assert sondas == []
+
+    def test_sonda_bem_sucedida_fecha(self):
+        disjuntor = DisjuntorCircuito("sgn", falhas_para_abrir=1, espera=0.01)
+        disjuntor.registrar_falha()
+        disjuntor.aguardar(lambda: True)
+        assert disjuntor.fechado
+
+    def test_sonda_com_falha_dobra_a_espera(self):
+        disjuntor = DisjuntorCircuito("sgn", falhas_para_abrir=1, espera=0.01, espera_max=1.0)
+        disjuntor.registrar_falha()
+        respostas = iter([False, True])
+        disjuntor.aguardar(lambda: next(respostas))
+        assert disjuntor.fechado
+        # A espera volta ao valor inicial depois de fechar
+        assert disjuntor.metricas()["espera"] == 0.01
+
+    def test_indisponibilidade_longa_falha_na_hora(self):
+        disjuntor = DisjuntorCircuito("sgn", falhas_para_abrir=1, espera=10, indisponibilidade_max=0)
+        disjuntor.registrar_falha()
+        with pytest.raises(CircuitoAberto):
+            disjuntor.aguardar(lambda: True)
+
+    def test_uma_unica_thread_sonda(self):
+        disjuntor = DisjuntorCircuito("sgn", falhas_para_abrir=1, espera=0.01)
+        disjuntor.registrar_falha()
+        sondas = []
+
+        def sonda():
+            sondas.append(threading.get_ident())
+            time.sleep(0.05)
+            return True
+
+        threads = [threading.Thread(target=disjuntor.aguardar, args=(sonda,)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(sondas) == 1
+        assert disjuntor.fechado
@@ -0,0 +1,176 @@
+"""
+Testes do subsistema de jobs (fila, execução, resultado, limpeza e cancelamento)
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.cancellation import JobCancelado, TokenCancelamento, cancelamento_do_job, verificar_cancelamento
+from src.jobs import JobManager
+from src.models import JobStatus
+
+
+@pytest.fixture
+def gerenciador():
+    gerenciador = JobManager(max_workers=1)
+    yield gerenciador
+    gerenciador._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_ciclo_de_vida_com_sucesso(gerenciador):
+    limpezas = []
+
+    def tarefa():
+        print("lançando conceitos")
+        return True, "ok", {"alunos": 3}
+
+    job = gerenciador.submeter("teste", tarefa, ao_finalizar=lambda: limpezas.append(1))
+    resultado = asyncio.run(gerenciador.aguardar(job))
+
+    assert job.status == JobStatus.CONCLUIDO
+    assert (resultado.success, resultado.message, resultado.dados) == (True, "ok", {"alunos": 3})
+    assert "lançando conceitos" in resultado.logs
+    assert job.iniciado_em and job.finalizado_em >= job.iniciado_em
+    assert limpezas == [1]
+    assert gerenciador.obter(job.id) is job
+
+
+def test_falha_e_excecao_da_tarefa(gerenciador):
+    def explode():
+        raise RuntimeError("navegador caiu")
+
+    falhou = gerenciador.submeter("teste", lambda: (False, "turma não encontrada"))
+    erro = gerenciador.submeter("teste", explode)
+    asyncio.run(gerenciador.aguardar(erro))
+
+    assert falhou.status == JobStatus.FALHOU
+    assert falhou.resultado.message == "turma não encontrada"
+    assert erro.status == JobStatus.FALHOU
+    assert erro.resultado.message == "Erro na API: navegador caiu"
+
+
+def test_fila_e_status(gerenciador):
+    liberar = threading.Event()
+    ocupando = gerenciador.submeter("teste", lambda: (liberar.wait(5), "ok"))
+    esperando = gerenciador.submeter("teste", lambda: (True, "ok"))
+    try:
+        status = gerenciador.status(esperando)
+        assert status.status == JobStatus.PENDENTE
+        assert status.posicao_fila == 1
+    finally:
+        liberar.set()
+    asyncio.run(gerenciador.aguardar(esperando))
+
+    assert ocupando.status == JobStatus.CONCLUIDO
+    assert gerenciador.posicao_fila(esperando) is None
+    assert gerenciador.status(esperando).message == "ok"
+
+
+def test_jobs_finalizados_expiram(gerenciador):
+    gerenciador.retencao_segundos = 0
+    job = gerenciador.submeter("teste", lambda: (True, "ok"))
+    asyncio.run(gerenciador.aguardar(job))
+    job.finalizado_em -= 1
+
+    gerenciador._limpar_jobs_antigos()
+
+    assert gerenciador.obter(job.id) is None
+
+
+def test_cancelar_job_pendente(gerenciador):
+    liberar = threading.Event()
+    limpezas = []
+    executou = []
+    ocupando = gerenciador.submeter("teste", lambda: (liberar.wait(5), "ok"))
+    pendente = gerenciador.submeter("teste", lambda: executou.append(1) or (True, "ok"),
+                                    ao_finalizar=lambda: limpezas.append(1))
+
+    try:
+        assert gerenciador.cancelar(pendente)
+    finally:
+        liberar.set()
+    asyncio.run(gerenciador.aguardar(ocupando))
+
+    assert pendente.status == JobStatus.CANCELADO
+    assert pendente.resultado.message == "Job cancelado antes de iniciar"
+    assert gerenciador.posicao_fila(pendente) is None
+    assert limpezas == [1]
+    assert executou == []
+
+
+def test_cancelar_job_em_execucao(gerenciador):
+    iniciou = threading.Event()
+    limpezas = []
+
+    def tarefa():
+        iniciou.set()
+        for _ in range(500):
+            verificar_cancelamento()
+            time.sleep(0.01)
+        return True, "não deveria terminar"
+
+    job = gerenciador.submeter("teste", tarefa, ao_finalizar=lambda: limpezas.append(1))
+    assert iniciou.wait(5)
+    assert gerenciador.cancelar(job)
+    asyncio.run(gerenciador.aguardar(job))
+
+    assert job.status == JobStatus.CANCELADO
+    assert job.resultado.message == "Job cancelado pelo usuário"
+    assert limpezas == [1]
+    # Já terminado: nada a cancelar
+    assert not gerenciador.cancelar(job)
+
+
+def test_verificar_cancelamento_fora_de_job():
+    token = TokenCancelamento()
+    token.cancelar()
+
+    verificar_cancelamento()
+    with cancelamento_do_job(token):
+        with pytest.raises(JobCancelado):
+            verificar_cancelamento()
+    verificar_cancelamento()
+
+
+def test_acompanhar_entrega_historico_e_linhas_novas(gerenciador):
+    imprimiu = threading.Event()
+    continuar = threading.Event()
+
+    def tarefa():
+        print("antes de assinar")
+        imprimiu.set()
+        continuar.wait(5)
+        print("depois de assinar")
+        return True, "ok"
+
+    job = gerenciador.submeter("teste", tarefa)
+    assert imprimiu.wait(5)
+
+    async def acompanhar():
+        itens = []
+        async for item in job.acompanhar(intervalo_heartbeat=5):
+            itens.append(item)
+            continuar.set()
+        return itens
+
+    assert asyncio.run(acompanhar()) == [("log", "antes de assinar"), ("log", "depois de assinar")]
+    assert job.finalizado
+
+
+def test_acompanhar_gera_heartbeat_sem_itens(gerenciador):
+    def tarefa():
+        time.sleep(0.3)
+        print("fim")
+        return True, "ok"
+
+    job = gerenciador.submeter("teste", tarefa)
+
+    async def acompanhar():
+        return [item async for item in job.acompanhar(intervalo_heartbeat=0.05)]
+
+    itens = asyncio.run(acompanhar())
+
+    assert None in itens
+    assert itens[-1] == ("log", "fim")
@@ -0,0 +1,149 @@
+"""
+Testes do cliente assíncrono sobre respostas reais do HAR
+
+O SGN é simulado por um transporte httpx: cada GET do diário abre uma view
+com ViewState próprio, a seleção do trimestre devolve a tabela gravada e as
+requisições da modal devolvem a modal gravada. O servidor anota quantas
+requisições estão em andamento, no total e por view.
+"""
+import asyncio
+import itertools
+import re
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from src import jsf_async
+from src.concurrency import ControladorAIMD, LimitadorTaxa
+from src.partial_response import CAMPO_VIEWSTATE
+from src.sgn_automation_helpers import SGNAutomationHelpers
+from tests.conftest import ler_respostas_har
+
+URL_DIARIO = "https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html?idDiario=123456"
+PADRAO_VIEWSTATE = re.compile(r'(name="javax\.faces\.ViewState"[^>]*value=")([^"]*)(")')
+
+
+class ElementoFalso:
+    def get_attribute(self, nome):
+        return "vs-navegador"
+
+
+class DriverFalso:
+    current_url = URL_DIARIO
+
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": "sessao", "domain": "sgn.sesisenai.org.br", "path": "/"}]
+
+    def execute_script(self, script):
+        return "Mozilla/5.0"
+
+    def find_element(self, by, seletor):
+        return ElementoFalso()
+
+
+class SeleniumManagerFalso:
+    def get_driver(self):
+        return DriverFalso()
+
+
+class ServidorFalso:
+    """SGN simulado: views abertas, trimestre selecionado e concorrência observada"""
+
+    def __init__(self, pagina, resposta_tabela, resposta_modal):
+        self.pagina = pagina
+        self.resposta_tabela = resposta_tabela
+        self.resposta_modal = resposta_modal
+        self.contador = itertools.count(1)
+        self.trimestre_selecionado = {"vs-navegador"}
+        self.em_andamento = 0
+        self.max_em_andamento = 0
+        self.por_view = {}
+        self.max_por_view = 0
+        self.modais_sem_trimestre = 0
+
+    async def __call__(self, request):
+        self.em_andamento += 1
+        self.max_em_andamento = max(self.max_em_andamento, self.em_andamento)
+        try:
+            if request.method == "GET":
+                await asyncio.sleep(0.01)
+                view = f"vs-{next(self.contador)}"
+                return httpx.Response(200, text=PADRAO_VIEWSTATE.sub(rf"\g<1>{view}\g<3>", self.pagina, count=1))
+
+            dados = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+            view = dados[CAMPO_VIEWSTATE]
+            self.por_view[view] = self.por_view.get(view, 0) + 1
+            self.max_por_view = max(self.max_por_view, self.por_view[view])
+            try:
+                await asyncio.sleep(0.01)
+                if dados["javax.faces.source"].endswith("mediasConceito"):
+                    self.trimestre_selecionado.add(view)
+                    return httpx.Response(200, text=self.resposta_tabela)
+                if view not in self.trimestre_selecionado:
+                    self.modais_sem_trimestre += 1
+                return httpx.Response(200, text=self.resposta_modal)
+            finally:
+                self.por_view[view] -= 1
+        finally:
+            self.em_andamento -= 1
+
+
+@pytest.fixture(scope="module")
+def respostas_conceito():
+    entradas = ler_respostas_har("requisicao conceito.har")
+    tabela = next(t for t in entradas if "<partial-response" in t and "linkEditarAtitudes" in t)
+    modal = next(t for t in entradas if "observacaoAtitude_input" in t)
+    return tabela, modal
+
+
+@pytest.fixture
+def servidor(monkeypatch, pagina_conceitos, respostas_conceito):
+    servidor = ServidorFalso(pagina_conceitos, *respostas_conceito)
+    cliente_original = httpx.AsyncClient
+
+    def cliente_com_servidor(**kwargs):
+        return cliente_original(transport=httpx.MockTransport(servidor), **kwargs)
+
+    monkeypatch.setattr(jsf_async.httpx, "AsyncClient", cliente_com_servidor)
+    monkeypatch.setenv("SGN_VIEWS_POR_SESSAO", "4")
+    return servidor
+
+
+@pytest.fixture
+def helpers():
+    helpers = SGNAutomationHelpers(SeleniumManagerFalso())
+    helpers.jsf.limitador = LimitadorTaxa(taxa=1000, rajada=100)
+    helpers.concorrencia = ControladorAIMD(limite_inicial=4, limite_max=4)
+    return helpers
+
+
+def test_modais_dos_alunos_em_views_proprias(servidor, helpers):
+    estatisticas = {}
+    valores = helpers._ler_modais_alunos_via_http(list(range(12)), "vs-navegador", "TR1",
+                                                  estatisticas=estatisticas)
+
+    assert sorted(valores) == list(range(12))
+    assert all(len(v["atitudes"]) == 119 and len(v["habilidades"]) == 10 for v in valores.values())
+    assert estatisticas["views"] == 4
+    # Leituras em paralelo, nunca duas sequências na mesma view
+    assert servidor.max_em_andamento > 1
+    assert servidor.max_por_view == 1
+    # Views extras só são usadas depois de selecionado o trimestre
+    assert servidor.modais_sem_trimestre == 0
+    # Views extras não alteram o ViewState acompanhado do navegador
+    assert helpers.jsf.acompanha_view({CAMPO_VIEWSTATE: "vs-navegador"})
+    assert not helpers.jsf.acompanha_view({CAMPO_VIEWSTATE: "vs-1"})
+
+
+def test_requisicoes_em_voo_no_limite_aimd(servidor, helpers):
+    helpers.concorrencia = ControladorAIMD(limite_inicial=2, limite_min=2, limite_max=2)
+    sequencias = [helpers._payloads_modal_aluno(i, "vs-navegador") for i in range(8)]
+
+    resultados = jsf_async.executar_leituras(helpers.jsf, sequencias, "vs-navegador", views_extras=3,
+                                             concorrencia=helpers.concorrencia)
+
+    assert not any(isinstance(r, Exception) for r in resultados)
+    assert servidor.max_em_andamento == 2
+    assert helpers.concorrencia.em_voo == 0
+    assert helpers.concorrencia.sucessos == 3 + 16
@@ -0,0 +1,211 @@
+"""
+Testes do cliente partial/ajax e do acompanhamento do ViewState contra as
+requisições gravadas nos HAR
+
+A sessão HTTP do cliente recebe um adaptador que devolve, em ordem, as
+respostas gravadas e anota cada requisição enviada.
+"""
+import json
+import os
+import re
+from urllib.parse import parse_qsl
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from src.concurrency import DisjuntorCircuito, LimitadorTaxa
+from src.jsf_client import ORIGEM_SGN, JsfClient, RastreadorViewState
+from src.partial_response import CAMPO_VIEWSTATE
+from tests.conftest import PASTA_HAR
+
+URL_DIARIO = "https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html?idDiario=123456"
+PADRAO_VIEWSTATE = re.compile(r'(name="javax\.faces\.ViewState"[^>]*value=")([^"]*)(")')
+
+
+def ler_har(nome):
+    """(payload, resposta) de cada POST gravado em um HAR de requisicoes/"""
+    with open(os.path.join(PASTA_HAR, nome), encoding="utf-8") as f:
+        har = json.load(f)
+    return [
+        ({p["name"]: p["value"] for p in e["request"]["postData"]["params"]},
+         e["response"]["content"].get("text") or "")
+        for e in har["log"]["entries"] if e["request"]["method"] == "POST"
+    ]
+
+
+class AdaptadorHar(BaseAdapter):
+    """Devolve as respostas gravadas em ordem e anota as requisições"""
+
+    def __init__(self, respostas, status=200):
+        super().__init__()
+        self.respostas = list(respostas)
+        self.status = status
+        self.enviadas = []
+
+    def send(self, request, **kwargs):
+        self.enviadas.append(request)
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = self.respostas.pop(0).encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class DriverFalso:
+    def __init__(self):
+        self.current_url = URL_DIARIO
+        self.copias = 0
+
+    def get_cookies(self):
+        self.copias += 1
+        return [{"name": "JSESSIONID", "value": "sessao", "domain": "sgn.sesisenai.org.br", "path": "/"}]
+
+    def execute_script(self, script):
+        return "Mozilla/5.0 (navegador do job)"
+
+
+@pytest.fixture(scope="module")
+def gravadas():
+    return ler_har("aplicando nota 2.har")
+
+
+@pytest.fixture
+def driver():
+    return DriverFalso()
+
+
+@pytest.fixture
+def jsf(driver):
+    jsf = JsfClient(lambda: driver, tamanho_pool=3,
+                    limitador=LimitadorTaxa(taxa=1000, rajada=100), disjuntor=DisjuntorCircuito("teste"))
+    yield jsf
+    jsf.fechar()
+
+
+def test_sessao_com_pool_keep_alive(jsf):
+    adaptador = jsf.session.get_adapter(ORIGEM_SGN)
+
+    assert isinstance(adaptador, HTTPAdapter)
+    assert adaptador._pool_maxsize == 3
+    assert adaptador.max_retries.total == 0
+    assert jsf.session.headers["Faces-Request"] == "partial/ajax"
+
+
+def test_sincronizar_copia_estado_do_navegador(jsf, driver):
+    url = jsf.sincronizar()
+    jsf.sincronizar()
+
+    assert url == URL_DIARIO.split("?")[0]
+    assert jsf.url_pagina == URL_DIARIO
+    assert jsf.cookies() == {"JSESSIONID": "sessao"}
+    assert jsf.session.headers["User-Agent"] == "Mozilla/5.0 (navegador do job)"
+    assert jsf.session.headers["Referer"] == URL_DIARIO
+    # A cópia é reaproveitada até expirar ou ser forçada
+    assert driver.copias == 1
+    jsf.sincronizar(forcar=True)
+    assert driver.copias == 2
+
+
+def test_payload_igual_ao_gravado(gravadas):
+    payload, _ = gravadas[2]
+    campo = next(nome[:-len("_input")] for nome in payload if nome.endswith("_input"))
+
+    montado = JsfClient.montar_payload(
+        payload["javax.faces.source"],
+        render=payload["javax.faces.partial.render"],
+        values={f"{campo}_focus": "", f"{campo}_input": payload[f"{campo}_input"]},
+        viewstate=payload[CAMPO_VIEWSTATE],
+        evento="valueChange",
+    )
+
+    assert montado == payload
+
+
+def test_posts_do_har_na_mesma_sessao(jsf, gravadas):
+    adaptador = AdaptadorHar(resposta for _, resposta in gravadas)
+    jsf.session.mount("https://", adaptador)
+
+    respostas = [jsf.post(payload) for payload, _ in gravadas]
+
+    assert [r.text for r in respostas] == [resposta for _, resposta in gravadas]
+    assert all(r.duracao >= 0 for r in respostas)
+    assert [dict(parse_qsl(r.body, keep_blank_values=True)) for r in adaptador.enviadas] == \
+        [payload for payload, _ in gravadas]
+    for enviada in adaptador.enviadas:
+        assert enviada.url == URL_DIARIO.split("?")[0]
+        assert enviada.headers["Faces-Request"] == "partial/ajax"
+        assert enviada.headers["Cookie"] == "JSESSIONID=sessao"
+
+
+def test_viewstate_das_respostas_do_har():
+    rastreador = RastreadorViewState()
+    for nome in ("aplicando nota 2.har", "requisicao atitude.har", "requisicao conceito.har"):
+        for payload, resposta in ler_har(nome):
+            if "<partial-response" in resposta:
+                assert rastreador.atualizar_da_resposta(resposta) == payload[CAMPO_VIEWSTATE]
+                assert rastreador.atual == payload[CAMPO_VIEWSTATE]
+
+    # Respostas sem ViewState não apagam o conhecido
+    assert rastreador.atualizar_da_resposta("") is None
+    assert rastreador.atual is not None
+
+
+def test_viewstate_acompanhado_pelas_respostas(driver, gravadas):
+    leituras_dom = []
+
+    def ler_viewstate_dom():
+        leituras_dom.append(1)
+        return "vs-do-dom"
+
+    jsf = JsfClient(lambda: driver, ler_viewstate_dom,
+                    limitador=LimitadorTaxa(taxa=1000, rajada=100), disjuntor=DisjuntorCircuito("teste"))
+    jsf.session.mount("https://", AdaptadorHar(resposta for _, resposta in gravadas))
+    recebido = gravadas[0][0][CAMPO_VIEWSTATE]
+
+    assert jsf.obter_viewstate() == "vs-do-dom"
+    for payload, _ in gravadas:
+        jsf.post(dict(payload, **{CAMPO_VIEWSTATE: jsf.obter_viewstate()}))
+
+    assert jsf.obter_viewstate() == recebido
+    assert len(leituras_dom) == 1
+
+    # Navegação de página inteira: o DOM é lido de novo uma vez
+    jsf.invalidar()
+    assert jsf.obter_viewstate() == "vs-do-dom"
+    assert len(leituras_dom) == 2
+    jsf.fechar()
+
+
+def test_views_extras_nao_alteram_o_viewstate_acompanhado(jsf, gravadas, pagina_conceitos):
+    payload, resposta = gravadas[0]
+    jsf.viewstate.atualizar("vs-navegador")
+    pagina_extra = PADRAO_VIEWSTATE.sub(r"\g<1>vs-extra\g<3>", pagina_conceitos, count=1)
+    pagina_navegador = PADRAO_VIEWSTATE.sub(r"\g<1>vs-navegador\g<3>", pagina_conceitos, count=1)
+
+    assert jsf.registrar_view(pagina_navegador) is None
+    assert jsf.registrar_view(pagina_extra) == "vs-extra"
+    jsf.session.mount("https://", AdaptadorHar([resposta]))
+    jsf.post(dict(payload, **{CAMPO_VIEWSTATE: "vs-extra"}))
+
+    assert jsf.viewstate.atual == "vs-navegador"
+    assert jsf.acompanha_view({CAMPO_VIEWSTATE: "vs-navegador"})
+    assert not jsf.acompanha_view({CAMPO_VIEWSTATE: "vs-extra"})
+    # Depois de uma navegação as views extras antigas deixam de existir
+    jsf.invalidar()
+    assert jsf.acompanha_view({CAMPO_VIEWSTATE: "vs-extra"})
+
+
+def test_resposta_de_erro_nao_altera_viewstate(jsf, gravadas):
+    payload, resposta = gravadas[0]
+    jsf.viewstate.atualizar("vs-navegador")
+    jsf.session.mount("https://", AdaptadorHar([resposta], status=500))
+
+    jsf.post(payload)
+
+    assert jsf.viewstate.atual == "vs-navegador"
@@ -0,0 +1,67 @@
+"""
+Testes do roteamento de prints para o canal de log de cada job
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.log_capture import CanalLog, canal_atual, canal_de_log, submeter_com_contexto
+
+
+def test_jobs_simultaneos_nao_misturam_logs():
+    canais = {"A": CanalLog(), "B": CanalLog()}
+    barreira = threading.Barrier(2)
+
+    def job(nome):
+        with canal_de_log(canais[nome]):
+            barreira.wait(5)
+            for i in range(200):
+                print(f"{nome} aluno {i}")
+
+    threads = [threading.Thread(target=job, args=(nome,)) for nome in canais]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for nome, canal in canais.items():
+        assert canal.obter_linhas() == [f"{nome} aluno {i}" for i in range(200)]
+    assert canal_atual() is None
+
+
+def test_threads_auxiliares_escrevem_no_canal_do_job():
+    canal = CanalLog()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with canal_de_log(canal):
+            futures = [submeter_com_contexto(executor, print, f"atitude {i}") for i in range(8)]
+            for future in futures:
+                future.result()
+            # Sem o contexto a thread do pool não conhece o canal
+            executor.submit(print, "fora do job").result()
+
+    assert sorted(canal.obter_linhas()) == sorted(f"atitude {i}" for i in range(8))
+
+
+def test_linha_incompleta_por_thread_e_descarregada():
+    canal = CanalLog()
+    with canal_de_log(canal):
+        print("processando", end="")
+        auxiliar = threading.Thread(target=lambda: canal.escrever("outra thread\n"))
+        auxiliar.start()
+        auxiliar.join()
+        print("... ok", end="")
+
+    assert canal.obter_linhas() == ["outra thread", "processando... ok"]
+
+
+def test_assinante_recebe_historico_e_linhas_novas():
+    canal = CanalLog()
+    canal.adicionar("antes")
+    recebidas = []
+
+    historico = canal.assinar(recebidas.append)
+    canal.adicionar("depois")
+    canal.cancelar_assinatura(recebidas.append)
+    canal.adicionar("sem assinante")
+
+    assert historico == ["antes"]
+    assert recebidas == ["depois"]
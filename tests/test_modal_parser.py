@@ -0,0 +1,71 @@
+"""
+Testes dos leitores da modal e da tabela de conceitos sobre páginas e HAR reais
+"""
+import pytest
+
+from src.modal_parser import (
+    ler_cabecalhos_conceitos,
+    ler_matriz_conceitos,
+    ler_modal_conceitos,
+    ler_selects,
+)
+
+ATITUDE_0 = "formAtitudes:panelAtitudes:dataTableAtitudes:0:observacaoAtitude"
+
+
+def test_selects_da_pagina(pagina_modal):
+    selects = ler_selects(pagina_modal)
+    atitude = selects[ATITUDE_0]
+    assert atitude["selecionado"] == "Às vezes"
+    assert not atitude["desabilitado"]
+    assert ("Não conseguiu observar", "Não conseguiu observar") in atitude["opcoes"]
+    assert atitude["opcoes"][0] == ("", "Selecione")
+
+
+def test_modal_da_pagina(pagina_modal):
+    modal = ler_modal_conceitos(pagina_modal)
+    assert modal["atitudes"] == {0: "Às vezes", 1: "Às vezes", 2: "Às vezes"}
+    assert modal["habilidades"] == [{
+        "indice": 0,
+        "habilidade": "H1 - Distinguir arquitetura de banco de dados de acordo com aplicação",
+        "valor": "B",
+    }]
+
+
+def test_modal_do_formulario_igual_a_pagina(pagina_modal):
+    inicio = pagina_modal.index('<form id="formAtitudes"')
+    formulario = pagina_modal[inicio:pagina_modal.index("</form>", inicio) + len("</form>")]
+    assert ler_modal_conceitos(formulario) == ler_modal_conceitos(pagina_modal)
+
+
+def test_modal_da_resposta_partial(respostas_aplicando_nota):
+    resposta = max((t for t in respostas_aplicando_nota if "observacaoAtitude_input" in t), key=len)
+    modal = ler_modal_conceitos(resposta)
+    assert len(modal["atitudes"]) == 119
+    assert set(modal["atitudes"].values()) == {"Raramente"}
+    valores = {h["indice"]: h["valor"] for h in modal["habilidades"]}
+    assert len(valores) == 10
+    # Habilidade sem opção selecionada não herda o valor do select seguinte
+    assert valores[5] == ""
+    assert valores[6] == "A"
+    assert modal["habilidades"][0]["habilidade"].startswith("H1 -")
+
+
+@pytest.mark.parametrize("texto", ["", None, "<partial-response></partial-response>"])
+def test_modal_ausente(texto):
+    assert ler_modal_conceitos(texto) == {"atitudes": {}, "habilidades": []}
+
+
+def test_matriz_de_conceitos(pagina_conceitos):
+    matriz = ler_matriz_conceitos(pagina_conceitos)
+    assert len(matriz) == 40
+    assert matriz["0"][0] == {"valor": "B", "desabilitado": False}
+    assert matriz["0"][1] == {"valor": "", "desabilitado": False}
+
+
+def test_cabecalhos_de_conceitos(pagina_conceitos):
+    cabecalhos = ler_cabecalhos_conceitos(pagina_conceitos)
+    assert [c["identificador"] for c in cabecalhos][:4] == ["AV1", "RP1", "CF", "SA"]
+    assert [c["coluna"] for c in cabecalhos] == list(range(len(cabecalhos)))
+    assert cabecalhos[0]["tooltip"].startswith("14/07/2025 - Avaliação 01")
+    assert cabecalhos[2]["tooltip"] == ""
@@ -0,0 +1,84 @@
+"""
+Testes da leitura das respostas partial/ajax (HAR reais e respostas de erro)
+"""
+import threading
+
+from src.partial_response import RespostaParcial, analisar_resposta
+
+REDIRECT_500 = ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<partial-response><redirect url="/errors/500.html"></redirect></partial-response>')
+REDIRECT_LOGIN = ('<?xml version="1.0" encoding="UTF-8"?>'
+                  '<partial-response><redirect url="/login.html"></redirect></partial-response>')
+
+
+def test_respostas_do_har(respostas_aplicando_nota):
+    for texto in respostas_aplicando_nota:
+        resposta = RespostaParcial(texto)
+        assert resposta.valida
+        assert resposta.viewstate
+        assert "sgnPrimeMessagesAutoUpdate" in resposta.updates
+        # O ViewState não aparece entre os updates de componentes
+        assert not any("ViewState" in update_id for update_id in resposta.updates)
+        assert not resposta.erro_servidor
+        assert not resposta.sessao_expirada
+
+
+def test_conteudo_por_id_parcial(respostas_aplicando_nota):
+    resposta = RespostaParcial(respostas_aplicando_nota[0])
+    assert resposta.conteudo("modalDadosAtitudes") is not None
+    assert resposta.conteudo("DadosAtitudes") is None
+    assert resposta.conteudo("DadosAtitudes", parcial=True) == resposta.conteudo("modalDadosAtitudes")
+
+
+def test_erro_do_servidor():
+    resposta = RespostaParcial(REDIRECT_500)
+    assert resposta.valida
+    assert resposta.redirect == "/errors/500.html"
+    assert resposta.erro_servidor
+    assert not resposta.sessao_expirada
+
+
+def test_sessao_expirada():
+    assert RespostaParcial(REDIRECT_LOGIN).sessao_expirada
+    # Página HTML de login no lugar do XML
+    html_login = "<html><body><form action='/login.html'>Oops! Ocorreu um erro ao carregar essa página</form></body></html>"
+    resposta = RespostaParcial(html_login)
+    assert not resposta.valida
+    assert resposta.sessao_expirada
+
+
+def test_cache_por_texto(respostas_aplicando_nota):
+    texto = respostas_aplicando_nota[0]
+    assert analisar_resposta(texto) is analisar_resposta(texto)
+
+
+def test_fragmento_novo_por_chamada(respostas_aplicando_nota):
+    resposta = analisar_resposta(respostas_aplicando_nota[0])
+    primeiro = resposta.fragmento("modalDadosAtitudes")
+    segundo = resposta.fragmento("modalDadosAtitudes")
+    assert primeiro is not None
+    assert primeiro is not segundo
+    # Alterar uma árvore não afeta a próxima leitura
+    primeiro.clear()
+    assert len(resposta.fragmento("modalDadosAtitudes"))
+
+
+def test_leitura_concorrente(respostas_aplicando_nota):
+    resultados = []
+    lock = threading.Lock()
+
+    def ler(texto):
+        resposta = analisar_resposta(texto)
+        with lock:
+            resultados.append((texto, resposta.viewstate, len(resposta.updates)))
+
+    threads = [
+        threading.Thread(target=ler, args=(texto,))
+        for texto in respostas_aplicando_nota * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    esperado = {t: (RespostaParcial(t).viewstate, len(RespostaParcial(t).updates)) for t in respostas_aplicando_nota}
+    assert all(esperado[texto] == (viewstate, updates) for texto, viewstate, updates in resultados)
@@ -0,0 +1,48 @@
+"""
+Testes do rastreador de progresso (contadores, vazão e ETA)
+"""
+import threading
+
+from src.progress import RastreadorProgresso
+
+
+def test_faixas_paralelas_nao_perdem_contagem():
+    rastreador = RastreadorProgresso()
+    faixas, por_faixa = 8, 200
+    barreira = threading.Barrier(faixas)
+
+    def faixa(numero):
+        barreira.wait()
+        for i in range(por_faixa):
+            nome = f"aluno {numero}-{i}"
+            rastreador.aluno_iniciado(i, faixas * por_faixa, nome)
+            rastreador.aluno_concluido(i, faixas * por_faixa, nome, sucesso=i % 2 == 0)
+
+    threads = [threading.Thread(target=faixa, args=(n,)) for n in range(faixas)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    resumo = rastreador.resumo()
+    assert resumo["done"] == faixas * por_faixa
+    assert resumo["alunos_com_erro"] == faixas * por_faixa // 2
+    concluidos = sorted(e["done"] for e in rastreador.eventos if e["type"] == "throughput")
+    assert concluidos == list(range(1, faixas * por_faixa + 1))
+
+
+def test_lote_zera_contagem_por_turma():
+    rastreador = RastreadorProgresso()
+    for turma, total in (("A", 3), ("B", 2)):
+        rastreador.iniciar_turma()
+        for i in range(total):
+            nome = f"{turma}{i}"
+            rastreador.aluno_iniciado(i, total, nome)
+            rastreador.aluno_concluido(i, total, nome, sucesso=nome != "A0")
+
+    resumo = rastreador.resumo()
+    assert (resumo["done"], resumo["total"]) == (2, 2)
+    assert resumo["eta_seconds"] == 0
+    assert resumo["alunos_com_erro"] == 0
+    assert resumo["alunos_concluidos_lote"] == 5
+    assert resumo["alunos_com_erro_lote"] == 1
@@ -0,0 +1,150 @@
+"""
+Testes da renovação de sessão do lançamento HTTP puro sobre página e HAR reais
+
+O navegador e o servidor são simulados: o GET do diário com idDiario devolve a
+página gravada da aba de conceitos, e a seleção do trimestre numa view dessa
+página devolve a resposta gravada com a tabela (linkEditarAtitudes). Views
+abertas do diário sem idDiario recebem uma resposta sem a tabela, como no SGN.
+"""
+import itertools
+import re
+
+import pytest
+
+from src import sgn_automation_helpers
+from src.concurrency import LimitadorTaxa
+from src.jsf_client import CAMPO_VIEWSTATE
+from src.sgn_automation_helpers import SGNAutomationHelpers
+from tests.conftest import ler_respostas_har
+
+URL_BASE = "https://sgn.sesisenai.org.br/pages/diarioClasse/diario-classe.html"
+URL_DIARIO = URL_BASE + "?idDiario=123456"
+PADRAO_VIEWSTATE = re.compile(r'(name="javax\.faces\.ViewState"[^>]*value=")([^"]*)(")')
+
+
+class RespostaFalsa:
+    def __init__(self, texto, status_code=200):
+        self.text = texto
+        self.status_code = status_code
+        self.headers = {}
+
+
+class ElementoFalso:
+    def __init__(self, valor):
+        self.valor = valor
+
+    def get_attribute(self, nome):
+        return self.valor
+
+
+class DriverFalso:
+    """Navegador parado no diário da turma, cuja sessão expirou"""
+
+    def __init__(self):
+        self.current_url = URL_DIARIO
+        self.visitadas = []
+
+    def get(self, url):
+        self.visitadas.append(url)
+        self.current_url = url
+
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": "nova", "domain": "sgn.sesisenai.org.br", "path": "/"}]
+
+    def execute_script(self, script):
+        return "Mozilla/5.0"
+
+    def find_element(self, by, seletor):
+        return ElementoFalso("vs-navegador")
+
+
+class SeleniumManagerFalso:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def get_driver(self):
+        return self.driver
+
+
+class SessaoFalsa:
+    """Servidor do SGN: cada GET abre uma view com ViewState próprio"""
+
+    def __init__(self, pagina_diario, resposta_tabela, resposta_sem_tabela):
+        self.pagina_diario = pagina_diario
+        self.resposta_tabela = resposta_tabela
+        self.resposta_sem_tabela = resposta_sem_tabela
+        self.views_do_diario = set()
+        self.contador = itertools.count(1)
+        self.cookies = _Cookies()
+        self.headers = {}
+
+    def get(self, url, timeout=None, headers=None):
+        view = f"vs-{next(self.contador)}"
+        if "idDiario=" in url:
+            self.views_do_diario.add(view)
+        return RespostaFalsa(PADRAO_VIEWSTATE.sub(rf"\g<1>{view}\g<3>", self.pagina_diario, count=1))
+
+    def post(self, url, data=None, timeout=None):
+        if data.get(CAMPO_VIEWSTATE) in self.views_do_diario:
+            return RespostaFalsa(self.resposta_tabela)
+        return RespostaFalsa(self.resposta_sem_tabela)
+
+
+class _Cookies:
+    def set(self, *args, **kwargs):
+        pass
+
+    def get_dict(self):
+        return {}
+
+
+@pytest.fixture(scope="module")
+def respostas_conceito():
+    respostas = ler_respostas_har("requisicao conceito.har")
+    com_tabela = next(t for t in respostas if "<partial-response" in t and "linkEditarAtitudes" in t)
+    sem_tabela = next(t for t in respostas if "<partial-response" in t and "linkEditarAtitudes" not in t)
+    return com_tabela, sem_tabela
+
+
+@pytest.fixture
+def helpers(monkeypatch, pagina_conceitos, respostas_conceito):
+    monkeypatch.setattr(sgn_automation_helpers.time, "sleep", lambda segundos: None)
+    helpers = SGNAutomationHelpers(SeleniumManagerFalso(DriverFalso()))
+    helpers.jsf.session = SessaoFalsa(pagina_conceitos, *respostas_conceito)
+    helpers.jsf.limitador = LimitadorTaxa(taxa=1000, rajada=100)
+    monkeypatch.setattr(helpers.jsf.disjuntor, "aguardar", lambda sondar: None)
+    helpers.jsf.sincronizar()
+    return helpers
+
+
+def test_renovacao_volta_ao_diario_da_turma(helpers):
+    helpers.driver.current_url = "https://sgn.sesisenai.org.br/login"
+
+    assert helpers._tentar_renovar_sessao()
+
+    assert helpers.driver.visitadas == [URL_DIARIO]
+    assert helpers._geracao_sessao == 1
+
+
+def test_views_reabertas_apos_renovacao_tem_a_tabela(helpers):
+    chamadas = []
+
+    def reabrir_aba_conceitos(trimestre):
+        chamadas.append((trimestre, helpers.driver.current_url))
+
+    helpers.reabrir_aba_conceitos = reabrir_aba_conceitos
+
+    views = helpers._reabrir_views_apos_renovacao(2, "TR1", timeout=5)
+
+    assert chamadas == [("TR1", URL_DIARIO)]
+    assert len(views) == 2
+    assert set(views) <= helpers.jsf.session.views_do_diario
+
+
+def test_falha_ao_reabrir_aba_nao_abre_views(helpers):
+    def reabrir_aba_conceitos(trimestre):
+        raise Exception("aba não encontrada")
+
+    helpers.reabrir_aba_conceitos = reabrir_aba_conceitos
+
+    assert helpers._reabrir_views_apos_renovacao(2, "TR1", timeout=5) == []